@@ -3,8 +3,10 @@ import time
 from uniinfer import (
     ChatMessage,
     ChatCompletionRequest,
-    ProviderFactory
+    ProviderFactory,
+    with_rate_limit
 )
+from uniinfer.errors import retry_after_of
 from credgoo import get_api_key
 from strukt2meta.jsonclean import cleanify_json
 
@@ -12,6 +14,18 @@ from strukt2meta.jsonclean import cleanify_json
 with open("./config.json", "r") as config_file:
     config = json.load(config_file)
 
+# Upper bound for the exponential backoff between retries, in seconds
+MAX_BACKOFF = 60
+
+
+def _retry_delay(attempt, base, error=None):
+    """Seconds to wait before the next retry: the error's Retry-After if set,
+    otherwise ``base`` doubled per failed attempt; never more than MAX_BACKOFF."""
+    retry_after = retry_after_of(error) if error is not None else None
+    if retry_after is not None:
+        return min(retry_after, MAX_BACKOFF)
+    return min(base * 2 ** attempt, MAX_BACKOFF)
+
 
 def call_ai_model(prompt, input_text, verbose=False, json_cleanup=False, task_type="default"):
     """Call AI model with task-specific configuration and retry logic.
@@ -39,14 +53,19 @@ def call_ai_model(prompt, input_text, verbose=False, json_cleanup=False, task_ty
         max_context_tokens = 24000  # Conservative estimate for default tasks
         max_response_tokens = 2048  # Reduced response tokens for default tasks
 
-    # Get a provider instance (API key is retrieved automatically via Credgoo)
-    provider = ProviderFactory.get_provider(
+    # Get a provider instance (API key is retrieved automatically via Credgoo).
+    # Calls wait for the provider's shared RPM/TPM budget (PROVIDER_CONFIGS
+    # 'rate_limit') instead of sleeping a fixed cooldown after every call;
+    # failed and empty responses still back off before retrying.
+    provider = with_rate_limit(ProviderFactory.get_provider(
         name=provider_name,
         api_key=get_api_key(provider_name)
-    )
+    ), provider_name)
 
     # Set max_retries based on provider (Gemini is more prone to failures)
     max_retries = 5 if provider_name == "gemini" else 3
+    # Initial retry backoff (longer for Gemini due to rate limiting)
+    backoff_base = 5 if provider_name == "gemini" else 2
 
     # Handle long documents by truncating if necessary
 
@@ -135,10 +154,6 @@ def call_ai_model(prompt, input_text, verbose=False, json_cleanup=False, task_ty
                     response_text = ""
                 print("\n=== End of Response ===\n")
 
-                # Add cooldown after AI invocation (longer for Gemini due to rate limiting)
-                cooldown_time = 5 if provider_name == "gemini" else 2
-                time.sleep(cooldown_time)
-
                 if json_cleanup and response_text.strip():
                     # Cleanify the streamed response
                     result = cleanify_json(response_text)
@@ -153,13 +168,11 @@ def call_ai_model(prompt, input_text, verbose=False, json_cleanup=False, task_ty
                 except Exception as e:
                     if verbose:
                         print(f"⚠️ API call error: {e}")
-                    # Continue to retry
+                    # Back off, then continue to retry
+                    if attempt < max_retries - 1:
+                        time.sleep(_retry_delay(attempt, backoff_base, e))
                     continue
 
-                # Add cooldown after AI invocation (longer for Gemini due to rate limiting)
-                cooldown_time = 5 if provider_name == "gemini" else 2
-                time.sleep(cooldown_time)
-
                 if json_cleanup and response.message.content.strip():
                     # Cleanify the response
                     result = cleanify_json(response.message.content)
@@ -170,9 +183,10 @@ def call_ai_model(prompt, input_text, verbose=False, json_cleanup=False, task_ty
 
             # If we get here, the response was empty or invalid
             if attempt < max_retries - 1:
+                delay = _retry_delay(attempt, backoff_base)
                 if verbose:
-                    print(f"⚠️ Empty or invalid response, retrying in {cooldown_time}s...")
-                time.sleep(cooldown_time)
+                    print(f"⚠️ Empty or invalid response, retrying in {delay}s...")
+                time.sleep(delay)
             else:
                 if verbose:
                     print("⚠️ All retry attempts failed")
@@ -182,8 +196,7 @@ def call_ai_model(prompt, input_text, verbose=False, json_cleanup=False, task_ty
             if attempt < max_retries - 1:
                 if verbose:
                     print(f"⚠️ API call failed (attempt {attempt + 1}/{max_retries}): {e}")
-                    cooldown_time = 5 if provider_name == "gemini" else 2
-                    time.sleep(cooldown_time)
+                time.sleep(_retry_delay(attempt, backoff_base, e))
                 continue
             else:
                 if verbose:
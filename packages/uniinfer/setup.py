@@ -37,9 +37,13 @@ setup(
         'mistral': ['mistralai>=0.4.0'],
         'cohere': ['cohere>=4.0.0'],
         'huggingface': ['huggingface-hub>=0.20.0'],
+        'async': ['httpx>=0.24.0'],
+        'numpy': ['numpy>=1.21.0'],
         'api': [
             'fastapi>=0.100.0',
             'uvicorn[standard]>=0.23.0',
+            'httpx>=0.24.0',
+            'python-multipart>=0.0.9',
         ],
         'all': [
             'google-genai>=1.38.0',
@@ -0,0 +1,108 @@
+"""
+Tests for adaptive (AIMD) concurrency limits and Retry-After handling.
+"""
+
+import asyncio
+import json
+import time
+
+from uniinfer.adaptive import RATE_LIMITED, TIMED_OUT, AdaptiveConcurrency, classify_error
+from uniinfer.errors import RateLimitError, http_error, map_provider_error, parse_retry_after
+from uniinfer.scheduler import PriorityScheduler
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_additive_increase_and_multiplicative_decrease():
+    """
+    Test growth only while saturated with flat latency, and one cut per burst of 429s.
+    """
+    limits = AdaptiveConcurrency(initial_limit=4, path=None)
+    for _ in range(4):
+        limits.on_success("p", 0.1, saturated=False)
+    assert limits.limit("p") == 4
+    for _ in range(5):
+        limits.on_success("p", 0.1)
+    assert limits.limit("p") == 5
+
+    # latency far above the baseline stops the growth
+    before = limits.stats()["p"]["limit"]
+    for _ in range(10):
+        limits.on_success("p", 5.0)
+    assert limits.stats()["p"]["limit"] < before + 0.5
+
+    started = time.monotonic()
+    assert limits.on_error("p", RateLimitError("429")) == RATE_LIMITED
+    assert limits.limit("p") == 2
+    # requests that were already running when the limit was cut do not cut again
+    assert limits.on_error("p", Exception("HTTP 429 too many requests"), started=started) == RATE_LIMITED
+    assert limits.limit("p") == 2
+    assert limits.on_error("p", ValueError("bad request")) is None
+    for _ in range(5):
+        limits.on_error("p", TimeoutError("timed out"))
+    assert limits.limit("p") == 1
+    assert limits.stats()["p"]["decreases"] == 6
+
+
+def test_retry_after_pauses_and_limits_persist(tmp_path):
+    """
+    Test that Retry-After pauses a provider and learned limits survive a restart.
+    """
+    path = str(tmp_path / "adaptive_limits.json")
+    limits = AdaptiveConcurrency(initial_limit=8, path=path)
+    limits.on_error("p", RateLimitError("slow down", retry_after=30))
+    assert 29 < limits.paused_for("p") <= 30
+    assert limits.paused_for("other") == 0
+    limits.save()
+    assert json.load(open(path))["p"]["limit"] == 4
+
+    restarted = AdaptiveConcurrency(initial_limit=8, path=path)
+    assert restarted.limit("p") == 4
+    assert restarted.paused_for("p") == 0
+
+
+def test_retry_after_parsing():
+    """
+    Test Retry-After parsing from headers, responses and error messages.
+    """
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    error = http_error("API error: 429", FakeResponse(429, {"retry-after": "3"}))
+    assert isinstance(error, RateLimitError) and error.retry_after == 3.0
+    assert type(http_error("API error: 500", FakeResponse(500))) is Exception
+    assert map_provider_error("p", Exception("rate limit hit, retry after 12s")).retry_after == 12.0
+    assert classify_error("p", asyncio.TimeoutError()) == TIMED_OUT
+
+
+def test_scheduler_follows_adaptive_limit_and_pause():
+    """
+    Test that the scheduler admits up to the learned limit and waits out a Retry-After.
+    """
+    limits = AdaptiveConcurrency(initial_limit=2, path=None)
+    scheduler = PriorityScheduler(adaptive=limits, use_provider_configs=False)
+
+    async def main():
+        first = await scheduler.acquire("ad", "m")
+        second = await scheduler.acquire("ad", "m")
+        third = asyncio.ensure_future(scheduler.acquire("ad", "m"))
+        await asyncio.sleep(0.01)
+        assert not third.done()
+
+        # a 429 with Retry-After halves the limit and pauses admissions
+        first.release(error=RateLimitError("429", retry_after=0.1))
+        assert scheduler.provider_limit("ad") == 1
+        await asyncio.sleep(0.02)
+        assert not third.done()
+        second.release()
+        started = time.monotonic()
+        slot = await asyncio.wait_for(third, 1)
+        assert time.monotonic() - started > 0.05
+        slot.release()
+
+    asyncio.run(main())
+    assert limits.stats()["ad"]["decreases"] == 1
@@ -0,0 +1,100 @@
+"""
+Tests for the bounded-concurrency batch runner.
+"""
+
+import threading
+import time
+
+import pytest
+
+from uniinfer import (
+    ChatMessage, ChatCompletionRequest, ChatCompletionResponse, ChatProvider,
+    FallbackStrategy, ProviderFactory, complete_many
+)
+
+
+class SlowProvider(ChatProvider):
+    """Provider that sleeps, tracks peak concurrency and fails on request."""
+
+    def __init__(self, api_key=None, **kwargs):
+        super().__init__(api_key)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def complete(self, request, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.02)
+            content = request.messages[-1].content
+            if content == "fail":
+                raise RuntimeError("upstream failed")
+            return ChatCompletionResponse(
+                message=ChatMessage(role="assistant", content=content.upper()),
+                provider="slow", model="slow-1", usage={}, raw_response={})
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def make_request(content):
+    return ChatCompletionRequest(messages=[ChatMessage(role="user", content=content)])
+
+
+@pytest.fixture
+def slow_provider(monkeypatch):
+    """Register the slow provider and clean up afterwards."""
+    monkeypatch.setenv("SLOW_API_KEY", "key")
+    ProviderFactory.register_provider("slow", SlowProvider)
+    yield ProviderFactory.get_provider("slow")
+    ProviderFactory._providers.pop("slow", None)
+    ProviderFactory.clear_cache("slow")
+
+
+def test_results_are_ordered_with_errors_captured(slow_provider):
+    """
+    Test that results follow input order and failures do not abort the batch.
+    """
+    contents = ["a", "fail", "c", "d"]
+    seen = []
+    results = complete_many([make_request(c) for c in contents], provider=slow_provider,
+                            concurrency=4, progress=lambda done, total, r: seen.append((done, total)))
+    assert [r.index for r in results] == [0, 1, 2, 3]
+    assert [r.response.message.content for r in results if r.ok] == ["A", "C", "D"]
+    assert isinstance(results[1].error, RuntimeError)
+    assert sorted(seen) == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+
+def test_concurrency_limits(slow_provider):
+    """
+    Test the global and per-provider in-flight limits.
+    """
+    requests = [("slow", make_request(str(i))) for i in range(8)]
+    complete_many(requests, concurrency=8, per_provider_limits={"slow": 2})
+    assert slow_provider.peak == 2
+
+
+def test_strategy_respects_provider_limits(slow_provider):
+    """
+    Test that a FallbackStrategy holds provider slots around each call.
+    """
+    strategy = FallbackStrategy(["slow"], max_retries=0)
+    results = complete_many([make_request(str(i)) for i in range(6)], strategy=strategy,
+                            concurrency=6, per_provider_limits={"slow": 3})
+    assert all(r.ok and r.provider == "slow" for r in results)
+    assert slow_provider.peak <= 3
+
+
+def test_provider_instance_uses_registered_name(slow_provider):
+    """
+    Test that per-provider limits apply to a provider passed as an instance.
+    """
+    results = complete_many([make_request(str(i)) for i in range(6)], provider=slow_provider,
+                            concurrency=6, per_provider_limits={"slow": 2})
+    assert all(r.ok and r.provider == "slow" for r in results)
+    assert slow_provider.peak == 2
+
+    results = complete_many([make_request("x")], provider=("renamed", slow_provider))
+    assert results[0].provider == "renamed"
@@ -0,0 +1,167 @@
+"""
+Tests for the persistent batch job store and runner.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from uniinfer.batch_jobs import BatchRunner, BatchStore, owner_hash, parse_batch_input
+from uniinfer.errors import RateLimitError
+
+
+def _input(n, model="p@m"):
+    return "\n".join(json.dumps({
+        "custom_id": f"r{i}", "method": "POST", "url": "/v1/chat/completions",
+        "body": {"model": model, "messages": [{"role": "user", "content": f"q{i}"}]},
+    }) for i in range(n)).encode("utf-8")
+
+
+def _lines(store, owner, file_id):
+    return [json.loads(line) for line in store.file_content(owner, file_id).decode().splitlines()]
+
+
+def test_batch_runs_retries_and_writes_output_files(tmp_path):
+    """
+    Test a batch end to end: retried rate limits, a failed item and the result files.
+    """
+    store = BatchStore(str(tmp_path / "batches.sqlite"))
+    owner = owner_hash("token")
+    input_file = store.create_file(owner, _input(5), "in.jsonl")
+    batch = store.create_batch(owner, input_file["id"])
+    assert batch["status"] == "in_progress"
+    assert batch["request_counts"] == {"total": 5, "completed": 0, "failed": 0}
+    assert store.get_batch(owner_hash("someone else"), batch["id"]) is None
+
+    calls = []
+
+    async def execute(body, token):
+        content = body["messages"][0]["content"]
+        calls.append(content)
+        assert token == "token"
+        if content == "q1" and calls.count("q1") == 1:
+            raise RateLimitError("slow down")
+        if content == "q3":
+            raise ValueError("bad request")
+        return {"object": "chat.completion", "choices": [{"message": {"content": content.upper()}}]}
+
+    runner = BatchRunner(store, execute, concurrency=2, retry_delay=0.001)
+    asyncio.run(runner.drain(batch["id"], "token"))
+
+    batch = store.get_batch(owner, batch["id"])
+    assert batch["status"] == "completed"
+    assert batch["request_counts"] == {"total": 5, "completed": 4, "failed": 1}
+    assert calls.count("q1") == 2
+    output = _lines(store, owner, batch["output_file_id"])
+    assert [line["custom_id"] for line in output] == ["r0", "r1", "r2", "r4"]
+    assert output[1]["response"]["body"]["choices"][0]["message"]["content"] == "Q1"
+    errors = _lines(store, owner, batch["error_file_id"])
+    assert errors[0]["custom_id"] == "r3"
+    assert errors[0]["error"] == {"code": "ValueError", "message": "bad request"}
+
+
+def test_restart_resumes_only_pending_requests(tmp_path):
+    """
+    Test that results written before a restart are kept and not sent again.
+    """
+    path = str(tmp_path / "batches.sqlite")
+    owner = owner_hash("token")
+    store = BatchStore(path)
+    batch = store.create_batch(owner, store.create_file(owner, _input(4), "in.jsonl")["id"])
+    store.record_result(batch["id"], 0, response={"done": "before restart"})
+    store.record_result(batch["id"], 1, response={"done": "before restart"})
+    store.close()
+
+    store = BatchStore(path)
+    assert [b["id"] for b in store.active_batches()] == [batch["id"]]
+    sent = []
+
+    async def execute(body, token):
+        sent.append(body["messages"][0]["content"])
+        return {"done": "after restart"}
+
+    asyncio.run(BatchRunner(store, execute).drain(batch["id"], "token"))
+    assert sorted(sent) == ["q2", "q3"]
+    output = _lines(store, owner, store.get_batch(owner, batch["id"])["output_file_id"])
+    assert [line["response"]["body"]["done"] for line in output] == ["before restart"] * 2 + ["after restart"] * 2
+    assert store.active_batches() == []
+
+
+def test_cancel_stops_sending_and_reports_unsent_requests(tmp_path):
+    """
+    Test that a cancelled batch keeps finished results and lists the rest as cancelled.
+    """
+    store = BatchStore(str(tmp_path / "batches.sqlite"))
+    owner = owner_hash("token")
+    batch = store.create_batch(owner, store.create_file(owner, _input(6), "in.jsonl")["id"])
+
+    async def execute(body, token):
+        if body["messages"][0]["content"] == "q1":
+            store.cancel_batch(owner, batch["id"])
+        return {"ok": True}
+
+    asyncio.run(BatchRunner(store, execute, concurrency=1).drain(batch["id"], "token"))
+    batch = store.get_batch(owner, batch["id"])
+    assert batch["status"] == "cancelled"
+    assert batch["cancelled_at"] is not None
+    assert len(_lines(store, owner, batch["output_file_id"])) == 2
+    errors = _lines(store, owner, batch["error_file_id"])
+    assert [line["custom_id"] for line in errors] == ["r2", "r3", "r4", "r5"]
+    assert errors[0]["error"]["code"] == "batch_cancelled"
+
+
+def test_overdue_batches_expire_and_stop_sending(tmp_path):
+    """
+    Test that batches past expires_at are finalized as expired, even without their owner.
+    """
+    store = BatchStore(str(tmp_path / "batches.sqlite"))
+    owner = owner_hash("token")
+    batch = store.create_batch(owner, store.create_file(owner, _input(3), "in.jsonl")["id"])
+    store.record_result(batch["id"], 0, response={"ok": True})
+    with store._lock:
+        store._conn.execute("UPDATE batches SET created_at = created_at - 25 * 3600 WHERE id = ?", (batch["id"],))
+        store._conn.commit()
+    sent = []
+
+    async def execute(body, token):
+        sent.append(body)
+        return {"ok": True}
+
+    async def main():
+        runner = BatchRunner(store, execute)
+        runner.start()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if not store.active_batches():
+                break
+        await runner.stop()
+
+    asyncio.run(main())
+    assert sent == []
+    batch = store.get_batch(owner, batch["id"])
+    assert batch["status"] == "expired"
+    assert batch["expired_at"] is not None
+    assert len(_lines(store, owner, batch["output_file_id"])) == 1
+    errors = _lines(store, owner, batch["error_file_id"])
+    assert [line["custom_id"] for line in errors] == ["r1", "r2"]
+    assert errors[0]["error"]["code"] == "batch_expired"
+
+
+def test_invalid_input_is_rejected(tmp_path):
+    """
+    Test validation of batch input files and endpoints.
+    """
+    with pytest.raises(ValueError, match="provider@modelname"):
+        parse_batch_input(_input(1, model="gpt-4o"), "/v1/chat/completions")
+    with pytest.raises(ValueError, match="duplicate"):
+        parse_batch_input(_input(1) + b"\n" + _input(1), "/v1/chat/completions")
+    with pytest.raises(ValueError, match="Line 1"):
+        parse_batch_input(b"not json", "/v1/chat/completions")
+    store = BatchStore(str(tmp_path / "batches.sqlite"))
+    owner = owner_hash("token")
+    file_id = store.create_file(owner, _input(1), "in.jsonl")["id"]
+    with pytest.raises(ValueError):
+        store.create_batch(owner, file_id, endpoint="/v1/embeddings")
+    with pytest.raises(KeyError):
+        store.create_batch(owner_hash("other"), file_id)
@@ -0,0 +1,158 @@
+"""
+Tests for per-provider circuit breakers.
+"""
+
+import time
+
+import pytest
+
+from uniinfer import (
+    ChatMessage, ChatCompletionRequest, ChatCompletionResponse, ChatProvider,
+    FallbackStrategy, ProviderFactory
+)
+from uniinfer.circuit_breaker import (
+    CircuitBreaker, configure_circuit_breakers, get_circuit_breaker
+)
+from uniinfer.errors import CircuitOpenError
+
+
+def test_opens_after_consecutive_failures_and_probes():
+    """
+    Test the closed -> open -> half-open -> closed cycle.
+    """
+    breaker = CircuitBreaker("p", failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()  # only one probe while half-open
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_opens_on_error_rate():
+    """
+    Test that a high error rate opens the breaker without consecutive failures.
+    """
+    breaker = CircuitBreaker("p", failure_threshold=100, error_rate_threshold=0.5,
+                             window=4, min_calls=4)
+    for ok in [True, False, True, False]:
+        breaker.record_success() if ok else breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_failed_probe_reopens():
+    """
+    Test that a failing half-open probe opens the breaker again.
+    """
+    breaker = CircuitBreaker("p", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+
+class DownProvider(ChatProvider):
+    """Provider that always fails and counts its calls."""
+
+    calls = 0
+
+    def complete(self, request, **kwargs):
+        DownProvider.calls += 1
+        raise RuntimeError("connection refused")
+
+
+class UpProvider(ChatProvider):
+    """Provider that always answers."""
+
+    def complete(self, request, **kwargs):
+        return ChatCompletionResponse(
+            message=ChatMessage(role="assistant", content="up"),
+            provider="up", model="m", usage={}, raw_response={})
+
+
+@pytest.fixture
+def breaker_providers(monkeypatch):
+    """Register the providers and use strict breaker settings."""
+    configure_circuit_breakers(failure_threshold=2, reset_timeout=60)
+    for name, cls in [("down", DownProvider), ("up", UpProvider)]:
+        monkeypatch.setenv(f"{name.upper()}_API_KEY", "key")
+        ProviderFactory.register_provider(name, cls)
+    DownProvider.calls = 0
+    yield
+    for name in ("down", "up"):
+        ProviderFactory._providers.pop(name, None)
+        ProviderFactory.clear_cache(name)
+    configure_circuit_breakers()
+
+
+def test_strategy_short_circuits_across_instances(breaker_providers):
+    """
+    Test that an open breaker is shared by strategies and skips the provider.
+    """
+    request = ChatCompletionRequest(messages=[ChatMessage(role="user", content="hi")])
+    first = FallbackStrategy(["down", "up"], max_retries=3)
+    assert first.complete(request)[1] == "up"
+    assert DownProvider.calls == 2
+    assert get_circuit_breaker("down").state == "open"
+
+    second = FallbackStrategy(["down", "up"], max_retries=3)
+    assert second.complete(request)[1] == "up"
+    assert DownProvider.calls == 2
+
+
+class FlakyStreamProvider(ChatProvider):
+    """Provider whose streams fail while ``failing`` is set."""
+
+    failing = False
+
+    def stream_complete(self, request, **kwargs):
+        if FlakyStreamProvider.failing:
+            raise RuntimeError("connection refused")
+        yield ChatCompletionResponse(
+            message=ChatMessage(role="assistant", content="ok"),
+            provider="flaky", model="m", usage={}, raw_response={})
+
+
+def test_stream_successes_reset_and_close_breaker(monkeypatch):
+    """
+    Test that successful streams reset the failure count and close a half-open breaker.
+    """
+    configure_circuit_breakers(failure_threshold=3, reset_timeout=0.05,
+                               error_rate_threshold=1.0)
+    monkeypatch.setenv("FLAKY_API_KEY", "key")
+    ProviderFactory.register_provider("flaky", FlakyStreamProvider)
+    request = ChatCompletionRequest(messages=[ChatMessage(role="user", content="hi")])
+    strategy = FallbackStrategy(["flaky"], max_retries=0)
+
+    def stream(failing):
+        FlakyStreamProvider.failing = failing
+        try:
+            return [chunk.message.content for chunk in strategy.stream_complete(request)[0]]
+        except Exception:
+            return None
+
+    try:
+        for _ in range(2):
+            assert stream(True) is None
+        assert stream(False) == ["ok"]
+        assert get_circuit_breaker("flaky").get_stats()["consecutive_failures"] == 0
+        for _ in range(2):
+            assert stream(True) is None
+        assert get_circuit_breaker("flaky").state == "closed"
+
+        assert stream(True) is None
+        assert get_circuit_breaker("flaky").state == "open"
+        time.sleep(0.06)
+        assert stream(False) == ["ok"]
+        assert get_circuit_breaker("flaky").state == "closed"
+    finally:
+        ProviderFactory._providers.pop("flaky", None)
+        ProviderFactory.clear_cache("flaky")
+        configure_circuit_breakers()
@@ -0,0 +1,142 @@
+"""
+Tests for the two-tier completion cache.
+"""
+
+import asyncio
+
+from uniinfer import ChatMessage, ChatCompletionRequest, ChatCompletionResponse, ChatProvider
+from uniinfer.completion_cache import CompletionCache, CachedProvider, make_cache_key
+from uniinfer.ratelimit import RateLimitedProvider, RateLimiter
+
+
+class EchoProvider(ChatProvider):
+    """Provider that echoes the last message and counts upstream calls."""
+
+    def __init__(self, api_key=None, **kwargs):
+        super().__init__(api_key)
+        self.calls = 0
+
+    def _response(self, content):
+        return ChatCompletionResponse(
+            message=ChatMessage(role="assistant", content=content),
+            provider="echo", model="echo-1", usage={"total_tokens": 2}, raw_response={})
+
+    def complete(self, request, **kwargs):
+        self.calls += 1
+        return self._response("echo: " + request.messages[-1].content)
+
+    def stream_complete(self, request, **kwargs):
+        self.calls += 1
+        for piece in ["echo", ": ", request.messages[-1].content]:
+            yield self._response(piece)
+
+
+def make_request(content="hello", temperature=0.0):
+    return ChatCompletionRequest(
+        messages=[ChatMessage(role="user", content=content)],
+        model="echo-1", temperature=temperature, max_tokens=10)
+
+
+def test_cache_key_depends_on_all_inputs():
+    """
+    Test that keys change with any input and are stable otherwise.
+    """
+    messages = [{"role": "user", "content": "hi"}]
+    base = make_cache_key("p", "m", messages, 0.0, 10, {"top_p": 1})
+    assert base == make_cache_key("p", "m", messages, 0.0, 10, {"top_p": 1})
+    assert base != make_cache_key("p", "m", messages, 0.5, 10, {"top_p": 1})
+    assert base != make_cache_key("p", "m", messages, 0.0, 20, {"top_p": 1})
+    assert base != make_cache_key("q", "m", messages, 0.0, 10, {"top_p": 1})
+    assert base != make_cache_key("p", "m", messages, 0.0, 10, {"top_p": 1},
+                                  base_url="http://host-a:11434")
+
+
+def test_hosts_do_not_share_entries():
+    """
+    Test that the same provider and model on two hosts are cached separately.
+    """
+    cache = CompletionCache(path=None)
+    host_a, host_b = EchoProvider(), EchoProvider()
+    host_a.base_url = "http://host-a:11434"
+    host_b.base_url = "http://host-b:11434"
+    CachedProvider(host_a, cache, "ollama").complete(make_request())
+    CachedProvider(host_b, cache, "ollama").complete(make_request())
+    assert host_a.calls == host_b.calls == 1
+
+
+def test_hosts_do_not_share_entries_behind_rate_limits(tmp_path):
+    """
+    Test that the host is found through a RateLimitedProvider wrapper.
+    """
+    cache = CompletionCache(path=None)
+    host_a, host_b = EchoProvider(), EchoProvider()
+    host_a.base_url = "http://host-a:11434"
+    host_b.base_url = "http://host-b:11434"
+    limiter = RateLimiter("ollama", rpm=100, path=str(tmp_path / "rl.sqlite"))
+    CachedProvider(RateLimitedProvider(host_a, limiter), cache, "ollama").complete(make_request())
+    CachedProvider(RateLimitedProvider(host_b, limiter), cache, "ollama").complete(make_request())
+    assert host_a.calls == host_b.calls == 1
+
+
+def test_complete_hits_memory_and_disk(tmp_path):
+    """
+    Test that repeated requests are served from memory, then from disk after restart.
+    """
+    path = str(tmp_path / "cache.sqlite")
+    upstream = EchoProvider()
+    provider = CachedProvider(upstream, CompletionCache(path=path), "echo")
+    assert provider.complete(make_request()).message.content == "echo: hello"
+    assert provider.complete(make_request()).message.content == "echo: hello"
+    assert upstream.calls == 1
+
+    restarted = CachedProvider(upstream, CompletionCache(path=path), "echo")
+    response = restarted.complete(make_request())
+    assert response.message.content == "echo: hello"
+    assert response.raw_response == {"cached": True}
+    assert upstream.calls == 1
+
+
+def test_ttl_expiry(tmp_path):
+    """
+    Test that expired entries are treated as misses.
+    """
+    cache = CompletionCache(path=str(tmp_path / "cache.sqlite"), ttl=-1)
+    cache.set("key", {"content": "x"})
+    assert cache.get("key") is None
+
+
+def test_size_based_eviction(tmp_path):
+    """
+    Test that the persistent tier stays within its byte budget.
+    """
+    cache = CompletionCache(path=str(tmp_path / "cache.sqlite"),
+                            memory_size=1, max_disk_bytes=200)
+    for i in range(10):
+        cache.set(f"key-{i}", {"content": "x" * 50})
+    assert cache.stats()["disk_entries"] < 10
+    assert cache.get("key-9") is not None
+
+
+def test_stream_replays_chunks(tmp_path):
+    """
+    Test that streamed completions are cached and replayed chunk by chunk.
+    """
+    upstream = EchoProvider()
+    provider = CachedProvider(
+        upstream, CompletionCache(path=str(tmp_path / "cache.sqlite")), "echo")
+    first = [c.message.content for c in provider.stream_complete(make_request())]
+    second = [c.message.content for c in provider.stream_complete(make_request())]
+    assert first == second == ["echo", ": ", "hello"]
+    assert upstream.calls == 1
+
+
+def test_async_complete_uses_cache(tmp_path):
+    """
+    Test that acomplete shares entries with complete.
+    """
+    upstream = EchoProvider()
+    provider = CachedProvider(upstream, CompletionCache(path=None), "echo")
+    provider.complete(make_request())
+    response = asyncio.run(provider.acomplete(make_request()))
+    assert response.message.content == "echo: hello"
+    assert upstream.calls == 1
@@ -0,0 +1,99 @@
+"""
+Tests for the in-memory credential resolution cache.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from uniinfer.credential_cache import CredentialCache
+from uniinfer.errors import AuthenticationError
+
+
+class Resolver:
+    """Resolves keys as '<provider>-key' and counts calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, token, provider):
+        self.calls.append((token, provider))
+        if token == "bad@token":
+            raise AuthenticationError("unknown token")
+        return f"{provider}-key"
+
+
+def test_keys_are_resolved_once_per_token_and_provider():
+    """
+    Test that repeated lookups hit the cache and scopes do not mix.
+    """
+    cache = CredentialCache()
+    resolver = Resolver()
+    assert cache.resolve("a@b", "openai", resolver) == "openai-key"
+    assert cache.resolve("a@b", "openai", resolver) == "openai-key"
+    assert cache.resolve("a@b", "mistral", resolver) == "mistral-key"
+    assert cache.resolve("c@d", "openai", resolver) == "openai-key"
+    assert len(resolver.calls) == 3
+    assert cache.stats() == {"hits": 1, "misses": 3, "entries": 3}
+    assert all("a@b" not in str(key) for key in cache._entries)
+
+
+def test_errors_are_not_cached():
+    """
+    Test that a failed resolution is retried on the next request.
+    """
+    cache = CredentialCache()
+    resolver = Resolver()
+    for _ in range(2):
+        with pytest.raises(AuthenticationError):
+            cache.resolve("bad@token", "openai", resolver)
+    assert len(resolver.calls) == 2
+
+
+def test_ttl_size_bound_and_flush():
+    """
+    Test expiry, LRU eviction and per-token and global flushes.
+    """
+    resolver = Resolver()
+    cache = CredentialCache(ttl=0)
+    cache.resolve("a@b", "openai", resolver)
+    cache.resolve("a@b", "openai", resolver)
+    assert len(resolver.calls) == 2
+
+    cache = CredentialCache(max_entries=2)
+    for provider in ("p1", "p2", "p3"):
+        cache.resolve("a@b", provider, resolver)
+    assert cache.stats()["entries"] == 2
+    cache.resolve("c@d", "p1", resolver)
+    assert cache.flush("a@b") == 1
+    assert cache.flush() == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_aresolve_runs_off_the_loop_and_shares_concurrent_misses():
+    """
+    Test that concurrent async misses call the resolver once, in a worker thread.
+    """
+    cache = CredentialCache()
+    threads = []
+
+    def slow_resolver(token, provider):
+        threads.append(threading.get_ident())
+        time.sleep(0.05)
+        return f"{provider}-key"
+
+    async def main():
+        keys = await asyncio.gather(*[cache.aresolve("a@b", "openai", slow_resolver) for _ in range(5)])
+        return keys, threading.get_ident()
+
+    keys, loop_thread = asyncio.run(main())
+    assert keys == ["openai-key"] * 5
+    assert len(threads) == 1 and threads[0] != loop_thread
+    assert asyncio.run(cache.aresolve("a@b", "openai", slow_resolver)) == "openai-key"
+    assert len(threads) == 1
+
+    with pytest.raises(AuthenticationError):
+        asyncio.run(cache.aresolve("bad@token", "openai", Resolver()))
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,119 @@
+"""
+Tests for embedding batching, splitting and deduplication.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from uniinfer import EmbeddingProvider, EmbeddingRequest, EmbeddingResponse
+from uniinfer.embedding_batch import BatchingEmbeddingProvider, plan_batches
+from uniinfer.errors import ProviderError
+
+
+class RecordingEmbeddingProvider(EmbeddingProvider):
+    """Embeds each text as [len(text)] and records the batches it receives."""
+
+    MAX_BATCH_SIZE = 2
+
+    def __init__(self, api_key=None, **kwargs):
+        super().__init__(api_key)
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def embed(self, request, **kwargs):
+        with self._lock:
+            self.batches.append(list(request.input))
+        # Return the data reversed to check that results are ordered by index
+        data = [{"object": "embedding", "embedding": [float(len(text))], "index": i}
+                for i, text in enumerate(request.input)][::-1]
+        return EmbeddingResponse(
+            object="list", data=data, model=request.model,
+            usage={"prompt_tokens": len(request.input), "total_tokens": len(request.input)},
+            provider="recording", raw_response={})
+
+
+def test_plan_batches_dedups_and_splits():
+    """
+    Test that duplicates map to one position and batches respect the size.
+    """
+    batches, mapping = plan_batches(["a", "b", "a", "c", "d"], 3)
+    assert batches == [["a", "b", "c"], ["d"]]
+    assert mapping == [0, 1, 0, 2, 3]
+
+
+def test_embed_splits_dedups_and_reassembles():
+    """
+    Test that results come back in input order with one request per batch.
+    """
+    inner = RecordingEmbeddingProvider()
+    provider = BatchingEmbeddingProvider(inner)
+    texts = ["x", "yy", "x", "zzz", "yy", "wwww", "x"]
+    response = provider.embed(EmbeddingRequest(input=texts, model="m"))
+
+    assert [item["embedding"] for item in response.data] == [[float(len(t))] for t in texts]
+    assert [item["index"] for item in response.data] == list(range(len(texts)))
+    assert sorted(text for batch in inner.batches for text in batch) == ["wwww", "x", "yy", "zzz"]
+    assert all(len(batch) <= 2 for batch in inner.batches)
+    assert response.usage == {"prompt_tokens": 4, "total_tokens": 4}
+
+
+def test_small_request_is_passed_through():
+    """
+    Test that a request without duplicates that fits one batch is sent unchanged.
+    """
+    inner = RecordingEmbeddingProvider()
+    request = EmbeddingRequest(input=["a", "b"], model="m")
+    BatchingEmbeddingProvider(inner).embed(request)
+    assert inner.batches == [["a", "b"]]
+
+
+def test_aembed_batches_concurrently():
+    """
+    Test the async path through the default executor-backed aembed.
+    """
+    inner = RecordingEmbeddingProvider()
+    provider = BatchingEmbeddingProvider(inner, max_batch_size=1)
+    texts = ["a", "bb", "a"]
+    response = asyncio.run(provider.aembed(EmbeddingRequest(input=texts, model="m")))
+    assert [item["embedding"] for item in response.data] == [[1.0], [2.0], [1.0]]
+    assert len(inner.batches) == 2
+
+
+def test_response_holds_float32_matrix():
+    """
+    Test that responses keep vectors as a float32 matrix with a data view for old callers.
+    """
+    import base64
+
+    from uniinfer.core import pack_embedding
+    np = pytest.importorskip("numpy")
+
+    response = EmbeddingResponse(
+        object="list", data=[{"embedding": [3.0, 4.0], "index": 1}, {"embedding": [1.0, 2.0], "index": 0}],
+        model="m", usage={}, provider="p", raw_response={})
+    assert response.embeddings.dtype == np.float32
+    assert response.embeddings.shape == (2, 2)
+    assert response.data[0] == {"object": "embedding", "embedding": [1.0, 2.0], "index": 0}
+    packed = base64.b64encode(pack_embedding(response.embeddings[1]))
+    assert np.frombuffer(base64.b64decode(packed), dtype="<f4").tolist() == [3.0, 4.0]
+
+
+def test_short_or_long_batch_raises_provider_error():
+    """
+    Test that a batch with the wrong number of vectors raises instead of misaligning rows.
+    """
+    class MiscountingProvider(RecordingEmbeddingProvider):
+        def embed(self, request, **kwargs):
+            response = super().embed(request, **kwargs)
+            # drop a vector from the first batch, add one to the others
+            data = response.data[:-1] if len(self.batches) == 1 else response.data + response.data[:1]
+            return EmbeddingResponse(object="list", data=data, model=response.model,
+                                     usage=response.usage, provider="recording", raw_response={})
+
+    request = EmbeddingRequest(input=["a", "bb", "ccc", "dddd"], model="m")
+    with pytest.raises(ProviderError, match="batch 1"):
+        BatchingEmbeddingProvider(MiscountingProvider(), concurrency=1).embed(request)
+    with pytest.raises(ProviderError):
+        asyncio.run(BatchingEmbeddingProvider(MiscountingProvider(), concurrency=1).aembed(request))
@@ -0,0 +1,157 @@
+"""
+Tests for the memory-mapped embedding cache.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+
+import pytest
+
+from uniinfer import EmbeddingProvider, EmbeddingRequest, EmbeddingResponse
+from uniinfer.embedding_cache import (
+    CachedEmbeddingProvider, EmbeddingCache, make_embedding_key
+)
+from uniinfer.errors import ProviderError
+
+
+class CountingEmbeddingProvider(EmbeddingProvider):
+    """Embeds each text as [len(text), 0.5] and records the texts it was asked for."""
+
+    def __init__(self, api_key=None, **kwargs):
+        super().__init__(api_key)
+        self.calls = []
+
+    def embed(self, request, **kwargs):
+        self.calls.append(list(request.input))
+        data = [{"object": "embedding", "embedding": [float(len(text)), 0.5], "index": i}
+                for i, text in enumerate(request.input)]
+        return EmbeddingResponse(
+            object="list", data=data, model=request.model,
+            usage={"prompt_tokens": len(request.input), "total_tokens": len(request.input)},
+            provider="counting", raw_response={})
+
+
+def _write_in_process(path, results):
+    cache = EmbeddingCache(path=path)
+    cache.put(make_embedding_key("p", "m", None, "from child"), [7.0, 8.0])
+    results.put(cache.stats()["entries"])
+
+
+def test_roundtrip_and_counters(tmp_path):
+    """
+    Test storing, reading back (float32 precision) and hit/miss counting.
+    """
+    cache = EmbeddingCache(path=str(tmp_path))
+    key = make_embedding_key("p", "m", None, "hello")
+    assert cache.get(key) is None
+    cache.put(key, [0.25, -1.5, 3.0])
+    assert list(cache.get(key)) == [0.25, -1.5, 3.0]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_keys_are_scoped_by_provider_model_and_dimensions():
+    """
+    Test that the same text under a different scope is a different key.
+    """
+    key = make_embedding_key("p", "m", None, "t")
+    assert key != make_embedding_key("q", "m", None, "t")
+    assert key != make_embedding_key("p", "n", None, "t")
+    assert key != make_embedding_key("p", "m", 256, "t")
+    assert len(key) == 32
+
+
+def test_persists_across_instances_and_processes(tmp_path):
+    """
+    Test that entries survive reopening and that other processes' writes are seen.
+    """
+    path = str(tmp_path)
+    cache = EmbeddingCache(path=path)
+    cache.put(make_embedding_key("p", "m", None, "a"), [1.0])
+    results = multiprocessing.get_context("spawn").Queue()
+    process = multiprocessing.get_context("spawn").Process(
+        target=_write_in_process, args=(path, results))
+    process.start()
+    process.join(30)
+    assert results.get(timeout=5) == 2
+    assert list(cache.get(make_embedding_key("p", "m", None, "from child"))) == [7.0, 8.0]
+    assert list(EmbeddingCache(path=path).get(make_embedding_key("p", "m", None, "a"))) == [1.0]
+
+
+def test_compaction_evicts_oldest(tmp_path):
+    """
+    Test that exceeding max_bytes keeps only the newest entries.
+    """
+    cache = EmbeddingCache(path=str(tmp_path), max_bytes=40)
+    keys = [make_embedding_key("p", "m", None, str(i)) for i in range(4)]
+    for i, key in enumerate(keys):
+        cache.put(key, [float(i)] * 4)  # 16 bytes each
+    vectors = cache.get_many(keys)
+    assert list(vectors[-1]) == [3.0] * 4
+    assert vectors[0] is None
+    assert cache.stats()["data_bytes"] <= 40
+
+
+def test_cached_provider_embeds_only_misses(tmp_path):
+    """
+    Test that the wrapper sends only uncached texts and keeps input order.
+    """
+    inner = CountingEmbeddingProvider()
+    provider = CachedEmbeddingProvider(inner, EmbeddingCache(path=str(tmp_path)), "counting")
+    provider.embed(EmbeddingRequest(input=["aa", "b"], model="m"))
+    response = provider.embed(EmbeddingRequest(input=["b", "ccc", "aa"], model="m"))
+    assert inner.calls == [["aa", "b"], ["ccc"]]
+    assert [item["embedding"][0] for item in response.data] == [1.0, 3.0, 2.0]
+
+    response = asyncio.run(provider.aembed(EmbeddingRequest(input=["ccc", "aa"], model="m")))
+    assert len(inner.calls) == 2
+    assert response.raw_response == {"cached": True}
+
+
+def test_cached_provider_rejects_short_responses(tmp_path):
+    """
+    Test that a response with fewer vectors than texts raises and caches nothing.
+    """
+    class ShortEmbeddingProvider(CountingEmbeddingProvider):
+        def embed(self, request, **kwargs):
+            response = super().embed(request, **kwargs)
+            return EmbeddingResponse(
+                object="list", data=response.data[:-1], model=response.model,
+                usage=response.usage, provider="short", raw_response={})
+
+    cache = EmbeddingCache(path=str(tmp_path))
+    provider = CachedEmbeddingProvider(ShortEmbeddingProvider(), cache, "short")
+    with pytest.raises(ProviderError):
+        provider.embed(EmbeddingRequest(input=["aa", "b"], model="m"))
+    with pytest.raises(ProviderError):
+        asyncio.run(provider.aembed(EmbeddingRequest(input=["aa", "b"], model="m")))
+    assert cache.stats()["entries"] == 0
+
+
+def test_async_cache_io_runs_off_the_event_loop(tmp_path):
+    """
+    Test that aembed reads and writes the cache in worker threads.
+    """
+    threads = []
+
+    class RecordingCache(EmbeddingCache):
+        def get_many(self, keys):
+            threads.append(threading.get_ident())
+            return super().get_many(keys)
+
+        def put_many(self, items):
+            threads.append(threading.get_ident())
+            return super().put_many(items)
+
+    provider = CachedEmbeddingProvider(
+        CountingEmbeddingProvider(), RecordingCache(path=str(tmp_path)), "counting")
+
+    async def main():
+        await provider.aembed(EmbeddingRequest(input=["aa", "b"], model="m"))
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert len(threads) == 2
+    assert loop_thread not in threads
@@ -0,0 +1,131 @@
+"""
+Tests for ProviderFactory instance caching and the shared transport.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from uniinfer import ProviderFactory, ChatProvider
+
+
+class CountingProvider(ChatProvider):
+    """Provider that counts how often it is constructed."""
+
+    instances = 0
+
+    def __init__(self, api_key=None, **kwargs):
+        super().__init__(api_key)
+        self.kwargs = kwargs
+        CountingProvider.instances += 1
+
+
+@pytest.fixture
+def counting_provider():
+    """Register the counting provider and clean up afterwards."""
+    CountingProvider.instances = 0
+    ProviderFactory.register_provider("counting", CountingProvider)
+    yield CountingProvider
+    ProviderFactory._providers.pop("counting", None)
+    ProviderFactory.clear_cache("counting")
+
+
+def test_get_provider_reuses_instances(counting_provider):
+    """
+    Test that identical lookups return the same cached instance.
+    """
+    first = ProviderFactory.get_provider("counting", api_key="key-a")
+    second = ProviderFactory.get_provider("Counting", api_key="key-a")
+    assert first is second
+    assert counting_provider.instances == 1
+
+
+def test_cache_key_includes_api_key_and_kwargs(counting_provider):
+    """
+    Test that different keys or kwargs produce different instances.
+    """
+    a = ProviderFactory.get_provider("counting", api_key="key-a")
+    b = ProviderFactory.get_provider("counting", api_key="key-b")
+    c = ProviderFactory.get_provider(
+        "counting", api_key="key-a", base_url="http://localhost")
+    assert len({id(a), id(b), id(c)}) == 3
+
+
+def test_clear_cache_invalidates(counting_provider):
+    """
+    Test explicit invalidation of cached instances.
+    """
+    first = ProviderFactory.get_provider("counting", api_key="key-a")
+    ProviderFactory.clear_cache("counting")
+    second = ProviderFactory.get_provider("counting", api_key="key-a")
+    assert first is not second
+
+
+def test_providers_share_transport(counting_provider):
+    """
+    Test that provider instances use the factory-owned transport by default.
+    """
+    a = ProviderFactory.get_provider("counting", api_key="key-a")
+    b = ProviderFactory.get_provider("counting", api_key="key-b")
+    assert a.transport is ProviderFactory.get_transport()
+    assert a.transport is b.transport
+
+
+def test_async_clients_are_kept_per_loop():
+    """
+    Test that each event loop gets one async client and closed loops are pruned.
+    """
+    pytest.importorskip("httpx")
+    from uniinfer.transport import HTTPTransport
+
+    transport = HTTPTransport()
+
+    async def client_pair():
+        return transport.async_client, transport.async_client
+
+    first, again = asyncio.run(client_pair())
+    assert first is again
+    second, _ = asyncio.run(client_pair())
+    assert second is not first
+    assert first not in list(transport._async_clients.values())
+
+    async def close():
+        transport.async_client
+        await transport.aclose()
+        return len(transport._async_clients)
+
+    assert asyncio.run(close()) == 0
+
+
+def test_env_key_lookup_loads_dotenv(counting_provider, tmp_path, monkeypatch):
+    """
+    Test that a key missing from the environment is read from ./.env.
+    """
+    import uniinfer.env as env
+
+    (tmp_path / ".env").write_text("COUNTING_API_KEY=from-dotenv\nCOUNTING_REGION=from-dotenv\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("COUNTING_API_KEY", raising=False)
+    monkeypatch.setenv("COUNTING_REGION", "exported")
+    monkeypatch.setattr(env, "_loaded", set())
+    try:
+        assert ProviderFactory.get_provider("counting").api_key == "from-dotenv"
+        # the factory does not override variables the caller exported
+        assert os.environ["COUNTING_REGION"] == "exported"
+    finally:
+        monkeypatch.delenv("COUNTING_API_KEY", raising=False)
+
+
+def test_factory_does_not_import_the_openai_wrapper():
+    """
+    Test that an env key lookup in the factory leaves uniinfer.uniioai unimported.
+    """
+    code = ("import sys; from uniinfer import ChatProvider, ProviderFactory;"
+            "ProviderFactory.register_provider('counting', ChatProvider);"
+            "ProviderFactory.get_provider('counting');"
+            "print('uniinfer.uniioai' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,45 @@
+"""
+Tests for the lazy provider registry and the import-time budget.
+"""
+
+import subprocess
+import sys
+
+from uniinfer import ProviderFactory, EmbeddingProviderFactory
+from uniinfer.benchmarks.import_time import measure_import
+
+
+def test_import_does_not_load_providers_or_sdks():
+    """
+    Test that a bare import stays within budget and loads no heavy modules.
+    """
+    result = measure_import("uniinfer", runs=3)
+    assert result["heavy_modules"] == []
+    # Generous bound so slow CI machines do not flake; the benchmark uses 150 ms
+    assert result["median_ms"] < 1000
+
+
+def test_list_providers_without_importing():
+    """
+    Test that listing providers does not import provider modules.
+    """
+    probe = (
+        "import sys, uniinfer; "
+        "names = uniinfer.ProviderFactory.list_providers(); "
+        "assert 'tu' in names and 'ollama' in names, names; "
+        "assert not [m for m in sys.modules if m.startswith('uniinfer.providers.')]"
+    )
+    subprocess.run([sys.executable, "-c", probe], check=True)
+
+
+def test_provider_classes_resolve_on_first_use():
+    """
+    Test that registered import paths resolve to the provider classes.
+    """
+    from uniinfer.providers.tu import TuAIProvider
+    from uniinfer.providers.ollama_embedding import OllamaEmbeddingProvider
+    import uniinfer
+
+    assert ProviderFactory.get_provider_class("tu") is TuAIProvider
+    assert uniinfer.TuAIProvider is TuAIProvider
+    assert EmbeddingProviderFactory.get_provider_class("ollama") is OllamaEmbeddingProvider
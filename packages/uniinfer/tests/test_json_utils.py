@@ -0,0 +1,76 @@
+"""
+Tests for buffered model access tracking in models.json.
+"""
+
+import json
+import threading
+
+import pytest
+
+from uniinfer.json_utils import ModelAccessTracker, touch_json, update_models
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    update_models(["m1", "m2"], "prov")
+    return tmp_path
+
+
+def _entries(home):
+    with open(home / ".uniinfer" / "models.json") as f:
+        return {e["name"]: e for e in json.load(f)["providers"]["prov"]["modellist"]}
+
+
+def test_accesses_are_buffered_until_flush(home):
+    """
+    Test that record() does not touch the file and flush() writes the counts.
+    """
+    tracker = ModelAccessTracker(flush_interval=0)
+    for _ in range(3):
+        tracker.record("m1", "prov")
+    tracker.record("m2", "prov")
+    assert tracker.pending() == 4
+    assert "accessed_count" not in _entries(home)["m1"]
+
+    tracker.flush()
+    entries = _entries(home)
+    assert entries["m1"]["accessed_count"] == 3
+    assert entries["m2"]["accessed_count"] == 1
+    assert entries["m1"]["accessed"] is not None
+    assert tracker.pending() == 0
+
+
+def test_concurrent_trackers_do_not_lose_updates(home):
+    """
+    Test that flushes from several trackers (as from several workers) add up.
+    """
+    trackers = [ModelAccessTracker(flush_interval=0) for _ in range(4)]
+
+    def work(tracker):
+        for _ in range(50):
+            tracker.record("m1", "prov")
+            tracker.flush()
+
+    threads = [threading.Thread(target=work, args=(t,)) for t in trackers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert _entries(home)["m1"]["accessed_count"] == 200
+    data, _ = touch_json()
+    assert set(data["providers"]) == {"prov"}
+
+
+def test_background_flush(home):
+    """
+    Test that the daemon thread flushes without an explicit call.
+    """
+    tracker = ModelAccessTracker(flush_interval=0.05)
+    tracker.record("m2", "prov")
+    for _ in range(100):
+        if _entries(home)["m2"].get("accessed_count") == 1:
+            break
+        threading.Event().wait(0.02)
+    tracker.close()
+    assert _entries(home)["m2"]["accessed_count"] == 1
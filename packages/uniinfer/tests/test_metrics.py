@@ -0,0 +1,71 @@
+"""
+Tests for the Prometheus-style metrics.
+"""
+
+import pytest
+
+from uniinfer.errors import RateLimitError
+from uniinfer.metrics import Counter, Histogram, MetricsRegistry, StreamTimer, track_request
+
+
+def test_histogram_renders_cumulative_buckets():
+    """
+    Test the text exposition of a labelled histogram.
+    """
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("provider",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe("p", value=value)
+    text = registry.render()
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{provider="p",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{provider="p",le="1"} 2' in text
+    assert 'latency_seconds_bucket{provider="p",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{provider="p"} 3' in text
+
+
+def test_label_escaping_and_series_cap():
+    """
+    Test that label values are escaped and excess series fold into one.
+    """
+    counter = Counter("requests_total", "Requests.", ("model",), max_series=2)
+    counter.inc('a"b')
+    counter.inc("c")
+    counter.inc("d")
+    counter.inc("e")
+    text = counter.render()
+    assert 'requests_total{model="a\\"b"} 1' in text
+    assert 'requests_total{model="_overflow"} 2' in text
+    with pytest.raises(ValueError):
+        counter.inc()
+
+
+def test_track_request_classifies_errors():
+    """
+    Test that upstream errors are counted by class and re-raised.
+    """
+    from uniinfer.metrics import INFLIGHT_REQUESTS, REQUESTS, UPSTREAM_ERRORS
+
+    with track_request("chat", "t-prov", "t-model"):
+        assert INFLIGHT_REQUESTS.value("chat") >= 1
+    with pytest.raises(RateLimitError):
+        with track_request("chat", "t-prov", "t-model"):
+            raise RateLimitError("slow down")
+    assert REQUESTS.value("chat", "t-prov", "t-model", "ok") == 1
+    assert REQUESTS.value("chat", "t-prov", "t-model", "RateLimitError") == 1
+    assert UPSTREAM_ERRORS.value("t-prov", "t-model", "RateLimitError") == 1
+
+
+def test_stream_timer_records_first_token_and_rate():
+    """
+    Test that a stream records time to first token, duration and throughput.
+    """
+    from uniinfer.metrics import STREAM_TOKENS_PER_SECOND, TIME_TO_FIRST_TOKEN
+
+    timer = StreamTimer("s-prov", "s-model")
+    timer.chunk("hello ")
+    timer.chunk("world")
+    timer.finish()
+    assert TIME_TO_FIRST_TOKEN.count("s-prov", "s-model") == 1
+    assert STREAM_TOKENS_PER_SECOND.count("s-prov", "s-model") == 1
+    assert isinstance(TIME_TO_FIRST_TOKEN, Histogram)
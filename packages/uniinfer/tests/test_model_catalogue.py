@@ -0,0 +1,133 @@
+"""
+Tests for the TTL-cached, concurrently fetched model catalogue.
+"""
+
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+import time
+
+from uniinfer.model_catalogue import ModelCatalogue
+
+
+class CountingFetch:
+    """Returns a new model list on every call and counts the calls."""
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, provider="p"):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls += 1
+            return [f"{provider}-model-{self.calls}"]
+
+
+def test_fresh_lists_are_served_from_memory():
+    """
+    Test that a list is fetched once within the TTL and scoped by key.
+    """
+    catalogue = ModelCatalogue(ttl=60, persist=False)
+    fetch = CountingFetch()
+    assert catalogue.get("p", fetch, api_key="k") == ["p-model-1"]
+    assert catalogue.get("p", fetch, api_key="k") == ["p-model-1"]
+    assert fetch.calls == 1
+    assert catalogue.get("p", fetch, api_key="other") == ["p-model-2"]
+    assert catalogue.get("p", fetch, api_key="k", refresh=True) == ["p-model-3"]
+
+
+def test_stale_list_is_returned_while_refreshing():
+    """
+    Test stale-while-revalidate: the old list comes back at once, then the new one.
+    """
+    catalogue = ModelCatalogue(ttl=0, stale_ttl=60, persist=False)
+    fetch = CountingFetch(delay=0.1)
+    assert catalogue.get("p", fetch) == ["p-model-1"]
+    started = time.monotonic()
+    assert catalogue.get("p", fetch) == ["p-model-1"]
+    assert time.monotonic() - started < 0.05
+    for _ in range(50):
+        if fetch.calls == 2:
+            break
+        time.sleep(0.02)
+    time.sleep(0.02)
+    assert catalogue.get("p", fetch) in (["p-model-2"], ["p-model-3"])
+
+
+def test_concurrent_misses_share_one_fetch():
+    """
+    Test that simultaneous callers for one provider trigger a single fetch.
+    """
+    catalogue = ModelCatalogue(persist=False)
+    fetch = CountingFetch(delay=0.1)
+
+    async def main():
+        return await asyncio.gather(*[catalogue.aget("p", fetch) for _ in range(5)])
+
+    assert asyncio.run(main()) == [["p-model-1"]] * 5
+    assert fetch.calls == 1
+
+
+def test_get_many_fans_out_with_timeouts():
+    """
+    Test that providers are queried in parallel and a slow one times out alone.
+    """
+    catalogue = ModelCatalogue(persist=False)
+
+    def fetch(provider):
+        time.sleep(1.0 if provider == "slow" else 0.2)
+        if provider == "broken":
+            raise ValueError("no key")
+        return [provider + "-m"]
+
+    started = time.monotonic()
+    results = catalogue.get_many(["a", "b", "c", "broken", "slow"], fetch, timeout=0.5)
+    assert time.monotonic() - started < 0.9
+    assert list(results) == ["a", "b", "c", "broken", "slow"]
+    assert results["a"] == ["a-m"]
+    assert isinstance(results["broken"], ValueError)
+    assert isinstance(results["slow"], TimeoutError)
+
+
+def test_timed_out_fetch_does_not_delay_exit():
+    """
+    Test that the interpreter exits without waiting for a fetch that timed out.
+    """
+    probe = (
+        "import time; from uniinfer.model_catalogue import ModelCatalogue; "
+        "result = ModelCatalogue(persist=False).get_many("
+        "['slow'], lambda p: time.sleep(5) or ['m'], timeout=0.1); "
+        "assert isinstance(result['slow'], TimeoutError)"
+    )
+    start_time = time.time()
+    subprocess.run([sys.executable, "-c", probe], check=True)
+    assert time.time() - start_time < 4
+
+
+def test_fetched_lists_are_saved_to_models_json(tmp_path, monkeypatch):
+    """
+    Test that fetched lists are written through with update_models.
+    """
+    monkeypatch.setenv("HOME", str(tmp_path))
+    ModelCatalogue().get("p", lambda: ["m1", "m2"])
+    with open(tmp_path / ".uniinfer" / "models.json") as f:
+        modellist = json.load(f)["providers"]["p"]["modellist"]
+    assert [entry["name"] for entry in modellist] == ["m1", "m2"]
+
+
+def test_new_process_reuses_models_json(tmp_path, monkeypatch):
+    """
+    Test that a fresh catalogue serves a recent models.json list without fetching.
+    """
+    monkeypatch.setenv("HOME", str(tmp_path))
+    ModelCatalogue().get("p", lambda: ["m1", "m2"])
+    fetch = CountingFetch()
+    assert ModelCatalogue(ttl=60).get("p", fetch) == ["m1", "m2"]
+    assert ModelCatalogue(ttl=60).get_many(["p"], fetch) == {"p": ["m1", "m2"]}
+    assert fetch.calls == 0
+    # past its TTL and stale window the saved list is fetched again
+    assert ModelCatalogue(ttl=0, stale_ttl=0).get("p", fetch) == ["p-model-1"]
@@ -0,0 +1,52 @@
+"""
+Tests for the proxy load-test harness and its mock upstream.
+"""
+
+import pytest
+
+from uniinfer.benchmarks.proxy_load import percentile, summarize
+
+
+def test_percentiles_and_summary():
+    """
+    Test nearest-rank percentiles and the split into stream/non-stream groups.
+    """
+    assert percentile([], 50) is None
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert percentile(list(range(1, 101)), 99) == 99
+
+    samples = [
+        {"stream": True, "status": 200, "ok": True, "latency": 0.2, "ttft": 0.05},
+        {"stream": False, "status": 200, "ok": True, "latency": 0.1, "ttft": None},
+        {"stream": False, "status": 500, "ok": False, "latency": 0.01, "ttft": None},
+    ]
+    result = summarize(samples, wall_seconds=1.0)
+    assert result["requests"] == 3
+    assert result["errors"] == 1
+    assert result["req_per_s"] == 2.0
+    assert result["status_counts"] == {"200": 2, "500": 1}
+    assert result["stream"]["ttft"]["p50"] == 0.05
+    assert result["non_stream"]["latency"]["max"] == 0.1
+
+
+def test_mock_upstream_streams_tokens_and_injects_errors():
+    """
+    Test the mock's OpenAI-style stream and its error injection.
+    """
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from uniinfer.benchmarks.mock_upstream import create_app
+
+    client = TestClient(create_app(latency=0, tokens=3, token_rate=0))
+    body = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "stream": True}
+    lines = [line for line in client.post("/v1/chat/completions", json=body).text.splitlines() if line]
+    assert len(lines) == 5
+    assert lines[-1] == "data: [DONE]"
+    response = client.post("/v1/chat/completions", json=dict(body, stream=False))
+    assert response.json()["choices"][0]["message"]["content"] == " tok0 tok1 tok2"
+
+    failing = TestClient(create_app(latency=0, rate_limit_rate=1.0))
+    response = failing.post("/v1/chat/completions", json=body)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,72 @@
+"""
+Tests for the shared token-bucket rate limiter.
+"""
+
+import multiprocessing
+
+import pytest
+
+from uniinfer import ChatMessage, ChatCompletionRequest
+from uniinfer.errors import RateLimitError
+from uniinfer.ratelimit import (
+    RateLimiter, configure_rate_limit, estimate_tokens, get_rate_limiter
+)
+
+
+def _acquire_in_process(path, results):
+    limiter = RateLimiter("shared", rpm=2, path=path)
+    results.put(limiter.acquire(timeout=0) < 0.05)
+
+
+def test_rpm_bucket_blocks_when_empty(tmp_path):
+    """
+    Test that the request bucket allows a burst up to rpm and then refuses.
+    """
+    limiter = RateLimiter("p", rpm=3, path=str(tmp_path / "rl.sqlite"))
+    for _ in range(3):
+        assert limiter.acquire(timeout=0) == pytest.approx(0, abs=0.05)
+    with pytest.raises(RateLimitError):
+        limiter.acquire(timeout=0.5)
+
+
+def test_tpm_bucket_and_adjust(tmp_path):
+    """
+    Test token accounting and refunds of over-estimated usage.
+    """
+    limiter = RateLimiter("p", tpm=100, path=str(tmp_path / "rl.sqlite"))
+    limiter.acquire(tokens=100, timeout=0)
+    with pytest.raises(RateLimitError):
+        limiter.acquire(tokens=50, timeout=0.5)
+    limiter.adjust(60)
+    limiter.acquire(tokens=50, timeout=0)
+
+
+def test_state_is_shared_across_processes(tmp_path):
+    """
+    Test that separate processes draw from the same budget.
+    """
+    path = str(tmp_path / "rl.sqlite")
+    RateLimiter("shared", rpm=2, path=path).acquire(timeout=0)
+    results = multiprocessing.get_context("spawn").Queue()
+    proc = multiprocessing.get_context("spawn").Process(
+        target=_acquire_in_process, args=(path, results))
+    proc.start()
+    proc.join(30)
+    assert results.get(timeout=5) is True
+    with pytest.raises(RateLimitError):
+        RateLimiter("shared", rpm=2, path=path).acquire(timeout=0.5)
+
+
+def test_configured_limits(tmp_path, monkeypatch):
+    """
+    Test that providers without limits get no limiter and overrides apply.
+    """
+    monkeypatch.setenv("UNIINFER_RATELIMIT_DB", str(tmp_path / "rl.sqlite"))
+    configure_rate_limit("unlimited-test")
+    assert get_rate_limiter("unlimited-test") is None
+    configure_rate_limit("limited-test", rpm=60)
+    assert get_rate_limiter("limited-test").rpm == 60
+
+    request = ChatCompletionRequest(
+        messages=[ChatMessage(role="user", content="x" * 40)], max_tokens=10)
+    assert estimate_tokens(request) == 20
@@ -0,0 +1,134 @@
+"""
+Tests for the record/replay provider.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from uniinfer import ChatCompletionRequest, ChatCompletionResponse, ChatMessage, ChatProvider, ProviderFactory
+from uniinfer.errors import ProviderError
+from uniinfer.providers.replay import ReplayProvider
+
+
+class ScriptedProvider(ChatProvider):
+    """Answers 'echo: <last message>' in two slow chunks and counts calls."""
+
+    calls = 0
+
+    def _response(self, request, content):
+        return ChatCompletionResponse(
+            message=ChatMessage(role="assistant", content=content), provider="scripted",
+            model=request.model, usage={"total_tokens": 2}, raw_response={"id": "x"})
+
+    def complete(self, request, **kwargs):
+        ScriptedProvider.calls += 1
+        return self._response(request, "echo: " + request.messages[-1].content)
+
+    def stream_complete(self, request, **kwargs):
+        ScriptedProvider.calls += 1
+        time.sleep(0.05)
+        yield self._response(request, "echo: ")
+        time.sleep(0.05)
+        yield self._response(request, request.messages[-1].content)
+
+
+@pytest.fixture
+def scripted_provider():
+    """Register the scripted provider and clean up afterwards."""
+    ScriptedProvider.calls = 0
+    ProviderFactory.register_provider("scripted", ScriptedProvider)
+    yield ScriptedProvider
+    ProviderFactory._providers.pop("scripted", None)
+    ProviderFactory.clear_cache("scripted")
+
+
+def _request(content="hi"):
+    return ChatCompletionRequest(
+        messages=[ChatMessage(role="user", content=content)], model="scripted@m1")
+
+
+def test_record_then_replay_offline(tmp_path, scripted_provider):
+    """
+    Test that recorded completions and streams are served without the target.
+    """
+    path = str(tmp_path / "rec.jsonl")
+    recorder = ReplayProvider(mode="record", path=path)
+    assert recorder.complete(_request()).message.content == "echo: hi"
+    assert [c.message.content for c in recorder.stream_complete(_request("s"))] == ["echo: ", "s"]
+    assert scripted_provider.calls == 2
+
+    player = ReplayProvider(mode="replay", path=path)
+    response = player.complete(_request())
+    assert response.message.content == "echo: hi"
+    assert response.raw_response == {"id": "x"}
+    assert [c.message.content for c in player.stream_complete(_request("s"))] == ["echo: ", "s"]
+    # A recorded stream also answers a non-streaming request
+    assert player.complete(_request("s")).message.content == "echo: s"
+    assert scripted_provider.calls == 2
+    assert ReplayProvider.list_models(path=path) == ["scripted@m1"]
+
+    with pytest.raises(ProviderError):
+        player.complete(_request("never recorded"))
+
+
+def test_realtime_replay_reproduces_chunk_timing(tmp_path, scripted_provider):
+    """
+    Test that realtime replay waits like the original stream and fast replay does not.
+    """
+    path = str(tmp_path / "rec.jsonl")
+    list(ReplayProvider(mode="record", path=path).stream_complete(_request()))
+
+    started = time.perf_counter()
+    list(ReplayProvider(mode="replay", path=path, timing="realtime").stream_complete(_request()))
+    assert time.perf_counter() - started >= 0.09
+
+    async def fast():
+        return [c async for c in ReplayProvider(mode="replay", path=path).astream_complete(_request())]
+
+    started = time.perf_counter()
+    assert len(asyncio.run(fast())) == 2
+    assert time.perf_counter() - started < 0.05
+
+
+def test_auto_mode_records_misses(tmp_path, scripted_provider):
+    """
+    Test that auto mode only calls the target for unrecorded requests.
+    """
+    provider = ReplayProvider(mode="auto", path=str(tmp_path / "rec.jsonl"))
+    provider.complete(_request())
+    provider.complete(_request())
+    assert scripted_provider.calls == 1
+
+
+def test_registered_with_factory(tmp_path):
+    """
+    Test that the provider is available as 'replay'.
+    """
+    provider = ProviderFactory.get_provider("replay", api_key="k", path=str(tmp_path / "r.jsonl"))
+    assert isinstance(provider, ReplayProvider)
+
+
+def test_proxy_resolves_keys_of_the_recorded_provider(monkeypatch):
+    """
+    Test that replaying needs no key and recording resolves the target provider's key.
+    """
+    pytest.importorskip("fastapi")
+    import uniinfer.uniioai_proxy as proxy
+    from uniinfer.credential_cache import CredentialCache
+
+    asked = []
+
+    def fake_get_provider_api_key(token, provider_name):
+        asked.append(provider_name)
+        return f"key-for-{provider_name}"
+
+    monkeypatch.setattr(proxy, "get_provider_api_key", fake_get_provider_api_key)
+    monkeypatch.setattr(proxy, "credential_cache", CredentialCache(ttl=0))
+    monkeypatch.setenv("UNIINFER_REPLAY_MODE", "replay")
+    assert asyncio.run(proxy.resolve_provider_api_key("bearer@enc", "replay", "openai@gpt-4o-mini")) is None
+    monkeypatch.setenv("UNIINFER_REPLAY_MODE", "record")
+    assert asyncio.run(
+        proxy.resolve_provider_api_key("bearer@enc", "replay", "openai@gpt-4o-mini")) == "key-for-openai"
+    assert asked == ["openai"]
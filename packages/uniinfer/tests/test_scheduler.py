@@ -0,0 +1,127 @@
+"""
+Tests for the priority scheduler.
+"""
+
+import asyncio
+
+import pytest
+
+from uniinfer.errors import QueueFullError
+from uniinfer.metrics import QUEUE_REJECTIONS
+from uniinfer.scheduler import PriorityScheduler, parse_limits, parse_priority
+
+
+def test_freed_slots_go_to_higher_priority_first():
+    """
+    Test that the provider limit holds and interactive waiters overtake batch ones.
+    """
+    scheduler = PriorityScheduler({"sched-a": 1}, use_provider_configs=False)
+    order = []
+
+    async def request(name, priority):
+        async with await scheduler.acquire("sched-a", "m", priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        first = await scheduler.acquire("sched-a", "m", "normal")
+        tasks = [asyncio.ensure_future(request("batch1", "batch")),
+                 asyncio.ensure_future(request("batch2", "low"))]
+        await asyncio.sleep(0.01)
+        tasks.append(asyncio.ensure_future(request("interactive", "interactive")))
+        await asyncio.sleep(0.01)
+        stats = scheduler.stats()["providers"]["sched-a"]
+        assert stats["inflight"] == 1
+        assert stats["waiting"] == {"interactive": 1, "normal": 0, "batch": 2}
+        first.release()
+        first.release()  # idempotent
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == ["interactive", "batch1", "batch2"]
+    assert scheduler.stats()["providers"]["sched-a"]["inflight"] == 0
+
+
+def test_model_limit_does_not_block_other_models():
+    """
+    Test that a waiter blocked by its model limit lets other models through.
+    """
+    scheduler = PriorityScheduler({"sched-b": 3, "sched-b@big": 1}, use_provider_configs=False)
+
+    async def main():
+        big = await scheduler.acquire("sched-b", "big")
+        waiting = asyncio.ensure_future(scheduler.acquire("sched-b", "big", "interactive"))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        small = await asyncio.wait_for(scheduler.acquire("sched-b", "small", "batch"), 1)
+        big.release()
+        second_big = await asyncio.wait_for(waiting, 1)
+        small.release()
+        second_big.release()
+
+    asyncio.run(main())
+
+
+def test_full_queue_and_wait_timeout_are_rejected():
+    """
+    Test the fast rejection of a full queue, the queue timeout and cancelled waiters.
+    """
+    scheduler = PriorityScheduler({"sched-c": 1}, max_queue=1, queue_timeout=0.05,
+                                  use_provider_configs=False)
+
+    async def main():
+        held = await scheduler.acquire("sched-c", "m")
+        waiter = asyncio.ensure_future(scheduler.acquire("sched-c", "m", "batch"))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError) as full:
+            await scheduler.acquire("sched-c", "m", "batch")
+        assert full.value.reason == "full"
+        with pytest.raises(QueueFullError) as timeout:
+            await waiter
+        assert timeout.value.reason == "timeout"
+
+        cancelled = asyncio.ensure_future(scheduler.acquire("sched-c", "m"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert scheduler.stats()["providers"]["sched-c"]["waiting"]["normal"] == 0
+        held.release()
+        (await scheduler.acquire("sched-c", "m")).release()
+
+    asyncio.run(main())
+    assert QUEUE_REJECTIONS.value("sched-c", "batch", "full") == 1
+    assert QUEUE_REJECTIONS.value("sched-c", "batch", "timeout") == 1
+    assert scheduler.stats()["rejected"] == 2
+
+
+def test_queue_timeout_override_waits_indefinitely():
+    """
+    Test that queue_timeout=None outlasts the scheduler's queue timeout.
+    """
+    scheduler = PriorityScheduler({"sched-d": 1}, queue_timeout=0.02, use_provider_configs=False)
+
+    async def main():
+        held = await scheduler.acquire("sched-d", "m")
+        waiter = asyncio.ensure_future(scheduler.acquire("sched-d", "m", "batch", queue_timeout=None))
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+        held.release()
+        (await asyncio.wait_for(waiter, 1)).release()
+
+    asyncio.run(main())
+    assert scheduler.stats()["rejected"] == 0
+
+
+def test_parse_limits_and_priority():
+    """
+    Test the configuration parsers.
+    """
+    assert parse_limits("openai=8, openai@gpt-4o=2,*=16,") == {"openai": 8, "openai@gpt-4o": 2, "*": 16}
+    assert parse_limits(None) == {}
+    with pytest.raises(ValueError):
+        parse_limits("openai=0")
+    assert parse_priority(None) == "normal"
+    assert parse_priority(" High ") == "interactive"
+    with pytest.raises(ValueError):
+        parse_priority("urgent")
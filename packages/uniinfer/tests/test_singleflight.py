@@ -0,0 +1,123 @@
+"""
+Tests for coalescing identical concurrent calls.
+"""
+
+import asyncio
+
+import pytest
+
+from uniinfer.singleflight import SingleFlight, make_request_key
+
+
+def test_identical_calls_share_one_upstream_call():
+    """
+    Test that concurrent callers with one key get the same result from one call.
+    """
+    flight = SingleFlight()
+    calls = []
+
+    async def upstream(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return {"answer": value}
+
+    async def main():
+        key_a = make_request_key("chat", "p@m", [{"role": "user", "content": "hi"}])
+        key_b = make_request_key("chat", "p@m", [{"role": "user", "content": "bye"}])
+        return await asyncio.gather(
+            *[flight.do(key_a, lambda: upstream("a")) for _ in range(4)],
+            flight.do(key_b, lambda: upstream("b")))
+
+    results = asyncio.run(main())
+    assert calls == ["a", "b"]
+    assert results[0] is results[3]
+    assert results[4] == {"answer": "b"}
+    assert flight.stats() == {"calls": 2, "coalesced": 3, "errors": 0, "inflight": 0}
+
+
+def test_errors_propagate_and_cancelled_callers_do_not_cancel_the_call():
+    """
+    Test that all waiters see the exception and a cancelled leader leaves the call running.
+    """
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise ValueError("upstream failed")
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        results = await asyncio.gather(
+            flight.do("k", failing), flight.do("k", failing), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+        leader = asyncio.ensure_future(flight.do("s", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("s", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    asyncio.run(main())
+    assert flight.stats()["errors"] == 1
+
+
+def test_counters_are_exported_to_metrics():
+    """
+    Test that calls, coalesced callers and errors show up in the metrics registry.
+    """
+    from uniinfer.metrics import (
+        REGISTRY, SINGLEFLIGHT_CALLS, SINGLEFLIGHT_COALESCED, SINGLEFLIGHT_ERRORS)
+
+    flight = SingleFlight()
+    before = (SINGLEFLIGHT_CALLS.value("test"), SINGLEFLIGHT_COALESCED.value("test"),
+              SINGLEFLIGHT_ERRORS.value("test"))
+
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise ValueError("upstream failed")
+
+    async def main():
+        await asyncio.gather(*(flight.do("k", failing, endpoint="test") for _ in range(3)),
+                             return_exceptions=True)
+
+    asyncio.run(main())
+    assert SINGLEFLIGHT_CALLS.value("test") - before[0] == 1
+    assert SINGLEFLIGHT_COALESCED.value("test") - before[1] == 2
+    assert SINGLEFLIGHT_ERRORS.value("test") - before[2] == 1
+    text = REGISTRY.render()
+    assert 'uniinfer_singleflight_calls_total{endpoint="test"}' in text
+    assert 'uniinfer_singleflight_coalesced_total{endpoint="test"}' in text
+
+
+def test_proxy_followers_do_not_take_scheduler_slots(monkeypatch):
+    """
+    Test that only the leader of a coalesced proxy call holds a scheduler slot.
+    """
+    pytest.importorskip("fastapi")
+    import uniinfer.uniioai_proxy as proxy
+    from uniinfer.scheduler import PriorityScheduler
+
+    # One slot and no queue: a follower that tried to admit would get a 429
+    scheduler = PriorityScheduler(limits={"sf-prov": 1}, max_queue=0)
+    monkeypatch.setattr(proxy, "scheduler", scheduler)
+    monkeypatch.setattr(proxy, "single_flight", SingleFlight())
+
+    async def upstream():
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*[
+            proxy.coalesced(("chat", "sf-prov@m"),
+                            lambda: proxy.admitted("normal", "sf-prov", "m", upstream))
+            for _ in range(4)])
+
+    assert asyncio.run(main()) == ["answer"] * 4
+    assert scheduler.admitted == 1
+    assert scheduler.rejected == 0
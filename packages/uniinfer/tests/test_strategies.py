@@ -0,0 +1,249 @@
+"""
+Tests for provider selection strategies.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from uniinfer import (
+    ChatMessage, ChatCompletionRequest, ChatCompletionResponse, ChatProvider,
+    FallbackStrategy, LatencyAwareStrategy, ProviderFactory
+)
+from uniinfer.transport import HTTPTransport
+
+
+def make_provider_class(name, delay, fail=False):
+    """Build a provider class that answers with its name after ``delay`` seconds."""
+
+    class DelayedProvider(ChatProvider):
+        calls = 0
+        cancelled = 0
+
+        def __init__(self, api_key=None, **kwargs):
+            super().__init__(api_key)
+
+        def _respond(self):
+            if fail:
+                raise RuntimeError(f"{name} failed")
+            return ChatCompletionResponse(
+                message=ChatMessage(role="assistant", content=name),
+                provider=name, model="m", usage={}, raw_response={})
+
+        def complete(self, request, **kwargs):
+            type(self).calls += 1
+            time.sleep(delay)
+            return self._respond()
+
+        async def acomplete(self, request, **kwargs):
+            type(self).calls += 1
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                type(self).cancelled += 1
+                raise
+            return self._respond()
+
+    return DelayedProvider
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """Register a fast, a slow and a failing provider."""
+    classes = {
+        "fast": make_provider_class("fast", 0.01),
+        "slow": make_provider_class("slow", 0.3),
+        "broken": make_provider_class("broken", 0.0, fail=True),
+    }
+    for name, cls in classes.items():
+        monkeypatch.setenv(f"{name.upper()}_API_KEY", "key")
+        ProviderFactory.register_provider(name, cls)
+    yield classes
+    for name in classes:
+        ProviderFactory._providers.pop(name, None)
+        ProviderFactory.clear_cache(name)
+
+
+def make_request():
+    return ChatCompletionRequest(messages=[ChatMessage(role="user", content="hi")])
+
+
+def test_orders_by_latency_and_errors(providers):
+    """
+    Test that measured latency and errors reorder providers.
+    """
+    strategy = LatencyAwareStrategy(["broken", "slow", "fast"], max_retries=0)
+    for _ in range(3):
+        strategy.complete(make_request())
+    for name, latency in [("slow", 0.3), ("fast", 0.01)]:
+        strategy._record_latency(name, latency)
+    assert strategy._provider_order() == ["fast", "slow", "broken"]
+    assert strategy.get_stats()["broken"]["error_rate"] == 1.0
+
+
+def test_hedged_request_returns_first_success(providers):
+    """
+    Test that a slow primary is hedged to the next-best provider.
+    """
+    strategy = LatencyAwareStrategy(["slow", "fast"], hedge=True, hedge_delay=0.05)
+    strategy._record_latency("slow", 0.001)
+    strategy._record_latency("fast", 0.002)
+    start_time = time.time()
+    response, provider_name = strategy.complete(make_request())
+    assert provider_name == "fast"
+    assert response.message.content == "fast"
+    assert time.time() - start_time < 0.25
+
+
+def test_async_hedge_cancels_loser(providers):
+    """
+    Test that the async hedge cancels the slower call.
+    """
+    strategy = LatencyAwareStrategy(["slow", "fast"], hedge=True, hedge_delay=0.05)
+    strategy._record_latency("slow", 0.001)
+    strategy._record_latency("fast", 0.002)
+    response, provider_name = asyncio.run(strategy.acomplete(make_request()))
+    assert provider_name == "fast"
+    assert providers["slow"].cancelled == 1
+
+
+def test_hedge_fallback_honours_max_retries(providers):
+    """
+    Test that providers are retried up to max_retries after a failed hedge.
+    """
+    for asynchronous in (False, True):
+        providers["broken"].calls = 0
+        strategy = LatencyAwareStrategy(["broken", "fast"], max_retries=2,
+                                        hedge=True, hedge_delay=0.05, circuit_breaker=False)
+        strategy._record_latency("broken", 0.001)
+        strategy._record_latency("fast", 0.002)
+        if asynchronous:
+            response, provider_name = asyncio.run(strategy.acomplete(make_request()))
+        else:
+            response, provider_name = strategy.complete(make_request())
+        assert provider_name == "fast"
+        assert providers["broken"].calls == 3
+
+
+def make_stream_provider_class(name, first_delay, fail_before_first=False):
+    """Build a provider class that streams three chunks after ``first_delay`` seconds."""
+
+    class StreamingProvider(ChatProvider):
+        def __init__(self, api_key=None, **kwargs):
+            super().__init__(api_key)
+
+        def stream_complete(self, request, **kwargs):
+            time.sleep(first_delay)
+            if fail_before_first:
+                raise RuntimeError("429 Too Many Requests")
+            for piece in [name, "-", "done"]:
+                yield ChatCompletionResponse(
+                    message=ChatMessage(role="assistant", content=piece),
+                    provider=name, model="m", usage={}, raw_response={})
+
+    return StreamingProvider
+
+
+@pytest.fixture
+def streaming_providers(monkeypatch):
+    """Register a stalled, a rate-limited and a healthy streaming provider."""
+    classes = {
+        "stalled": make_stream_provider_class("stalled", 0.5),
+        "limited": make_stream_provider_class("limited", 0.0, fail_before_first=True),
+        "healthy": make_stream_provider_class("healthy", 0.01),
+    }
+    for name, cls in classes.items():
+        monkeypatch.setenv(f"{name.upper()}_API_KEY", "key")
+        ProviderFactory.register_provider(name, cls)
+    yield classes
+    for name in classes:
+        ProviderFactory._providers.pop(name, None)
+        ProviderFactory.clear_cache(name)
+
+
+def test_stream_fails_over_before_first_chunk(streaming_providers):
+    """
+    Test failover on errors raised before the first chunk and on a missed TTFT deadline.
+    """
+    strategy = FallbackStrategy(["limited", "stalled", "healthy"], max_retries=0,
+                                first_token_timeout=0.1)
+    stream, provider_name = strategy.stream_complete(make_request())
+    assert provider_name == "healthy"
+    assert [chunk.message.content for chunk in stream] == ["healthy", "-", "done"]
+
+    stats = strategy.get_stats()
+    assert stats["limited"]["error_count"] == 1
+    assert stats["stalled"]["error_count"] == 1
+    assert stats["healthy"]["avg_ttft"] < 0.1
+    assert stats["healthy"]["avg_tokens_per_second"] > 0
+
+
+class StalledSocket:
+    """Socket stand-in whose reader blocks until it is shut down."""
+
+    def __init__(self):
+        self.shut_down = threading.Event()
+
+    def shutdown(self, how):
+        self.shut_down.set()
+
+
+class StalledResponse:
+    """Streaming response that never delivers a byte until its socket is shut down."""
+
+    def __init__(self):
+        self.raw = type("Raw", (), {})()
+        self.raw.connection = type("Connection", (), {})()
+        self.raw.connection.sock = StalledSocket()
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def iter_content(self, chunk_size=None):
+        self.raw.connection.sock.shut_down.wait(30)
+        raise ConnectionError("connection aborted")
+        yield b""
+
+    def close(self):
+        self.closed = True
+
+
+def test_timed_out_stream_is_closed(streaming_providers):
+    """
+    Test that a stream abandoned at the first-token deadline has its response aborted.
+    """
+    response = StalledResponse()
+    transport = HTTPTransport()
+    transport._session = type("Session", (), {"request": lambda self, method, url, **kw: response})()
+    finished = threading.Event()
+
+    class HTTPStalledProvider(ChatProvider):
+        def __init__(self, api_key=None, **kwargs):
+            super().__init__(api_key, transport=transport)
+
+        def stream_complete(self, request, **kwargs):
+            try:
+                with self.transport.post("http://upstream/chat", stream=True) as upstream:
+                    for _ in upstream.iter_content():
+                        yield None
+            finally:
+                finished.set()
+
+    ProviderFactory.register_provider("httpstalled", HTTPStalledProvider)
+    try:
+        strategy = FallbackStrategy(["httpstalled", "healthy"], max_retries=0, first_token_timeout=0.1)
+        stream, provider_name = strategy.stream_complete(make_request())
+        assert provider_name == "healthy"
+        assert finished.wait(2)
+        assert response.raw.connection.sock.shut_down.is_set()
+        assert response.closed
+        list(stream)
+    finally:
+        ProviderFactory._providers.pop("httpstalled", None)
+        ProviderFactory.clear_cache("httpstalled")
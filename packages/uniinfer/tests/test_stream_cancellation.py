@@ -0,0 +1,117 @@
+"""
+Tests for closing upstream streams when the consumer goes away.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from uniinfer import ChatCompletionRequest, ChatCompletionResponse, ChatMessage, ChatProvider
+
+
+class EndlessSyncProvider(ChatProvider):
+    """Sync-only provider streaming forever; records when its stream is closed."""
+
+    def __init__(self, api_key=None, **kwargs):
+        super().__init__(api_key)
+        self.closed = threading.Event()
+        self.produced = 0
+
+    def stream_complete(self, request, **kwargs):
+        try:
+            while True:
+                time.sleep(0.01)
+                self.produced += 1
+                yield ChatCompletionResponse(
+                    message=ChatMessage(role="assistant", content="x"), provider="endless",
+                    model=request.model, usage={}, raw_response=None)
+        finally:
+            self.closed.set()
+
+
+def _request():
+    return ChatCompletionRequest(messages=[ChatMessage(role="user", content="hi")], model="m")
+
+
+def test_sync_fallback_closes_stream_when_consumer_stops():
+    """
+    Test that aclose() and cancellation stop the executor-driven sync stream.
+    """
+    provider = EndlessSyncProvider()
+
+    async def consume_two():
+        stream = provider.astream_complete(_request())
+        chunks = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return chunks
+
+    assert len(asyncio.run(consume_two())) == 2
+    assert provider.closed.wait(1)
+
+    provider = EndlessSyncProvider()
+
+    async def cancel_midway():
+        async def consume():
+            async for _ in provider.astream_complete(_request()):
+                pass
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_midway())
+    assert provider.closed.wait(1)
+    produced = provider.produced
+    time.sleep(0.05)
+    assert provider.produced == produced
+
+
+def test_proxy_stream_stops_on_disconnect(monkeypatch):
+    """
+    Test that the proxy cancels the upstream read and counts the cancellation.
+    """
+    pytest.importorskip("fastapi")
+    import uniinfer.uniioai_proxy as proxy
+    from uniinfer.metrics import STREAM_BYTES_SAVED, STREAM_CANCELLATIONS
+
+    upstream_closed = []
+
+    async def slow_stream(*args, **kwargs):
+        try:
+            yield "first"
+            await asyncio.sleep(30)
+            yield "never"
+        finally:
+            upstream_closed.append(True)
+
+    monkeypatch.setattr(proxy, "astream_completion", slow_stream)
+
+    class DisconnectingRequest:
+        def __init__(self):
+            self.gone = asyncio.Event()
+
+        async def receive(self):
+            await self.gone.wait()
+            return {"type": "http.disconnect"}
+
+    async def main():
+        request = DisconnectingRequest()
+        stream = proxy.stream_response_generator(
+            [{"role": "user", "content": "hi"}], "cancel-prov@cancel-model", 0.7, 100,
+            None, None, request=request)
+        chunks = [await stream.__anext__(), await stream.__anext__()]
+        started = time.perf_counter()
+        request.gone.set()
+        rest = [chunk async for chunk in stream]
+        return chunks, rest, time.perf_counter() - started
+
+    chunks, rest, elapsed = asyncio.run(main())
+    assert '"first"' in chunks[1]
+    assert rest == []
+    assert elapsed < 1
+    assert upstream_closed == [True]
+    assert STREAM_CANCELLATIONS.value("cancel-prov", "cancel-model") == 1
+    assert STREAM_BYTES_SAVED.value("cancel-prov", "cancel-model") == 100 * 4 - len("first")
@@ -0,0 +1,91 @@
+"""
+Tests for the shared SSE / NDJSON stream decoder.
+"""
+
+import asyncio
+
+import pytest
+
+from uniinfer.benchmarks.stream_decode import (
+    decode_incremental, decode_per_line, generate_stream, split_chunks
+)
+from uniinfer.streaming import (
+    StreamDecoder, aiter_sse, decode_lines, iter_ndjson, iter_sse
+)
+
+
+class FakeResponse:
+    """Minimal stand-in for a streaming requests/httpx response."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def iter_content(self, chunk_size=None):
+        return iter(self.chunks)
+
+    async def aiter_bytes(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def test_sse_frames_split_across_chunks():
+    """
+    Test that frames cut at arbitrary byte boundaries are reassembled.
+    """
+    body = b'data: {"n": 1}\n\ndata: {"n": 2}\r\n\n: keep-alive\nevent: x\ndata: [DONE]\n\ndata: {"n": 3}\n'
+    for size in (1, 3, 7, len(body)):
+        events = list(iter_sse(FakeResponse(split_chunks(body, size))))
+        assert events == [{"n": 1}, {"n": 2}]
+
+
+def test_malformed_lines_are_skipped():
+    """
+    Test that a bad payload does not end the stream.
+    """
+    decoder = StreamDecoder()
+    assert decoder.feed(b'data: {broken\ndata: {"ok": true}\n') == [{"ok": True}]
+    assert not decoder.done
+
+
+def test_ndjson_and_trailing_line():
+    """
+    Test NDJSON decoding, including a final line without a newline.
+    """
+    chunks = [b'{"a": 1}\n{"a"', b': 2}\n\n{"done": true}']
+    assert list(iter_ndjson(FakeResponse(chunks))) == [{"a": 1}, {"a": 2}, {"done": True}]
+
+
+def test_async_sse():
+    """
+    Test the httpx-style async iterator.
+    """
+    async def collect():
+        response = FakeResponse([b'data: {"n"', b': 1}\n\ndata: [DONE]\n\n'])
+        return [event async for event in aiter_sse(response)]
+
+    assert asyncio.run(collect()) == [{"n": 1}]
+
+
+def test_decode_lines_accepts_str_and_bytes():
+    """
+    Test decoding recorded lines.
+    """
+    lines = ['data: {"n": 1}', b'data: {"n": 2}', "data: [DONE]", 'data: {"n": 3}']
+    assert list(decode_lines(lines)) == [{"n": 1}, {"n": 2}]
+
+
+def test_unknown_format():
+    """
+    Test that an unknown format is rejected.
+    """
+    with pytest.raises(ValueError):
+        StreamDecoder("xml")
+
+
+@pytest.mark.parametrize("format", ["sse", "ndjson"])
+def test_benchmark_decoders_agree(format):
+    """
+    Test that the benchmark's baseline and incremental decoders see the same events.
+    """
+    chunks = split_chunks(generate_stream(200, format), 97)
+    assert decode_per_line(chunks, format) == decode_incremental(chunks, format)
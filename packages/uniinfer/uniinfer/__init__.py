@@ -8,96 +8,95 @@ LLM inference providers.
 from .core import ChatMessage, ChatCompletionRequest, ChatCompletionResponse, ChatProvider, EmbeddingRequest, EmbeddingResponse, EmbeddingProvider
 from .factory import ProviderFactory
 from .embedding_factory import EmbeddingProviderFactory
-from .providers import (
-    MistralProvider, AnthropicProvider, OpenAIProvider,
-    OllamaProvider, OllamaEmbeddingProvider, OpenRouterProvider, ArliAIProvider,
-    InternLMProvider, StepFunProvider, SambanovaProvider,
-    UpstageProvider, NGCProvider, CloudflareProvider, ChutesProvider,
-    PollinationsProvider, BigmodelProvider, TuAIProvider, TuAIEmbeddingProvider
-)
+from . import providers as _providers
+from .providers import provider_path as _provider_path
 from .errors import (
     UniInferError, ProviderError, AuthenticationError,
-    RateLimitError, TimeoutError, InvalidRequestError
+    RateLimitError, TimeoutError, InvalidRequestError, CircuitOpenError,
+    QueueFullError
+)
+from .circuit_breaker import (
+    CircuitBreaker, configure_circuit_breakers, get_circuit_breaker,
+    reset_circuit_breakers
+)
+from .strategies import FallbackStrategy, LatencyAwareStrategy, CostBasedStrategy
+from .completion_cache import (
+    CompletionCache, CachedProvider, enable_completion_cache,
+    disable_completion_cache, get_completion_cache
+)
+from .batch import complete_many, BatchResult, ProviderSlots
+from .ratelimit import (
+    RateLimiter, RateLimitedProvider, configure_rate_limit,
+    get_rate_limiter, with_rate_limit
 )
-from .strategies import FallbackStrategy, CostBasedStrategy
-
-# Import optional providers conditionally
-try:
-    from .providers import HuggingFaceProvider
-    HAS_HUGGINGFACE = True
-except ImportError:
-    HAS_HUGGINGFACE = False
-
-try:
-    from .providers import CohereProvider
-    HAS_COHERE = True
-except ImportError:
-    HAS_COHERE = False
-
-try:
-    from .providers import MoonshotProvider
-    HAS_MOONSHOT = True
-except ImportError:
-    HAS_MOONSHOT = False
-
-try:
-    from .providers import GroqProvider
-    HAS_GROQ = True
-except ImportError:
-    HAS_GROQ = False
-
-try:
-    from .providers import AI21Provider
-    HAS_AI21 = True
-except ImportError:
-    HAS_AI21 = False
-
-try:
-    from .providers import GeminiProvider
-    HAS_GENAI = True
-except ImportError:
-    HAS_GENAI = False
-
-# Register built-in providers
-ProviderFactory.register_provider("mistral", MistralProvider)
-ProviderFactory.register_provider("anthropic", AnthropicProvider)
-ProviderFactory.register_provider("openai", OpenAIProvider)
-ProviderFactory.register_provider("ollama", OllamaProvider)
-ProviderFactory.register_provider("openrouter", OpenRouterProvider)
-ProviderFactory.register_provider("arli", ArliAIProvider)
-ProviderFactory.register_provider("internlm", InternLMProvider)
-ProviderFactory.register_provider("stepfun", StepFunProvider)
-ProviderFactory.register_provider("sambanova", SambanovaProvider)
-ProviderFactory.register_provider("upstage", UpstageProvider)
-ProviderFactory.register_provider("ngc", NGCProvider)
-ProviderFactory.register_provider("cloudflare", CloudflareProvider)
-ProviderFactory.register_provider("chutes", ChutesProvider)
-ProviderFactory.register_provider("pollinations", PollinationsProvider)
-ProviderFactory.register_provider("bigmodel", BigmodelProvider)
-ProviderFactory.register_provider("tu", TuAIProvider)
+from .embedding_batch import BatchingEmbeddingProvider, with_embedding_batching
+from .embedding_cache import (
+    EmbeddingCache, CachedEmbeddingProvider, enable_embedding_cache,
+    disable_embedding_cache, get_embedding_cache
+)
+from .model_catalogue import ModelCatalogue, get_model_catalogue
+from .credential_cache import CredentialCache
+from .scheduler import PriorityScheduler
+from .adaptive import AdaptiveConcurrency
+
+# Optional providers are registered only if their SDK is installed; the
+# check uses importlib.util.find_spec, so no SDK is imported here
+HAS_HUGGINGFACE = _providers.HAS_HUGGINGFACE
+HAS_COHERE = _providers.HAS_COHERE
+HAS_MOONSHOT = _providers.HAS_MOONSHOT
+HAS_GROQ = _providers.HAS_GROQ
+HAS_AI21 = _providers.HAS_AI21
+HAS_GENAI = _providers.HAS_GENAI
+
+# Register built-in providers by import path; each module is imported on first use
+ProviderFactory.register_provider("mistral", _provider_path("MistralProvider"))
+ProviderFactory.register_provider("anthropic", _provider_path("AnthropicProvider"))
+ProviderFactory.register_provider("openai", _provider_path("OpenAIProvider"))
+ProviderFactory.register_provider("ollama", _provider_path("OllamaProvider"))
+ProviderFactory.register_provider("openrouter", _provider_path("OpenRouterProvider"))
+ProviderFactory.register_provider("arli", _provider_path("ArliAIProvider"))
+ProviderFactory.register_provider("internlm", _provider_path("InternLMProvider"))
+ProviderFactory.register_provider("stepfun", _provider_path("StepFunProvider"))
+ProviderFactory.register_provider("sambanova", _provider_path("SambanovaProvider"))
+ProviderFactory.register_provider("upstage", _provider_path("UpstageProvider"))
+ProviderFactory.register_provider("ngc", _provider_path("NGCProvider"))
+ProviderFactory.register_provider("cloudflare", _provider_path("CloudflareProvider"))
+ProviderFactory.register_provider("chutes", _provider_path("ChutesProvider"))
+ProviderFactory.register_provider("pollinations", _provider_path("PollinationsProvider"))
+ProviderFactory.register_provider("bigmodel", _provider_path("BigmodelProvider"))
+ProviderFactory.register_provider("tu", _provider_path("TuAIProvider"))
+ProviderFactory.register_provider("replay", _provider_path("ReplayProvider"))
 
 # Register embedding providers
-EmbeddingProviderFactory.register_provider("ollama", OllamaEmbeddingProvider)
-EmbeddingProviderFactory.register_provider("tu", TuAIEmbeddingProvider)
+EmbeddingProviderFactory.register_provider("ollama", _provider_path("OllamaEmbeddingProvider"))
+EmbeddingProviderFactory.register_provider("tu", _provider_path("TuAIEmbeddingProvider"))
 
 # Register optional providers if available
 if HAS_HUGGINGFACE:
-    ProviderFactory.register_provider("huggingface", HuggingFaceProvider)
+    ProviderFactory.register_provider("huggingface", _provider_path("HuggingFaceProvider"))
 
 if HAS_COHERE:
-    ProviderFactory.register_provider("cohere", CohereProvider)
+    ProviderFactory.register_provider("cohere", _provider_path("CohereProvider"))
 
 if HAS_MOONSHOT:
-    ProviderFactory.register_provider("moonshot", MoonshotProvider)
+    ProviderFactory.register_provider("moonshot", _provider_path("MoonshotProvider"))
 
 if HAS_GROQ:
-    ProviderFactory.register_provider("groq", GroqProvider)
+    ProviderFactory.register_provider("groq", _provider_path("GroqProvider"))
 
 if HAS_AI21:
-    ProviderFactory.register_provider("ai21", AI21Provider)
+    ProviderFactory.register_provider("ai21", _provider_path("AI21Provider"))
 
 if HAS_GENAI:
-    ProviderFactory.register_provider("gemini", GeminiProvider)
+    ProviderFactory.register_provider("gemini", _provider_path("GeminiProvider"))
+
+
+def __getattr__(name):
+    # Provider classes (e.g. uniinfer.TuAIProvider) are imported on first access
+    if name in _providers._PROVIDER_MODULES:
+        return getattr(_providers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __version__ = "0.1.0"
 
@@ -133,6 +132,7 @@ __all__ = [
     'UpstageProvider',
     'NGCProvider',
     'CloudflareProvider',
+    'ReplayProvider',
     'ChutesProvider',
     'PollinationsProvider',
     'BigmodelProvider',
@@ -144,8 +144,40 @@ __all__ = [
     'RateLimitError',
     'TimeoutError',
     'InvalidRequestError',
+    'CircuitOpenError',
+    'QueueFullError',
+    'CircuitBreaker',
+    'configure_circuit_breakers',
+    'get_circuit_breaker',
+    'reset_circuit_breakers',
     'FallbackStrategy',
-    'CostBasedStrategy'
+    'LatencyAwareStrategy',
+    'CostBasedStrategy',
+    'CompletionCache',
+    'CachedProvider',
+    'enable_completion_cache',
+    'disable_completion_cache',
+    'get_completion_cache',
+    'complete_many',
+    'BatchResult',
+    'ProviderSlots',
+    'RateLimiter',
+    'RateLimitedProvider',
+    'configure_rate_limit',
+    'get_rate_limiter',
+    'with_rate_limit',
+    'BatchingEmbeddingProvider',
+    'with_embedding_batching',
+    'EmbeddingCache',
+    'CachedEmbeddingProvider',
+    'enable_embedding_cache',
+    'disable_embedding_cache',
+    'get_embedding_cache',
+    'ModelCatalogue',
+    'get_model_catalogue',
+    'CredentialCache',
+    'PriorityScheduler',
+    'AdaptiveConcurrency'
 ]
 
 # Add optional providers to exports if available
@@ -0,0 +1,252 @@
+"""
+Adaptive (AIMD) concurrency limits per provider.
+
+Providers rarely document their real capacity, and free tiers change it
+without notice. ``AdaptiveConcurrency`` learns it from the responses, in the
+style of TCP congestion control:
+
+- additive increase: every successful call made while the provider's window
+  was full adds ``1 / limit``, so the limit grows by about one per round of
+  calls, as long as latency stays within ``latency_tolerance`` times its
+  baseline;
+- multiplicative decrease: a rate limit (429) or timeout multiplies the limit
+  by ``backoff``. Calls that started before the last cut do not cut again,
+  so one burst of 429s counts as one signal;
+- a ``Retry-After`` delay pauses new calls to the provider until it lapses.
+
+Learned limits and latency baselines are saved to
+``~/.uniinfer/adaptive_limits.json`` (at most every ``save_interval``
+seconds and at exit) and loaded on start, so each run begins where the
+previous one ended.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .errors import RateLimitError, TimeoutError, map_provider_error, retry_after_of
+from .json_utils import write_json_atomic
+
+DEFAULT_LIMITS_PATH = os.path.expanduser("~/.uniinfer/adaptive_limits.json")
+DEFAULT_INITIAL_LIMIT = 4.0
+DEFAULT_MIN_LIMIT = 1.0
+DEFAULT_MAX_LIMIT = 64.0
+DEFAULT_BACKOFF = 0.5
+DEFAULT_LATENCY_TOLERANCE = 2.0
+DEFAULT_SAVE_INTERVAL = 30.0
+LATENCY_SMOOTHING = 0.2
+# Per-sample upward drift of the latency baseline, so a provider that became
+# slower for good is eventually accepted as its new normal
+BASELINE_DRIFT = 0.001
+# Longest Retry-After pause honoured, in seconds
+MAX_PAUSE = 300.0
+
+RATE_LIMITED = "rate_limited"
+TIMED_OUT = "timed_out"
+
+
+def classify_error(provider_name: str, error: BaseException) -> Optional[str]:
+    """
+    Return RATE_LIMITED or TIMED_OUT for congestion signals, None for other errors.
+
+    Provider errors that are not uniinfer errors yet are classified by their
+    message through map_provider_error().
+    """
+    if isinstance(error, RateLimitError):
+        return RATE_LIMITED
+    # uniinfer's TimeoutError, the builtin one and asyncio's (a separate class before 3.11)
+    if isinstance(error, TimeoutError) or type(error).__name__ == "TimeoutError":
+        return TIMED_OUT
+    if type(error).__name__ in ("CancelledError", "GeneratorExit", "KeyboardInterrupt"):
+        return None
+    mapped = map_provider_error(provider_name, error)
+    if isinstance(mapped, RateLimitError):
+        return RATE_LIMITED
+    if isinstance(mapped, TimeoutError):
+        return TIMED_OUT
+    return None
+
+
+class _ProviderState:
+    __slots__ = ("limit", "baseline", "latency", "last_cut", "paused_until", "increases", "decreases")
+
+    def __init__(self, limit: float, baseline: Optional[float] = None):
+        self.limit = limit
+        self.baseline = baseline
+        self.latency = baseline
+        self.last_cut = 0.0
+        self.paused_until = 0.0
+        self.increases = 0
+        self.decreases = 0
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit per provider, learned from latency, 429s and timeouts.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = DEFAULT_INITIAL_LIMIT,
+        min_limit: float = DEFAULT_MIN_LIMIT,
+        max_limit: float = DEFAULT_MAX_LIMIT,
+        backoff: float = DEFAULT_BACKOFF,
+        latency_tolerance: float = DEFAULT_LATENCY_TOLERANCE,
+        path: Optional[str] = DEFAULT_LIMITS_PATH,
+        save_interval: float = DEFAULT_SAVE_INTERVAL,
+    ):
+        """
+        Initialize the limits, loading those learned in earlier runs.
+
+        Args:
+            initial_limit (float): Limit of a provider seen for the first time.
+            min_limit (float): The limit never drops below this.
+            max_limit (float): The limit never grows beyond this.
+            backoff (float): Factor applied to the limit on a 429 or timeout.
+            latency_tolerance (float): The limit only grows while the smoothed
+                latency stays below this multiple of the baseline.
+            path (Optional[str]): JSON file the limits persist in; None keeps them in memory.
+            save_interval (float): Minimum seconds between saves.
+        """
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.path = path
+        self.save_interval = save_interval
+        self._providers: Dict[str, _ProviderState] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        if path:
+            self._load()
+            atexit.register(self.save)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        for provider, entry in saved.items():
+            try:
+                limit = min(max(float(entry["limit"]), self.min_limit), self.max_limit)
+                baseline = entry.get("baseline_latency")
+                self._providers[provider] = _ProviderState(
+                    limit, float(baseline) if baseline is not None else None)
+            except (TypeError, KeyError, ValueError):
+                continue
+
+    def save(self) -> None:
+        """Write the learned limits to the JSON file."""
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                provider: {"limit": round(state.limit, 3), "baseline_latency": state.baseline,
+                           "updated_at": time.time()}
+                for provider, state in self._providers.items()
+            }
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            write_json_atomic(self.path, data)
+        except OSError as e:
+            print(f"Warning: could not save adaptive limits to {self.path}: {e}")
+
+    def _state(self, provider: str) -> _ProviderState:
+        state = self._providers.get(provider)
+        if state is None:
+            state = self._providers[provider] = _ProviderState(self.initial_limit)
+        return state
+
+    def _save_if_due(self) -> None:
+        if self.path and self._dirty and time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def limit(self, provider: str) -> int:
+        """Return the current in-flight limit of a provider."""
+        with self._lock:
+            return max(int(self._state(provider).limit), int(self.min_limit))
+
+    def paused_for(self, provider: str) -> float:
+        """Return the seconds left of the provider's Retry-After pause (0 if none)."""
+        with self._lock:
+            state = self._providers.get(provider)
+            return max(0.0, state.paused_until - time.monotonic()) if state is not None else 0.0
+
+    def on_success(self, provider: str, latency: Optional[float], saturated: bool = True) -> None:
+        """
+        Record a successful call.
+
+        Args:
+            provider (str): The provider name.
+            latency (Optional[float]): Seconds the call (or a stream's first
+                token) took; None skips the latency check.
+            saturated (bool): Whether the provider's window was full while the
+                call ran. The limit only grows when it is actually the bottleneck.
+        """
+        with self._lock:
+            state = self._state(provider)
+            flat = True
+            if latency is not None:
+                state.latency = latency if state.latency is None else (
+                    (1 - LATENCY_SMOOTHING) * state.latency + LATENCY_SMOOTHING * latency)
+                state.baseline = state.latency if state.baseline is None else min(
+                    state.latency, state.baseline * (1 + BASELINE_DRIFT))
+                flat = state.latency <= state.baseline * self.latency_tolerance
+            if flat and saturated and state.limit < self.max_limit:
+                state.limit = min(self.max_limit, state.limit + 1.0 / state.limit)
+                state.increases += 1
+                self._dirty = True
+        self._save_if_due()
+
+    def on_error(self, provider: str, error: BaseException, started: Optional[float] = None) -> Optional[str]:
+        """
+        Record a failed call; rate limits and timeouts cut the limit.
+
+        Args:
+            provider (str): The provider name.
+            error (BaseException): The error the call failed with.
+            started (Optional[float]): ``time.monotonic()`` when the call started.
+                Calls that started before the last cut do not cut again.
+
+        Returns:
+            Optional[str]: RATE_LIMITED, TIMED_OUT or None if the error is no congestion signal.
+        """
+        signal = classify_error(provider, error)
+        if signal is None:
+            return None
+        retry_after = retry_after_of(error) if signal == RATE_LIMITED else None
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(provider)
+            if started is None or started >= state.last_cut:
+                state.limit = max(self.min_limit, state.limit * self.backoff)
+                state.last_cut = now
+                state.decreases += 1
+                self._dirty = True
+            if retry_after:
+                state.paused_until = max(state.paused_until, now + min(retry_after, MAX_PAUSE))
+        self._save_if_due()
+        return signal
+
+    def stats(self) -> Dict[str, Any]:
+        """Return limit, latency baseline, pause and adjustment counts per provider."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                provider: {
+                    "limit": round(state.limit, 2),
+                    "baseline_latency": state.baseline,
+                    "latency": state.latency,
+                    "paused_for": max(0.0, state.paused_until - now),
+                    "increases": state.increases,
+                    "decreases": state.decreases,
+                }
+                for provider, state in self._providers.items()
+            }
@@ -0,0 +1,185 @@
+"""
+Bounded-concurrency batch completion for UniInfer.
+
+``complete_many`` runs many chat completion requests concurrently on top of
+the existing providers (or a FallbackStrategy), keeps results in input order,
+captures errors per item and reports progress as items finish.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .core import ChatCompletionRequest, ChatCompletionResponse, ChatProvider
+from .factory import ProviderFactory
+
+BatchItem = Union[ChatCompletionRequest, Tuple[str, ChatCompletionRequest]]
+
+
+class BatchResult:
+    """
+    Outcome of one request in a batch.
+
+    Attributes:
+        index (int): Position of the request in the input sequence.
+        response (Optional[ChatCompletionResponse]): The response, if the call succeeded.
+        provider (Optional[str]): Name of the provider that answered (or was tried).
+        error (Optional[Exception]): The exception, if the call failed.
+        latency (float): Wall-clock seconds spent on the call, including queueing for a slot.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        response: Optional[ChatCompletionResponse] = None,
+        provider: Optional[str] = None,
+        error: Optional[Exception] = None,
+        latency: float = 0.0
+    ):
+        self.index = index
+        self.response = response
+        self.provider = provider
+        self.error = error
+        self.latency = latency
+
+    @property
+    def ok(self) -> bool:
+        """Whether the request succeeded."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"BatchResult(index={self.index}, provider={self.provider!r}, {status})"
+
+
+class ProviderSlots:
+    """
+    Per-provider concurrency limits.
+
+    Providers without a configured limit are not restricted.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        """
+        Initialize the slots.
+
+        Args:
+            limits (Optional[Dict[str, int]]): Maximum in-flight calls per provider name.
+        """
+        self._semaphores = {
+            name: threading.BoundedSemaphore(limit)
+            for name, limit in (limits or {}).items()
+        }
+
+    @contextmanager
+    def slot(self, provider_name: str) -> Iterator[None]:
+        """Hold one in-flight slot of the given provider."""
+        semaphore = self._semaphores.get(provider_name)
+        if semaphore is None:
+            yield
+            return
+        with semaphore:
+            yield
+
+
+def complete_many(
+    requests: Sequence[BatchItem],
+    provider: Union[str, ChatProvider, Tuple[str, ChatProvider], None] = None,
+    strategy: Optional[Any] = None,
+    concurrency: int = 8,
+    per_provider_limits: Optional[Dict[str, int]] = None,
+    progress: Optional[Callable[[int, int, BatchResult], None]] = None,
+    **kwargs
+) -> List[BatchResult]:
+    """
+    Run many chat completion requests concurrently.
+
+    Each item is either a ChatCompletionRequest, sent to ``provider`` or
+    ``strategy``, or a ``(provider_name, request)`` tuple for mixed batches.
+
+    Args:
+        requests (Sequence): The requests to run.
+        provider (Union[str, ChatProvider, Tuple[str, ChatProvider], None]): Default
+            provider name, instance, or ``(name, instance)`` pair. A bare instance
+            is known by the name its class is registered under in ProviderFactory.
+        strategy: A FallbackStrategy (or compatible) used for plain requests
+            when no provider is given.
+        concurrency (int): Maximum number of requests in flight overall.
+        per_provider_limits (Optional[Dict[str, int]]): Maximum in-flight requests per provider.
+        progress (Optional[Callable]): Called as ``progress(done, total, result)``
+            after each item finishes, from a worker thread.
+        **kwargs: Additional provider-specific parameters for every request.
+
+    Returns:
+        List[BatchResult]: One result per input item, in input order.
+
+    Raises:
+        ValueError: If a plain request has neither a provider nor a strategy to
+            run on, or per_provider_limits are given for a provider instance whose
+            name cannot be determined.
+    """
+    slots = ProviderSlots(per_provider_limits)
+    total = len(requests)
+    results: List[Optional[BatchResult]] = [None] * total
+    done_lock = threading.Lock()
+    done = [0]
+
+    if isinstance(provider, str):
+        default_name: Optional[str] = provider
+        default_provider: Optional[ChatProvider] = ProviderFactory.get_provider(
+            provider)
+    elif isinstance(provider, tuple):
+        default_name, default_provider = provider
+    elif provider is not None:
+        default_name = ProviderFactory.get_provider_name(provider)
+        if default_name is None:
+            if per_provider_limits:
+                raise ValueError(
+                    f"Cannot tell which provider name {type(provider).__name__} is registered under;"
+                    " pass provider=(name, instance) to apply per_provider_limits")
+            default_name = type(provider).__name__
+        default_provider = provider
+    else:
+        default_name = None
+        default_provider = None
+
+    if default_provider is None and strategy is None and any(
+            not isinstance(item, tuple) for item in requests):
+        raise ValueError(
+            "complete_many needs a provider or strategy for plain requests")
+
+    def run(index: int, item: BatchItem) -> BatchResult:
+        start_time = time.time()
+        provider_name = default_name
+        try:
+            if isinstance(item, tuple):
+                provider_name, request = item
+                with slots.slot(provider_name):
+                    response = ProviderFactory.get_provider(
+                        provider_name).complete(request, **kwargs)
+            elif default_provider is not None:
+                with slots.slot(provider_name):
+                    response = default_provider.complete(item, **kwargs)
+            else:
+                response, provider_name = strategy.complete(
+                    item, slots=slots, **kwargs)
+            result = BatchResult(index, response=response, provider=provider_name,
+                                 latency=time.time() - start_time)
+        except Exception as e:
+            result = BatchResult(index, provider=provider_name, error=e,
+                                 latency=time.time() - start_time)
+
+        results[index] = result
+        if progress is not None:
+            with done_lock:
+                done[0] += 1
+                completed = done[0]
+            progress(completed, total, result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for future in [executor.submit(run, i, item) for i, item in enumerate(requests)]:
+            future.result()
+
+    return results
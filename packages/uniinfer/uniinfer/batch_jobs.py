@@ -0,0 +1,493 @@
+"""
+Persistent job store and runner for OpenAI-style batch jobs.
+
+``BatchStore`` keeps uploaded JSONL files, batches and their individual
+requests in a SQLite file. ``BatchRunner`` drains pending requests on the
+event loop with bounded concurrency and writes every result as soon as it
+arrives, so a restarted process resumes where it stopped: completed requests
+are not sent again. Store calls run in worker threads, off the event loop.
+When all requests of a batch are done, the runner writes its output and
+error files in the OpenAI batch format. A batch still unfinished at its
+``expires_at`` (24 hours after creation) stops sending requests and is
+finalized as ``expired``, with its unsent requests in the error file.
+
+Files and batches belong to the sha256 hash of the bearer token that created
+them. The token itself is needed to resolve provider keys but is never
+written to disk: the runner keeps it in memory, and after a restart a batch
+resumes once its owner makes any authenticated batch or file call.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .errors import QueueFullError, RateLimitError, retry_after_of
+
+DEFAULT_BATCH_DB = os.path.expanduser("~/.uniinfer/batches.sqlite")
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY = 2.0
+MAX_RETRY_DELAY = 60.0
+COMPLETION_WINDOW = 24 * 3600
+SUPPORTED_ENDPOINTS = ("/v1/chat/completions",)
+# Seconds the idle runner sleeps before looking for resumable batches again
+IDLE_POLL_INTERVAL = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id TEXT PRIMARY KEY, owner TEXT NOT NULL, filename TEXT NOT NULL, purpose TEXT NOT NULL,
+    bytes INTEGER NOT NULL, created_at INTEGER NOT NULL, content BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS batches (
+    id TEXT PRIMARY KEY, owner TEXT NOT NULL, endpoint TEXT NOT NULL, input_file_id TEXT NOT NULL,
+    completion_window TEXT NOT NULL, status TEXT NOT NULL, metadata TEXT,
+    output_file_id TEXT, error_file_id TEXT, created_at INTEGER NOT NULL,
+    in_progress_at INTEGER, finalizing_at INTEGER, completed_at INTEGER,
+    cancelling_at INTEGER, cancelled_at INTEGER, expired_at INTEGER);
+CREATE TABLE IF NOT EXISTS batch_requests (
+    batch_id TEXT NOT NULL, idx INTEGER NOT NULL, custom_id TEXT NOT NULL, body TEXT NOT NULL,
+    status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, response TEXT, error TEXT,
+    PRIMARY KEY (batch_id, idx));
+CREATE INDEX IF NOT EXISTS batch_requests_pending ON batch_requests (batch_id, status);
+"""
+
+# Batch statuses the runner still has work for
+_ACTIVE = ("in_progress", "cancelling")
+
+
+def owner_hash(api_bearer_token: Optional[str]) -> str:
+    """Return the owner id stored for a bearer token (its sha256 hex)."""
+    return hashlib.sha256((api_bearer_token or "").encode("utf-8")).hexdigest()
+
+
+def parse_batch_input(content: bytes, endpoint: str) -> List[Dict[str, Any]]:
+    """
+    Parse and validate a batch input file.
+
+    Args:
+        content (bytes): JSONL with one ``{"custom_id", "method", "url", "body"}`` per line.
+        endpoint (str): The batch endpoint every line must target.
+
+    Returns:
+        List[Dict[str, Any]]: The requests in file order.
+
+    Raises:
+        ValueError: If a line is not valid JSON, targets another endpoint, lacks
+            a model or repeats a custom_id.
+    """
+    requests = []
+    seen = set()
+    for number, line in enumerate(content.decode("utf-8").splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number}: invalid JSON ({e})")
+        if not isinstance(item, dict) or not isinstance(item.get("body"), dict):
+            raise ValueError(f"Line {number}: expected an object with a 'body' object")
+        custom_id = item.get("custom_id")
+        if not custom_id:
+            raise ValueError(f"Line {number}: missing custom_id")
+        if custom_id in seen:
+            raise ValueError(f"Line {number}: duplicate custom_id '{custom_id}'")
+        seen.add(custom_id)
+        if item.get("method", "POST").upper() != "POST" or item.get("url", endpoint) != endpoint:
+            raise ValueError(f"Line {number}: requests must be POST {endpoint}")
+        if "@" not in str(item["body"].get("model", "")):
+            raise ValueError(f"Line {number}: body.model must be 'provider@modelname'")
+        requests.append({"custom_id": str(custom_id), "body": item["body"]})
+    if not requests:
+        raise ValueError("The input file contains no requests")
+    return requests
+
+
+class BatchStore:
+    """
+    SQLite-backed store of uploaded files, batches and per-request results.
+    """
+
+    def __init__(self, path: str = DEFAULT_BATCH_DB):
+        """
+        Initialize the store.
+
+        Args:
+            path (str): SQLite file; ``":memory:"`` keeps everything in memory.
+        """
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            # stores created before batches could expire lack the column
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(batches)")}
+            if "expired_at" not in columns:
+                self._conn.execute("ALTER TABLE batches ADD COLUMN expired_at INTEGER")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- files ---
+
+    def create_file(self, owner: str, content: bytes, filename: str, purpose: str = "batch") -> Dict[str, Any]:
+        """Store a file and return its OpenAI-style file object."""
+        file_id = f"file-{uuid.uuid4().hex}"
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO files (id, owner, filename, purpose, bytes, created_at, content)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (file_id, owner, filename, purpose, len(content), int(time.time()), content))
+            self._conn.commit()
+        return self.get_file(owner, file_id)
+
+    def get_file(self, owner: str, file_id: str) -> Optional[Dict[str, Any]]:
+        """Return the file object, or None if the owner has no such file."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, bytes, created_at, filename, purpose FROM files WHERE id = ? AND owner = ?",
+                (file_id, owner)).fetchone()
+        if row is None:
+            return None
+        return {"id": row["id"], "object": "file", "bytes": row["bytes"], "created_at": row["created_at"],
+                "filename": row["filename"], "purpose": row["purpose"]}
+
+    def file_content(self, owner: str, file_id: str) -> Optional[bytes]:
+        """Return the content of a file, or None if the owner has no such file."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM files WHERE id = ? AND owner = ?", (file_id, owner)).fetchone()
+        return bytes(row["content"]) if row is not None else None
+
+    # --- batches ---
+
+    def create_batch(
+        self,
+        owner: str,
+        input_file_id: str,
+        endpoint: str = "/v1/chat/completions",
+        completion_window: str = "24h",
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Create a batch from an uploaded input file; it starts ``in_progress``.
+
+        Raises:
+            KeyError: If the owner has no such input file.
+            ValueError: If the endpoint or completion window is unsupported or
+                the file is not a valid batch input.
+        """
+        if endpoint not in SUPPORTED_ENDPOINTS:
+            raise ValueError(f"Unsupported batch endpoint '{endpoint}'. Supported: {', '.join(SUPPORTED_ENDPOINTS)}")
+        if completion_window != "24h":
+            raise ValueError("completion_window must be '24h'")
+        content = self.file_content(owner, input_file_id)
+        if content is None:
+            raise KeyError(input_file_id)
+        requests = parse_batch_input(content, endpoint)
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        now = int(time.time())
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO batches (id, owner, endpoint, input_file_id, completion_window, status,"
+                " metadata, created_at, in_progress_at) VALUES (?, ?, ?, ?, ?, 'in_progress', ?, ?, ?)",
+                (batch_id, owner, endpoint, input_file_id, completion_window,
+                 json.dumps(metadata) if metadata else None, now, now))
+            self._conn.executemany(
+                "INSERT INTO batch_requests (batch_id, idx, custom_id, body, status)"
+                " VALUES (?, ?, ?, ?, 'pending')",
+                [(batch_id, i, item["custom_id"], json.dumps(item["body"])) for i, item in enumerate(requests)])
+            self._conn.commit()
+        return self.get_batch(owner, batch_id)
+
+    def _batch_object(self, row: sqlite3.Row) -> Dict[str, Any]:
+        counts = {"total": 0, "completed": 0, "failed": 0}
+        for status, count in self._conn.execute(
+                "SELECT status, COUNT(*) FROM batch_requests WHERE batch_id = ? GROUP BY status", (row["id"],)):
+            counts["total"] += count
+            if status in ("completed", "failed"):
+                counts[status] = count
+        return {
+            "id": row["id"], "object": "batch", "endpoint": row["endpoint"], "errors": None,
+            "input_file_id": row["input_file_id"], "completion_window": row["completion_window"],
+            "status": row["status"], "output_file_id": row["output_file_id"],
+            "error_file_id": row["error_file_id"], "created_at": row["created_at"],
+            "in_progress_at": row["in_progress_at"], "expires_at": row["created_at"] + COMPLETION_WINDOW,
+            "finalizing_at": row["finalizing_at"], "completed_at": row["completed_at"],
+            "failed_at": None, "expired_at": row["expired_at"], "cancelling_at": row["cancelling_at"],
+            "cancelled_at": row["cancelled_at"], "request_counts": counts,
+            "metadata": json.loads(row["metadata"]) if row["metadata"] else None,
+        }
+
+    def get_batch(self, owner: str, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Return the batch object, or None if the owner has no such batch."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM batches WHERE id = ? AND owner = ?", (batch_id, owner)).fetchone()
+            return self._batch_object(row) if row is not None else None
+
+    def list_batches(self, owner: str, limit: int = 20, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the owner's batches, newest first, optionally after a batch id."""
+        with self._lock:
+            query = "SELECT * FROM batches WHERE owner = ?"
+            params: List[Any] = [owner]
+            if after:
+                query += " AND rowid < (SELECT rowid FROM batches WHERE id = ?)"
+                params.append(after)
+            query += " ORDER BY rowid DESC LIMIT ?"
+            params.append(limit)
+            return [self._batch_object(row) for row in self._conn.execute(query, params).fetchall()]
+
+    def cancel_batch(self, owner: str, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Ask the runner to stop a batch; requests already sent still complete."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE batches SET status = 'cancelling', cancelling_at = ?"
+                " WHERE id = ? AND owner = ? AND status = 'in_progress'",
+                (int(time.time()), batch_id, owner))
+            self._conn.commit()
+        return self.get_batch(owner, batch_id)
+
+    # --- runner side ---
+
+    def active_batches(self) -> List[Dict[str, Any]]:
+        """Return ids, owners, statuses and deadlines of batches with work left, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, owner, status, created_at + {COMPLETION_WINDOW} AS expires_at FROM batches"
+                f" WHERE status IN ({','.join('?' * len(_ACTIVE))}) ORDER BY rowid", _ACTIVE).fetchall()
+        return [dict(row) for row in rows]
+
+    def status(self, batch_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM batches WHERE id = ?", (batch_id,)).fetchone()
+        return row["status"] if row is not None else None
+
+    def pending_requests(self, batch_id: str) -> List[Dict[str, Any]]:
+        """Return the requests of a batch that have no result yet, in file order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, custom_id, body, attempts FROM batch_requests"
+                " WHERE batch_id = ? AND status = 'pending' ORDER BY idx", (batch_id,)).fetchall()
+        return [{"idx": row["idx"], "custom_id": row["custom_id"], "body": json.loads(row["body"]),
+                 "attempts": row["attempts"]} for row in rows]
+
+    def record_attempt(self, batch_id: str, idx: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE batch_requests SET attempts = attempts + 1 WHERE batch_id = ? AND idx = ?",
+                (batch_id, idx))
+            self._conn.commit()
+
+    def record_result(self, batch_id: str, idx: int, response: Optional[Dict[str, Any]] = None,
+                      error: Optional[Dict[str, Any]] = None) -> None:
+        """Persist the outcome of one request: a response body or an error."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE batch_requests SET status = ?, response = ?, error = ? WHERE batch_id = ? AND idx = ?",
+                ("failed" if error is not None else "completed",
+                 json.dumps(response) if response is not None else None,
+                 json.dumps(error) if error is not None else None, batch_id, idx))
+            self._conn.commit()
+
+    def finalize(self, batch_id: str) -> None:
+        """
+        Write the output and error files of a batch and mark it completed,
+        cancelled (if it was being cancelled) or expired (if requests were
+        left unsent past its deadline). Unsent requests are reported in the
+        error file.
+        """
+        now = int(time.time())
+        with self._lock:
+            batch = self._conn.execute("SELECT owner, status FROM batches WHERE id = ?", (batch_id,)).fetchone()
+            if batch["status"] == "cancelling":
+                status, unsent = "cancelled", {
+                    "code": "batch_cancelled", "message": "Batch was cancelled before this request ran"}
+            elif self._conn.execute(
+                    "SELECT 1 FROM batch_requests WHERE batch_id = ? AND status = 'pending' LIMIT 1",
+                    (batch_id,)).fetchone():
+                status, unsent = "expired", {
+                    "code": "batch_expired", "message": "Batch expired before this request ran"}
+            else:
+                status, unsent = "completed", None
+            outputs, errors = [], []
+            for row in self._conn.execute(
+                    "SELECT idx, custom_id, status, response, error FROM batch_requests"
+                    " WHERE batch_id = ? ORDER BY idx", (batch_id,)):
+                line = {"id": f"batch_req_{batch_id[6:]}_{row['idx']}", "custom_id": row["custom_id"]}
+                if row["status"] == "completed":
+                    line.update(response={"status_code": 200, "request_id": line["id"],
+                                          "body": json.loads(row["response"])}, error=None)
+                    outputs.append(json.dumps(line))
+                else:
+                    error = json.loads(row["error"]) if row["error"] else unsent
+                    line.update(response=None, error=error)
+                    errors.append(json.dumps(line))
+            file_ids = []
+            for kind, lines in (("output", outputs), ("errors", errors)):
+                if not lines:
+                    file_ids.append(None)
+                    continue
+                content = ("\n".join(lines) + "\n").encode("utf-8")
+                file_id = f"file-{uuid.uuid4().hex}"
+                self._conn.execute(
+                    "INSERT INTO files (id, owner, filename, purpose, bytes, created_at, content)"
+                    " VALUES (?, ?, ?, 'batch_output', ?, ?, ?)",
+                    (file_id, batch["owner"], f"{batch_id}_{kind}.jsonl", len(content), now, content))
+                file_ids.append(file_id)
+            self._conn.execute(
+                f"UPDATE batches SET status = ?, output_file_id = ?, error_file_id = ?, finalizing_at = ?,"
+                f" {status}_at = ? WHERE id = ?",
+                (status, file_ids[0], file_ids[1], now, now, batch_id))
+            self._conn.commit()
+
+
+def _retryable(error: BaseException) -> bool:
+    """Rate limits and full scheduler queues are retried with backoff."""
+    return isinstance(error, (RateLimitError, QueueFullError))
+
+
+class BatchRunner:
+    """
+    Runs the pending requests of active batches on the event loop.
+    """
+
+    def __init__(
+        self,
+        store: BatchStore,
+        execute: Callable[[Dict[str, Any], str], Awaitable[Dict[str, Any]]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            store (BatchStore): Where batches and results live.
+            execute (Callable): ``await execute(body, api_bearer_token)`` sends one
+                request and returns the response body.
+            concurrency (int): Requests in flight at once.
+            max_attempts (int): Attempts per request on rate limits or full
+                queues before it is recorded as failed.
+            retry_delay (float): First backoff delay in seconds; doubled per attempt.
+        """
+        self.store = store
+        self.execute = execute
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._tokens: Dict[str, str] = {}
+        self._task = None
+        self._wake = None
+
+    def attach(self, api_bearer_token: str) -> str:
+        """
+        Remember an owner's token in memory so its batches can run, and wake the runner.
+
+        Returns:
+            str: The owner id of the token.
+        """
+        owner = owner_hash(api_bearer_token)
+        self._tokens[owner] = api_bearer_token
+        self.start()
+        return owner
+
+    def start(self) -> None:
+        """Start the runner task on the running loop if it is not running."""
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        self._wake.set()
+
+    async def stop(self) -> None:
+        """Cancel the runner task; pending requests stay pending in the store."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            active = await asyncio.to_thread(self.store.active_batches)
+            # overdue batches are finalized even if their owner has not come back
+            for batch in [batch for batch in active if batch["expires_at"] <= time.time()]:
+                await asyncio.to_thread(self.store.finalize, batch["id"])
+                active.remove(batch)
+            runnable = [batch for batch in active if batch["owner"] in self._tokens]
+            if not runnable:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), IDLE_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for batch in runnable:
+                try:
+                    await self.drain(batch["id"], self._tokens[batch["owner"]], batch["expires_at"])
+                except Exception as e:
+                    # leave the batch active; its pending requests are retried later
+                    print(f"Error running batch {batch['id']}: {type(e).__name__}: {e}")
+                    await asyncio.sleep(IDLE_POLL_INTERVAL)
+
+    async def drain(self, batch_id: str, api_bearer_token: str, expires_at: float = float("inf")) -> None:
+        """
+        Run all pending requests of one batch, then finalize it.
+
+        Args:
+            batch_id (str): The batch to run.
+            api_bearer_token (str): Token of the batch owner, passed to ``execute``.
+            expires_at (float): Unix time after which no new request is sent.
+        """
+        queue = asyncio.Queue()
+        if await asyncio.to_thread(self.store.status, batch_id) == "in_progress":
+            for item in await asyncio.to_thread(self.store.pending_requests, batch_id):
+                queue.put_nowait(item)
+
+        async def worker():
+            while not queue.empty():
+                # stop sending new requests once the batch is being cancelled or has expired
+                if time.time() >= expires_at:
+                    return
+                if await asyncio.to_thread(self.store.status, batch_id) != "in_progress":
+                    return
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    # another worker took the last item while the status was read
+                    return
+                await self._run_one(batch_id, item, api_bearer_token)
+
+        await asyncio.gather(*[worker() for _ in range(min(self.concurrency, max(queue.qsize(), 1)))])
+        await asyncio.to_thread(self.store.finalize, batch_id)
+
+    async def _run_one(self, batch_id: str, item: Dict[str, Any], api_bearer_token: str) -> None:
+        attempts = item["attempts"]
+        while True:
+            attempts += 1
+            await asyncio.to_thread(self.store.record_attempt, batch_id, item["idx"])
+            try:
+                response = await self.execute(item["body"], api_bearer_token)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if _retryable(e) and attempts < self.max_attempts:
+                    # exponential backoff, or longer if the provider sent Retry-After
+                    delay = min(self.retry_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+                    await asyncio.sleep(max(delay, retry_after_of(e) or 0.0))
+                    continue
+                await asyncio.to_thread(self.store.record_result, batch_id, item["idx"], error={
+                    "code": type(e).__name__, "message": str(e)})
+                return
+            await asyncio.to_thread(self.store.record_result, batch_id, item["idx"], response=response)
+            return
@@ -0,0 +1,5 @@
+"""
+Benchmarks for UniInfer.
+
+Run them as modules, e.g. ``python -m uniinfer.benchmarks.import_time``.
+"""
@@ -0,0 +1,90 @@
+"""
+Import-time benchmark for UniInfer.
+
+Measures how long ``import <module>`` takes in fresh interpreters and which
+heavy modules it pulls in, and fails when the median exceeds a budget::
+
+    python -m uniinfer.benchmarks.import_time --budget-ms 150
+    python -m uniinfer.benchmarks.import_time --module uniinfer.uniioai --json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+DEFAULT_MODULE = "uniinfer"
+DEFAULT_RUNS = 5
+DEFAULT_BUDGET_MS = 150.0
+# Modules that must not be loaded by a bare ``import uniinfer``
+HEAVY_MODULES = [
+    "requests", "httpx", "credgoo", "dotenv", "openai", "google.genai",
+    "cohere", "groq", "ai21", "huggingface_hub", "numpy", "uniinfer.providers.openai",
+]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+
+def measure_import(module: str = DEFAULT_MODULE, runs: int = DEFAULT_RUNS) -> Dict[str, Any]:
+    """
+    Import a module in fresh interpreters and collect timings.
+
+    Args:
+        module (str): The module to import.
+        runs (int): Number of fresh interpreters to start.
+
+    Returns:
+        Dict[str, Any]: Median/min/max milliseconds and the heavy modules loaded.
+    """
+    timings: List[float] = []
+    heavy: List[str] = []
+    probe = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", probe], check=True, capture_output=True, text=True
+        ).stdout.strip().splitlines()[-1]
+        elapsed, heavy = json.loads(output)
+        timings.append(elapsed * 1000)
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+        "heavy_modules": heavy,
+    }
+
+
+def main() -> int:
+    """Run the benchmark from the command line; exit 1 if over budget."""
+    parser = argparse.ArgumentParser(description="Measure UniInfer import time")
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="Module to import")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Fresh interpreters to start")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Fail if the median import time exceeds this budget")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    result = measure_import(args.module, args.runs)
+    result["budget_ms"] = args.budget_ms
+    result["within_budget"] = result["median_ms"] <= args.budget_ms
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"import {result['module']}: median {result['median_ms']:.1f} ms "
+              f"(min {result['min_ms']:.1f}, max {result['max_ms']:.1f}, {result['runs']} runs), "
+              f"budget {args.budget_ms:.0f} ms")
+        if result["heavy_modules"]:
+            print(f"heavy modules loaded: {', '.join(result['heavy_modules'])}")
+    return 0 if result["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
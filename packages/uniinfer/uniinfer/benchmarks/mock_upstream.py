@@ -0,0 +1,152 @@
+"""
+Mock OpenAI-compatible upstream for load tests.
+
+Serves ``/v1/chat/completions`` (streaming and non-streaming),
+``/v1/embeddings`` and ``/v1/models`` with a configurable time to first
+token, token rate and injected errors, so the proxy can be measured without
+calling (or paying for) a real provider::
+
+    python -m uniinfer.benchmarks.mock_upstream --port 9100 --latency 0.2 --token-rate 50
+
+Point the ``openai`` provider at it with ``base_url=http://127.0.0.1:9100/v1``.
+Requires the ``api`` extra (FastAPI and uvicorn).
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+
+DEFAULT_PORT = 9100
+DEFAULT_LATENCY = 0.1
+DEFAULT_TOKENS = 50
+DEFAULT_TOKEN_RATE = 100.0
+
+
+def create_app(
+    latency: float = DEFAULT_LATENCY,
+    tokens: int = DEFAULT_TOKENS,
+    token_rate: float = DEFAULT_TOKEN_RATE,
+    error_rate: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    seed: int = None,
+):
+    """
+    Build the mock upstream application.
+
+    Args:
+        latency (float): Seconds before the first token (or the whole response).
+        tokens (int): Tokens per completion.
+        token_rate (float): Tokens per second after the first; 0 sends them at once.
+        error_rate (float): Fraction of requests answered with HTTP 500.
+        rate_limit_rate (float): Fraction of requests answered with HTTP 429.
+        seed (int): Seed for the error injection.
+
+    Returns:
+        FastAPI: The application.
+    """
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    app = FastAPI(title="uniinfer mock upstream")
+    rng = random.Random(seed)
+    interval = 1.0 / token_rate if token_rate > 0 else 0.0
+
+    def injected_error():
+        roll = rng.random()
+        if roll < rate_limit_rate:
+            return JSONResponse(
+                {"error": {"message": "mock rate limit", "type": "rate_limit_error"}},
+                status_code=429, headers={"Retry-After": "1"})
+        if roll < rate_limit_rate + error_rate:
+            return JSONResponse(
+                {"error": {"message": "mock server error", "type": "server_error"}}, status_code=500)
+        return None
+
+    async def stream(model: str):
+        completion_id = f"chatcmpl-{uuid.uuid4()}"
+        created = int(time.time())
+        await asyncio.sleep(latency)
+        for i in range(tokens):
+            if i and interval:
+                await asyncio.sleep(interval)
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                     "model": model,
+                     "choices": [{"index": 0, "delta": {"content": f" tok{i}"}, "finish_reason": None}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+        final = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                 "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        error = injected_error()
+        if error is not None:
+            return error
+        model = body.get("model", "mock-model")
+        if body.get("stream"):
+            return StreamingResponse(stream(model), media_type="text/event-stream")
+        await asyncio.sleep(latency + interval * max(tokens - 1, 0))
+        return {
+            "id": f"chatcmpl-{uuid.uuid4()}", "object": "chat.completion", "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant",
+                                     "content": "".join(f" tok{i}" for i in range(tokens))}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": tokens, "total_tokens": tokens + 1},
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        error = injected_error()
+        if error is not None:
+            return error
+        texts = body.get("input") or []
+        if isinstance(texts, str):
+            texts = [texts]
+        await asyncio.sleep(latency)
+        return {
+            "object": "list", "model": body.get("model", "mock-embedding"),
+            "data": [{"object": "embedding", "index": i, "embedding": [float(len(text)), 1.0, 0.5]}
+                     for i, text in enumerate(texts)],
+            "usage": {"prompt_tokens": len(texts), "total_tokens": len(texts)},
+        }
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "mock-model", "object": "model"}]}
+
+    return app
+
+
+def main() -> int:
+    """Run the mock upstream from the command line."""
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible upstream for load tests")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                        help="Seconds before the first token")
+    parser.add_argument("--tokens", type=int, default=DEFAULT_TOKENS, help="Tokens per completion")
+    parser.add_argument("--token-rate", type=float, default=DEFAULT_TOKEN_RATE,
+                        help="Tokens per second (0 = all at once)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of HTTP 500 answers")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fraction of HTTP 429 answers")
+    parser.add_argument("--seed", type=int, help="Seed for error injection")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(args.latency, args.tokens, args.token_rate, args.error_rate,
+                     args.rate_limit_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
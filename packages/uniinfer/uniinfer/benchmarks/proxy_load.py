@@ -0,0 +1,283 @@
+"""
+Load test for the UniIOAI proxy against a mock upstream.
+
+Starts the mock upstream (``uniinfer.benchmarks.mock_upstream``) and the proxy
+as subprocesses, then drives ``/v1/chat/completions`` with concurrent
+streaming and non-streaming clients. The requests use the ``openai`` provider
+with ``base_url`` pointing at the mock, so no real provider is called.
+Reports latency and time-to-first-token percentiles and requests per
+second::
+
+    python -m uniinfer.benchmarks.proxy_load --concurrency 32 --requests 2000
+    python -m uniinfer.benchmarks.proxy_load --stream-ratio 1 --json --output load.json
+    python -m uniinfer.benchmarks.proxy_load --proxy-url http://127.0.0.1:8123
+
+Requires the ``api`` extra (FastAPI, uvicorn and httpx).
+"""
+import argparse
+import asyncio
+import json
+import math
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import mock_upstream
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_REQUESTS = 500
+DEFAULT_STREAM_RATIO = 0.5
+DEFAULT_MODEL = "openai@mock-model"
+STARTUP_TIMEOUT = 30.0
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Return the q-th percentile (0-100) by nearest rank, or None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100.0 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _distribution(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": sum(values) / len(values) if values else None,
+        "max": max(values) if values else None,
+    }
+
+
+def summarize(samples: List[Dict[str, Any]], wall_seconds: float) -> Dict[str, Any]:
+    """
+    Aggregate per-request samples.
+
+    Args:
+        samples (List[Dict[str, Any]]): One dict per request with ``stream``,
+            ``status``, ``ok``, ``latency`` and (streams) ``ttft``.
+        wall_seconds (float): Duration of the whole run.
+
+    Returns:
+        Dict[str, Any]: Totals, req/s and latency/TTFT distributions, overall
+        and split into streaming and non-streaming requests.
+    """
+    def group(items):
+        ok = [s for s in items if s["ok"]]
+        status_counts: Dict[str, int] = {}
+        for sample in items:
+            status_counts[str(sample["status"])] = status_counts.get(str(sample["status"]), 0) + 1
+        return {
+            "requests": len(items),
+            "errors": len(items) - len(ok),
+            "status_counts": status_counts,
+            "req_per_s": len(ok) / wall_seconds if wall_seconds else 0.0,
+            "latency": _distribution([s["latency"] for s in ok]),
+            "ttft": _distribution([s["ttft"] for s in ok if s.get("ttft") is not None]),
+        }
+
+    result = group(samples)
+    result["wall_seconds"] = wall_seconds
+    result["stream"] = group([s for s in samples if s["stream"]])
+    result["non_stream"] = group([s for s in samples if not s["stream"]])
+    return result
+
+
+async def _one_request(client, proxy_url: str, body: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    sample = {"stream": bool(body.get("stream")), "ttft": None}
+    try:
+        if sample["stream"]:
+            async with client.stream("POST", f"{proxy_url}/v1/chat/completions",
+                                     json=body, headers=headers) as response:
+                sample["status"] = response.status_code
+                failed = response.status_code != 200
+                async for line in response.aiter_lines():
+                    if sample["ttft"] is None and '"content":"' in line:
+                        sample["ttft"] = time.perf_counter() - started
+                    elif line.startswith('data: {"error"'):
+                        failed = True
+                sample["ok"] = not failed
+        else:
+            response = await client.post(f"{proxy_url}/v1/chat/completions", json=body, headers=headers)
+            sample["status"] = response.status_code
+            sample["ok"] = response.status_code == 200
+    except Exception as e:
+        sample["status"] = type(e).__name__
+        sample["ok"] = False
+    sample["latency"] = time.perf_counter() - started
+    return sample
+
+
+async def run_load(
+    proxy_url: str,
+    upstream_url: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    requests: int = DEFAULT_REQUESTS,
+    stream_ratio: float = DEFAULT_STREAM_RATIO,
+    model: str = DEFAULT_MODEL,
+    api_key: str = "sk-mock",
+) -> Dict[str, Any]:
+    """
+    Send requests to the proxy from concurrent clients and summarize them.
+
+    Args:
+        proxy_url (str): Base URL of the proxy.
+        upstream_url (str): OpenAI-compatible base URL the proxy should call.
+        concurrency (int): Number of clients sending requests back to back.
+        requests (int): Total requests.
+        stream_ratio (float): Fraction of streaming requests (spread evenly).
+        model (str): provider@model to request.
+        api_key (str): Bearer token; a plain key is passed through to the provider.
+
+    Returns:
+        Dict[str, Any]: See summarize().
+    """
+    import httpx
+
+    headers = {"Authorization": f"Bearer {api_key}"}
+    samples: List[Dict[str, Any]] = []
+    next_index = 0
+
+    async def client_loop(client):
+        nonlocal next_index
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            # Bresenham-style spread of streaming requests over the run
+            stream = int((index + 1) * stream_ratio) > int(index * stream_ratio)
+            body = {
+                "model": model,
+                "messages": [{"role": "user", "content": f"load test request {index}"}],
+                "stream": stream,
+                "base_url": upstream_url,
+            }
+            samples.append(await _one_request(client, proxy_url, body, headers))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[client_loop(client) for _ in range(concurrency)])
+        wall_seconds = time.perf_counter() - started
+    return summarize(samples, wall_seconds)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, process: subprocess.Popen, timeout: float = STARTUP_TIMEOUT) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server on port {port} exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not start within {timeout} seconds")
+
+
+def _start(args: List[str], port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable] + args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_for_port(port, process)
+    except RuntimeError:
+        process.kill()
+        raise
+    return process
+
+
+def main() -> int:
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(description="Load test the UniIOAI proxy against a mock upstream")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="Total requests")
+    parser.add_argument("--stream-ratio", type=float, default=DEFAULT_STREAM_RATIO,
+                        help="Fraction of streaming requests")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="provider@model to request")
+    parser.add_argument("--latency", type=float, default=mock_upstream.DEFAULT_LATENCY,
+                        help="Mock upstream seconds to first token")
+    parser.add_argument("--tokens", type=int, default=mock_upstream.DEFAULT_TOKENS,
+                        help="Mock upstream tokens per completion")
+    parser.add_argument("--token-rate", type=float, default=mock_upstream.DEFAULT_TOKEN_RATE,
+                        help="Mock upstream tokens per second")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock upstream HTTP 500 fraction")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Mock upstream HTTP 429 fraction")
+    parser.add_argument("--proxy-url", help="Use a running proxy instead of starting one")
+    parser.add_argument("--upstream-url", help="Use a running upstream (OpenAI-compatible base URL)")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    args = parser.parse_args()
+
+    processes = []
+    try:
+        upstream_url = args.upstream_url
+        if upstream_url is None:
+            port = _free_port()
+            processes.append(_start(
+                ["-m", "uniinfer.benchmarks.mock_upstream", "--port", str(port),
+                 "--latency", str(args.latency), "--tokens", str(args.tokens),
+                 "--token-rate", str(args.token_rate), "--error-rate", str(args.error_rate),
+                 "--rate-limit-rate", str(args.rate_limit_rate), "--seed", "0"], port))
+            upstream_url = f"http://127.0.0.1:{port}/v1"
+        proxy_url = args.proxy_url
+        if proxy_url is None:
+            port = _free_port()
+            processes.append(_start(
+                ["-m", "uvicorn", "uniinfer.uniioai_proxy:app", "--port", str(port),
+                 "--log-level", "warning"], port))
+            proxy_url = f"http://127.0.0.1:{port}"
+
+        result = asyncio.run(run_load(
+            proxy_url.rstrip("/"), upstream_url, args.concurrency, args.requests,
+            args.stream_ratio, args.model))
+    finally:
+        for process in processes:
+            process.terminate()
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    result["config"] = {
+        "concurrency": args.concurrency, "requests": args.requests,
+        "stream_ratio": args.stream_ratio, "model": args.model, "latency": args.latency,
+        "tokens": args.tokens, "token_rate": args.token_rate, "error_rate": args.error_rate,
+        "rate_limit_rate": args.rate_limit_rate,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        def ms(value):
+            return f"{value * 1000:8.1f} ms" if value is not None else "       -   "
+
+        print(f"{result['requests']} requests, {args.concurrency} clients, "
+              f"{result['errors']} errors, {result['req_per_s']:.1f} req/s "
+              f"in {result['wall_seconds']:.1f} s")
+        for name in ("non_stream", "stream"):
+            group = result[name]
+            if not group["requests"]:
+                continue
+            line = (f"  {name:<10} latency p50 {ms(group['latency']['p50'])}  "
+                    f"p95 {ms(group['latency']['p95'])}  p99 {ms(group['latency']['p99'])}")
+            if name == "stream":
+                line += (f"   ttft p50 {ms(group['ttft']['p50'])}  p95 {ms(group['ttft']['p95'])}  "
+                         f"p99 {ms(group['ttft']['p99'])}")
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Stream decoding benchmark for UniInfer.
+
+Replays a recorded (or generated) SSE / NDJSON stream through the shared
+StreamDecoder and through the per-line ``decode()``/``json.loads`` parsing
+providers used before, and reports decoded chunks per second::
+
+    python -m uniinfer.benchmarks.stream_decode
+    python -m uniinfer.benchmarks.stream_decode --format ndjson --json
+    python -m uniinfer.benchmarks.stream_decode --file recorded.sse
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..streaming import HAS_ORJSON, NDJSON, SSE, StreamDecoder
+
+DEFAULT_EVENTS = 20000
+DEFAULT_RUNS = 5
+# Typical size of the byte chunks a socket hands to the client
+DEFAULT_CHUNK_SIZE = 1024
+
+
+def generate_stream(events: int = DEFAULT_EVENTS, format: str = SSE) -> bytes:
+    """
+    Build an OpenAI-style (SSE) or Ollama-style (NDJSON) token stream.
+
+    Args:
+        events (int): Number of content events.
+        format (str): "sse" or "ndjson".
+
+    Returns:
+        bytes: The raw stream body.
+    """
+    lines = []
+    for i in range(events):
+        if format == SSE:
+            payload = {"id": "chatcmpl-bench", "object": "chat.completion.chunk",
+                       "model": "bench-model",
+                       "choices": [{"index": 0, "delta": {"content": f" token{i}"},
+                                    "finish_reason": None}]}
+            lines.append(b"data: " + json.dumps(payload).encode() + b"\n\n")
+        else:
+            payload = {"model": "bench-model", "created_at": "2025-01-01T00:00:00Z",
+                       "message": {"role": "assistant", "content": f" token{i}"},
+                       "done": False}
+            lines.append(json.dumps(payload).encode() + b"\n")
+    if format == SSE:
+        lines.append(b"data: [DONE]\n\n")
+    else:
+        lines.append(b'{"model": "bench-model", "done": true}\n')
+    return b"".join(lines)
+
+
+def split_chunks(body: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[bytes]:
+    """Cut a stream body into fixed-size network chunks, ignoring line boundaries."""
+    return [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+
+def decode_per_line(chunks: Iterable[bytes], format: str = SSE) -> int:
+    """
+    Decode the way providers did before: split lines, decode to str, json.loads.
+
+    Returns:
+        int: Number of decoded events.
+    """
+    count = 0
+    pending = b""
+    for chunk in chunks:
+        lines = (pending + chunk).splitlines(keepends=True)
+        pending = lines.pop() if lines and not lines[-1].endswith(b"\n") else b""
+        for line in lines:
+            line = line.rstrip(b"\r\n")
+            if not line:
+                continue
+            text = line.decode("utf-8")
+            if format == SSE:
+                if text == "data: [DONE]":
+                    return count
+                if text.startswith("data: "):
+                    text = text[6:]
+            try:
+                json.loads(text)
+            except json.JSONDecodeError:
+                continue
+            count += 1
+    return count
+
+
+def decode_incremental(chunks: Iterable[bytes], format: str = SSE) -> int:
+    """
+    Decode with the shared StreamDecoder.
+
+    Returns:
+        int: Number of decoded events.
+    """
+    decoder = StreamDecoder(format)
+    count = 0
+    for chunk in chunks:
+        count += len(decoder.feed(chunk))
+        if decoder.done:
+            return count
+    return count + len(decoder.flush())
+
+
+def _time(decode: Callable[[List[bytes], str], int], chunks: List[bytes], format: str, runs: int) -> Dict[str, Any]:
+    best = None
+    events = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        events = decode(chunks, format)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {"events": events, "seconds": best, "chunks_per_second": events / best if best else 0.0}
+
+
+def run_benchmark(
+    body: Optional[bytes] = None,
+    format: str = SSE,
+    events: int = DEFAULT_EVENTS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    runs: int = DEFAULT_RUNS
+) -> Dict[str, Any]:
+    """
+    Compare per-line parsing with the incremental decoder.
+
+    Args:
+        body (Optional[bytes]): A recorded stream body. Generated when None.
+        format (str): "sse" or "ndjson".
+        events (int): Events to generate when no body is given.
+        chunk_size (int): Size of the replayed network chunks.
+        runs (int): Repetitions; the fastest run is reported.
+
+    Returns:
+        Dict[str, Any]: Throughput of both decoders and the speedup.
+    """
+    if body is None:
+        body = generate_stream(events, format)
+    chunks = split_chunks(body, chunk_size)
+    per_line = _time(decode_per_line, chunks, format, runs)
+    incremental = _time(decode_incremental, chunks, format, runs)
+    return {
+        "format": format,
+        "bytes": len(body),
+        "chunk_size": chunk_size,
+        "orjson": HAS_ORJSON,
+        "per_line": per_line,
+        "incremental": incremental,
+        "speedup": (per_line["seconds"] / incremental["seconds"]) if incremental["seconds"] else 0.0,
+    }
+
+
+def main() -> int:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Measure stream decoding throughput")
+    parser.add_argument("--format", choices=[SSE, NDJSON], default=SSE, help="Stream format")
+    parser.add_argument("--file", help="Replay a recorded stream body instead of a generated one")
+    parser.add_argument("--events", type=int, default=DEFAULT_EVENTS, help="Events to generate")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Bytes per replayed network chunk")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Repetitions (best is reported)")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    body = None
+    if args.file:
+        with open(args.file, "rb") as f:
+            body = f.read()
+    result = run_benchmark(body, args.format, args.events, args.chunk_size, args.runs)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['format']} stream: {result['per_line']['events']} events, "
+              f"{result['bytes']} bytes in {result['chunk_size']}-byte chunks "
+              f"(orjson {'on' if result['orjson'] else 'off'})")
+        for name in ("per_line", "incremental"):
+            print(f"  {name:<12} {result[name]['chunks_per_second']:>12,.0f} chunks/s")
+        print(f"  speedup      {result['speedup']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
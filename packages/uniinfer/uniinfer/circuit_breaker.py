@@ -0,0 +1,194 @@
+"""
+Per-provider circuit breakers for UniInfer strategies.
+
+A breaker starts closed. It opens after ``failure_threshold`` consecutive
+failures, or when the error rate over the last ``window`` calls reaches
+``error_rate_threshold``. While open, calls are short-circuited with
+CircuitOpenError. After ``reset_timeout`` seconds the breaker turns half-open
+and lets a single probe through: success closes it, failure opens it again.
+
+Breakers are shared process-wide by provider name, so every strategy
+instance sees the same provider health.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from .errors import CircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for one provider.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        error_rate_threshold: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            name (str): The provider name.
+            failure_threshold (int): Consecutive failures that open the breaker.
+            error_rate_threshold (float): Error rate over the window that opens the breaker.
+            window (int): Number of recent calls used for the error rate.
+            min_calls (int): Calls needed in the window before the error rate applies.
+            reset_timeout (float): Seconds the breaker stays open before probing.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self._outcomes: deque = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """The current state: "closed", "open" or "half_open"."""
+        with self._lock:
+            if self._state == OPEN and time.time() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go through, claiming the probe when half-open.
+
+        Returns:
+            bool: True if the call may proceed.
+        """
+        with self._lock:
+            now = time.time()
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if now - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = HALF_OPEN
+                self._probe_started = None
+            # Half-open: one probe at a time; a probe that never reports back
+            # (e.g. a cancelled call) is replaced after reset_timeout
+            if self._probe_started is None or now - self._probe_started >= self.reset_timeout:
+                self._probe_started = now
+                return True
+            return False
+
+    def check(self) -> None:
+        """
+        Raise if the breaker does not allow a call.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a probe in flight.
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit for provider '{self.name}' is open")
+
+    def record_success(self) -> None:
+        """Record a successful call, closing a half-open breaker."""
+        with self._lock:
+            self._outcomes.append(True)
+            self._consecutive_failures = 0
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._outcomes.clear()
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the breaker when a threshold is reached."""
+        with self._lock:
+            self._outcomes.append(False)
+            self._consecutive_failures += 1
+            failures = self._outcomes.count(False)
+            if (self._state == HALF_OPEN
+                    or self._consecutive_failures >= self.failure_threshold
+                    or (len(self._outcomes) >= self.min_calls
+                        and failures / len(self._outcomes) >= self.error_rate_threshold)):
+                self._state = OPEN
+                self._opened_at = time.time()
+            self._probe_started = None
+
+    def reset(self) -> None:
+        """Close the breaker and forget its history."""
+        with self._lock:
+            self._state = CLOSED
+            self._outcomes.clear()
+            self._consecutive_failures = 0
+            self._probe_started = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the breaker's state and recent outcomes.
+
+        Returns:
+            Dict[str, Any]: State, consecutive failures and window error rate.
+        """
+        state = self.state
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "error_rate": self._outcomes.count(False) / calls if calls else 0.0,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breaker_settings: Dict[str, Any] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(provider_name: str) -> CircuitBreaker:
+    """
+    Return the process-wide breaker of a provider, creating it on first use.
+
+    Args:
+        provider_name (str): The provider name.
+
+    Returns:
+        CircuitBreaker: The shared breaker.
+    """
+    name = provider_name.lower()
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, **_breaker_settings)
+        return breaker
+
+
+def configure_circuit_breakers(**settings) -> None:
+    """
+    Set the thresholds of breakers created from now on and reset existing ones.
+
+    Args:
+        **settings: CircuitBreaker arguments (failure_threshold, error_rate_threshold,
+            window, min_calls, reset_timeout).
+    """
+    with _breakers_lock:
+        _breaker_settings.clear()
+        _breaker_settings.update(settings)
+        _breakers.clear()
+
+
+def reset_circuit_breakers() -> None:
+    """Close all breakers and forget their history."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    for breaker in breakers:
+        breaker.reset()
@@ -0,0 +1,432 @@
+"""
+Opt-in response cache for chat completions.
+
+Completions are keyed by a hash of (provider, base URL, model, messages,
+temperature, max_tokens, extra kwargs) and stored in two tiers: an in-memory LRU for hot
+entries and a SQLite file for persistence across runs, with TTL expiry and
+size-based eviction. Streaming hits replay the cached content as chunks.
+The async API runs cache lookups and writes in worker threads.
+
+Enable it globally with ``enable_completion_cache()`` or by setting the
+``UNIINFER_COMPLETION_CACHE`` environment variable (``1`` for the default
+location or a path to the SQLite file).
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from .core import ChatCompletionRequest, ChatCompletionResponse, ChatMessage, ChatProvider
+
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.uniinfer/completion_cache.sqlite")
+DEFAULT_MEMORY_SIZE = 256
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL = 7 * 24 * 3600
+# Size of replayed chunks for entries that were stored from non-streaming calls
+REPLAY_CHUNK_CHARS = 16
+
+
+def make_cache_key(
+    provider: str,
+    model: Optional[str],
+    messages: List[Dict[str, str]],
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    extra: Optional[Dict[str, Any]] = None,
+    base_url: Optional[str] = None,
+) -> str:
+    """
+    Build a stable cache key for a completion request.
+
+    Args:
+        base_url (Optional[str]): Host serving the provider, so the same model
+            name on two hosts gets separate entries. Omitted from the key when None.
+
+    Returns:
+        str: Hex sha256 of the canonical JSON encoding of all inputs.
+    """
+    parts = {
+        "provider": provider,
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "extra": extra or {},
+    }
+    if base_url:
+        parts["base_url"] = base_url.rstrip("/")
+    canonical = json.dumps(
+        parts,
+        sort_keys=True,
+        ensure_ascii=False,
+        default=repr,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of completion results.
+
+    Values are plain dicts with ``role``, ``content``, ``model``, ``usage`` and
+    optionally ``chunks`` (the streamed pieces, for faithful replay).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_CACHE_PATH,
+        memory_size: int = DEFAULT_MEMORY_SIZE,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+        ttl: Optional[float] = DEFAULT_TTL,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path (Optional[str]): SQLite file for the persistent tier. None keeps memory only.
+            memory_size (int): Number of entries kept in the in-memory LRU.
+            max_disk_bytes (int): Size budget of the persistent tier; least recently
+                used entries are evicted beyond it.
+            ttl (Optional[float]): Seconds an entry stays valid. None never expires.
+        """
+        self.path = path
+        self.memory_size = memory_size
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed)")
+            self._conn.commit()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def _remember(self, key: str, value: Dict[str, Any], created: float) -> None:
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached completion.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached value, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created = entry
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created FROM completions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if self._expired(row[1], now):
+                        self._conn.execute(
+                            "DELETE FROM completions WHERE key = ?", (key,))
+                    else:
+                        self._conn.execute(
+                            "UPDATE completions SET accessed = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        value = json.loads(row[0])
+                        self._remember(key, value, row[1])
+                        self.hits += 1
+                        return value
+                    self._conn.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a completion in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._conn is None:
+                return
+            encoded = json.dumps(value, ensure_ascii=False)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, size, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries and keep the persistent tier within its size budget."""
+        if self.ttl is not None:
+            self._conn.execute(
+                "DELETE FROM completions WHERE created < ?", (now - self.ttl,))
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM completions ORDER BY accessed ASC").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_disk_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", evicted)
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM completions")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            disk_entries = 0
+            if self._conn is not None:
+                disk_entries = self._conn.execute(
+                    "SELECT COUNT(*) FROM completions").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _provider_base_url(provider: Any) -> Optional[str]:
+    """Return the base_url of a provider, looking through wrapping providers."""
+    seen = set()
+    while provider is not None and id(provider) not in seen:
+        seen.add(id(provider))
+        base_url = getattr(provider, "base_url", None)
+        if base_url:
+            return base_url
+        provider = getattr(provider, "provider", None)
+    return None
+
+
+class CachedProvider(ChatProvider):
+    """
+    ChatProvider wrapper that serves repeated requests from a CompletionCache.
+
+    Misses are forwarded to the wrapped provider and stored; streaming misses
+    are stored only once the stream has been fully consumed.
+    """
+
+    def __init__(
+        self,
+        provider: ChatProvider,
+        cache: CompletionCache,
+        provider_name: Optional[str] = None,
+        base_url: Optional[str] = None,
+    ):
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider (ChatProvider): The provider that serves cache misses.
+            cache (CompletionCache): The cache to consult.
+            provider_name (Optional[str]): Name used in cache keys and responses.
+            base_url (Optional[str]): Host used in cache keys; defaults to the
+                ``base_url`` attribute of the provider or of the provider it
+                wraps (e.g. behind a RateLimitedProvider), if it has one.
+        """
+        super().__init__(provider.api_key)
+        self.provider = provider
+        self.cache = cache
+        self.provider_name = provider_name or type(provider).__name__
+        self.base_url = base_url or _provider_base_url(provider)
+
+    def _key(self, request: ChatCompletionRequest, provider_specific_kwargs: Dict[str, Any]) -> str:
+        return make_cache_key(
+            self.provider_name,
+            request.model,
+            [msg.to_dict() for msg in request.messages],
+            request.temperature,
+            request.max_tokens,
+            provider_specific_kwargs,
+            base_url=self.base_url,
+        )
+
+    def _response(self, value: Dict[str, Any], content: str, request: ChatCompletionRequest) -> ChatCompletionResponse:
+        return ChatCompletionResponse(
+            message=ChatMessage(role=value.get("role", "assistant"), content=content),
+            provider=self.provider_name,
+            model=value.get("model") or request.model,
+            usage=value.get("usage", {}),
+            raw_response={"cached": True},
+        )
+
+    def _replay_chunks(self, value: Dict[str, Any]) -> List[str]:
+        chunks = value.get("chunks")
+        if chunks:
+            return chunks
+        content = value.get("content", "")
+        return [content[i:i + REPLAY_CHUNK_CHARS]
+                for i in range(0, len(content), REPLAY_CHUNK_CHARS)]
+
+    def _store(self, key: str, response: ChatCompletionResponse, chunks: Optional[List[str]] = None) -> None:
+        content = response.message.content if response.message else None
+        if not content:
+            return
+        value = {
+            "role": response.message.role,
+            "content": content,
+            "model": response.model,
+            "usage": response.usage or {},
+        }
+        if chunks:
+            value["chunks"] = chunks
+        self.cache.set(key, value)
+
+    def complete(self, request: ChatCompletionRequest, **provider_specific_kwargs) -> ChatCompletionResponse:
+        """Return a cached completion or forward to the wrapped provider."""
+        key = self._key(request, provider_specific_kwargs)
+        value = self.cache.get(key)
+        if value is not None:
+            return self._response(value, value["content"], request)
+        response = self.provider.complete(request, **provider_specific_kwargs)
+        self._store(key, response)
+        return response
+
+    def stream_complete(self, request: ChatCompletionRequest, **provider_specific_kwargs) -> Iterator[ChatCompletionResponse]:
+        """Replay a cached completion as chunks or stream from the wrapped provider."""
+        key = self._key(request, provider_specific_kwargs)
+        value = self.cache.get(key)
+        if value is not None:
+            for chunk in self._replay_chunks(value):
+                yield self._response(value, chunk, request)
+            return
+        chunks = []
+        last = None
+        for last in self.provider.stream_complete(request, **provider_specific_kwargs):
+            if last.message and last.message.content:
+                chunks.append(last.message.content)
+            yield last
+        if last is not None and chunks:
+            self._store(key, ChatCompletionResponse(
+                message=ChatMessage(role="assistant", content="".join(chunks)),
+                provider=self.provider_name,
+                model=last.model,
+                usage=last.usage,
+                raw_response=None,
+            ), chunks)
+
+    async def acomplete(self, request: ChatCompletionRequest, **provider_specific_kwargs) -> ChatCompletionResponse:
+        """Async counterpart of complete."""
+        key = self._key(request, provider_specific_kwargs)
+        value = await asyncio.to_thread(self.cache.get, key)
+        if value is not None:
+            return self._response(value, value["content"], request)
+        response = await self.provider.acomplete(request, **provider_specific_kwargs)
+        await asyncio.to_thread(self._store, key, response)
+        return response
+
+    async def astream_complete(self, request: ChatCompletionRequest, **provider_specific_kwargs) -> AsyncIterator[ChatCompletionResponse]:
+        """Async counterpart of stream_complete."""
+        key = self._key(request, provider_specific_kwargs)
+        value = await asyncio.to_thread(self.cache.get, key)
+        if value is not None:
+            for chunk in self._replay_chunks(value):
+                yield self._response(value, chunk, request)
+            return
+        chunks = []
+        last = None
+        async for last in self.provider.astream_complete(request, **provider_specific_kwargs):
+            if last.message and last.message.content:
+                chunks.append(last.message.content)
+            yield last
+        if last is not None and chunks:
+            await asyncio.to_thread(self._store, key, ChatCompletionResponse(
+                message=ChatMessage(role="assistant", content="".join(chunks)),
+                provider=self.provider_name,
+                model=last.model,
+                usage=last.usage,
+                raw_response=None,
+            ), chunks)
+
+
+_completion_cache: Optional[CompletionCache] = None
+_completion_cache_lock = threading.Lock()
+_env_checked = False
+
+
+def enable_completion_cache(**kwargs) -> CompletionCache:
+    """
+    Enable the process-wide completion cache.
+
+    Args:
+        **kwargs: Arguments for CompletionCache (path, memory_size, max_disk_bytes, ttl).
+
+    Returns:
+        CompletionCache: The active cache.
+    """
+    global _completion_cache
+    with _completion_cache_lock:
+        if _completion_cache is not None:
+            _completion_cache.close()
+        _completion_cache = CompletionCache(**kwargs)
+        return _completion_cache
+
+
+def disable_completion_cache() -> None:
+    """Disable the process-wide completion cache."""
+    global _completion_cache
+    with _completion_cache_lock:
+        if _completion_cache is not None:
+            _completion_cache.close()
+        _completion_cache = None
+
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    """
+    Return the process-wide completion cache, or None if caching is off.
+
+    On first call the ``UNIINFER_COMPLETION_CACHE`` environment variable is
+    honoured: ``1``/``true`` enables the default location, any other value is
+    used as the SQLite path.
+    """
+    global _env_checked
+    if not _env_checked:
+        _env_checked = True
+        setting = os.getenv("UNIINFER_COMPLETION_CACHE", "").strip()
+        if setting and setting.lower() not in ("0", "false", "no", "off") and _completion_cache is None:
+            if setting.lower() in ("1", "true", "yes", "on"):
+                enable_completion_cache()
+            else:
+                enable_completion_cache(path=os.path.expanduser(setting))
+    return _completion_cache
@@ -1,7 +1,24 @@
 """
 Core classes for the UniInfer package.
 """
-from typing import List, Dict, Any, Iterator, Optional
+import asyncio
+import functools
+import threading
+from importlib.util import find_spec
+from typing import List, Dict, Any, Iterator, AsyncIterator, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .transport import HTTPTransport
+
+# Embedding matrices use numpy when it is installed (imported on first use)
+HAS_NUMPY = find_spec("numpy") is not None
+
+
+def _shared_transport() -> "HTTPTransport":
+    """Return the transport owned by ProviderFactory."""
+    # Imported lazily: the factory module depends on this one.
+    from .factory import ProviderFactory
+    return ProviderFactory.get_transport()
 
 
 class ChatMessage:
@@ -13,6 +30,9 @@ class ChatMessage:
         content (str): The content of the message.
     """
 
+    # Streams create one instance per chunk; slots keep them small and fast
+    __slots__ = ("role", "content")
+
     def __init__(self, role: str, content: str):
         self.role = role
         self.content = content
@@ -64,6 +84,8 @@ class ChatCompletionResponse:
         raw_response (Any): The raw response from the provider.
     """
 
+    __slots__ = ("message", "provider", "model", "usage", "raw_response")
+
     def __init__(
         self,
         message: ChatMessage,
@@ -94,10 +116,25 @@ class ChatProvider:
         Args:
             api_key (Optional[str]): The API key for authentication.
             **kwargs: Additional provider-specific configuration parameters.
+                ``transport`` overrides the shared HTTPTransport.
         """
         self.api_key = api_key
+        self._transport = kwargs.get("transport")
         # Additional provider-specific configuration can be handled by subclasses
 
+    @property
+    def transport(self) -> "HTTPTransport":
+        """
+        The HTTP transport used for API calls.
+
+        Defaults to the pooled transport shared through ProviderFactory.
+        """
+        return getattr(self, "_transport", None) or _shared_transport()
+
+    @transport.setter
+    def transport(self, transport: "HTTPTransport") -> None:
+        self._transport = transport
+
     @classmethod
     def list_models(cls, api_key: Optional[str] = None, **kwargs) -> List[str]:
         """
@@ -148,6 +185,108 @@ class ChatProvider:
         raise NotImplementedError(
             "Providers must implement the stream_complete method")
 
+    async def acomplete(
+        self,
+        request: ChatCompletionRequest,
+        **provider_specific_kwargs
+    ) -> ChatCompletionResponse:
+        """
+        Make a chat completion request without blocking the event loop.
+
+        Providers with a native async client override this. The default runs
+        the synchronous complete method in the default executor.
+
+        Args:
+            request (ChatCompletionRequest): The request to make.
+            **provider_specific_kwargs: Additional provider-specific parameters.
+
+        Returns:
+            ChatCompletionResponse: The completion response.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.complete, request, **provider_specific_kwargs))
+
+    async def astream_complete(
+        self,
+        request: ChatCompletionRequest,
+        **provider_specific_kwargs
+    ) -> AsyncIterator[ChatCompletionResponse]:
+        """
+        Stream a chat completion response without blocking the event loop.
+
+        Providers with a native async client override this. The default pulls
+        chunks from the synchronous stream_complete iterator in the default
+        executor.
+
+        Args:
+            request (ChatCompletionRequest): The request to make.
+            **provider_specific_kwargs: Additional provider-specific parameters.
+
+        Returns:
+            AsyncIterator[ChatCompletionResponse]: An async iterator of response chunks.
+        """
+        loop = asyncio.get_running_loop()
+        pump = _SyncStreamPump(self.stream_complete(
+            request, **provider_specific_kwargs))
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, pump.next)
+                if chunk is _SyncStreamPump.DONE:
+                    break
+                yield chunk
+        finally:
+            # Runs when the consumer stops early (client gone, task cancelled):
+            # closing the generator releases the provider's HTTP response
+            pump.close()
+
+
+class _SyncStreamPump:
+    """
+    Pulls chunks from a synchronous stream on executor threads and closes it
+    once the consumer is gone.
+
+    A generator cannot be closed while a worker thread is inside next(), so
+    close() during a pending read only marks the pump; the worker closes the
+    stream itself as soon as that read returns.
+    """
+
+    DONE = object()
+
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+        self._lock = threading.Lock()
+        self._reading = False
+        self._closed = False
+
+    def next(self):
+        with self._lock:
+            if self._closed:
+                return self.DONE
+            self._reading = True
+        try:
+            return next(self._iterator, self.DONE)
+        finally:
+            with self._lock:
+                self._reading = False
+                close_now = self._closed
+            if close_now:
+                self._close_iterator()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            reading = self._reading
+        if not reading:
+            self._close_iterator()
+
+    def _close_iterator(self) -> None:
+        close = getattr(self._iterator, "close", None)
+        if close is not None:
+            close()
+
 
 class EmbeddingRequest:
     """
@@ -176,13 +315,65 @@ class EmbeddingRequest:
         self.user = user
 
 
+def embedding_matrix(vectors: Any) -> Any:
+    """
+    Pack embedding vectors into a float32 matrix.
+
+    Args:
+        vectors: A sequence of equally long vectors, or an existing matrix.
+
+    Returns:
+        A ``numpy.ndarray`` of shape (n, dimensions) and dtype float32 when numpy
+        is installed, otherwise a list of ``array('f')`` rows.
+    """
+    if HAS_NUMPY:
+        import numpy as np  # deferred: keeps `import uniinfer` fast
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(matrix), -1) if matrix.size else matrix.reshape(0, 0)
+        return matrix
+    from array import array
+    return [row if isinstance(row, array) and row.typecode == "f" else array("f", row)
+            for row in vectors]
+
+
+def pack_embedding(vector: Any) -> bytes:
+    """
+    Serialize one embedding as packed little-endian float32 values.
+
+    This is the layout of OpenAI's ``encoding_format="base64"`` embeddings.
+
+    Args:
+        vector: A numpy row, ``array('f')`` row or sequence of floats.
+
+    Returns:
+        bytes: 4 bytes per dimension.
+    """
+    if HAS_NUMPY:
+        import numpy as np
+
+        return np.asarray(vector, dtype="<f4").tobytes()
+    import sys
+    from array import array
+    values = array("f", vector)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
 class EmbeddingResponse:
     """
     A response from an embedding request.
 
+    Vectors are held as one float32 matrix (``embeddings``) rather than as
+    Python float lists; ``data`` builds the OpenAI-style list of dicts on
+    first access for existing callers.
+
     Attributes:
         object (str): The object type, always "list".
-        data (List[Dict]): The embedding data.
+        embeddings: float32 matrix with one row per input (see embedding_matrix).
+        data (List[Dict]): The embedding data as {"object", "embedding", "index"} dicts.
         model (str): The model used for embedding.
         usage (Dict): Token usage information.
         provider (str): The provider that generated the response.
@@ -192,18 +383,39 @@ class EmbeddingResponse:
     def __init__(
         self,
         object: str,
-        data: List[Dict],
-        model: str,
-        usage: Dict,
-        provider: str,
-        raw_response: Any
+        data: Optional[List[Dict]] = None,
+        model: Optional[str] = None,
+        usage: Optional[Dict] = None,
+        provider: Optional[str] = None,
+        raw_response: Any = None,
+        embeddings: Any = None
     ):
         self.object = object
-        self.data = data
         self.model = model
         self.usage = usage
         self.provider = provider
         self.raw_response = raw_response
+        self._data: Optional[List[Dict]] = None
+        if embeddings is not None:
+            self.embeddings = embedding_matrix(embeddings)
+        else:
+            self.data = data or []
+
+    @property
+    def data(self) -> List[Dict]:
+        """The embeddings as OpenAI-style dicts with Python float lists."""
+        if self._data is None:
+            self._data = [
+                {"object": "embedding", "embedding": row.tolist(), "index": i}
+                for i, row in enumerate(self.embeddings)
+            ]
+        return self._data
+
+    @data.setter
+    def data(self, data: List[Dict]) -> None:
+        ordered = sorted(data, key=lambda item: item.get("index", 0))
+        self.embeddings = embedding_matrix([item["embedding"] for item in ordered])
+        self._data = None
 
 
 class EmbeddingProvider:
@@ -214,6 +426,9 @@ class EmbeddingProvider:
     the embed method.
     """
 
+    # Maximum inputs per API request; None means no known limit
+    MAX_BATCH_SIZE: Optional[int] = None
+
     def __init__(self, api_key: Optional[str] = None, **kwargs):
         """
         Initialize the provider with an API key and optional configuration.
@@ -221,10 +436,25 @@ class EmbeddingProvider:
         Args:
             api_key (Optional[str]): The API key for authentication.
             **kwargs: Additional provider-specific configuration parameters.
+                ``transport`` overrides the shared HTTPTransport.
         """
         self.api_key = api_key
+        self._transport = kwargs.get("transport")
         # Additional provider-specific configuration can be handled by subclasses
 
+    @property
+    def transport(self) -> "HTTPTransport":
+        """
+        The HTTP transport used for API calls.
+
+        Defaults to the pooled transport shared through ProviderFactory.
+        """
+        return getattr(self, "_transport", None) or _shared_transport()
+
+    @transport.setter
+    def transport(self, transport: "HTTPTransport") -> None:
+        self._transport = transport
+
     @classmethod
     def list_models(cls, **kwargs) -> List[str]:
         """
@@ -256,3 +486,25 @@ class EmbeddingProvider:
         """
         raise NotImplementedError(
             "Embedding providers must implement the embed method")
+
+    async def aembed(
+        self,
+        request: EmbeddingRequest,
+        **provider_specific_kwargs
+    ) -> EmbeddingResponse:
+        """
+        Make an embedding request without blocking the event loop.
+
+        Providers with a native async client override this. The default runs
+        the synchronous embed method in the default executor.
+
+        Args:
+            request (EmbeddingRequest): The request to make.
+            **provider_specific_kwargs: Additional provider-specific parameters.
+
+        Returns:
+            EmbeddingResponse: The embedding response.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.embed, request, **provider_specific_kwargs))
@@ -0,0 +1,154 @@
+"""
+In-memory cache of resolved provider API keys.
+
+Resolving a credgoo token reads and decrypts local files and may call the
+credgoo service. ``CredentialCache`` keeps the resolved key per (token,
+provider) for ``ttl`` seconds so only the first request of a token pays for
+it. Tokens are stored as sha256 hashes; keys never leave process memory.
+``aresolve`` is the event-loop variant: a miss runs the resolver in a worker
+thread, and concurrent misses for one token and provider share that call.
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+DEFAULT_TTL = 900.0
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def _token_hash(api_bearer_token: Optional[str]) -> str:
+    return hashlib.sha256((api_bearer_token or "").encode("utf-8")).hexdigest()
+
+
+class CredentialCache:
+    """
+    Bounded LRU of provider API keys keyed by token hash and provider, with TTL.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl (float): Seconds a resolved key is reused. 0 disables caching.
+            max_entries (int): Most (token, provider) pairs kept; the least
+                recently used are dropped first.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # (token hash, provider) -> (expiry, api key)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # (token hash, provider) -> resolver call in flight, for aresolve
+        self._pending: Dict[Tuple[str, str], "asyncio.Future"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(
+        self,
+        api_bearer_token: Optional[str],
+        provider_name: str,
+        resolver: Callable[[Optional[str], str], Optional[str]],
+    ) -> Optional[str]:
+        """
+        Return the provider key for a token, calling resolver on a miss.
+
+        Args:
+            api_bearer_token (Optional[str]): The bearer token of the request.
+            provider_name (str): The provider the key is for.
+            resolver (Callable): ``resolver(api_bearer_token, provider_name)``,
+                e.g. ``get_provider_api_key``. Its errors are not cached.
+
+        Returns:
+            Optional[str]: The provider API key.
+        """
+        entry_key = (_token_hash(api_bearer_token), provider_name)
+        found, api_key = self._lookup(entry_key)
+        if found:
+            return api_key
+        api_key = resolver(api_bearer_token, provider_name)
+        self._store(entry_key, api_key)
+        return api_key
+
+    async def aresolve(
+        self,
+        api_bearer_token: Optional[str],
+        provider_name: str,
+        resolver: Callable[[Optional[str], str], Optional[str]],
+    ) -> Optional[str]:
+        """
+        Async counterpart of resolve that keeps the resolver off the event loop.
+
+        A miss runs ``resolver`` in a worker thread; callers that miss on the
+        same token and provider while it runs await the same call.
+
+        Returns:
+            Optional[str]: The provider API key.
+        """
+        entry_key = (_token_hash(api_bearer_token), provider_name)
+        found, api_key = self._lookup(entry_key)
+        if found:
+            return api_key
+        with self._lock:
+            pending = self._pending.get(entry_key)
+            if pending is None:
+                pending = asyncio.ensure_future(
+                    asyncio.to_thread(resolver, api_bearer_token, provider_name))
+                self._pending[entry_key] = pending
+                pending.add_done_callback(lambda done: self._settle(entry_key, done))
+        # a cancelled caller must not cancel the lookup the others wait for
+        return await asyncio.shield(pending)
+
+    def _lookup(self, entry_key: Tuple[str, str]) -> Tuple[bool, Optional[str]]:
+        """Return (True, key) for a fresh entry, counting the hit or miss."""
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def _store(self, entry_key: Tuple[str, str], api_key: Optional[str]) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[entry_key] = (time.monotonic() + self.ttl, api_key)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _settle(self, entry_key: Tuple[str, str], done: "asyncio.Future") -> None:
+        # store before dropping the pending call, so no caller sees neither
+        if not done.cancelled() and done.exception() is None:
+            self._store(entry_key, done.result())
+        with self._lock:
+            if self._pending.get(entry_key) is done:
+                del self._pending[entry_key]
+
+    def flush(self, api_bearer_token: Optional[str] = None) -> int:
+        """
+        Drop cached keys of one token, or of all tokens.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        with self._lock:
+            if api_bearer_token is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            token_hash = _token_hash(api_bearer_token)
+            stale = [key for key in self._entries if key[0] == token_hash]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the number of cached entries."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -0,0 +1,187 @@
+"""
+Automatic batching and deduplication for embedding requests.
+
+``BatchingEmbeddingProvider`` wraps an EmbeddingProvider. Identical input
+strings are embedded once, the unique strings are split into batches of at
+most ``max_batch_size`` (the provider's ``MAX_BATCH_SIZE`` by default) and the
+batches are sent concurrently. The result lists one embedding per original
+input, in input order, with usage summed over the batches.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .core import EmbeddingProvider, EmbeddingRequest, EmbeddingResponse
+from .errors import ProviderError
+
+# Batches in flight per request
+DEFAULT_CONCURRENCY = 4
+
+
+def plan_batches(texts: List[str], max_batch_size: Optional[int]) -> Tuple[List[List[str]], List[int]]:
+    """
+    Deduplicate texts and split the unique ones into batches.
+
+    Args:
+        texts (List[str]): The caller's inputs.
+        max_batch_size (Optional[int]): Maximum inputs per batch. None means one batch.
+
+    Returns:
+        Tuple[List[List[str]], List[int]]: The batches of unique texts, and for
+        each original input the position of its text among the unique texts.
+    """
+    positions: Dict[str, int] = {}
+    unique: List[str] = []
+    mapping: List[int] = []
+    for text in texts:
+        position = positions.get(text)
+        if position is None:
+            position = positions[text] = len(unique)
+            unique.append(text)
+        mapping.append(position)
+    size = max_batch_size or len(unique) or 1
+    batches = [unique[i:i + size] for i in range(0, len(unique), size)]
+    return batches, mapping
+
+
+def merge_responses(
+    responses: List[EmbeddingResponse],
+    batches: List[List[str]],
+    mapping: List[int],
+    request: EmbeddingRequest
+) -> EmbeddingResponse:
+    """
+    Reassemble batch responses into one response in the caller's input order.
+
+    Args:
+        responses (List[EmbeddingResponse]): Responses of the batches, in batch order.
+        batches (List[List[str]]): The texts sent in each batch (see plan_batches).
+        mapping (List[int]): Unique-text position of each original input (see plan_batches).
+        request (EmbeddingRequest): The caller's request.
+
+    Returns:
+        EmbeddingResponse: One embedding per original input.
+
+    Raises:
+        ProviderError: If a batch came back with a different number of
+            vectors than texts were sent, which would misalign the rows.
+    """
+    rows: List[Any] = []
+    usage: Dict[str, Any] = {}
+    for number, (response, batch) in enumerate(zip(responses, batches), 1):
+        if len(response.embeddings) != len(batch):
+            raise ProviderError(
+                f"Embedding batch {number} returned {len(response.embeddings)} embeddings "
+                f"for {len(batch)} inputs")
+        rows.extend(response.embeddings)
+        for key, value in (response.usage or {}).items():
+            if isinstance(value, (int, float)):
+                usage[key] = usage.get(key, 0) + value
+    first = responses[0] if responses else None
+    return EmbeddingResponse(
+        object="list",
+        embeddings=[rows[position] for position in mapping],
+        model=first.model if first else request.model,
+        usage=usage,
+        provider=first.provider if first else None,
+        raw_response=[response.raw_response for response in responses]
+    )
+
+
+class BatchingEmbeddingProvider(EmbeddingProvider):
+    """
+    EmbeddingProvider wrapper that deduplicates inputs and sends them in concurrent batches.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        max_batch_size: Optional[int] = None,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ):
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider (EmbeddingProvider): The provider to wrap.
+            max_batch_size (Optional[int]): Maximum inputs per request. Defaults to
+                the provider's MAX_BATCH_SIZE; None there means no limit.
+            concurrency (int): Maximum batches in flight at once.
+        """
+        super().__init__(provider.api_key)
+        self.provider = provider
+        self.max_batch_size = max_batch_size or provider.MAX_BATCH_SIZE
+        self.concurrency = max(1, concurrency)
+
+    def _batch_request(self, request: EmbeddingRequest, texts: List[str]) -> EmbeddingRequest:
+        return EmbeddingRequest(
+            input=texts,
+            model=request.model,
+            encoding_format=request.encoding_format,
+            dimensions=request.dimensions,
+            user=request.user
+        )
+
+    def _plan(self, request: EmbeddingRequest) -> Optional[Tuple[List[List[str]], List[int]]]:
+        """Plan the batches, or return None when the request can be sent as is."""
+        if isinstance(request.input, str):
+            return None
+        batches, mapping = plan_batches(list(request.input), self.max_batch_size)
+        if len(batches) <= 1 and len(set(mapping)) == len(mapping):
+            # Nothing to split or deduplicate
+            return None
+        return batches, mapping
+
+    def embed(self, request: EmbeddingRequest, **provider_specific_kwargs) -> EmbeddingResponse:
+        """Embed the request's unique inputs in concurrent batches."""
+        plan = self._plan(request)
+        if plan is None:
+            return self.provider.embed(request, **provider_specific_kwargs)
+
+        batches, mapping = plan
+        embed = functools.partial(self.provider.embed, **provider_specific_kwargs)
+        batch_requests = [self._batch_request(request, texts) for texts in batches]
+        if len(batch_requests) == 1:
+            responses = [embed(batch_requests[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batch_requests))) as executor:
+                responses = list(executor.map(embed, batch_requests))
+        return merge_responses(responses, batches, mapping, request)
+
+    async def aembed(self, request: EmbeddingRequest, **provider_specific_kwargs) -> EmbeddingResponse:
+        """Async counterpart of embed."""
+        plan = self._plan(request)
+        if plan is None:
+            return await self.provider.aembed(request, **provider_specific_kwargs)
+
+        batches, mapping = plan
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(texts: List[str]) -> EmbeddingResponse:
+            async with semaphore:
+                return await self.provider.aembed(
+                    self._batch_request(request, texts), **provider_specific_kwargs)
+
+        responses = await asyncio.gather(*(run(texts) for texts in batches))
+        return merge_responses(list(responses), batches, mapping, request)
+
+
+def with_embedding_batching(
+    provider: EmbeddingProvider,
+    max_batch_size: Optional[int] = None,
+    concurrency: int = DEFAULT_CONCURRENCY
+) -> EmbeddingProvider:
+    """
+    Wrap an embedding provider so large or repetitive inputs are batched.
+
+    Args:
+        provider (EmbeddingProvider): The provider instance.
+        max_batch_size (Optional[int]): Maximum inputs per request; defaults to
+            the provider's MAX_BATCH_SIZE.
+        concurrency (int): Maximum batches in flight at once.
+
+    Returns:
+        EmbeddingProvider: The wrapped provider.
+    """
+    return BatchingEmbeddingProvider(provider, max_batch_size=max_batch_size, concurrency=concurrency)
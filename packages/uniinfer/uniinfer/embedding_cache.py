@@ -0,0 +1,493 @@
+"""
+Persistent content-addressed cache for embeddings.
+
+Vectors are keyed by a hash of (provider, model, dimensions, sha256(text))
+and stored as contiguous little-endian float32 rows in an append-only file
+(``vectors.f32``) that is read through a memory map. A compact binary index
+(``index.bin``, 44 bytes per entry: key digest, byte offset, dimensions)
+locates each row. New vectors are appended to both files under an exclusive
+file lock, so several processes can share one cache directory; ``compact()``
+rewrites the files without superseded rows and evicts the oldest entries
+when the cache outgrows ``max_bytes``.
+
+Enable it globally with ``enable_embedding_cache()`` or by setting the
+``UNIINFER_EMBEDDING_CACHE`` environment variable (``1`` for the default
+location or a path to the cache directory). The async API does its cache
+reads and writes in worker threads, since they wait on file locks and a
+write may compact the whole vector file.
+"""
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from contextlib import contextmanager
+from importlib.util import find_spec
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .core import EmbeddingProvider, EmbeddingRequest, EmbeddingResponse, pack_embedding
+from .errors import ProviderError
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # Windows: the cache is shared by threads of one process only
+    HAS_FCNTL = False
+
+# numpy speeds up decoding; it is imported on first use to keep `import uniinfer` fast
+HAS_NUMPY = find_spec("numpy") is not None
+
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.uniinfer/embedding_cache")
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+DATA_FILE = "vectors.f32"
+INDEX_FILE = "index.bin"
+LOCK_FILE = "lock"
+# Index record: sha256 key digest, byte offset in the data file, dimensions
+INDEX_RECORD = struct.Struct("<32sQI")
+FLOAT_SIZE = 4
+# Fraction of max_bytes kept when an append pushes the cache over its limit
+COMPACT_TARGET = 0.8
+_SWAP_BYTES = sys.byteorder != "little"
+
+
+def make_embedding_key(
+    provider: str,
+    model: Optional[str],
+    dimensions: Optional[int],
+    text: str,
+    extra: Optional[Dict[str, Any]] = None
+) -> bytes:
+    """
+    Build the cache key of one text.
+
+    Args:
+        provider (str): The provider name.
+        model (Optional[str]): The model name.
+        dimensions (Optional[int]): Requested output dimensions.
+        text (str): The embedded text.
+        extra (Optional[Dict[str, Any]]): Provider-specific parameters that affect the vector.
+
+    Returns:
+        bytes: A 32-byte sha256 digest.
+    """
+    scope = json.dumps([provider, model, dimensions, extra or {}], sort_keys=True, default=str)
+    text_digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return hashlib.sha256(scope.encode("utf-8") + b"\0" + text_digest).digest()
+
+
+class EmbeddingCache:
+    """
+    Memory-mapped, append-only embedding store shared across processes.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): Directory holding the data, index and lock files.
+            max_bytes (int): Size of the vector file above which compaction evicts
+                the oldest entries.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._index: Dict[bytes, Tuple[int, int]] = {}
+        self._index_pos = 0
+        self._identity: Tuple[int, int] = (0, 0)
+        self._map: Optional[mmap.mmap] = None
+        self._map_file = None
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = open(os.path.join(path, LOCK_FILE), "a+b")
+        with self._file_lock(exclusive=False):
+            self._load()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """Hold the cross-process lock (shared for reads, exclusive for writes)."""
+        if not HAS_FCNTL:
+            yield
+            return
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _stat_identity(self) -> Tuple[int, int]:
+        """Inode numbers of the current data and index files (0 if missing)."""
+        identity = []
+        for name in (DATA_FILE, INDEX_FILE):
+            try:
+                identity.append(os.stat(self._file(name)).st_ino)
+            except FileNotFoundError:
+                identity.append(0)
+        return identity[0], identity[1]
+
+    def _close_map(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._map_file is not None:
+            self._map_file.close()
+            self._map_file = None
+
+    def _load(self) -> None:
+        """(Re)read the whole index and map the data file. Needs the file lock."""
+        self._close_map()
+        self._index = {}
+        self._index_pos = 0
+        self._identity = self._stat_identity()
+        self._read_index_tail()
+        self._remap()
+
+    def _read_index_tail(self) -> None:
+        """Read index records appended since the last read."""
+        try:
+            with open(self._file(INDEX_FILE), "rb") as f:
+                f.seek(self._index_pos)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # Ignore a trailing partial record left by an interrupted writer
+        usable = len(data) - len(data) % INDEX_RECORD.size
+        for digest, offset, dimensions in INDEX_RECORD.iter_unpack(data[:usable]):
+            self._index[digest] = (offset, dimensions)
+        self._index_pos += usable
+
+    def _remap(self) -> None:
+        """Map the data file, growing the mapping after appends."""
+        try:
+            size = os.path.getsize(self._file(DATA_FILE))
+        except FileNotFoundError:
+            size = 0
+        if size == 0 or (self._map is not None and len(self._map) == size):
+            return
+        self._close_map()
+        self._map_file = open(self._file(DATA_FILE), "rb")
+        self._map = mmap.mmap(self._map_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _refresh(self) -> None:
+        """Pick up entries written by other processes. Needs the file lock."""
+        if self._stat_identity() != self._identity:
+            # Another process compacted the cache
+            self._load()
+            return
+        self._read_index_tail()
+        self._remap()
+
+    def _read(self, offset: int, dimensions: int, np: Any = None) -> Any:
+        end = offset + dimensions * FLOAT_SIZE
+        if self._map is None or end > len(self._map):
+            return None
+        if np is not None:
+            # Copy out of the mapping, which is replaced when the file grows
+            return np.frombuffer(self._map, dtype="<f4", count=dimensions, offset=offset).astype(np.float32)
+        values = array("f", self._map[offset:end])
+        if _SWAP_BYTES:
+            values.byteswap()
+        return values
+
+    def get_many(self, keys: Sequence[bytes]) -> List[Any]:
+        """
+        Look up several keys.
+
+        Args:
+            keys (Sequence[bytes]): Keys from make_embedding_key.
+
+        Returns:
+            List[Any]: The float32 vector of each key (a numpy array, or
+            ``array('f')`` without numpy), or None on a miss.
+        """
+        with self._lock:
+            if any(key not in self._index for key in keys):
+                with self._file_lock(exclusive=False):
+                    self._refresh()
+            np = None
+            if HAS_NUMPY:
+                import numpy as np
+            vectors = []
+            for key in keys:
+                entry = self._index.get(key)
+                vectors.append(self._read(*entry, np=np) if entry is not None else None)
+            found = sum(vector is not None for vector in vectors)
+            self.hits += found
+            self.misses += len(vectors) - found
+            return vectors
+
+    def get(self, key: bytes) -> Any:
+        """Look up one key; see get_many."""
+        return self.get_many([key])[0]
+
+    def put_many(self, items: Sequence[Tuple[bytes, Sequence[float]]]) -> None:
+        """
+        Append vectors to the cache.
+
+        Args:
+            items (Sequence[Tuple[bytes, Sequence[float]]]): (key, vector) pairs.
+        """
+        if not items:
+            return
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            pending = {key: vector for key, vector in items if key not in self._index}
+            if not pending:
+                return
+            with open(self._file(DATA_FILE), "ab") as data_file:
+                offset = data_file.tell()
+                records = []
+                chunks = []
+                for key, vector in pending.items():
+                    packed = pack_embedding(vector)
+                    chunks.append(packed)
+                    records.append(INDEX_RECORD.pack(key, offset, len(packed) // FLOAT_SIZE))
+                    offset += len(packed)
+                data_file.write(b"".join(chunks))
+            # The index is written after the data, so readers never see a record
+            # whose vector is missing
+            with open(self._file(INDEX_FILE), "ab") as index_file:
+                index_file.write(b"".join(records))
+            if 0 in self._identity:
+                # This write created the files
+                self._identity = self._stat_identity()
+            self._read_index_tail()
+            self._remap()
+            if self._map is not None and len(self._map) > self.max_bytes:
+                # Leave headroom so that the next appends do not compact again
+                self._compact(int(self.max_bytes * COMPACT_TARGET))
+
+    def put(self, key: bytes, vector: Sequence[float]) -> None:
+        """Append one vector; see put_many."""
+        self.put_many([(key, vector)])
+
+    def compact(self) -> None:
+        """
+        Rewrite the files without superseded rows, evicting the oldest entries
+        while the live vectors exceed ``max_bytes``.
+        """
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            self._compact(self.max_bytes)
+
+    def _compact(self, limit: int) -> None:
+        """Compact the files, keeping at most ``limit`` bytes of vectors. Needs the exclusive file lock."""
+        # Newest entries first; they survive eviction
+        entries = sorted(self._index.items(), key=lambda item: item[1][0], reverse=True)
+        kept = []
+        total = 0
+        for key, (offset, dimensions) in entries:
+            size = dimensions * FLOAT_SIZE
+            if total + size > limit:
+                break
+            kept.append((key, offset, dimensions))
+            total += size
+        kept.reverse()
+
+        data_tmp = self._file(DATA_FILE + ".tmp")
+        index_tmp = self._file(INDEX_FILE + ".tmp")
+        with open(data_tmp, "wb") as data_file, open(index_tmp, "wb") as index_file:
+            new_offset = 0
+            for key, offset, dimensions in kept:
+                size = dimensions * FLOAT_SIZE
+                data_file.write(self._map[offset:offset + size])
+                index_file.write(INDEX_RECORD.pack(key, new_offset, dimensions))
+                new_offset += size
+        os.replace(data_tmp, self._file(DATA_FILE))
+        os.replace(index_tmp, self._file(INDEX_FILE))
+        self._load()
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock, self._file_lock(exclusive=True):
+            self._close_map()
+            for name in (DATA_FILE, INDEX_FILE):
+                try:
+                    os.remove(self._file(name))
+                except FileNotFoundError:
+                    pass
+            self._load()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters, the entry count and file sizes."""
+        with self._lock:
+            data_bytes = len(self._map) if self._map is not None else 0
+            live_bytes = sum(dimensions for _, dimensions in self._index.values()) * FLOAT_SIZE
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._index),
+                "data_bytes": data_bytes,
+                "live_bytes": live_bytes,
+            }
+
+    def close(self) -> None:
+        """Release the memory map and the lock file."""
+        with self._lock:
+            self._close_map()
+            self._lock_file.close()
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+    """
+    EmbeddingProvider wrapper that embeds only texts missing from an EmbeddingCache.
+    """
+
+    def __init__(self, provider: EmbeddingProvider, cache: EmbeddingCache, provider_name: Optional[str] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider (EmbeddingProvider): The provider that serves cache misses.
+            cache (EmbeddingCache): The cache to consult.
+            provider_name (Optional[str]): Name used in cache keys and responses.
+        """
+        super().__init__(provider.api_key)
+        self.provider = provider
+        self.cache = cache
+        self.provider_name = provider_name or type(provider).__name__
+
+    def _lookup(self, request: EmbeddingRequest, provider_specific_kwargs: Dict[str, Any]):
+        texts = [request.input] if isinstance(request.input, str) else list(request.input)
+        keys = [make_embedding_key(self.provider_name, request.model, request.dimensions,
+                                   text, provider_specific_kwargs) for text in texts]
+        vectors = self.cache.get_many(keys)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        return texts, keys, vectors, missing
+
+    def _miss_request(self, request: EmbeddingRequest, texts: List[str]) -> EmbeddingRequest:
+        return EmbeddingRequest(
+            input=texts,
+            model=request.model,
+            encoding_format=request.encoding_format,
+            dimensions=request.dimensions,
+            user=request.user
+        )
+
+    def _complete(
+        self,
+        request: EmbeddingRequest,
+        keys: List[bytes],
+        vectors: List[Any],
+        missing: List[int],
+        response: Optional[EmbeddingResponse]
+    ) -> EmbeddingResponse:
+        """
+        Fill in the fetched vectors, store them and build the response.
+
+        Raises:
+            ProviderError: If the provider returned a different number of
+                vectors than texts were sent, so no gap is silently cached.
+        """
+        if response is not None:
+            if len(response.embeddings) != len(missing):
+                raise ProviderError(
+                    f"{self.provider_name} returned {len(response.embeddings)} embeddings "
+                    f"for {len(missing)} inputs")
+            for i, vector in zip(missing, response.embeddings):
+                vectors[i] = vector
+            self.cache.put_many([(keys[i], vectors[i]) for i in missing])
+        return EmbeddingResponse(
+            object="list",
+            embeddings=vectors,
+            model=response.model if response is not None else request.model,
+            usage=response.usage if response is not None else {"prompt_tokens": 0, "total_tokens": 0},
+            provider=response.provider if response is not None else self.provider_name,
+            raw_response=response.raw_response if response is not None else {"cached": True}
+        )
+
+    def embed(self, request: EmbeddingRequest, **provider_specific_kwargs) -> EmbeddingResponse:
+        """Serve cached vectors and embed only the missing texts."""
+        texts, keys, vectors, missing = self._lookup(request, provider_specific_kwargs)
+        response = None
+        if missing:
+            response = self.provider.embed(
+                self._miss_request(request, [texts[i] for i in missing]), **provider_specific_kwargs)
+        return self._complete(request, keys, vectors, missing, response)
+
+    async def aembed(self, request: EmbeddingRequest, **provider_specific_kwargs) -> EmbeddingResponse:
+        """Async counterpart of embed; cache I/O runs off the event loop."""
+        texts, keys, vectors, missing = await asyncio.to_thread(
+            self._lookup, request, provider_specific_kwargs)
+        response = None
+        if missing:
+            response = await self.provider.aembed(
+                self._miss_request(request, [texts[i] for i in missing]), **provider_specific_kwargs)
+        return await asyncio.to_thread(self._complete, request, keys, vectors, missing, response)
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+_env_checked = False
+
+
+def enable_embedding_cache(**kwargs) -> EmbeddingCache:
+    """
+    Enable the process-wide embedding cache.
+
+    Args:
+        **kwargs: Arguments for EmbeddingCache (path, max_bytes).
+
+    Returns:
+        EmbeddingCache: The active cache.
+    """
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is not None:
+            _embedding_cache.close()
+        _embedding_cache = EmbeddingCache(**kwargs)
+        return _embedding_cache
+
+
+def disable_embedding_cache() -> None:
+    """Disable the process-wide embedding cache."""
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is not None:
+            _embedding_cache.close()
+        _embedding_cache = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Return the process-wide embedding cache, or None if caching is off.
+
+    On first call the ``UNIINFER_EMBEDDING_CACHE`` environment variable is
+    honoured: ``1``/``true`` enables the default location, any other value is
+    used as the cache directory.
+    """
+    global _env_checked
+    if not _env_checked:
+        _env_checked = True
+        setting = os.getenv("UNIINFER_EMBEDDING_CACHE", "").strip()
+        if setting and setting.lower() not in ("0", "false", "no", "off") and _embedding_cache is None:
+            if setting.lower() in ("1", "true", "yes", "on"):
+                enable_embedding_cache()
+            else:
+                enable_embedding_cache(path=os.path.expanduser(setting))
+    return _embedding_cache
+
+
+def with_embedding_cache(provider: EmbeddingProvider, provider_name: str) -> EmbeddingProvider:
+    """
+    Wrap an embedding provider in the embedding cache when caching is enabled.
+
+    Args:
+        provider (EmbeddingProvider): The provider instance.
+        provider_name (str): Name used in cache keys.
+
+    Returns:
+        EmbeddingProvider: The wrapped provider, or the provider itself when caching is off.
+    """
+    cache = get_embedding_cache()
+    if cache is None:
+        return provider
+    return CachedEmbeddingProvider(provider, cache, provider_name=provider_name)
@@ -2,8 +2,9 @@
 Embedding provider factory for managing and instantiating embedding providers.
 """
 import os  # Added import
-from typing import Dict, Type, Optional, Any
+from typing import Dict, Type, Optional, Any, Union
 from .core import EmbeddingProvider
+from .factory import ProviderInstanceCache, load_provider_class
 
 # Try to import credgoo for API key management
 
@@ -12,18 +13,29 @@ class EmbeddingProviderFactory:
     """
     Factory for creating embedding provider instances.
     """
-    _providers: Dict[str, Type[EmbeddingProvider]] = {}
+    # Values are provider classes or "module:Class" paths imported on first use
+    _providers: Dict[str, Union[Type[EmbeddingProvider], str]] = {}
+    _instances = ProviderInstanceCache()
 
     @staticmethod
-    def register_provider(name: str, provider_class: Type[EmbeddingProvider]) -> None:
+    def register_provider(name: str, provider_class: Union[Type[EmbeddingProvider], str]) -> None:
         """
         Register an embedding provider.
 
         Args:
             name (str): The name of the provider.
-            provider_class (Type[EmbeddingProvider]): The provider class.
+            provider_class (Union[Type[EmbeddingProvider], str]): The provider class,
+                or its import path as ``"package.module:ClassName"``.
         """
         EmbeddingProviderFactory._providers[name] = provider_class
+        EmbeddingProviderFactory._instances.invalidate(name)
+
+    @staticmethod
+    def _provider_class(name: str) -> Type[EmbeddingProvider]:
+        """Return the class of a registered provider, importing it if needed."""
+        provider_class = load_provider_class(EmbeddingProviderFactory._providers[name])
+        EmbeddingProviderFactory._providers[name] = provider_class
+        return provider_class
 
     @staticmethod
     def get_provider(name: str, api_key: Optional[str] = None, **kwargs) -> EmbeddingProvider:
@@ -57,12 +69,18 @@ class EmbeddingProviderFactory:
                 print(
                     f"Warning: API key for '{name}' not provided and not found in environment variable '{env_var_name}'.")
 
-        provider_class = EmbeddingProviderFactory._providers[provider_name_lower]
+        cache_key = ProviderInstanceCache.make_key(
+            provider_name_lower, api_key, kwargs)
+        cached = EmbeddingProviderFactory._instances.get(cache_key)
+        if cached is not None:
+            return cached
+
+        provider_class = EmbeddingProviderFactory._provider_class(provider_name_lower)
         try:
             # Pass the potentially retrieved api_key and other kwargs
             # Ensure api_key is only passed if it's expected by the constructor or not None
             # Most provider classes should accept api_key=None gracefully if not needed
-            return provider_class(api_key=api_key, **kwargs)
+            instance = provider_class(api_key=api_key, **kwargs)
         except TypeError as e:
             # Catch TypeError if api_key is passed unexpectedly or required but None
             # This might indicate an issue with the specific provider's __init__ signature
@@ -74,6 +92,17 @@ class EmbeddingProviderFactory:
             # Catch other potential initialization errors
             raise ValueError(
                 f"Failed to initialize embedding provider '{name}': {str(e)}") from e
+        return EmbeddingProviderFactory._instances.put(cache_key, instance)
+
+    @staticmethod
+    def clear_cache(name: Optional[str] = None) -> None:
+        """
+        Invalidate cached embedding provider instances.
+
+        Args:
+            name (Optional[str]): Only clear instances of this provider. Clears all if None.
+        """
+        EmbeddingProviderFactory._instances.invalidate(name)
 
     @staticmethod
     def list_providers() -> list:
@@ -95,10 +124,10 @@ class EmbeddingProviderFactory:
             Returns an empty list for providers that don't implement list_models.
         """
         result = {}
-        for name, provider_class in EmbeddingProviderFactory._providers.items():
+        for name in list(EmbeddingProviderFactory._providers):
             try:
-                result[name] = provider_class.list_models()
-            except AttributeError:
+                result[name] = EmbeddingProviderFactory._provider_class(name).list_models()
+            except (AttributeError, ImportError):
                 result[name] = []
         return result
 
@@ -118,4 +147,4 @@ class EmbeddingProviderFactory:
         """
         if name not in EmbeddingProviderFactory._providers:
             raise ValueError(f"Embedding provider '{name}' not registered")
-        return EmbeddingProviderFactory._providers[name]
+        return EmbeddingProviderFactory._provider_class(name)
@@ -0,0 +1,35 @@
+"""
+Loading of the ``.env`` file in the current directory.
+
+The OpenAI wrapper and the proxy load it with ``override=True`` so the file
+wins over the shell, as they always have. The provider factory only fills
+in variables that are not set, so a library caller's exported environment
+is left alone. python-dotenv is imported on first use.
+"""
+import os
+import threading
+
+# override flags .env has been loaded with
+_loaded = set()
+_lock = threading.Lock()
+
+
+def load_environment(override: bool = True) -> bool:
+    """
+    Load environment variables from the .env file in the current directory, once.
+
+    Args:
+        override (bool): Whether values from .env replace variables that are
+            already set. A load with override=True also covers later loads
+            without it.
+
+    Returns:
+        bool: True if a .env file was found and loaded by this call.
+    """
+    with _lock:
+        if True in _loaded or override in _loaded:
+            return False
+        _loaded.add(override)
+    from dotenv import load_dotenv
+    dotenv_path = os.path.join(os.getcwd(), '.env')  # Explicitly check current dir
+    return load_dotenv(dotenv_path=dotenv_path, verbose=True, override=override)
@@ -1,6 +1,12 @@
 """
 Error handling for UniInfer.
 """
+import re
+import time
+from typing import Any, Optional
+
+_RETRY_AFTER_IN_MESSAGE = r"(?i)retry[- _]after\W{0,3}(\d+(?:\.\d+)?)"
+
 
 class UniInferError(Exception):
     """Base exception for all UniInfer errors."""
@@ -18,8 +24,11 @@ class AuthenticationError(ProviderError):
 
 
 class RateLimitError(ProviderError):
-    """Rate limit error from a provider."""
-    pass
+    """Rate limit error from a provider; retry_after holds the requested wait in seconds, if known."""
+
+    def __init__(self, message: str = "", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 class TimeoutError(ProviderError):
@@ -32,6 +41,75 @@ class InvalidRequestError(ProviderError):
     pass
 
 
+class CircuitOpenError(ProviderError):
+    """Call short-circuited because the provider's circuit breaker is open."""
+    pass
+
+
+class QueueFullError(UniInferError):
+    """Request rejected by the scheduler: its queue was full or it waited too long."""
+
+    def __init__(self, message: str, reason: str = "full"):
+        super().__init__(message)
+        self.reason = reason
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value: delay seconds or an HTTP date.
+
+    Returns:
+        Optional[float]: Seconds to wait (not negative), or None if absent or unparsable.
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime  # deferred: keeps `import uniinfer` fast
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def retry_after_of(error: BaseException) -> Optional[float]:
+    """
+    Return the Retry-After delay carried by an error: its retry_after
+    attribute, the Retry-After header of an attached HTTP response, or a
+    "retry after N" hint in the message.
+    """
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return retry_after
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            retry_after = parse_retry_after(headers.get("retry-after"))
+        except AttributeError:
+            retry_after = None
+        if retry_after is not None:
+            return retry_after
+    match = re.search(_RETRY_AFTER_IN_MESSAGE, str(error))
+    return float(match.group(1)) if match else None
+
+
+def http_error(message: str, response: Any) -> Exception:
+    """
+    Build the exception for a failed HTTP response of a provider.
+
+    Returns:
+        Exception: RateLimitError with the Retry-After delay for HTTP 429,
+        otherwise a plain Exception with the message.
+    """
+    if getattr(response, "status_code", None) == 429:
+        return RateLimitError(message, retry_after=parse_retry_after(response.headers.get("retry-after")))
+    return Exception(message)
+
+
 def map_provider_error(provider_name: str, original_error: Exception) -> ProviderError:
     """
     Map a provider-specific error to a UniInfer error.
@@ -51,7 +129,8 @@ def map_provider_error(provider_name: str, original_error: Exception) -> Provide
     
     # Rate limit errors
     if any(term in error_message for term in ["rate limit", "ratelimit", "too many requests", "429"]):
-        return RateLimitError(f"{provider_name} rate limit error: {str(original_error)}")
+        return RateLimitError(f"{provider_name} rate limit error: {str(original_error)}",
+                              retry_after=retry_after_of(original_error))
     
     # Timeout errors
     if any(term in error_message for term in ["timeout", "timed out"]):
@@ -2,54 +2,15 @@
 Module containing provider configurations and related utilities.
 """
 
-# Check if HuggingFace support is available
-try:
-    from uniinfer import HuggingFaceProvider
-    HAS_HUGGINGFACE = True
-except ImportError:
-    HAS_HUGGINGFACE = False
-
-# Check if Cohere support is available
-try:
-    from uniinfer import CohereProvider
-    HAS_COHERE = True
-except ImportError:
-    HAS_COHERE = False
-
-# Check if Moonshot support is available
-try:
-    from uniinfer import MoonshotProvider
-    HAS_MOONSHOT = True
-except ImportError:
-    HAS_MOONSHOT = False
+from importlib.util import find_spec
+
+# Optional SDK availability, checked without importing the SDKs or providers
+from uniinfer import (
+    HAS_HUGGINGFACE, HAS_COHERE, HAS_MOONSHOT, HAS_GROQ, HAS_AI21, HAS_GENAI
+)
 
 # Check if OpenAI client is available (for StepFun)
-try:
-    from openai import OpenAI
-    HAS_OPENAI = True
-except ImportError:
-    HAS_OPENAI = False
-
-# Check if Groq support is available
-try:
-    from uniinfer import GroqProvider
-    HAS_GROQ = True
-except ImportError:
-    HAS_GROQ = False
-
-# Check if AI21 support is available
-try:
-    from uniinfer import AI21Provider
-    HAS_AI21 = True
-except ImportError:
-    HAS_AI21 = False
-
-# Check if Gemini support is available
-try:
-    from uniinfer import GeminiProvider
-    HAS_GENAI = True
-except ImportError:
-    HAS_GENAI = False
+HAS_OPENAI = find_spec("openai") is not None
 
 
 PROVIDER_CONFIGS = {
@@ -191,6 +152,8 @@ if HAS_GENAI:
         'name': 'Google Gemini',
         'default_model': 'gemini-2.5-flash',
         'needs_api_key': True,
+        # Free-tier quota; requests and tokens per minute (see uniinfer.ratelimit)
+        'rate_limit': {'rpm': 10, 'tpm': 250000},
     }
 
 
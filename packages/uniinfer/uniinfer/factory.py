@@ -2,28 +2,201 @@
 Provider factory for managing and instantiating chat providers.
 """
 import os  # Added import
-from typing import Dict, Type, Optional, Any
+import hashlib
+import importlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Type, Optional, Any, Hashable, Tuple, Union
 from .core import ChatProvider
+from .env import load_environment
+from .transport import HTTPTransport
 
 # Try to import credgoo for API key management
 
 
+def api_key_fingerprint(api_key: Optional[str]) -> Optional[str]:
+    """
+    Return a short, non-reversible fingerprint of an API key.
+
+    Used in cache keys so raw keys are never kept as dictionary keys.
+    """
+    if api_key is None:
+        return None
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def load_provider_class(provider_class: Union[Type[Any], str]) -> Type[Any]:
+    """
+    Resolve a registered provider entry to its class.
+
+    Args:
+        provider_class (Union[Type, str]): A class, or an import path in the
+            form ``"package.module:ClassName"``.
+
+    Returns:
+        Type: The provider class.
+
+    Raises:
+        ImportError: If the module (or an SDK it needs) cannot be imported.
+    """
+    if not isinstance(provider_class, str):
+        return provider_class
+    module_name, _, class_name = provider_class.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class ProviderInstanceCache:
+    """
+    Bounded, thread-safe LRU cache of provider instances.
+
+    Instances are keyed by (provider name, API-key fingerprint, kwargs), so
+    hot paths reuse warmed SDK clients instead of rebuilding them per call.
+    """
+
+    def __init__(self, max_size: int = 64):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of cached instances. 0 disables caching.
+        """
+        self.max_size = max_size
+        self._instances: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(name: str, api_key: Optional[str], kwargs: Dict[str, Any]) -> Tuple:
+        """Build the cache key for a provider configuration."""
+        frozen_kwargs = tuple(sorted((k, repr(v)) for k, v in kwargs.items()))
+        return (name, api_key_fingerprint(api_key), frozen_kwargs)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached instance for key, or None."""
+        with self._lock:
+            instance = self._instances.get(key)
+            if instance is not None:
+                self._instances.move_to_end(key)
+            return instance
+
+    def put(self, key: Hashable, instance: Any) -> Any:
+        """
+        Store an instance and return the cached one.
+
+        If another thread cached an instance for the same key first, that
+        instance wins so every caller shares one object.
+        """
+        if self.max_size <= 0:
+            return instance
+        with self._lock:
+            existing = self._instances.get(key)
+            if existing is not None:
+                self._instances.move_to_end(key)
+                return existing
+            self._instances[key] = instance
+            while len(self._instances) > self.max_size:
+                self._instances.popitem(last=False)
+            return instance
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """
+        Drop cached instances.
+
+        Args:
+            name (Optional[str]): Only drop instances of this provider. Drops all if None.
+        """
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+                return
+            for key in [k for k in self._instances if k[0] == name.lower()]:
+                del self._instances[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._instances)
+
+
 class ProviderFactory:
     """
     Factory for creating provider instances.
+
+    The factory also owns the HTTP transport shared by every provider
+    instance, so connections are pooled across providers and requests,
+    and caches provider instances so repeated lookups are cheap.
     """
-    _providers: Dict[str, Type[ChatProvider]] = {}
+    # Values are provider classes or "module:Class" paths imported on first use
+    _providers: Dict[str, Union[Type[ChatProvider], str]] = {}
+    _transport: Optional[HTTPTransport] = None
+    _instances = ProviderInstanceCache()
 
     @staticmethod
-    def register_provider(name: str, provider_class: Type[ChatProvider]) -> None:
+    def register_provider(name: str, provider_class: Union[Type[ChatProvider], str]) -> None:
         """
         Register a provider.
 
         Args:
             name (str): The name of the provider.
-            provider_class (Type[ChatProvider]): The provider class.
+            provider_class (Union[Type[ChatProvider], str]): The provider class, or
+                its import path as ``"package.module:ClassName"`` to defer the
+                import until the provider is first used.
+        """
+        ProviderFactory._providers[name] = provider_class
+        ProviderFactory._instances.invalidate(name)
+
+    @staticmethod
+    def get_provider_name(provider: ChatProvider) -> Optional[str]:
+        """
+        Return the name a provider instance's class is registered under.
+
+        Lazily registered providers are matched by import path, so nothing
+        is imported.
+
+        Returns:
+            Optional[str]: The registered name, or None if the class is not
+            registered or registered under several names.
         """
+        provider_class = type(provider)
+        path = f"{provider_class.__module__}:{provider_class.__qualname__}"
+        names = [name for name, entry in ProviderFactory._providers.items()
+                 if entry is provider_class or entry == path]
+        return names[0] if len(names) == 1 else None
+
+    @staticmethod
+    def _provider_class(name: str) -> Type[ChatProvider]:
+        """Return the class of a registered provider, importing it if needed."""
+        provider_class = load_provider_class(ProviderFactory._providers[name])
         ProviderFactory._providers[name] = provider_class
+        return provider_class
+
+    @staticmethod
+    def get_transport() -> HTTPTransport:
+        """
+        Get the HTTP transport shared by all providers.
+
+        Returns:
+            HTTPTransport: The shared transport, created with defaults on first use.
+        """
+        if ProviderFactory._transport is None:
+            ProviderFactory._transport = HTTPTransport()
+        return ProviderFactory._transport
+
+    @staticmethod
+    def configure_transport(**kwargs) -> HTTPTransport:
+        """
+        Replace the shared HTTP transport.
+
+        Args:
+            **kwargs: Arguments for HTTPTransport (pool_connections, pool_maxsize,
+                timeout, max_retries).
+
+        Returns:
+            HTTPTransport: The new shared transport.
+        """
+        old_transport = ProviderFactory._transport
+        ProviderFactory._transport = HTTPTransport(**kwargs)
+        if old_transport is not None:
+            old_transport.close()
+        return ProviderFactory._transport
 
     @staticmethod
     def get_provider(name: str, api_key: Optional[str] = None, **kwargs) -> ChatProvider:
@@ -50,6 +223,8 @@ class ProviderFactory:
         # If API key not provided, try to get it from environment
         # Ollama typically doesn't require an API key in the standard sense
         if api_key is None and provider_name_lower != "ollama":
+            # fill in unset variables from ./.env without overriding the caller's
+            load_environment(override=False)
             env_var_name = f"{provider_name_lower.upper()}_API_KEY"
             api_key = os.getenv(env_var_name)
             if not api_key:
@@ -57,12 +232,18 @@ class ProviderFactory:
                 print(
                     f"Warning: API key for '{name}' not provided and not found in environment variable '{env_var_name}'.")
 
-        provider_class = ProviderFactory._providers[provider_name_lower]
+        cache_key = ProviderInstanceCache.make_key(
+            provider_name_lower, api_key, kwargs)
+        cached = ProviderFactory._instances.get(cache_key)
+        if cached is not None:
+            return cached
+
+        provider_class = ProviderFactory._provider_class(provider_name_lower)
         try:
             # Pass the potentially retrieved api_key and other kwargs
             # Ensure api_key is only passed if it's expected by the constructor or not None
             # Most provider classes should accept api_key=None gracefully if not needed
-            return provider_class(api_key=api_key, **kwargs)
+            instance = provider_class(api_key=api_key, **kwargs)
         except TypeError as e:
             # Catch TypeError if api_key is passed unexpectedly or required but None
             # This might indicate an issue with the specific provider's __init__ signature
@@ -74,6 +255,31 @@ class ProviderFactory:
             # Catch other potential initialization errors
             raise ValueError(
                 f"Failed to initialize provider '{name}': {str(e)}") from e
+        return ProviderFactory._instances.put(cache_key, instance)
+
+    @staticmethod
+    def clear_cache(name: Optional[str] = None) -> None:
+        """
+        Invalidate cached provider instances.
+
+        Call this after rotating API keys or changing provider configuration.
+
+        Args:
+            name (Optional[str]): Only clear instances of this provider. Clears all if None.
+        """
+        ProviderFactory._instances.invalidate(name)
+
+    @staticmethod
+    def set_cache_size(max_size: int) -> None:
+        """
+        Set the maximum number of cached provider instances.
+
+        Args:
+            max_size (int): The new bound. 0 disables instance caching.
+        """
+        ProviderFactory._instances.max_size = max_size
+        if max_size <= 0:
+            ProviderFactory._instances.invalidate()
 
     @staticmethod
     def list_providers() -> list:
@@ -95,10 +301,10 @@ class ProviderFactory:
             Returns an empty list for providers that don't implement list_models.
         """
         result = {}
-        for name, provider_class in ProviderFactory._providers.items():
+        for name in list(ProviderFactory._providers):
             try:
-                result[name] = provider_class.list_models()
-            except AttributeError:
+                result[name] = ProviderFactory._provider_class(name).list_models()
+            except (AttributeError, ImportError):
                 result[name] = []
         return result
 
@@ -118,4 +324,4 @@ class ProviderFactory:
         """
         if name not in ProviderFactory._providers:
             raise ValueError(f"Provider '{name}' not registered")
-        return ProviderFactory._providers[name]
+        return ProviderFactory._provider_class(name)
@@ -1,16 +1,34 @@
+import atexit
 import json
 import os
 import datetime
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # Windows: writers of one process are still serialized
+    HAS_FCNTL = False
+
+# Seconds between background flushes of recorded model accesses
+DEFAULT_FLUSH_INTERVAL = 30.0
+
+
+def _json_path(json_file='models.json'):
+    return os.path.expanduser(f"~/.uniinfer/{json_file}")
+
+
 # Save models to a JSON file
 
 
 def touch_json(json_file='models.json'):
     # ensure directory exists and file is present
-    json_path = os.path.expanduser(f"~/.uniinfer/{json_file}")
+    json_path = _json_path(json_file)
     os.makedirs(os.path.dirname(json_path), exist_ok=True)
     if not os.path.exists(json_path):
-        with open(json_path, 'w') as f:
-            json.dump({}, f)
+        write_json_atomic(json_path, {})
     # load and return data + path
     with open(json_path, 'r') as f:
         try:
@@ -20,59 +38,186 @@ def touch_json(json_file='models.json'):
     return data, json_path
 
 
+def write_json_atomic(json_path, data):
+    """Write data as JSON to json_path so that readers never see a partial file."""
+    # write a temp file next to the target and rename it over
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(json_path), prefix=".models-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, json_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# Former private name, kept for existing callers
+_write_json_atomic = write_json_atomic
+
+_write_lock = threading.Lock()
+
+
+@contextmanager
+def _locked_json(json_file='models.json'):
+    """Load the JSON file under an exclusive lock; the caller saves it with write_json_atomic."""
+    json_path = _json_path(json_file)
+    os.makedirs(os.path.dirname(json_path), exist_ok=True)
+    with _write_lock, open(json_path + ".lock", 'a') as lock_file:
+        if HAS_FCNTL:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield touch_json(json_file)
+        finally:
+            if HAS_FCNTL:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
 def update_models(models, provider_name, json_file='models.json'):
     print(f"Updating models for provider: {provider_name} in {json_file}")
-    # load or initialize JSON
-    existing_models, json_path = touch_json(json_file)
-
-    # ensure top-level structure
-    providers = existing_models.get("providers", {})
-
-    # preserve old entries
-    old_entries = providers.get(provider_name, {}).get("modellist", [])
-    old_map = {e["name"]: e for e in old_entries}
-
-    now = datetime.datetime.now().isoformat()
-    model_entries = []
-    for m in models:
-        if m in old_map:
-            model_entries.append(old_map[m])
-        else:
-            model_entries.append({"name": m, "created": now, "accessed": None})
-
-    providers[provider_name] = {"modellist": model_entries}
-    existing_models["providers"] = providers
-
-    # persist back
-    with open(json_path, 'w') as f:
-        json.dump(existing_models, f, indent=2)
+    # load or initialize JSON; the lock keeps concurrent writers from
+    # overwriting each other's changes
+    with _locked_json(json_file) as (existing_models, json_path):
+        # ensure top-level structure
+        providers = existing_models.get("providers", {})
+
+        # preserve old entries
+        old_entries = providers.get(provider_name, {}).get("modellist", [])
+        old_map = {e["name"]: e for e in old_entries}
+
+        now = datetime.datetime.now().isoformat()
+        model_entries = []
+        for m in models:
+            if m in old_map:
+                model_entries.append(old_map[m])
+            else:
+                model_entries.append({"name": m, "created": now, "accessed": None})
+
+        # "updated" lets a new process reuse the list until it goes stale
+        providers[provider_name] = {"modellist": model_entries, "updated": now}
+        existing_models["providers"] = providers
+
+        # persist back
+        write_json_atomic(json_path, existing_models)
     print(f"Models saved to {json_path}")
 
 
+def load_models(provider_name, json_file='models.json'):
+    """Return (model names, Unix time they were saved) for a provider, or None."""
+    try:
+        with open(_json_path(json_file), 'r') as f:
+            data = json.load(f)
+        entry = data.get("providers", {}).get(provider_name) or {}
+        updated = datetime.datetime.fromisoformat(entry["updated"]).timestamp()
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        # no file, no entry, or one written before fetch times were saved
+        return None
+    return [e["name"] for e in entry.get("modellist", [])], updated
+
+
+class ModelAccessTracker:
+    """
+    Buffers model accesses in memory and merges them into the models file.
+
+    Counts are flushed every ``flush_interval`` seconds by a daemon thread and
+    at interpreter exit. Each flush re-reads the file under a lock and adds
+    the buffered counts, so several processes can share one file.
+    """
+
+    def __init__(self, json_file='models.json', flush_interval=DEFAULT_FLUSH_INTERVAL):
+        """
+        Initialize the tracker.
+
+        Args:
+            json_file (str): File name below ``~/.uniinfer``.
+            flush_interval (float): Seconds between background flushes. 0 or None
+                disables the background thread; call flush() explicitly.
+        """
+        self.json_file = json_file
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        atexit.register(self.flush)
+
+    def record(self, model_name, provider_name):
+        """Count one access of a model; this does no file I/O."""
+        now = datetime.datetime.now().isoformat()
+        with self._lock:
+            count, _ = self._pending.get((provider_name, model_name), (0, None))
+            self._pending[(provider_name, model_name)] = (count + 1, now)
+            if self._thread is None and self.flush_interval:
+                self._thread = threading.Thread(
+                    target=self._run, name="uniinfer-model-access", daemon=True)
+                self._thread.start()
+
+    def pending(self):
+        """Return the number of buffered accesses not yet written."""
+        with self._lock:
+            return sum(count for count, _ in self._pending.values())
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Warning: could not save model access counts: {e}")
+
+    def flush(self):
+        """Merge the buffered accesses into the models file."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            with _locked_json(self.json_file) as (existing_models, json_path):
+                providers = existing_models.get("providers", {})
+                for (provider_name, model_name), (count, accessed) in pending.items():
+                    modellist = providers.get(provider_name, {}).get("modellist", [])
+                    for model_entry in modellist:
+                        if model_entry.get("name") == model_name:
+                            model_entry["accessed"] = max(
+                                model_entry.get("accessed") or accessed, accessed)
+                            model_entry["accessed_count"] = model_entry.get(
+                                "accessed_count", 0) + count
+                            break
+                    else:
+                        print(
+                            f"Warning: Model '{model_name}' not found for provider '{provider_name}'.")
+                write_json_atomic(json_path, existing_models)
+        except BaseException:
+            # keep the counts for the next attempt
+            with self._lock:
+                for key, (count, accessed) in pending.items():
+                    newer_count, newer_accessed = self._pending.get(key, (0, accessed))
+                    self._pending[key] = (count + newer_count, max(accessed, newer_accessed))
+            raise
+
+    def close(self):
+        """Stop the background thread and flush what is left."""
+        self._stop.set()
+        self.flush()
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_access_tracker(json_file='models.json'):
+    """Return the process-wide tracker for a models file."""
+    with _trackers_lock:
+        tracker = _trackers.get(json_file)
+        if tracker is None:
+            tracker = _trackers[json_file] = ModelAccessTracker(json_file)
+        return tracker
+
+
 def update_model_accessed(model_name, provider_name, json_file='models.json'):
-    # load or initialize JSON
-    existing_models, json_path = touch_json(json_file)
-
-    # ensure top-level structure
-    providers = existing_models.get("providers", {})
-    provider_data = providers.get(provider_name, {})
-    modellist = provider_data.get("modellist", [])
-
-    found = False
-    for model_entry in modellist:
-        if model_entry.get("name") == model_name:
-            model_entry["accessed"] = datetime.datetime.now().isoformat()
-            model_entry["accessed_count"] = model_entry.get(
-                "accessed_count", 0) + 1
-            found = True
-            break
-
-    if not found:
-        print(
-            f"Warning: Model '{model_name}' not found for provider '{provider_name}'.")
-
-    # Persist back
-    with open(json_path, 'w') as f:
-        json.dump(existing_models, f, indent=2)
-    print(
-        f"Model '{model_name}' accessed time and count updated in {json_path}")
+    # buffered: the count reaches the file with the tracker's next flush
+    get_access_tracker(json_file).record(model_name, provider_name)
+
+
+def flush_model_accessed(json_file='models.json'):
+    # write buffered access counts now (e.g. before reading models.json)
+    get_access_tracker(json_file).flush()
@@ -0,0 +1,325 @@
+"""
+Lightweight in-process metrics in the Prometheus text format.
+
+Counters, gauges and histograms keep their values in plain dicts behind one
+lock per metric, so recording a value costs a dict lookup and a few additions
+and the metrics can stay enabled in production. ``REGISTRY.render()`` produces
+the text served by the proxy's ``/metrics`` endpoint.
+
+The number of label combinations per metric is capped (``max_series``);
+further combinations are folded into one series whose labels are all
+``"_overflow"``, so arbitrary model names cannot grow memory without bound.
+"""
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .errors import (
+    AuthenticationError, CircuitOpenError, InvalidRequestError, ProviderError,
+    RateLimitError, TimeoutError, UniInferError
+)
+
+DEFAULT_MAX_SERIES = 1000
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+RATE_BUCKETS = (1, 5, 10, 20, 40, 80, 160, 320, 640)
+# Streams carry text, not token counts; tokens are estimated from characters
+CHARS_PER_TOKEN = 4
+_OVERFLOW = "_overflow"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 max_series: int = DEFAULT_MAX_SERIES):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labelvalues: Sequence[str]) -> Tuple[str, ...]:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labelvalues)}")
+        key = tuple(str(value) for value in labelvalues)
+        if key not in self._values and len(self._values) >= self.max_series:
+            return (_OVERFLOW,) * len(key)
+        return key
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Return the metric in the Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """A monotonically increasing count per label combination."""
+
+    kind = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            key = self._key(labelvalues)
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        with self._lock:
+            return self._values.get(tuple(labelvalues), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """A value that can go up and down per label combination."""
+
+    kind = "gauge"
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, *labelvalues: str, value: float) -> None:
+        with self._lock:
+            self._values[self._key(labelvalues)] = float(value)
+
+
+class Histogram(_Metric):
+    """Bucketed observations with their sum and count per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, max_series: int = DEFAULT_MAX_SERIES):
+        super().__init__(name, documentation, labelnames, max_series)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labelvalues: str, value: float) -> None:
+        # index len(buckets) is the +Inf bucket
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(labelvalues)
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, *labelvalues: str) -> int:
+        with self._lock:
+            state = self._values.get(tuple(labelvalues))
+            return state[2] if state else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """A named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter(
+    "uniinfer_requests_total", "Requests by endpoint, provider, model and outcome.",
+    ("endpoint", "provider", "model", "status"))
+REQUEST_LATENCY = REGISTRY.histogram(
+    "uniinfer_request_duration_seconds", "Time until the upstream call returned.",
+    ("endpoint", "provider", "model"))
+TIME_TO_FIRST_TOKEN = REGISTRY.histogram(
+    "uniinfer_time_to_first_token_seconds", "Time until a stream produced its first content.",
+    ("provider", "model"))
+STREAM_DURATION = REGISTRY.histogram(
+    "uniinfer_stream_duration_seconds", "Time from stream start to its last chunk.",
+    ("provider", "model"))
+STREAM_TOKENS_PER_SECOND = REGISTRY.histogram(
+    "uniinfer_stream_tokens_per_second",
+    f"Estimated output tokens ({CHARS_PER_TOKEN} characters each) per second after the first token.",
+    ("provider", "model"), buckets=RATE_BUCKETS)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "uniinfer_upstream_errors_total", "Failed upstream calls by error class.",
+    ("provider", "model", "error"))
+STREAM_CANCELLATIONS = REGISTRY.counter(
+    "uniinfer_stream_cancellations_total", "Streams stopped because the client went away.",
+    ("provider", "model"))
+STREAM_BYTES_SAVED = REGISTRY.counter(
+    "uniinfer_stream_cancelled_bytes_saved_total",
+    f"Estimated output bytes not generated thanks to cancellation: max_tokens "
+    f"({CHARS_PER_TOKEN} bytes each) minus what was received.",
+    ("provider", "model"))
+INFLIGHT_REQUESTS = REGISTRY.gauge(
+    "uniinfer_inflight_requests", "Requests currently being served.", ("endpoint",))
+QUEUE_WAIT = REGISTRY.histogram(
+    "uniinfer_queue_wait_seconds", "Time admitted or timed-out requests spent in the scheduler queue.",
+    ("provider", "priority"))
+QUEUE_DEPTH = REGISTRY.gauge(
+    "uniinfer_queue_depth", "Requests waiting in the scheduler queue.", ("provider", "priority"))
+QUEUE_REJECTIONS = REGISTRY.counter(
+    "uniinfer_queue_rejections_total", "Requests rejected by the scheduler (queue full or wait timeout).",
+    ("provider", "priority", "reason"))
+SCHEDULER_INFLIGHT = REGISTRY.gauge(
+    "uniinfer_scheduler_inflight", "Requests holding a scheduler slot.", ("provider",))
+SINGLEFLIGHT_CALLS = REGISTRY.counter(
+    "uniinfer_singleflight_calls_total", "Calls started by single-flight coalescing.", ("endpoint",))
+SINGLEFLIGHT_COALESCED = REGISTRY.counter(
+    "uniinfer_singleflight_coalesced_total", "Callers that joined an identical call in flight.",
+    ("endpoint",))
+SINGLEFLIGHT_ERRORS = REGISTRY.counter(
+    "uniinfer_singleflight_errors_total", "Shared calls that failed or were cancelled.", ("endpoint",))
+
+_ERROR_CLASSES = (
+    RateLimitError, AuthenticationError, TimeoutError, InvalidRequestError,
+    CircuitOpenError, ProviderError, UniInferError,
+)
+
+
+def error_class(error: BaseException) -> str:
+    """Return a bounded label for an exception: its uniinfer error class or 'other'."""
+    for cls in _ERROR_CLASSES:
+        if isinstance(error, cls):
+            return cls.__name__
+    return "other"
+
+
+def record_error(provider: str, model: str, error: BaseException) -> str:
+    """Count an upstream error and return its class label."""
+    label = error_class(error)
+    UPSTREAM_ERRORS.inc(provider, model, label)
+    return label
+
+
+@contextmanager
+def track_request(endpoint: str, provider: str, model: str) -> Iterator[Dict[str, str]]:
+    """
+    Record in-flight count, latency and outcome of the upstream call in the block.
+
+    Exceptions are counted by class and re-raised; a cancelled block (the
+    client went away) counts as status ``cancelled``, not as an upstream error.
+    The block receives a dict whose ``"status"`` it may set, e.g. to
+    ``"cancelled"`` when it stops a stream itself.
+    """
+    INFLIGHT_REQUESTS.inc(endpoint)
+    started = time.perf_counter()
+    outcome = {"status": "ok"}
+    try:
+        yield outcome
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome["status"] = "cancelled"
+        raise
+    except Exception as e:
+        outcome["status"] = record_error(provider, model, e)
+        raise
+    finally:
+        INFLIGHT_REQUESTS.dec(endpoint)
+        REQUESTS.inc(endpoint, provider, model, outcome["status"])
+        REQUEST_LATENCY.observe(endpoint, provider, model, value=time.perf_counter() - started)
+
+
+class StreamTimer:
+    """
+    Measures one streamed response: time to first token, duration and rate.
+    """
+
+    __slots__ = ("provider", "model", "started", "first_at", "chars", "cancelled")
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self.started = time.perf_counter()
+        self.first_at: Optional[float] = None
+        self.chars = 0
+        self.cancelled = False
+
+    def chunk(self, content: str) -> None:
+        """Account one content chunk."""
+        if self.first_at is None:
+            self.first_at = time.perf_counter()
+            TIME_TO_FIRST_TOKEN.observe(self.provider, self.model, value=self.first_at - self.started)
+        self.chars += len(content)
+
+    def cancel(self, max_tokens: Optional[int] = None) -> None:
+        """Record a stream stopped early, estimating the output it saved."""
+        if self.cancelled:
+            return
+        self.cancelled = True
+        STREAM_CANCELLATIONS.inc(self.provider, self.model)
+        if max_tokens:
+            saved = max_tokens * CHARS_PER_TOKEN - self.chars
+            if saved > 0:
+                STREAM_BYTES_SAVED.inc(self.provider, self.model, amount=saved)
+
+    def finish(self) -> None:
+        """Record duration and throughput of the finished stream."""
+        now = time.perf_counter()
+        STREAM_DURATION.observe(self.provider, self.model, value=now - self.started)
+        if self.first_at is not None and now > self.first_at:
+            STREAM_TOKENS_PER_SECOND.observe(
+                self.provider, self.model,
+                value=self.chars / CHARS_PER_TOKEN / (now - self.first_at))
@@ -0,0 +1,287 @@
+"""
+Cached, concurrently fetched model lists.
+
+Listing models costs a remote call per provider. ``ModelCatalogue`` keeps each
+provider's list in memory for ``ttl`` seconds. After that, for another
+``stale_ttl`` seconds, callers get the old list right away while one background
+refresh replaces it (stale-while-revalidate). Concurrent callers for the same
+provider share a single fetch, ``get_many`` fans out over providers in
+parallel with a per-provider timeout, and every fresh list is written through
+to ``~/.uniinfer/models.json`` via ``json_utils.update_models``. That file is
+the persistent store: on its first miss for a provider, a new process seeds
+the entry from it with its saved fetch time, so a recent list is served
+without a remote call. Fetches run on daemon threads, so one that timed out
+does not hold up interpreter exit.
+
+Lists are scoped by provider and a hash of the API key, since accounts can see
+different models.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .json_utils import load_models, update_models
+
+DEFAULT_TTL = 300.0
+DEFAULT_STALE_TTL = 3600.0
+DEFAULT_TIMEOUT = 20.0
+DEFAULT_MAX_WORKERS = 16
+
+
+def _scope(api_key: Optional[str]) -> str:
+    if not api_key:
+        return ""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class ModelCatalogue:
+    """
+    Per-provider model lists with TTL, background refresh and parallel fetching.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        stale_ttl: float = DEFAULT_STALE_TTL,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        persist: bool = True,
+    ):
+        """
+        Initialize the catalogue.
+
+        Args:
+            ttl (float): Seconds a fetched list is served without refreshing.
+            stale_ttl (float): Further seconds a list is served while it is
+                refreshed in the background. After that callers wait for a fetch.
+            timeout (float): Default seconds to wait for one provider's fetch.
+            max_workers (int): Fetches running at the same time.
+            persist (bool): Write fetched lists to models.json and seed
+                missing entries from it.
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.persist = persist
+        # (provider, scope) -> (monotonic fetch time, models)
+        self._entries: Dict[Tuple[str, str], Tuple[float, List[str]]] = {}
+        self._inflight = {}
+        # providers whose models.json entry has been read
+        self._seeded = set()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def _run_fetch(self, future: Future, entry_key: Tuple[str, str], fetch: Callable[[], List[str]]) -> None:
+        with self._slots:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                models = self._fetch(entry_key, fetch)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(models)
+
+    def _fetch(self, entry_key: Tuple[str, str], fetch: Callable[[], List[str]]) -> List[str]:
+        models = list(fetch())
+        with self._lock:
+            self._entries[entry_key] = (time.monotonic(), models)
+        if self.persist:
+            try:
+                update_models(models, entry_key[0])
+            except OSError as e:
+                print(f"Warning: could not save models for {entry_key[0]}: {e}")
+        return models
+
+    def _start_fetch(self, entry_key: Tuple[str, str], fetch: Callable[[], List[str]]):
+        """Return the running fetch for a key, starting one if there is none."""
+        with self._lock:
+            future = self._inflight.get(entry_key)
+            if future is not None:
+                return future
+            future = Future()
+            self._inflight[entry_key] = future
+        # Daemon thread rather than an executor: the interpreter joins executor
+        # threads at exit, which would wait out a fetch that already timed out
+        threading.Thread(target=self._run_fetch, args=(future, entry_key, fetch),
+                         name="uniinfer-models", daemon=True).start()
+        # Outside the lock: the callback runs inline if the fetch already finished
+        future.add_done_callback(lambda _: self._forget(entry_key, future))
+        return future
+
+    def _forget(self, entry_key, future) -> None:
+        with self._lock:
+            if self._inflight.get(entry_key) is future:
+                del self._inflight[entry_key]
+
+    def _needs_seed(self, entry_key: Tuple[str, str]) -> bool:
+        with self._lock:
+            return self.persist and entry_key not in self._entries and entry_key[0] not in self._seeded
+
+    def _seed(self, entry_key: Tuple[str, str]) -> None:
+        """Fill a missing entry from models.json, once per provider."""
+        if not self._needs_seed(entry_key):
+            return
+        with self._lock:
+            self._seeded.add(entry_key[0])
+        saved = load_models(entry_key[0])
+        if saved is None:
+            return
+        models, updated = saved
+        # map the wall-clock save time onto the monotonic clock of the entries
+        fetched_at = time.monotonic() - max(0.0, time.time() - updated)
+        with self._lock:
+            self._entries.setdefault(entry_key, (fetched_at, models))
+
+    def _lookup(self, entry_key: Tuple[str, str], fetch: Callable[[], List[str]]) -> Optional[List[str]]:
+        """Return a cached list (refreshing it in the background when stale), or None."""
+        self._seed(entry_key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[0]
+        if age < self.ttl:
+            return list(entry[1])
+        if age < self.ttl + self.stale_ttl:
+            self._start_fetch(entry_key, fetch)
+            return list(entry[1])
+        return None
+
+    def get(
+        self,
+        provider: str,
+        fetch: Callable[[], List[str]],
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        refresh: bool = False,
+    ) -> List[str]:
+        """
+        Return the model list of a provider.
+
+        Args:
+            provider (str): Provider name.
+            fetch (Callable[[], List[str]]): Fetches the list from the provider.
+            api_key (Optional[str]): Key the list was fetched with; scopes the entry.
+            timeout (Optional[float]): Seconds to wait for a fetch.
+            refresh (bool): Ignore the cached list and fetch a new one.
+
+        Returns:
+            List[str]: The model names.
+
+        Raises:
+            TimeoutError: If the fetch did not finish in time. It keeps running
+                and fills the cache when it completes.
+        """
+        entry_key = (provider, _scope(api_key))
+        if not refresh:
+            models = self._lookup(entry_key, fetch)
+            if models is not None:
+                return models
+        future = self._start_fetch(entry_key, fetch)
+        try:
+            return list(future.result(self.timeout if timeout is None else timeout))
+        except FutureTimeoutError:
+            raise TimeoutError(f"Listing models for '{provider}' timed out") from None
+
+    async def aget(
+        self,
+        provider: str,
+        fetch: Callable[[], List[str]],
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        refresh: bool = False,
+    ) -> List[str]:
+        """
+        Async version of get(); cached lists are returned without leaving the loop.
+        """
+        entry_key = (provider, _scope(api_key))
+        if not refresh:
+            if self._needs_seed(entry_key):
+                await asyncio.to_thread(self._seed, entry_key)
+            models = self._lookup(entry_key, fetch)
+            if models is not None:
+                return models
+        future = asyncio.wrap_future(self._start_fetch(entry_key, fetch))
+        try:
+            models = await asyncio.wait_for(
+                asyncio.shield(future), self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Listing models for '{provider}' timed out") from None
+        return list(models)
+
+    def get_many(
+        self,
+        providers: Iterable[str],
+        fetch: Callable[[str], List[str]],
+        timeout: Optional[float] = None,
+        refresh: bool = False,
+    ) -> Dict[str, Union[List[str], Exception]]:
+        """
+        Return the model lists of several providers, fetching them in parallel.
+
+        Args:
+            providers (Iterable[str]): Provider names.
+            fetch (Callable[[str], List[str]]): Fetches the list of one provider.
+            timeout (Optional[float]): Seconds to wait for the slowest provider.
+            refresh (bool): Ignore cached lists.
+
+        Returns:
+            Dict[str, Union[List[str], Exception]]: Models or the error of each
+            provider, in the order given. Providers that did not answer in time
+            map to a TimeoutError.
+        """
+        results = {}
+        futures = {}
+        for provider in providers:
+            entry_key = (provider, "")
+            fetch_one = (lambda p: lambda: fetch(p))(provider)
+            models = None if refresh else self._lookup(entry_key, fetch_one)
+            if models is not None:
+                results[provider] = models
+            else:
+                results[provider] = None
+                futures[provider] = self._start_fetch(entry_key, fetch_one)
+
+        wait(futures.values(), timeout=self.timeout if timeout is None else timeout)
+        for provider, future in futures.items():
+            if not future.done():
+                results[provider] = TimeoutError(f"Listing models for '{provider}' timed out")
+            elif future.exception() is not None:
+                results[provider] = future.exception()
+            else:
+                results[provider] = list(future.result())
+        return results
+
+    def invalidate(self, provider: Optional[str] = None) -> None:
+        """Drop the cached lists of one provider, or of all providers."""
+        with self._lock:
+            for entry_key in list(self._entries):
+                if provider is None or entry_key[0] == provider:
+                    del self._entries[entry_key]
+
+
+_model_catalogue: Optional[ModelCatalogue] = None
+_model_catalogue_lock = threading.Lock()
+
+
+def get_model_catalogue() -> ModelCatalogue:
+    """
+    Return the process-wide model catalogue.
+
+    The TTL can be set with the ``UNIINFER_MODELS_TTL`` environment variable
+    (seconds; ``0`` always fetches).
+    """
+    global _model_catalogue
+    with _model_catalogue_lock:
+        if _model_catalogue is None:
+            ttl = float(os.environ.get("UNIINFER_MODELS_TTL", DEFAULT_TTL))
+            _model_catalogue = ModelCatalogue(
+                ttl=ttl, stale_ttl=DEFAULT_STALE_TTL if ttl > 0 else 0)
+        return _model_catalogue
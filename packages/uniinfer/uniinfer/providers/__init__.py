@@ -1,69 +1,83 @@
 """
 Provider implementations for different LLM services.
+
+Provider modules are imported on first attribute access, so importing this
+package (or ``uniinfer``) does not load every provider and optional SDK.
 """
-from .mistral import MistralProvider
-from .anthropic import AnthropicProvider
-from .openai import OpenAIProvider
-from .ollama import OllamaProvider
-from .ollama_embedding import OllamaEmbeddingProvider
-from .openrouter import OpenRouterProvider
-from .arli import ArliAIProvider
-from .internlm import InternLMProvider
-from .stepfun import StepFunProvider
-from .sambanova import SambanovaProvider
-from .upstage import UpstageProvider
-from .ngc import NGCProvider
-from .cloudflare import CloudflareProvider
-from .chutes import ChutesProvider
-from .pollinations import PollinationsProvider
-from .bigmodel import BigmodelProvider
-
-# Import providers with optional dependencies
-try:
-    from .gemini import GeminiProvider
-    HAS_GENAI = True
-except ImportError:
-    HAS_GENAI = False
-
-try:
-    from .tu import TuAIProvider
-    from .tu_embedding import TuAIEmbeddingProvider
-    HAS_TU = True
-except ImportError:
-    HAS_TU = False
-
-# Import other providers with optional dependencies
-try:
-    from .huggingface import HuggingFaceProvider
-    HAS_HUGGINGFACE = True
-except ImportError:
-    HAS_HUGGINGFACE = False
-
-try:
-    from .cohere import CohereProvider
-    HAS_COHERE = True
-except ImportError:
-    HAS_COHERE = False
-
-try:
-    from .moonshot import MoonshotProvider
-    HAS_MOONSHOT = True
-except ImportError:
-    HAS_MOONSHOT = False
-
-try:
-    from .groq import GroqProvider
-    HAS_GROQ = True
-except ImportError:
-    HAS_GROQ = False
-
-try:
-    from .ai21 import AI21Provider
-    HAS_AI21 = True
-except ImportError:
-    HAS_AI21 = False
-
-# Import all provider classes here so they can be easily imported from uniinfer.providers
+import importlib
+from importlib.util import find_spec
+
+
+def _has_module(name: str) -> bool:
+    """Check whether a module is installed without importing it."""
+    try:
+        return find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# Provider class name -> module that defines it
+_PROVIDER_MODULES = {
+    'MistralProvider': '.mistral',
+    'AnthropicProvider': '.anthropic',
+    'OpenAIProvider': '.openai',
+    'OllamaProvider': '.ollama',
+    'OllamaEmbeddingProvider': '.ollama_embedding',
+    'OpenRouterProvider': '.openrouter',
+    'ArliAIProvider': '.arli',
+    'InternLMProvider': '.internlm',
+    'StepFunProvider': '.stepfun',
+    'SambanovaProvider': '.sambanova',
+    'UpstageProvider': '.upstage',
+    'NGCProvider': '.ngc',
+    'CloudflareProvider': '.cloudflare',
+    'ChutesProvider': '.chutes',
+    'PollinationsProvider': '.pollinations',
+    'BigmodelProvider': '.bigmodel',
+    'TuAIProvider': '.tu',
+    'TuAIEmbeddingProvider': '.tu_embedding',
+    'GeminiProvider': '.gemini',
+    'HuggingFaceProvider': '.huggingface',
+    'CohereProvider': '.cohere',
+    'MoonshotProvider': '.moonshot',
+    'GroqProvider': '.groq',
+    'AI21Provider': '.ai21',
+    'ReplayProvider': '.replay',
+}
+
+# Providers with optional dependencies are available if their SDK is installed
+HAS_GENAI = _has_module('google.genai')
+HAS_TU = True
+HAS_HUGGINGFACE = _has_module('huggingface_hub')
+HAS_COHERE = _has_module('cohere')
+HAS_MOONSHOT = _has_module('openai')
+HAS_GROQ = _has_module('groq')
+HAS_AI21 = _has_module('ai21')
+
+
+def provider_path(class_name: str) -> str:
+    """
+    Return the ``"module:Class"`` import path of a built-in provider class.
+
+    Args:
+        class_name (str): The provider class name, e.g. ``"TuAIProvider"``.
+
+    Returns:
+        str: The import path, suitable for ProviderFactory.register_provider.
+    """
+    return f"{__name__}{_PROVIDER_MODULES[class_name]}:{class_name}"
+
+
+def __getattr__(name):
+    module_name = _PROVIDER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+# Provider classes exported from uniinfer.providers (resolved lazily above)
 __all__ = [
     'MistralProvider',
     'AnthropicProvider',
@@ -83,6 +97,7 @@ __all__ = [
     'BigmodelProvider',
     'TuAIProvider',
     'TuAIEmbeddingProvider',
+    'ReplayProvider',
 ]
 
 # Add optional providers to __all__ if available
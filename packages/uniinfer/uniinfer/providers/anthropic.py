@@ -2,10 +2,11 @@
 Anthropic provider implementation.
 """
 import json
-import requests
 from typing import Dict, Any, Iterator, Optional
 
 from ..core import ChatProvider, ChatCompletionRequest, ChatCompletionResponse, ChatMessage
+from ..factory import ProviderFactory
+from ..streaming import iter_sse
 
 
 class AnthropicProvider(ChatProvider):
@@ -40,7 +41,7 @@ class AnthropicProvider(ChatProvider):
             "x-api-key": api_key,
             "anthropic-version": "2023-06-01"
         }
-        response = requests.get(url, headers=headers)
+        response = ProviderFactory.get_transport().get(url, headers=headers)
         if response.status_code != 200:
             raise Exception(f"Anthropic API error: {response.status_code} - {response.text}")
 
@@ -112,7 +113,7 @@ class AnthropicProvider(ChatProvider):
             "anthropic-version": self.api_version
         }
 
-        response = requests.post(
+        response = self.transport.post(
             endpoint,
             headers=headers,
             data=json.dumps(payload)
@@ -210,7 +211,7 @@ class AnthropicProvider(ChatProvider):
             "anthropic-version": self.api_version
         }
 
-        with requests.post(
+        with self.transport.post(
             endpoint,
             headers=headers,
             data=json.dumps(payload),
@@ -221,47 +222,29 @@ class AnthropicProvider(ChatProvider):
                 error_msg = f"Anthropic API error: {response.status_code} - {response.text}"
                 raise Exception(error_msg)
 
-            # Process the streaming response
-            for line in response.iter_lines():
-                if line:
-                    # Parse the JSON data from the stream
-                    try:
-                        data = line.decode('utf-8')
-
-                        # Skip empty lines or data: [DONE]
-                        if not data or data == 'data: [DONE]':
-                            continue
-
-                        # Remove 'data: ' prefix if present
-                        if data.startswith('data: '):
-                            data = data[6:]
-
-                        # Parse the JSON
-                        event_data = json.loads(data)
-
-                        # Handle different event types
-                        if event_data.get('type') == 'content_block_delta':
-                            delta = event_data.get('delta', {})
-                            content = delta.get('text', '')
-
-                            # Create a message for this chunk
-                            message = ChatMessage(
-                                role="assistant", content=content)
-
-                            # Calculate approximate usage (Anthropic doesn't provide usage in stream)
-                            usage = {
-                                "input_tokens": 0,
-                                "output_tokens": 0,
-                                "total_tokens": 0
-                            }
-
-                            yield ChatCompletionResponse(
-                                message=message,
-                                provider='anthropic',
-                                model=event_data.get('model', request.model),
-                                usage=usage,
-                                raw_response=event_data
-                            )
-                    except json.JSONDecodeError:
-                        # Skip invalid JSON lines
-                        continue
+            # Process the streaming response; "event:" lines are skipped and
+            # the event type is read from each data payload
+            for event_data in iter_sse(response):
+                # Handle different event types
+                if event_data.get('type') == 'content_block_delta':
+                    delta = event_data.get('delta', {})
+                    content = delta.get('text', '')
+
+                    # Create a message for this chunk
+                    message = ChatMessage(
+                        role="assistant", content=content)
+
+                    # Calculate approximate usage (Anthropic doesn't provide usage in stream)
+                    usage = {
+                        "input_tokens": 0,
+                        "output_tokens": 0,
+                        "total_tokens": 0
+                    }
+
+                    yield ChatCompletionResponse(
+                        message=message,
+                        provider='anthropic',
+                        model=event_data.get('model', request.model),
+                        usage=usage,
+                        raw_response=event_data
+                    )
@@ -2,10 +2,11 @@
 ArliAI provider implementation.
 """
 import json
-import requests
 from typing import Dict, Any, Iterator, Optional
 
 from ..core import ChatProvider, ChatCompletionRequest, ChatCompletionResponse, ChatMessage
+from ..factory import ProviderFactory
+from ..streaming import iter_sse
 
 
 class ArliAIProvider(ChatProvider):
@@ -48,7 +49,7 @@ class ArliAIProvider(ChatProvider):
             "Authorization": f"Bearer {api_key}"
         }
 
-        response = requests.get(endpoint, headers=headers)
+        response = ProviderFactory.get_transport().get(endpoint, headers=headers)
 
         if response.status_code != 200:
             raise Exception(
@@ -110,7 +111,7 @@ class ArliAIProvider(ChatProvider):
             "Authorization": f"Bearer {self.api_key}"
         }
 
-        response = requests.post(
+        response = self.transport.post(
             endpoint,
             headers=headers,
             data=json.dumps(payload)
@@ -197,7 +198,7 @@ class ArliAIProvider(ChatProvider):
             "Authorization": f"Bearer {self.api_key}"
         }
 
-        with requests.post(
+        with self.transport.post(
             endpoint,
             headers=headers,
             data=json.dumps(payload),
@@ -209,58 +210,40 @@ class ArliAIProvider(ChatProvider):
                 raise Exception(error_msg)
 
             # Process the streaming response
-            for line in response.iter_lines():
-                if line:
-                    # Parse the JSON data from the stream
-                    try:
-                        line = line.decode('utf-8')
-
-                        # Skip empty lines or '[DONE]'
-                        if not line or line == 'data: [DONE]':
-                            continue
-
-                        # Remove 'data: ' prefix if present
-                        if line.startswith('data: '):
-                            line = line[6:]
-
-                        data = json.loads(line)
-
-                        # Skip if no choices or deltas
-                        if 'choices' not in data or not data['choices']:
-                            continue
-
-                        choice = data['choices'][0]
-
-                        # Handle different streaming formats (delta or message)
-                        content = ""
-                        role = "assistant"
-
-                        if 'delta' in choice:
-                            delta = choice['delta']
-                            content = delta.get('content', '')
-                            role = delta.get('role', 'assistant')
-                        elif 'message' in choice:
-                            message = choice['message']
-                            content = message.get('content', '')
-                            role = message.get('role', 'assistant')
-
-                        # Skip empty content
-                        if not content:
-                            continue
-
-                        # Create a message for this chunk
-                        message = ChatMessage(role=role, content=content)
-
-                        # Usage stats typically not provided in stream chunks
-                        usage = {}
-
-                        yield ChatCompletionResponse(
-                            message=message,
-                            provider='arli',
-                            model=data.get('model', request.model),
-                            usage=usage,
-                            raw_response=data
-                        )
-                    except json.JSONDecodeError:
-                        # Skip invalid JSON lines
-                        continue
+            for data in iter_sse(response):
+                # Skip if no choices or deltas
+                if 'choices' not in data or not data['choices']:
+                    continue
+
+                choice = data['choices'][0]
+
+                # Handle different streaming formats (delta or message)
+                content = ""
+                role = "assistant"
+
+                if 'delta' in choice:
+                    delta = choice['delta']
+                    content = delta.get('content', '')
+                    role = delta.get('role', 'assistant')
+                elif 'message' in choice:
+                    message = choice['message']
+                    content = message.get('content', '')
+                    role = message.get('role', 'assistant')
+
+                # Skip empty content
+                if not content:
+                    continue
+
+                # Create a message for this chunk
+                message = ChatMessage(role=role, content=content)
+
+                # Usage stats typically not provided in stream chunks
+                usage = {}
+
+                yield ChatCompletionResponse(
+                    message=message,
+                    provider='arli',
+                    model=data.get('model', request.model),
+                    usage=usage,
+                    raw_response=data
+                )
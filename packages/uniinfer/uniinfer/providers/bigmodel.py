@@ -1,10 +1,10 @@
 """
 Bigmodel provider implementation.
 """
-import requests
 from typing import Dict, Any, Iterator, Optional
 
 from ..core import ChatProvider, ChatCompletionRequest, ChatCompletionResponse, ChatMessage
+from ..factory import ProviderFactory
 
 try:
     from openai import OpenAI
@@ -73,7 +73,7 @@ class BigmodelProvider(ChatProvider):
             "Content-Type": "application/json"
         }
         
-        response = requests.get(url, headers=headers)
+        response = ProviderFactory.get_transport().get(url, headers=headers)
         if response.status_code != 200:
             raise Exception(
                 f"Bigmodel API error: {response.status_code} - {response.text}")
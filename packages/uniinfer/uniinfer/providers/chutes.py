@@ -4,10 +4,12 @@ Chutes provider implementation.
 Chutes is a unified API to access multiple AI models from different providers.
 """
 import json
-import requests
 from typing import Dict, Any, Iterator, Optional
 
 from ..core import ChatProvider, ChatCompletionRequest, ChatCompletionResponse, ChatMessage
+from ..errors import http_error
+from ..factory import ProviderFactory
+from ..streaming import iter_sse
 
 
 class ChutesProvider(ChatProvider):
@@ -67,11 +69,11 @@ class ChutesProvider(ChatProvider):
             "Content-Type": "application/json"
         }
 
-        response = requests.get(endpoint, headers=headers)
+        response = ProviderFactory.get_transport().get(endpoint, headers=headers)
 
         if response.status_code != 200:
             error_msg = f"Chutes API error: {response.status_code} - {response.text}"
-            raise Exception(error_msg)
+            raise http_error(error_msg, response)
 
         models = response.json().get('data', [])
         
@@ -121,7 +123,7 @@ class ChutesProvider(ChatProvider):
             "Authorization": f"Bearer {self.api_key}"
         }
 
-        response = requests.post(
+        response = self.transport.post(
             endpoint,
             headers=headers,
             data=json.dumps(payload)
@@ -130,7 +132,7 @@ class ChutesProvider(ChatProvider):
         # Handle error response
         if response.status_code != 200:
             error_msg = f"Chutes API error: {response.status_code} - {response.text}"
-            raise Exception(error_msg)
+            raise http_error(error_msg, response)
 
         # Parse the response
         response_data = response.json()
@@ -194,7 +196,7 @@ class ChutesProvider(ChatProvider):
             "Authorization": f"Bearer {self.api_key}"
         }
 
-        with requests.post(
+        with self.transport.post(
             endpoint,
             headers=headers,
             data=json.dumps(payload),
@@ -202,62 +204,24 @@ class ChutesProvider(ChatProvider):
         ) as response:
             if response.status_code != 200:
                 error_msg = f"Chutes API error: {response.status_code} - {response.text}"
-                raise Exception(error_msg)
-
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        line = line.decode('utf-8').strip()
-                        if not line or not line.startswith('data: '):
-                            continue
-                        data = line[6:]
-                        if data == '[DONE]':
-                            break
-                        chunk = data.strip()
-                        if not chunk:
-                            continue
-                        data_json = json.loads(chunk)
-                        if 'choices' not in data_json or not data_json['choices']:
-                            continue
-                        choice = data_json['choices'][0]
-                        # Chutes streaming: content is in delta.content
-                        if 'delta' not in choice or 'content' not in choice['delta'] or not choice['delta']['content']:
-                            continue
-                        content = choice['delta']['content']
-                        role = choice['delta'].get('role', 'assistant')
-                        message = ChatMessage(role=role, content=content)
-                        usage = {}
-                        model = data_json.get('model', request.model)
-                        yield ChatCompletionResponse(
-                            message=message,
-                            provider='chutes',
-                            model=model,
-                            usage=usage,
-                            raw_response=data_json
-                        )
-                    except json.JSONDecodeError:
-                        continue
-                        content = choice['delta']['content']
-
-                        # Get role from delta or default to assistant
-                        role = choice['delta'].get('role', 'assistant')
-
-                        # Create a message for this chunk
-                        message = ChatMessage(role=role, content=content)
-
-                        # Usage stats typically not provided in stream chunks
-                        usage = {}
-
-                        # Get model info if available
-                        model = data.get('model', request.model)
-
-                        yield ChatCompletionResponse(
-                            message=message,
-                            provider='chutes',
-                            model=model,
-                            usage=usage,
-                            raw_response=data
-                        )
-                    except json.JSONDecodeError:
-                        # Skip invalid JSON lines
-                        continue
+                raise http_error(error_msg, response)
+
+            for data in iter_sse(response):
+                if 'choices' not in data or not data['choices']:
+                    continue
+                choice = data['choices'][0]
+                # Chutes streaming: content is in delta.content
+                if 'delta' not in choice or 'content' not in choice['delta'] or not choice['delta']['content']:
+                    continue
+                content = choice['delta']['content']
+                role = choice['delta'].get('role', 'assistant')
+                message = ChatMessage(role=role, content=content)
+                usage = {}
+                model = data.get('model', request.model)
+                yield ChatCompletionResponse(
+                    message=message,
+                    provider='chutes',
+                    model=model,
+                    usage=usage,
+                    raw_response=data
+                )
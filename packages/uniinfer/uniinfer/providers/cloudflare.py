@@ -1,11 +1,11 @@
 """
 Cloudflare Workers AI provider implementation.
 """
-import json
-import requests
 from typing import Dict, Any, Iterator, Optional, List
 
 from ..core import ChatProvider, ChatCompletionRequest, ChatCompletionResponse, ChatMessage
+from ..factory import ProviderFactory
+from ..streaming import iter_sse
 from ..errors import map_provider_error, AuthenticationError
 
 
@@ -99,7 +99,7 @@ class CloudflareProvider(ChatProvider):
             params["source"] = source
 
         try:
-            response = requests.get(
+            response = ProviderFactory.get_transport().get(
                 f"https://api.cloudflare.com/client/v4/accounts/{account_id}/ai/models/search",
                 headers=headers,
                 params=params
@@ -245,7 +245,7 @@ class CloudflareProvider(ChatProvider):
                 data[key] = value
 
             # Make the API call - exactly as in the working example
-            response = requests.post(
+            response = self.transport.post(
                 self.base_url + model,
                 headers=self.headers,
                 json=data
@@ -343,7 +343,7 @@ class CloudflareProvider(ChatProvider):
             print(f"Streaming data: {data}")
 
             # Make the streaming API call with stream=True
-            response = requests.post(
+            response = self.transport.post(
                 self.base_url + model,
                 headers=self.headers,
                 json=data,
@@ -355,68 +355,45 @@ class CloudflareProvider(ChatProvider):
                 error_msg = f"Cloudflare API error: {response.status_code} - {response.text}"
                 raise Exception(error_msg)
 
-            # Process the streaming response line by line
+            # Process the streaming response event by event
             accumulated_text = ""
-            for line in response.iter_lines():
-                if line:
-                    chunk_data = line.decode("utf-8").strip()
-                    if chunk_data.startswith("data: "):
-                        chunk_data = chunk_data[len("data: "):]
-                    try:
-                        # Parse the JSON (may raise JSONDecodeError)
-                        json_chunk = json.loads(chunk_data)
-
-                        # Extract the chunk text based on the response format
-                        chunk_text = ""
-                        if "response" in json_chunk:  # Most common format
-                            chunk_text = json_chunk["response"]
-                        elif "result" in json_chunk:
-                            if isinstance(json_chunk["result"], str):
-                                chunk_text = json_chunk["result"]
-                            elif isinstance(json_chunk["result"], dict) and "response" in json_chunk["result"]:
-                                chunk_text = json_chunk["result"]["response"]
-
-                        if not chunk_text:
-                            continue
-
-                        # Extract the chunk text based on the response format
-                        chunk_text = ""
-                        if "response" in json_chunk:  # Most common format
-                            chunk_text = json_chunk["response"]
-                        elif "result" in json_chunk:
-                            if isinstance(json_chunk["result"], str):
-                                chunk_text = json_chunk["result"]
-                            elif isinstance(json_chunk["result"], dict) and "response" in json_chunk["result"]:
-                                chunk_text = json_chunk["result"]["response"]
-
-                        if not chunk_text:
-                            continue
-
-                        # Create a message for this chunk
-                        message = ChatMessage(
-                            role="assistant",
-                            content=chunk_text
-                        )
-
-                        # Yield the chunk as a response
-                        yield ChatCompletionResponse(
-                            message=message,
-                            provider='cloudflare',
-                            model=model,
-                            usage={},
-                            raw_response=json_chunk
-                        )
-
-                        # Accumulate the text for potential error recovery
-                        accumulated_text += chunk_text
-
-                    except json.JSONDecodeError:
-                        # Skip malformed chunks
-                        continue
-                    except Exception as chunk_error:
-                        print(f"Error processing chunk: {str(chunk_error)}")
+            for json_chunk in iter_sse(response):
+                try:
+                    # Extract the chunk text based on the response format
+                    chunk_text = ""
+                    if "response" in json_chunk:  # Most common format
+                        chunk_text = json_chunk["response"]
+                    elif "result" in json_chunk:
+                        if isinstance(json_chunk["result"], str):
+                            chunk_text = json_chunk["result"]
+                        elif isinstance(json_chunk["result"], dict) and "response" in json_chunk["result"]:
+                            chunk_text = json_chunk["result"]["response"]
+
+                    if not chunk_text:
                         continue
 
+                    # Create a message for this chunk
+                    message = ChatMessage(
+                        role="assistant",
+                        content=chunk_text
+                    )
+
+                    # Yield the chunk as a response
+                    yield ChatCompletionResponse(
+                        message=message,
+                        provider='cloudflare',
+                        model=model,
+                        usage={},
+                        raw_response=json_chunk
+                    )
+
+                    # Accumulate the text for potential error recovery
+                    accumulated_text += chunk_text
+
+                except Exception as chunk_error:
+                    print(f"Error processing chunk: {str(chunk_error)}")
+                    continue
+
             # If we didn't yield any chunks but got a response, handle as fallback
             if not accumulated_text and response.content:
                 try:
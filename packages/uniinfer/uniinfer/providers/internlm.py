@@ -2,10 +2,11 @@
 InternLM provider implementation.
 """
 import json
-import requests
 from typing import Dict, Any, Iterator, Optional
 
 from ..core import ChatProvider, ChatCompletionRequest, ChatCompletionResponse, ChatMessage
+from ..factory import ProviderFactory
+from ..streaming import iter_sse
 
 try:
     from openai import OpenAI
@@ -75,7 +76,7 @@ class InternLMProvider(ChatProvider):
                 headers = {
                     "Authorization": f"Bearer {api_key}"
                 }
-                response = requests.get(
+                response = ProviderFactory.get_transport().get(
                     "https://chat.intern-ai.org.cn/api/v1/models",
                     headers=headers
                 )
@@ -205,7 +206,7 @@ class InternLMProvider(ChatProvider):
             "Authorization": f"Bearer {self.api_key}"
         }
 
-        response = requests.post(
+        response = self.transport.post(
             endpoint,
             headers=headers,
             data=json.dumps(payload)
@@ -365,7 +366,7 @@ class InternLMProvider(ChatProvider):
             "Authorization": f"Bearer {self.api_key}"
         }
 
-        with requests.post(
+        with self.transport.post(
             endpoint,
             headers=headers,
             data=json.dumps(payload),
@@ -376,29 +377,11 @@ class InternLMProvider(ChatProvider):
                 error_msg = f"InternLM API error: {response.status_code} - {response.text}"
                 raise Exception(error_msg)
 
-            # Process the streaming response using recommended chunk_size and delimiter
-            for chunk in response.iter_lines(chunk_size=8192, decode_unicode=False, delimiter=b'\n'):
-                if not chunk:
-                    continue
-
-                decoded = chunk.decode('utf-8')
-
-                # Handle special format of InternLM responses
-                if not decoded.startswith("data:"):
-                    raise Exception(f"InternLM API error message: {decoded}")
-
-                # Extract JSON data
-                decoded = decoded.strip("data:").strip()
-
-                # Check for end of stream
-                if decoded == "[DONE]":
-                    break
-
-                # Parse JSON
-                try:
-                    data = json.loads(decoded)
-                except json.JSONDecodeError:
-                    continue
+            # Process the streaming response; InternLM reports some errors as a
+            # plain (non "data:") body, which yields no events at all
+            received = False
+            for data in iter_sse(response):
+                received = True
 
                 # Check for error
                 if data.get("object") == "error":
@@ -425,3 +408,6 @@ class InternLMProvider(ChatProvider):
                     usage=usage,
                     raw_response=data
                 )
+
+            if not received:
+                raise Exception("InternLM API error message: stream contained no data events")
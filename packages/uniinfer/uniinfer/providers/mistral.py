@@ -2,10 +2,11 @@
 Mistral AI provider implementation.
 """
 import json
-import requests
 from typing import Dict, Any, Iterator, Optional
 
 from ..core import ChatProvider, ChatCompletionRequest, ChatCompletionResponse, ChatMessage
+from ..factory import ProviderFactory
+from ..streaming import iter_sse
 
 
 class MistralProvider(ChatProvider):
@@ -59,7 +60,7 @@ class MistralProvider(ChatProvider):
         headers = {
             "Authorization": f"Bearer {api_key}"
         }
-        response = requests.get(endpoint, headers=headers)
+        response = ProviderFactory.get_transport().get(endpoint, headers=headers)
 
         if response.status_code != 200:
             raise Exception(
@@ -111,7 +112,7 @@ class MistralProvider(ChatProvider):
             "Authorization": f"Bearer {self.api_key}"
         }
 
-        response = requests.post(
+        response = self.transport.post(
             endpoint,
             headers=headers,
             data=json.dumps(payload)
@@ -181,7 +182,7 @@ class MistralProvider(ChatProvider):
             "Authorization": f"Bearer {self.api_key}"
         }
 
-        with requests.post(
+        with self.transport.post(
             endpoint,
             headers=headers,
             data=json.dumps(payload),
@@ -193,35 +194,19 @@ class MistralProvider(ChatProvider):
                 raise Exception(error_msg)
 
             # Process the streaming response
-            for line in response.iter_lines():
-                if line:
-                    # Parse the JSON data from the stream
-                    try:
-                        data = line.decode('utf-8')
-                        if data.startswith('data: '):
-                            data = data[6:]  # Remove 'data: ' prefix
-
-                        # Skip empty lines or [DONE]
-                        if not data or data == '[DONE]':
-                            continue
-
-                        chunk = json.loads(data)
-
-                        if 'choices' in chunk:
-                            choice = chunk['choices'][0]
-                            role = choice['delta'].get('role', 'assistant')
-                            content = choice['delta'].get('content', '')
-
-                            # Create a message for this chunk
-                            message = ChatMessage(role=role, content=content)
-
-                            yield ChatCompletionResponse(
-                                message=message,
-                                provider='mistral',
-                                model=chunk.get('model', request.model),
-                                usage=chunk.get('usage', {}),
-                                raw_response=chunk
-                            )
-                    except json.JSONDecodeError:
-                        # Skip invalid JSON lines
-                        continue
+            for chunk in iter_sse(response):
+                if 'choices' in chunk:
+                    choice = chunk['choices'][0]
+                    role = choice['delta'].get('role', 'assistant')
+                    content = choice['delta'].get('content', '')
+
+                    # Create a message for this chunk
+                    message = ChatMessage(role=role, content=content)
+
+                    yield ChatCompletionResponse(
+                        message=message,
+                        provider='mistral',
+                        model=chunk.get('model', request.model),
+                        usage=chunk.get('usage', {}),
+                        raw_response=chunk
+                    )
@@ -1,10 +1,10 @@
 """
 Moonshot provider implementation.
 """
-import requests
 from typing import Dict, Any, Iterator, Optional
 
 from ..core import ChatProvider, ChatCompletionRequest, ChatCompletionResponse, ChatMessage
+from ..factory import ProviderFactory
 
 try:
     from openai import OpenAI
@@ -71,7 +71,7 @@ class MoonshotProvider(ChatProvider):
         }
 
         try:
-            response = requests.get(
+            response = ProviderFactory.get_transport().get(
                 "https://api.moonshot.cn/v1/models",
                 headers=headers
             )
@@ -2,10 +2,11 @@
 Ollama provider implementation.
 """
 import json
-import requests
-from typing import Dict, Any, Iterator, Optional
+from typing import Dict, Any, Iterator, AsyncIterator, Optional
 
 from ..core import ChatProvider, ChatCompletionRequest, ChatCompletionResponse, ChatMessage
+from ..factory import ProviderFactory
+from ..streaming import aiter_ndjson, iter_ndjson
 
 
 def _normalize_base_url(base_url: str) -> str:
@@ -70,7 +71,7 @@ class OllamaProvider(ChatProvider):
                 endpoint = f"{base_url}/api/tags"
             print(f"Using Ollama endpoint: {endpoint}")  # Verbose logging
 
-            response = requests.get(endpoint)
+            response = ProviderFactory.get_transport().get(endpoint)
             response.raise_for_status()
 
             data = response.json()
@@ -88,33 +89,17 @@ class OllamaProvider(ChatProvider):
                 "error listing models",
             ]
 
-    def complete(
+    def _build_payload(
         self,
         request: ChatCompletionRequest,
-        **provider_specific_kwargs
-    ) -> ChatCompletionResponse:
-        """
-        Make a chat completion request to Ollama.
-
-        Args:
-            request (ChatCompletionRequest): The request to make.
-            **provider_specific_kwargs: Additional Ollama-specific parameters.
-
-        Returns:
-            ChatCompletionResponse: The completion response.
-
-        Raises:
-            Exception: If the request fails.
-        """
-        # Ensure URL normalized (localhost allowed)
-        base_url = _normalize_base_url(self.base_url)
-        endpoint = f"{base_url}/api/chat"
-
-        # Prepare the request payload
+        stream: bool,
+        provider_specific_kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the /api/chat payload."""
         payload = {
             "model": request.model or "llama2",  # Default to llama2 if no model specified
             "messages": [{"role": msg.role, "content": msg.content} for msg in request.messages],
-            "stream": False,
+            "stream": stream,
             "options": {}
         }
 
@@ -135,25 +120,10 @@ class OllamaProvider(ChatProvider):
                 else:
                     # Add top-level parameters
                     payload[key] = value
+        return payload
 
-        headers = {
-            "Content-Type": "application/json"
-        }
-
-        response = requests.post(
-            endpoint,
-            headers=headers,
-            data=json.dumps(payload)
-        )
-
-        # Handle error response
-        if response.status_code != 200:
-            error_msg = f"Ollama API error: {response.status_code} - {response.text}"
-            raise Exception(error_msg)
-
-        # Parse the response
-        response_data = response.json()
-
+    def _parse_response(self, response_data: Dict[str, Any], request: ChatCompletionRequest) -> ChatCompletionResponse:
+        """Convert an /api/chat response body into a ChatCompletionResponse."""
         # Extract the message content
         assistant_message = response_data["message"]
 
@@ -180,6 +150,63 @@ class OllamaProvider(ChatProvider):
             raw_response=response_data
         )
 
+    def _parse_stream_event(self, data: dict, request: ChatCompletionRequest) -> Optional[ChatCompletionResponse]:
+        """Convert one decoded NDJSON event into a chunk, or None for the final done event."""
+        # Check if this is a message or a done event
+        if "done" in data and data["done"]:
+            return None
+
+        # Extract content
+        content = ""
+        if "message" in data and "content" in data["message"]:
+            content = data["message"]["content"]
+
+        # Basic usage stats (Ollama stream doesn't have detailed usage per chunk)
+        return ChatCompletionResponse(
+            message=ChatMessage(role="assistant", content=content),
+            provider='ollama',
+            model=data.get('model', request.model),
+            usage={},
+            raw_response=data
+        )
+
+    def complete(
+        self,
+        request: ChatCompletionRequest,
+        **provider_specific_kwargs
+    ) -> ChatCompletionResponse:
+        """
+        Make a chat completion request to Ollama.
+
+        Args:
+            request (ChatCompletionRequest): The request to make.
+            **provider_specific_kwargs: Additional Ollama-specific parameters.
+
+        Returns:
+            ChatCompletionResponse: The completion response.
+
+        Raises:
+            Exception: If the request fails.
+        """
+        # Ensure URL normalized (localhost allowed)
+        base_url = _normalize_base_url(self.base_url)
+        endpoint = f"{base_url}/api/chat"
+        payload = self._build_payload(
+            request, False, provider_specific_kwargs)
+
+        response = self.transport.post(
+            endpoint,
+            headers={"Content-Type": "application/json"},
+            data=json.dumps(payload)
+        )
+
+        # Handle error response
+        if response.status_code != 200:
+            error_msg = f"Ollama API error: {response.status_code} - {response.text}"
+            raise Exception(error_msg)
+
+        return self._parse_response(response.json(), request)
+
     def stream_complete(
         self,
         request: ChatCompletionRequest,
@@ -201,77 +228,96 @@ class OllamaProvider(ChatProvider):
         # Ensure URL normalized (localhost allowed)
         base_url = _normalize_base_url(self.base_url)
         endpoint = f"{base_url}/api/chat"
+        payload = self._build_payload(request, True, provider_specific_kwargs)
 
-        # Prepare the request payload
-        payload = {
-            "model": request.model or "llama2",  # Default to llama2 if no model specified
-            "messages": [{"role": msg.role, "content": msg.content} for msg in request.messages],
-            "stream": True,
-            "options": {}
-        }
+        with self.transport.post(
+            endpoint,
+            headers={"Content-Type": "application/json"},
+            data=json.dumps(payload),
+            stream=True
+        ) as response:
+            # Handle error response
+            if response.status_code != 200:
+                error_msg = f"Ollama API error: {response.status_code} - {response.text}"
+                raise Exception(error_msg)
 
-        # Add temperature if provided
-        if request.temperature is not None:
-            payload["options"]["temperature"] = request.temperature
+            # Process the streaming response
+            for data in iter_ndjson(response):
+                chunk = self._parse_stream_event(data, request)
+                if chunk is not None:
+                    yield chunk
 
-        # Add token limit if provided
-        if request.max_tokens is not None:
-            payload["options"]["num_predict"] = request.max_tokens
+    async def acomplete(
+        self,
+        request: ChatCompletionRequest,
+        **provider_specific_kwargs
+    ) -> ChatCompletionResponse:
+        """
+        Make a chat completion request to Ollama on the event loop.
 
-        # Add any provider-specific parameters
-        if provider_specific_kwargs:
-            for key, value in provider_specific_kwargs.items():
-                if key == "options" and isinstance(value, dict):
-                    # Merge options dictionaries
-                    payload["options"].update(value)
-                else:
-                    # Add top-level parameters
-                    payload[key] = value
+        Args:
+            request (ChatCompletionRequest): The request to make.
+            **provider_specific_kwargs: Additional Ollama-specific parameters.
 
-        headers = {
-            "Content-Type": "application/json"
-        }
+        Returns:
+            ChatCompletionResponse: The completion response.
 
-        with requests.post(
+        Raises:
+            Exception: If the request fails.
+        """
+        base_url = _normalize_base_url(self.base_url)
+        endpoint = f"{base_url}/api/chat"
+        payload = self._build_payload(
+            request, False, provider_specific_kwargs)
+
+        response = await self.transport.apost(
             endpoint,
-            headers=headers,
-            data=json.dumps(payload),
-            stream=True
+            headers={"Content-Type": "application/json"},
+            content=json.dumps(payload)
+        )
+
+        # Handle error response
+        if response.status_code != 200:
+            error_msg = f"Ollama API error: {response.status_code} - {response.text}"
+            raise Exception(error_msg)
+
+        return self._parse_response(response.json(), request)
+
+    async def astream_complete(
+        self,
+        request: ChatCompletionRequest,
+        **provider_specific_kwargs
+    ) -> AsyncIterator[ChatCompletionResponse]:
+        """
+        Stream a chat completion response from Ollama on the event loop.
+
+        Args:
+            request (ChatCompletionRequest): The request to make.
+            **provider_specific_kwargs: Additional Ollama-specific parameters.
+
+        Returns:
+            AsyncIterator[ChatCompletionResponse]: An async iterator of response chunks.
+
+        Raises:
+            Exception: If the request fails.
+        """
+        base_url = _normalize_base_url(self.base_url)
+        endpoint = f"{base_url}/api/chat"
+        payload = self._build_payload(request, True, provider_specific_kwargs)
+
+        async with self.transport.astream(
+            "POST",
+            endpoint,
+            headers={"Content-Type": "application/json"},
+            content=json.dumps(payload)
         ) as response:
             # Handle error response
             if response.status_code != 200:
+                await response.aread()
                 error_msg = f"Ollama API error: {response.status_code} - {response.text}"
                 raise Exception(error_msg)
 
-            # Process the streaming response
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        data = json.loads(line.decode('utf-8'))
-
-                        # Check if this is a message or a done event
-                        if "done" in data and data["done"]:
-                            continue
-
-                        # Extract content
-                        content = ""
-                        if "message" in data and "content" in data["message"]:
-                            content = data["message"]["content"]
-
-                        # Create a message for this chunk
-                        message = ChatMessage(
-                            role="assistant", content=content)
-
-                        # Basic usage stats (Ollama stream doesn't have detailed usage per chunk)
-                        usage = {}
-
-                        yield ChatCompletionResponse(
-                            message=message,
-                            provider='ollama',
-                            model=data.get('model', request.model),
-                            usage=usage,
-                            raw_response=data
-                        )
-                    except json.JSONDecodeError:
-                        # Skip invalid JSON lines
-                        continue
+            async for data in aiter_ndjson(response):
+                chunk = self._parse_stream_event(data, request)
+                if chunk is not None:
+                    yield chunk
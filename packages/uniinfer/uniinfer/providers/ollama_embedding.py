@@ -2,10 +2,10 @@
 Ollama embedding provider implementation.
 """
 import json
-import requests
 from typing import List, Dict, Any, Optional
 
 from ..core import EmbeddingProvider, EmbeddingRequest, EmbeddingResponse
+from ..factory import ProviderFactory
 
 
 def _normalize_base_url(base_url: str) -> str:
@@ -35,6 +35,9 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
     This provider requires a running Ollama instance.
     """
 
+    # Keeps /api/embed requests well below typical proxy body limits
+    MAX_BATCH_SIZE = 64
+
     def __init__(self, api_key: Optional[str] = None, base_url: str = "https://localhost:11434", **kwargs):
         """
         Initialize the Ollama embedding provider.
@@ -70,7 +73,7 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
                 endpoint = f"{base_url}/api/tags"
             print(f"Using Ollama endpoint: {endpoint}")  # Verbose logging
 
-            response = requests.get(endpoint)
+            response = ProviderFactory.get_transport().get(endpoint)
             response.raise_for_status()
 
             data = response.json()
@@ -88,6 +91,38 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
                 "error listing models",
             ]
 
+    def _build_payload(self, request: EmbeddingRequest, provider_specific_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the /api/embed payload."""
+        payload = {
+            # Default to nomic-embed-text if no model specified
+            "model": request.model or "nomic-embed-text",
+            "input": request.input
+        }
+
+        # Add any provider-specific parameters
+        if provider_specific_kwargs:
+            for key, value in provider_specific_kwargs.items():
+                payload[key] = value
+        return payload
+
+    def _parse_response(self, response_data: Dict[str, Any], request: EmbeddingRequest) -> EmbeddingResponse:
+        """Convert an /api/embed response body into an EmbeddingResponse."""
+        # Construct usage information (Ollama doesn't always provide detailed usage for embeddings)
+        usage = {
+            "prompt_tokens": response_data.get("prompt_eval_count", 0),
+            "total_tokens": response_data.get("prompt_eval_count", 0)
+        }
+
+        # The vectors go into a float32 matrix; raw_response keeps the metadata only
+        return EmbeddingResponse(
+            object="list",
+            embeddings=response_data.get("embeddings", []),
+            model=response_data.get('model', request.model),
+            usage=usage,
+            provider='ollama',
+            raw_response={key: value for key, value in response_data.items() if key != "embeddings"}
+        )
+
     def embed(
         self,
         request: EmbeddingRequest,
@@ -109,26 +144,11 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
         # Ensure URL normalized (localhost allowed)
         base_url = _normalize_base_url(self.base_url)
         endpoint = f"{base_url}/api/embed"
+        payload = self._build_payload(request, provider_specific_kwargs)
 
-        # Prepare the request payload
-        payload = {
-            # Default to nomic-embed-text if no model specified
-            "model": request.model or "nomic-embed-text",
-            "input": request.input
-        }
-
-        # Add any provider-specific parameters
-        if provider_specific_kwargs:
-            for key, value in provider_specific_kwargs.items():
-                payload[key] = value
-
-        headers = {
-            "Content-Type": "application/json"
-        }
-
-        response = requests.post(
+        response = self.transport.post(
             endpoint,
-            headers=headers,
+            headers={"Content-Type": "application/json"},
             data=json.dumps(payload)
         )
 
@@ -137,32 +157,39 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
             error_msg = f"Ollama API error: {response.status_code} - {response.text}"
             raise Exception(error_msg)
 
-        # Parse the response
-        response_data = response.json()
+        return self._parse_response(response.json(), request)
 
-        # Extract the embeddings
-        embeddings = response_data.get("embeddings", [])
+    async def aembed(
+        self,
+        request: EmbeddingRequest,
+        **provider_specific_kwargs
+    ) -> EmbeddingResponse:
+        """
+        Make an embedding request to Ollama on the event loop.
 
-        # Create data entries
-        data = []
-        for i, embedding in enumerate(embeddings):
-            data.append({
-                "object": "embedding",
-                "embedding": embedding,
-                "index": i
-            })
+        Args:
+            request (EmbeddingRequest): The request to make.
+            **provider_specific_kwargs: Additional Ollama-specific parameters.
 
-        # Construct usage information (Ollama doesn't always provide detailed usage for embeddings)
-        usage = {
-            "prompt_tokens": response_data.get("prompt_eval_count", 0),
-            "total_tokens": response_data.get("prompt_eval_count", 0)
-        }
+        Returns:
+            EmbeddingResponse: The embedding response.
 
-        return EmbeddingResponse(
-            object="list",
-            data=data,
-            model=response_data.get('model', request.model),
-            usage=usage,
-            provider='ollama',
-            raw_response=response_data
+        Raises:
+            Exception: If the request fails.
+        """
+        base_url = _normalize_base_url(self.base_url)
+        endpoint = f"{base_url}/api/embed"
+        payload = self._build_payload(request, provider_specific_kwargs)
+
+        response = await self.transport.apost(
+            endpoint,
+            headers={"Content-Type": "application/json"},
+            content=json.dumps(payload)
         )
+
+        # Handle error response
+        if response.status_code != 200:
+            error_msg = f"Ollama API error: {response.status_code} - {response.text}"
+            raise Exception(error_msg)
+
+        return self._parse_response(response.json(), request)
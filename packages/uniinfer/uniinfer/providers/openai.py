@@ -2,27 +2,39 @@
 OpenAI provider implementation.
 """
 import json
-import requests
-from typing import Dict, Any, Iterator, Optional
+from typing import Dict, Any, Iterator, AsyncIterator, Optional
 
 from ..core import ChatProvider, ChatCompletionRequest, ChatCompletionResponse, ChatMessage
+from ..errors import http_error
+from ..factory import ProviderFactory
+from ..streaming import aiter_sse, iter_sse
 
 
 class OpenAIProvider(ChatProvider):
     """
     Provider for OpenAI API.
+
+    Also serves as the base class for OpenAI-compatible endpoints, which only
+    need to override the class attributes below.
     """
 
-    def __init__(self, api_key: Optional[str] = None, organization: Optional[str] = None):
+    BASE_URL = "https://api.openai.com/v1"
+    PROVIDER_NAME = "openai"
+    DEFAULT_MODEL = "gpt-3.5-turbo"
+    ORGANIZATION_HEADER = "OpenAI-Organization"
+    ERROR_LABEL = "OpenAI"
+
+    def __init__(self, api_key: Optional[str] = None, organization: Optional[str] = None, base_url: Optional[str] = None):
         """
         Initialize the OpenAI provider.
 
         Args:
             api_key (Optional[str]): The OpenAI API key.
             organization (Optional[str]): The OpenAI organization ID.
+            base_url (Optional[str]): Override for the API base URL (defaults to BASE_URL).
         """
         super().__init__(api_key)
-        self.base_url = "https://api.openai.com/v1"
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
         self.organization = organization
 
     @classmethod
@@ -36,18 +48,91 @@ class OpenAIProvider(ChatProvider):
         if not api_key:
             raise ValueError("API key is required to list models")
 
-        url = "https://api.openai.com/v1/models"
+        url = f"{cls.BASE_URL}/models"
         headers = {
             "Authorization": f"Bearer {api_key}",
         }
-        response = requests.get(url, headers=headers)
+        response = ProviderFactory.get_transport().get(url, headers=headers)
         if response.status_code != 200:
-            raise Exception(f"OpenAI API error: {response.status_code} - {response.text}")
+            raise Exception(f"{cls.ERROR_LABEL} API error: {response.status_code} - {response.text}")
 
         data = response.json()
         return [model["id"] for model in data.get("data", [])]
 
 
+    def _headers(self) -> Dict[str, str]:
+        """Build the request headers."""
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+
+        # Add organization header if provided
+        if self.organization:
+            headers[self.ORGANIZATION_HEADER] = self.organization
+        return headers
+
+    def _build_payload(
+        self,
+        request: ChatCompletionRequest,
+        stream: bool,
+        provider_specific_kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the chat completions payload."""
+        payload = {
+            "model": request.model or self.DEFAULT_MODEL,  # Default model if none specified
+            "messages": [{"role": msg.role, "content": msg.content} for msg in request.messages],
+            "temperature": request.temperature,
+        }
+        if stream:
+            payload["stream"] = True
+
+        # Add max_tokens if provided
+        if request.max_tokens is not None:
+            payload["max_tokens"] = request.max_tokens
+
+        # Add any provider-specific parameters (like functions, tools, etc.)
+        payload.update(provider_specific_kwargs)
+        return payload
+
+    def _parse_response(self, response_data: Dict[str, Any], request: ChatCompletionRequest) -> ChatCompletionResponse:
+        """Convert a chat completions response body into a ChatCompletionResponse."""
+        choice = response_data['choices'][0]
+        message = ChatMessage(
+            role=choice['message']['role'],
+            content=choice['message']['content']
+        )
+
+        return ChatCompletionResponse(
+            message=message,
+            provider=self.PROVIDER_NAME,
+            model=response_data.get('model', request.model),
+            usage=response_data.get('usage', {}),
+            raw_response=response_data
+        )
+
+    def _parse_stream_event(self, data: dict, request: ChatCompletionRequest) -> Optional[ChatCompletionResponse]:
+        """Convert one decoded SSE event into a chunk, or None if it carries no content."""
+        if len(data['choices']) == 0:
+            return None
+        choice = data['choices'][0]
+
+        # Skip if content not present
+        if 'delta' not in choice or 'content' not in choice['delta'] or not choice['delta']['content']:
+            return None
+
+        # Usage stats typically not provided in stream chunks
+        return ChatCompletionResponse(
+            message=ChatMessage(
+                role=choice['delta'].get('role', 'assistant'),
+                content=choice['delta']['content']
+            ),
+            provider=self.PROVIDER_NAME,
+            model=data.get('model', request.model),
+            usage={},
+            raw_response=data
+        )
+
     def complete(
         self,
         request: ChatCompletionRequest,
@@ -67,59 +152,24 @@ class OpenAIProvider(ChatProvider):
             Exception: If the request fails.
         """
         if self.api_key is None:
-            raise ValueError("OpenAI API key is required")
+            raise ValueError(f"{self.ERROR_LABEL} API key is required")
 
         endpoint = f"{self.base_url}/chat/completions"
+        payload = self._build_payload(
+            request, False, provider_specific_kwargs)
 
-        # Prepare the request payload
-        payload = {
-            "model": request.model or "gpt-3.5-turbo",  # Default model if none specified
-            "messages": [{"role": msg.role, "content": msg.content} for msg in request.messages],
-            "temperature": request.temperature,
-        }
-
-        # Add max_tokens if provided
-        if request.max_tokens is not None:
-            payload["max_tokens"] = request.max_tokens
-
-        # Add any provider-specific parameters (like functions, tools, etc.)
-        payload.update(provider_specific_kwargs)
-
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
-
-        # Add organization header if provided
-        if self.organization:
-            headers["OpenAI-Organization"] = self.organization
-
-        response = requests.post(
+        response = self.transport.post(
             endpoint,
-            headers=headers,
+            headers=self._headers(),
             data=json.dumps(payload)
         )
 
         # Handle error response
         if response.status_code != 200:
-            error_msg = f"OpenAI API error: {response.status_code} - {response.text}"
-            raise Exception(error_msg)
+            error_msg = f"{self.ERROR_LABEL} API error: {response.status_code} - {response.text}"
+            raise http_error(error_msg, response)
 
-        # Parse the response
-        response_data = response.json()
-        choice = response_data['choices'][0]
-        message = ChatMessage(
-            role=choice['message']['role'],
-            content=choice['message']['content']
-        )
-
-        return ChatCompletionResponse(
-            message=message,
-            provider='openai',
-            model=response_data.get('model', request.model),
-            usage=response_data.get('usage', {}),
-            raw_response=response_data
-        )
+        return self._parse_response(response.json(), request)
 
     def stream_complete(
         self,
@@ -140,89 +190,111 @@ class OpenAIProvider(ChatProvider):
             Exception: If the request fails.
         """
         if self.api_key is None:
-            raise ValueError("OpenAI API key is required")
+            raise ValueError(f"{self.ERROR_LABEL} API key is required")
 
         endpoint = f"{self.base_url}/chat/completions"
+        payload = self._build_payload(request, True, provider_specific_kwargs)
 
-        # Prepare the request payload
-        payload = {
-            "model": request.model or "gpt-3.5-turbo",
-            "messages": [{"role": msg.role, "content": msg.content} for msg in request.messages],
-            "temperature": request.temperature,
-            "stream": True
-        }
+        with self.transport.post(
+            endpoint,
+            headers=self._headers(),
+            data=json.dumps(payload),
+            stream=True
+        ) as response:
+            # Handle error response
+            if response.status_code != 200:
+                error_msg = f"{self.ERROR_LABEL} API error: {response.status_code} - {response.text}"
+                raise http_error(error_msg, response)
 
-        # Add max_tokens if provided
-        if request.max_tokens is not None:
-            payload["max_tokens"] = request.max_tokens
+            # Process the streaming response
+            for data in iter_sse(response):
+                try:
+                    chunk = self._parse_stream_event(data, request)
+                except Exception:
+                    # Skip malformed chunks
+                    continue
+                if chunk is not None:
+                    yield chunk
+
+    async def acomplete(
+        self,
+        request: ChatCompletionRequest,
+        **provider_specific_kwargs
+    ) -> ChatCompletionResponse:
+        """
+        Make a chat completion request to OpenAI on the event loop.
 
-        # Add any provider-specific parameters
-        payload.update(provider_specific_kwargs)
+        Args:
+            request (ChatCompletionRequest): The request to make.
+            **provider_specific_kwargs: Additional OpenAI-specific parameters.
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
+        Returns:
+            ChatCompletionResponse: The completion response.
 
-        # Add organization header if provided
-        if self.organization:
-            headers["OpenAI-Organization"] = self.organization
+        Raises:
+            Exception: If the request fails.
+        """
+        if self.api_key is None:
+            raise ValueError(f"{self.ERROR_LABEL} API key is required")
 
-        with requests.post(
+        endpoint = f"{self.base_url}/chat/completions"
+        payload = self._build_payload(
+            request, False, provider_specific_kwargs)
+
+        response = await self.transport.apost(
             endpoint,
-            headers=headers,
-            data=json.dumps(payload),
-            stream=True
+            headers=self._headers(),
+            content=json.dumps(payload)
+        )
+
+        # Handle error response
+        if response.status_code != 200:
+            error_msg = f"{self.ERROR_LABEL} API error: {response.status_code} - {response.text}"
+            raise http_error(error_msg, response)
+
+        return self._parse_response(response.json(), request)
+
+    async def astream_complete(
+        self,
+        request: ChatCompletionRequest,
+        **provider_specific_kwargs
+    ) -> AsyncIterator[ChatCompletionResponse]:
+        """
+        Stream a chat completion response from OpenAI on the event loop.
+
+        Args:
+            request (ChatCompletionRequest): The request to make.
+            **provider_specific_kwargs: Additional OpenAI-specific parameters.
+
+        Returns:
+            AsyncIterator[ChatCompletionResponse]: An async iterator of response chunks.
+
+        Raises:
+            Exception: If the request fails.
+        """
+        if self.api_key is None:
+            raise ValueError(f"{self.ERROR_LABEL} API key is required")
+
+        endpoint = f"{self.base_url}/chat/completions"
+        payload = self._build_payload(request, True, provider_specific_kwargs)
+
+        async with self.transport.astream(
+            "POST",
+            endpoint,
+            headers=self._headers(),
+            content=json.dumps(payload)
         ) as response:
             # Handle error response
             if response.status_code != 200:
-                error_msg = f"OpenAI API error: {response.status_code} - {response.text}"
-                raise Exception(error_msg)
-
-            # Process the streaming response
-            for line in response.iter_lines():
-                if line:
-                    # Parse the JSON data from the stream
-                    try:
-                        line = line.decode('utf-8')
-
-                        # Skip empty lines, data: [DONE], or invalid lines
-                        if not line or line == 'data: [DONE]' or not line.startswith('data: '):
-                            continue
-
-                        # Parse the data portion
-                        data_str = line[6:]  # Remove 'data: ' prefix
-                        data = json.loads(data_str)
-
-                        if len(data['choices']) > 0:
-                            choice = data['choices'][0]
-
-                            # Skip if content not present
-                            if 'delta' not in choice or 'content' not in choice['delta'] or not choice['delta']['content']:
-                                continue
-
-                            # Get content from delta
-                            content = choice['delta']['content']
-
-                            # Create a message for this chunk
-                            message = ChatMessage(
-                                role=choice['delta'].get('role', 'assistant'),
-                                content=content
-                            )
-
-                            # Usage stats typically not provided in stream chunks
-                            usage = {}
-
-                            yield ChatCompletionResponse(
-                                message=message,
-                                provider='openai',
-                                model=data.get('model', request.model),
-                                usage=usage,
-                                raw_response=data
-                            )
-                    except json.JSONDecodeError:
-                        # Skip invalid JSON lines
-                        continue
-                    except Exception as e:
-                        # Skip other errors in individual chunks
-                        continue
+                await response.aread()
+                error_msg = f"{self.ERROR_LABEL} API error: {response.status_code} - {response.text}"
+                raise http_error(error_msg, response)
+
+            async for data in aiter_sse(response):
+                try:
+                    chunk = self._parse_stream_event(data, request)
+                except Exception:
+                    # Skip malformed chunks
+                    continue
+                if chunk is not None:
+                    yield chunk
@@ -4,10 +4,12 @@ OpenRouter provider implementation.
 OpenRouter is a unified API to access multiple AI models from different providers.
 """
 import json
-import requests
 from typing import Dict, Any, Iterator, Optional
 
 from ..core import ChatProvider, ChatCompletionRequest, ChatCompletionResponse, ChatMessage
+from ..errors import http_error
+from ..factory import ProviderFactory
+from ..streaming import iter_sse
 
 
 class OpenRouterProvider(ChatProvider):
@@ -68,11 +70,11 @@ class OpenRouterProvider(ChatProvider):
             "X-Title": "UniInfer"
         }
 
-        response = requests.get(endpoint, headers=headers)
+        response = ProviderFactory.get_transport().get(endpoint, headers=headers)
 
         if response.status_code != 200:
             error_msg = f"OpenRouter API error: {response.status_code} - {response.text}"
-            raise Exception(error_msg)
+            raise http_error(error_msg, response)
 
         models = response.json().get('data', [])
         free_models = [
@@ -128,7 +130,7 @@ class OpenRouterProvider(ChatProvider):
             "X-Title": "UniInfer"  # Application name for OpenRouter
         }
 
-        response = requests.post(
+        response = self.transport.post(
             endpoint,
             headers=headers,
             data=json.dumps(payload)
@@ -137,7 +139,7 @@ class OpenRouterProvider(ChatProvider):
         # Handle error response
         if response.status_code != 200:
             error_msg = f"OpenRouter API error: {response.status_code} - {response.text}"
-            raise Exception(error_msg)
+            raise http_error(error_msg, response)
 
         # Parse the response
         response_data = response.json()
@@ -203,7 +205,7 @@ class OpenRouterProvider(ChatProvider):
             "X-Title": "UniInfer"
         }
 
-        with requests.post(
+        with self.transport.post(
             endpoint,
             headers=headers,
             data=json.dumps(payload),
@@ -212,56 +214,38 @@ class OpenRouterProvider(ChatProvider):
             # Handle error response
             if response.status_code != 200:
                 error_msg = f"OpenRouter API error: {response.status_code} - {response.text}"
-                raise Exception(error_msg)
+                raise http_error(error_msg, response)
 
             # Process the streaming response
-            for line in response.iter_lines():
-                if line:
-                    # Parse the JSON data from the stream
-                    try:
-                        line = line.decode('utf-8')
+            for data in iter_sse(response):
+                # Skip non-content deltas
+                if 'choices' not in data or not data['choices']:
+                    continue
 
-                        # Skip empty lines or [DONE]
-                        if not line or line == 'data: [DONE]':
-                            continue
+                choice = data['choices'][0]
 
-                        # Remove 'data: ' prefix if present
-                        if line.startswith('data: '):
-                            line = line[6:]
+                if 'delta' not in choice or 'content' not in choice['delta'] or not choice['delta']['content']:
+                    continue
 
-                        data = json.loads(line)
+                # Extract content delta
+                content = choice['delta']['content']
 
-                        # Skip non-content deltas
-                        if 'choices' not in data or not data['choices']:
-                            continue
+                # Get role from delta or default to assistant
+                role = choice['delta'].get('role', 'assistant')
 
-                        choice = data['choices'][0]
+                # Create a message for this chunk
+                message = ChatMessage(role=role, content=content)
 
-                        if 'delta' not in choice or 'content' not in choice['delta'] or not choice['delta']['content']:
-                            continue
+                # Usage stats typically not provided in stream chunks
+                usage = {}
 
-                        # Extract content delta
-                        content = choice['delta']['content']
+                # Get model info if available
+                model = data.get('model', request.model)
 
-                        # Get role from delta or default to assistant
-                        role = choice['delta'].get('role', 'assistant')
-
-                        # Create a message for this chunk
-                        message = ChatMessage(role=role, content=content)
-
-                        # Usage stats typically not provided in stream chunks
-                        usage = {}
-
-                        # Get model info if available
-                        model = data.get('model', request.model)
-
-                        yield ChatCompletionResponse(
-                            message=message,
-                            provider='openrouter',
-                            model=model,
-                            usage=usage,
-                            raw_response=data
-                        )
-                    except json.JSONDecodeError:
-                        # Skip invalid JSON lines
-                        continue
+                yield ChatCompletionResponse(
+                    message=message,
+                    provider='openrouter',
+                    model=model,
+                    usage=usage,
+                    raw_response=data
+                )
@@ -9,6 +9,9 @@ import urllib.parse
 import json
 
 from ..core import ChatProvider, ChatCompletionRequest, ChatCompletionResponse, ChatMessage
+from ..errors import http_error
+from ..factory import ProviderFactory
+from ..streaming import iter_sse
 
 
 class PollinationsProvider(ChatProvider):
@@ -67,11 +70,11 @@ class PollinationsProvider(ChatProvider):
             "Content-Type": "application/json"
         }
 
-        response = requests.get(endpoint, headers=headers)
+        response = ProviderFactory.get_transport().get(endpoint, headers=headers)
 
         if response.status_code != 200:
             error_msg = f"Pollinations API error: {response.status_code} - {response.text}"
-            raise Exception(error_msg)
+            raise http_error(error_msg, response)
 
         models = response.json()
         # Handle the API response format which is a list of model objects with 'name' field
@@ -131,11 +134,11 @@ class PollinationsProvider(ChatProvider):
         url = f"{self.base_url}/{encoded_prompt}"
 
         try:
-            response = requests.get(url, params=params)
+            response = self.transport.get(url, params=params)
 
             if response.status_code != 200:
                 error_msg = f"Pollinations API error: {response.status_code} - {response.text}"
-                raise Exception(error_msg)
+                raise http_error(error_msg, response)
 
             # Handle JSON response if requested
             if params.get("json") == "true":
@@ -222,7 +225,7 @@ class PollinationsProvider(ChatProvider):
             "Authorization": f"Bearer {self.api_key}"
         }
 
-        with requests.get(
+        with self.transport.get(
             url,
             params=params,
             headers=headers,
@@ -230,64 +233,24 @@ class PollinationsProvider(ChatProvider):
         ) as response:
             if response.status_code != 200:
                 error_msg = f"Pollinations API error: {response.status_code} - {response.text}"
-                raise Exception(error_msg)
-
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        line = line.decode('utf-8').strip()
-                        if not line or not line.startswith('data: '):
-                            continue
-                        data = line[6:]
-                        if data == '[DONE]':
-                            break
-                        chunk = data.strip()
-                        if not chunk:
-                            continue
-                        data_json = json.loads(chunk)
-                        if 'choices' not in data_json or not data_json['choices']:
-                            continue
-                        choice = data_json['choices'][0]
-                        # Pollinations streaming: content is in delta.content
-                        if 'delta' not in choice or 'content' not in choice['delta'] or not choice['delta']['content']:
-                            continue
-                        content = choice['delta']['content']
-                        role = choice['delta'].get('role', 'assistant')
-                        message = ChatMessage(role=role, content=content)
-                        usage = {}
-                        model = data_json.get('model', request.model)
-                        yield ChatCompletionResponse(
-                            message=message,
-                            provider='pollinations',
-                            model=model,
-                            usage=usage,
-                            raw_response=data_json
-                        )
-                    except json.JSONDecodeError:
-                        continue
-                    except json.JSONDecodeError:
-                        continue
-                        content = choice['delta']['content']
-
-                        # Get role from delta or default to assistant
-                        role = choice['delta'].get('role', 'assistant')
-
-                        # Create a message for this chunk
-                        message = ChatMessage(role=role, content=content)
-
-                        # Usage stats typically not provided in stream chunks
-                        usage = {}
-
-                        # Get model info if available
-                        model = data.get('model', request.model)
-
-                        yield ChatCompletionResponse(
-                            message=message,
-                            provider='pollinations',
-                            model=model,
-                            usage=usage,
-                            raw_response=data
-                        )
-                    except json.JSONDecodeError:
-                        # Skip invalid JSON lines
-                        continue
+                raise http_error(error_msg, response)
+
+            for data in iter_sse(response):
+                if 'choices' not in data or not data['choices']:
+                    continue
+                choice = data['choices'][0]
+                # Pollinations streaming: content is in delta.content
+                if 'delta' not in choice or 'content' not in choice['delta'] or not choice['delta']['content']:
+                    continue
+                content = choice['delta']['content']
+                role = choice['delta'].get('role', 'assistant')
+                message = ChatMessage(role=role, content=content)
+                usage = {}
+                model = data.get('model', request.model)
+                yield ChatCompletionResponse(
+                    message=message,
+                    provider='pollinations',
+                    model=model,
+                    usage=usage,
+                    raw_response=data
+                )
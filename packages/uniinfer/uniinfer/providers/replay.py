@@ -0,0 +1,304 @@
+"""
+Record/replay provider for deterministic offline runs.
+
+In ``record`` mode the provider forwards requests to a real provider and
+appends each response, with its latency and per-chunk timings, to a JSONL
+file keyed by a hash of the request. In ``replay`` mode it answers from that
+file without network access, either with the recorded timing (``realtime``)
+or as fast as possible (``fast``). ``auto`` replays what is recorded and
+records the rest.
+
+The target provider is taken from the model name, so a pipeline only needs a
+``replay@`` prefix::
+
+    get_completion(messages, "replay@openai@gpt-4o-mini")
+
+Configuration comes from constructor arguments or the environment:
+``UNIINFER_REPLAY_MODE`` (record, replay or auto; default replay),
+``UNIINFER_REPLAY_PATH`` (default ``~/.uniinfer/replay.jsonl``) and
+``UNIINFER_REPLAY_TIMING`` (realtime or fast; default fast).
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from ..completion_cache import make_cache_key
+from ..core import ChatCompletionRequest, ChatCompletionResponse, ChatMessage, ChatProvider
+from ..errors import ProviderError
+
+RECORD = "record"
+REPLAY = "replay"
+AUTO = "auto"
+REALTIME = "realtime"
+FAST = "fast"
+DEFAULT_REPLAY_PATH = os.path.expanduser("~/.uniinfer/replay.jsonl")
+
+# path -> (file size when loaded, {key: {kind: record}}); shared by instances
+_recordings: Dict[str, Tuple[int, Dict[str, Dict[str, Dict[str, Any]]]]] = {}
+_recordings_lock = threading.Lock()
+
+
+def _load(path: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Return the records of a file, re-reading it when it has grown."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return {}
+    with _recordings_lock:
+        cached = _recordings.get(path)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        records: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a partially written last line
+                records.setdefault(record["key"], {})[record["kind"]] = record
+        _recordings[path] = (size, records)
+        return records
+
+
+def key_provider(model: str, mode: Optional[str] = None) -> Optional[str]:
+    """
+    Return the provider whose API key a replay request needs.
+
+    Replaying needs no key; recording forwards to the target provider named
+    in the model, so it needs that provider's key.
+
+    Args:
+        model (str): The replay model, ``provider@model``.
+        mode (Optional[str]): Replay mode; defaults to ``UNIINFER_REPLAY_MODE``.
+
+    Returns:
+        Optional[str]: The target provider name, or None if no key is needed.
+    """
+    mode = (mode or os.getenv("UNIINFER_REPLAY_MODE") or REPLAY).lower()
+    if mode == REPLAY or "@" not in model:
+        return None
+    return model.split("@", 1)[0]
+
+
+def _jsonable(value: Any) -> Any:
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return None
+
+
+class ReplayProvider(ChatProvider):
+    """
+    Records responses of a real provider and replays them offline.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        mode: Optional[str] = None,
+        path: Optional[str] = None,
+        timing: Optional[str] = None,
+        target: Optional[str] = None,
+        **target_kwargs
+    ):
+        """
+        Initialize the replay provider.
+
+        Args:
+            api_key (Optional[str]): Passed to the target provider when recording.
+            mode (Optional[str]): "record", "replay" or "auto".
+            path (Optional[str]): The JSONL recording file.
+            timing (Optional[str]): "realtime" to reproduce recorded latency and
+                chunk timing, "fast" to return immediately.
+            target (Optional[str]): Provider to record from when the model name
+                has no ``provider@`` prefix.
+            **target_kwargs: Passed to the target provider (e.g. base_url).
+        """
+        super().__init__(api_key)
+        self.mode = (mode or os.getenv("UNIINFER_REPLAY_MODE") or REPLAY).lower()
+        self.path = os.path.expanduser(path or os.getenv("UNIINFER_REPLAY_PATH") or DEFAULT_REPLAY_PATH)
+        self.timing = (timing or os.getenv("UNIINFER_REPLAY_TIMING") or FAST).lower()
+        self.target = target
+        self.target_kwargs = target_kwargs
+        if self.mode not in (RECORD, REPLAY, AUTO):
+            raise ValueError(f"Invalid replay mode '{self.mode}'. Expected record, replay or auto.")
+        if self.timing not in (REALTIME, FAST):
+            raise ValueError(f"Invalid replay timing '{self.timing}'. Expected realtime or fast.")
+        self._write_lock = threading.Lock()
+
+    @classmethod
+    def list_models(cls, api_key: Optional[str] = None, path: Optional[str] = None, **kwargs) -> List[str]:
+        """
+        List the models that have recordings.
+
+        Returns:
+            List[str]: ``provider@model`` names found in the recording file.
+        """
+        path = os.path.expanduser(path or os.getenv("UNIINFER_REPLAY_PATH") or DEFAULT_REPLAY_PATH)
+        return sorted({record["model"] for kinds in _load(path).values() for record in kinds.values()})
+
+    def _target(self, request: ChatCompletionRequest) -> Tuple[str, Optional[str]]:
+        """Split the request model into target provider and model."""
+        if request.model and "@" in request.model:
+            provider_name, model = request.model.split("@", 1)
+            return provider_name, model
+        if not self.target:
+            raise ValueError(
+                "Replay model must be 'provider@model' or the provider needs a target")
+        return self.target, request.model
+
+    def _key(self, request: ChatCompletionRequest, provider_specific_kwargs: Dict[str, Any]) -> str:
+        provider_name, model = self._target(request)
+        return make_cache_key(
+            provider_name, model, [msg.to_dict() for msg in request.messages],
+            request.temperature, request.max_tokens, provider_specific_kwargs)
+
+    def _target_request(self, request: ChatCompletionRequest) -> Tuple[ChatProvider, ChatCompletionRequest]:
+        from ..factory import ProviderFactory
+
+        provider_name, model = self._target(request)
+        provider = ProviderFactory.get_provider(provider_name, api_key=self.api_key, **self.target_kwargs)
+        return provider, ChatCompletionRequest(
+            messages=request.messages, model=model, temperature=request.temperature,
+            max_tokens=request.max_tokens, streaming=request.streaming)
+
+    def _lookup(self, key: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Return the record for a request, preferring the same kind (complete/stream)."""
+        if self.mode == RECORD:
+            return None
+        kinds = _load(self.path).get(key)
+        if kinds:
+            return kinds.get(kind) or next(iter(kinds.values()))
+        if self.mode == REPLAY:
+            raise ProviderError(f"No recorded response for this request in {self.path}")
+        return None
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._write_lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def _record(self, key: str, kind: str, request: ChatCompletionRequest, response: ChatCompletionResponse,
+                latency: float, chunks: Optional[List[List[Any]]] = None) -> None:
+        provider_name, model = self._target(request)
+        self._append({
+            "key": key,
+            "kind": kind,
+            "model": f"{provider_name}@{model}",
+            "role": response.message.role if response.message else "assistant",
+            "content": response.message.content if response.message else "",
+            "response_model": response.model,
+            "usage": response.usage or {},
+            "raw_response": _jsonable(response.raw_response),
+            "latency": latency,
+            "chunks": chunks,
+            "recorded_at": time.time(),
+        })
+
+    def _response(self, record: Dict[str, Any], content: str) -> ChatCompletionResponse:
+        return ChatCompletionResponse(
+            message=ChatMessage(role=record.get("role") or "assistant", content=content),
+            provider="replay",
+            model=record.get("response_model"),
+            usage=record.get("usage") or {},
+            raw_response=record.get("raw_response"),
+        )
+
+    @staticmethod
+    def _chunks(record: Dict[str, Any]) -> List[List[Any]]:
+        """Recorded [offset, content] pairs; a complete() recording is one chunk."""
+        return record.get("chunks") or [[record.get("latency", 0.0), record.get("content") or ""]]
+
+    def _delay(self, record: Dict[str, Any]) -> float:
+        return record.get("latency", 0.0) if self.timing == REALTIME else 0.0
+
+    def _content(self, record: Dict[str, Any]) -> str:
+        if record.get("chunks"):
+            return "".join(chunk[1] for chunk in record["chunks"])
+        return record.get("content") or ""
+
+    def complete(self, request: ChatCompletionRequest, **provider_specific_kwargs) -> ChatCompletionResponse:
+        """Replay a recorded completion or record a new one."""
+        key = self._key(request, provider_specific_kwargs)
+        record = self._lookup(key, "complete")
+        if record is not None:
+            time.sleep(self._delay(record))
+            return self._response(record, self._content(record))
+        provider, target_request = self._target_request(request)
+        started = time.perf_counter()
+        response = provider.complete(target_request, **provider_specific_kwargs)
+        self._record(key, "complete", request, response, time.perf_counter() - started)
+        return response
+
+    def stream_complete(self, request: ChatCompletionRequest, **provider_specific_kwargs) -> Iterator[ChatCompletionResponse]:
+        """Replay recorded chunks (with their timing in realtime mode) or record a stream."""
+        key = self._key(request, provider_specific_kwargs)
+        record = self._lookup(key, "stream")
+        if record is not None:
+            started = time.perf_counter()
+            for offset, content in self._chunks(record):
+                if self.timing == REALTIME:
+                    time.sleep(max(0.0, offset - (time.perf_counter() - started)))
+                yield self._response(record, content)
+            return
+        provider, target_request = self._target_request(request)
+        started = time.perf_counter()
+        chunks = []
+        last = None
+        for last in provider.stream_complete(target_request, **provider_specific_kwargs):
+            content = last.message.content if last.message else None
+            if content:
+                chunks.append([time.perf_counter() - started, content])
+            yield last
+        if last is not None:
+            self._record(key, "stream", request, ChatCompletionResponse(
+                message=ChatMessage(role="assistant", content="".join(c[1] for c in chunks)),
+                provider=last.provider, model=last.model, usage=last.usage,
+                raw_response=None), time.perf_counter() - started, chunks)
+
+    async def acomplete(self, request: ChatCompletionRequest, **provider_specific_kwargs) -> ChatCompletionResponse:
+        """Async counterpart of complete."""
+        key = self._key(request, provider_specific_kwargs)
+        record = self._lookup(key, "complete")
+        if record is not None:
+            await asyncio.sleep(self._delay(record))
+            return self._response(record, self._content(record))
+        provider, target_request = self._target_request(request)
+        started = time.perf_counter()
+        response = await provider.acomplete(target_request, **provider_specific_kwargs)
+        self._record(key, "complete", request, response, time.perf_counter() - started)
+        return response
+
+    async def astream_complete(self, request: ChatCompletionRequest, **provider_specific_kwargs) -> AsyncIterator[ChatCompletionResponse]:
+        """Async counterpart of stream_complete."""
+        key = self._key(request, provider_specific_kwargs)
+        record = self._lookup(key, "stream")
+        if record is not None:
+            started = time.perf_counter()
+            for offset, content in self._chunks(record):
+                if self.timing == REALTIME:
+                    await asyncio.sleep(max(0.0, offset - (time.perf_counter() - started)))
+                yield self._response(record, content)
+            return
+        provider, target_request = self._target_request(request)
+        started = time.perf_counter()
+        chunks = []
+        last = None
+        async for last in provider.astream_complete(target_request, **provider_specific_kwargs):
+            content = last.message.content if last.message else None
+            if content:
+                chunks.append([time.perf_counter() - started, content])
+            yield last
+        if last is not None:
+            self._record(key, "stream", request, ChatCompletionResponse(
+                message=ChatMessage(role="assistant", content="".join(c[1] for c in chunks)),
+                provider=last.provider, model=last.model, usage=last.usage,
+                raw_response=None), time.perf_counter() - started, chunks)
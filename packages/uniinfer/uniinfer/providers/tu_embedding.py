@@ -2,10 +2,10 @@
 TU embedding provider implementation.
 """
 import json
-import requests
 from typing import List, Dict, Any, Optional
 
 from ..core import EmbeddingProvider, EmbeddingRequest, EmbeddingResponse
+from ..factory import ProviderFactory
 
 
 class TuAIEmbeddingProvider(EmbeddingProvider):
@@ -16,6 +16,7 @@ class TuAIEmbeddingProvider(EmbeddingProvider):
     """
 
     BASE_URL = "https://aqueduct.ai.datalab.tuwien.ac.at/v1"
+    MAX_BATCH_SIZE = 128
 
     def __init__(self, api_key: Optional[str] = None, organization: Optional[str] = None):
         """
@@ -42,7 +43,7 @@ class TuAIEmbeddingProvider(EmbeddingProvider):
         headers = {
             "Authorization": f"Bearer {api_key}",
         }
-        response = requests.get(url, headers=headers)
+        response = ProviderFactory.get_transport().get(url, headers=headers)
         if response.status_code != 200:
             raise Exception(
                 f"TU AI API error: {response.status_code} - {response.text}")
@@ -50,6 +51,46 @@ class TuAIEmbeddingProvider(EmbeddingProvider):
         data = response.json()
         return [model["id"] for model in data.get("data", [])]
 
+    def _headers(self) -> Dict[str, str]:
+        """Build the request headers."""
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+
+        # Add organization header if provided
+        if self.organization:
+            headers["TUW-Organization"] = self.organization
+        return headers
+
+    def _build_payload(self, request: EmbeddingRequest, provider_specific_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the /embeddings payload."""
+        payload = {
+            "model": request.model or "e5-mistral-7b",  # Default embedding model
+            "input": request.input
+        }
+
+        # Add any provider-specific parameters
+        payload.update(provider_specific_kwargs)
+        return payload
+
+    def _parse_response(self, response_data: Dict[str, Any], request: EmbeddingRequest) -> EmbeddingResponse:
+        """Convert an /embeddings response body into an EmbeddingResponse."""
+        # Order the vectors by index; they go into a float32 matrix
+        embeddings_data = sorted(response_data.get("data", []), key=lambda item: item["index"])
+
+        # Construct usage information
+        usage = response_data.get("usage", {})
+
+        return EmbeddingResponse(
+            object="list",
+            embeddings=[item["embedding"] for item in embeddings_data],
+            model=response_data.get('model', request.model),
+            usage=usage,
+            provider='tu',
+            raw_response={key: value for key, value in response_data.items() if key != "data"}
+        )
+
     def embed(
         self,
         request: EmbeddingRequest,
@@ -72,28 +113,11 @@ class TuAIEmbeddingProvider(EmbeddingProvider):
             raise ValueError("TU AI API key is required")
 
         endpoint = f"{self.BASE_URL}/embeddings"
+        payload = self._build_payload(request, provider_specific_kwargs)
 
-        # Prepare the request payload
-        payload = {
-            "model": request.model or "e5-mistral-7b",  # Default embedding model
-            "input": request.input
-        }
-
-        # Add any provider-specific parameters
-        payload.update(provider_specific_kwargs)
-
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
-
-        # Add organization header if provided
-        if self.organization:
-            headers["TUW-Organization"] = self.organization
-
-        response = requests.post(
+        response = self.transport.post(
             endpoint,
-            headers=headers,
+            headers=self._headers(),
             data=json.dumps(payload)
         )
 
@@ -102,29 +126,41 @@ class TuAIEmbeddingProvider(EmbeddingProvider):
             error_msg = f"TU AI API error: {response.status_code} - {response.text}"
             raise Exception(error_msg)
 
-        # Parse the response
-        response_data = response.json()
+        return self._parse_response(response.json(), request)
 
-        # Extract the embeddings
-        embeddings_data = response_data.get("data", [])
+    async def aembed(
+        self,
+        request: EmbeddingRequest,
+        **provider_specific_kwargs
+    ) -> EmbeddingResponse:
+        """
+        Make an embedding request to TU AI on the event loop.
 
-        # Create data entries
-        data = []
-        for item in embeddings_data:
-            data.append({
-                "object": "embedding",
-                "embedding": item["embedding"],
-                "index": item["index"]
-            })
+        Args:
+            request (EmbeddingRequest): The request to make.
+            **provider_specific_kwargs: Additional TU AI-specific parameters.
 
-        # Construct usage information
-        usage = response_data.get("usage", {})
+        Returns:
+            EmbeddingResponse: The embedding response.
 
-        return EmbeddingResponse(
-            object="list",
-            data=data,
-            model=response_data.get('model', request.model),
-            usage=usage,
-            provider='tu',
-            raw_response=response_data
+        Raises:
+            Exception: If the request fails.
+        """
+        if self.api_key is None:
+            raise ValueError("TU AI API key is required")
+
+        endpoint = f"{self.BASE_URL}/embeddings"
+        payload = self._build_payload(request, provider_specific_kwargs)
+
+        response = await self.transport.apost(
+            endpoint,
+            headers=self._headers(),
+            content=json.dumps(payload)
         )
+
+        # Handle error response
+        if response.status_code != 200:
+            error_msg = f"TU AI API error: {response.status_code} - {response.text}"
+            raise Exception(error_msg)
+
+        return self._parse_response(response.json(), request)
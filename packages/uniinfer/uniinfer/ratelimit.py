@@ -0,0 +1,334 @@
+"""
+Per-provider request and token rate limiting.
+
+Each provider gets two token buckets, one for requests per minute (RPM) and
+one for tokens per minute (TPM). Bucket levels live in a small SQLite file so
+that threads and separate processes (e.g. several CLI runs in parallel) draw
+from the same budget; updates happen inside ``BEGIN IMMEDIATE`` transactions.
+
+Limits come from the ``rate_limit`` entry of a provider in
+``PROVIDER_CONFIGS`` (``{'rpm': 15, 'tpm': 1000000}``) or from
+``configure_rate_limit()``. Providers without limits are not throttled.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from .core import ChatCompletionRequest, ChatCompletionResponse, ChatProvider
+from .errors import RateLimitError
+
+DEFAULT_STATE_PATH = os.path.expanduser("~/.uniinfer/ratelimit.sqlite")
+# Rough characters-per-token ratio used to estimate prompt size before a call
+CHARS_PER_TOKEN = 4
+# Upper bound for a single sleep so that released capacity is noticed quickly
+MAX_SLEEP = 1.0
+
+
+def estimate_tokens(request: ChatCompletionRequest) -> int:
+    """
+    Estimate the tokens a request will consume (prompt plus max_tokens).
+
+    Returns:
+        int: The estimated token count.
+    """
+    prompt_chars = sum(len(msg.content or "") for msg in request.messages)
+    return prompt_chars // CHARS_PER_TOKEN + (request.max_tokens or 0)
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for one provider, shared across threads and processes.
+    """
+
+    def __init__(
+        self,
+        provider_name: str,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        path: Optional[str] = DEFAULT_STATE_PATH,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            provider_name (str): The provider whose budget is tracked.
+            rpm (Optional[float]): Requests per minute. None means unlimited.
+            tpm (Optional[float]): Tokens per minute. None means unlimited.
+            path (Optional[str]): SQLite file holding the shared state. None keeps
+                the state in memory, shared by threads of this process only.
+        """
+        self.provider_name = provider_name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.path = path
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(
+            path or ":memory:", timeout=30.0, check_same_thread=False,
+            isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " provider TEXT NOT NULL, kind TEXT NOT NULL, level REAL NOT NULL,"
+            " updated REAL NOT NULL, PRIMARY KEY (provider, kind))"
+        )
+
+    def _buckets(self, tokens: int) -> Dict[str, Tuple[float, float]]:
+        """Map bucket kind to (per-minute rate, cost of this call)."""
+        buckets = {}
+        if self.rpm:
+            buckets["rpm"] = (float(self.rpm), 1.0)
+        if self.tpm:
+            # A single call larger than the whole budget waits for a full bucket
+            buckets["tpm"] = (float(self.tpm), float(min(tokens, self.tpm)))
+        return buckets
+
+    def _try_acquire(self, tokens: int) -> float:
+        """
+        Take capacity if all buckets allow it.
+
+        Returns:
+            float: 0 if the capacity was taken, else the seconds to wait.
+        """
+        buckets = self._buckets(tokens)
+        if not buckets:
+            return 0.0
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = {}
+                wait = 0.0
+                for kind, (rate, cost) in buckets.items():
+                    row = self._conn.execute(
+                        "SELECT level, updated FROM buckets WHERE provider = ? AND kind = ?",
+                        (self.provider_name, kind)).fetchone()
+                    if row is None:
+                        level = rate
+                    else:
+                        level = min(rate, row[0] + (now - row[1]) * rate / 60.0)
+                    levels[kind] = level
+                    if level < cost:
+                        wait = max(wait, (cost - level) * 60.0 / rate)
+                if wait > 0:
+                    self._conn.execute("ROLLBACK")
+                    return wait
+                for kind, (rate, cost) in buckets.items():
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO buckets (provider, kind, level, updated)"
+                        " VALUES (?, ?, ?, ?)",
+                        (self.provider_name, kind, levels[kind] - cost, now))
+                self._conn.execute("COMMIT")
+                return 0.0
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def acquire(self, tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """
+        Block until one request of ``tokens`` tokens fits the budget.
+
+        Args:
+            tokens (int): Estimated tokens of the call.
+            timeout (Optional[float]): Maximum seconds to wait. None waits indefinitely.
+
+        Returns:
+            float: Seconds spent waiting.
+
+        Raises:
+            RateLimitError: If the budget does not allow the call within ``timeout``.
+        """
+        start_time = time.time()
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return time.time() - start_time
+            waited = time.time() - start_time
+            if timeout is not None and waited + wait > timeout:
+                raise RateLimitError(
+                    f"{self.provider_name} local rate limit: no capacity within {timeout}s")
+            time.sleep(min(wait, MAX_SLEEP))
+
+    async def aacquire(self, tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """
+        Async counterpart of acquire; waits without blocking the event loop.
+
+        The SQLite transaction (which may wait on other processes' locks) runs
+        in a worker thread.
+        """
+        start_time = time.time()
+        while True:
+            wait = await asyncio.to_thread(self._try_acquire, tokens)
+            if wait <= 0:
+                return time.time() - start_time
+            waited = time.time() - start_time
+            if timeout is not None and waited + wait > timeout:
+                raise RateLimitError(
+                    f"{self.provider_name} local rate limit: no capacity within {timeout}s")
+            await asyncio.sleep(min(wait, MAX_SLEEP))
+
+    def adjust(self, tokens: int) -> None:
+        """
+        Correct the token bucket once the real usage is known.
+
+        Args:
+            tokens (int): Tokens to give back (positive) or take (negative).
+        """
+        if not self.tpm or not tokens:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE buckets SET level = MIN(?, level + ?)"
+                    " WHERE provider = ? AND kind = 'tpm'",
+                    (float(self.tpm), float(tokens), self.provider_name))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def reset(self) -> None:
+        """Forget the stored state, refilling both buckets."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM buckets WHERE provider = ?", (self.provider_name,))
+
+    def close(self) -> None:
+        """Close the state database."""
+        with self._lock:
+            self._conn.close()
+
+
+class RateLimitedProvider(ChatProvider):
+    """
+    ChatProvider wrapper that waits for rate-limit capacity before each call.
+
+    The token estimate taken up front is corrected with the reported usage
+    once the response (or the last streamed chunk) arrives.
+    """
+
+    def __init__(self, provider: ChatProvider, limiter: RateLimiter, timeout: Optional[float] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider (ChatProvider): The provider to throttle.
+            limiter (RateLimiter): The provider's limiter.
+            timeout (Optional[float]): Maximum seconds to wait for capacity.
+        """
+        super().__init__(provider.api_key)
+        self.provider = provider
+        self.limiter = limiter
+        self.timeout = timeout
+
+    def _settle(self, estimated: int, response: Optional[ChatCompletionResponse]) -> None:
+        usage = response.usage if response is not None else None
+        actual = (usage or {}).get("total_tokens")
+        if actual:
+            self.limiter.adjust(estimated - int(actual))
+
+    def complete(self, request: ChatCompletionRequest, **provider_specific_kwargs) -> ChatCompletionResponse:
+        """Wait for capacity, then forward to the wrapped provider."""
+        estimated = estimate_tokens(request)
+        self.limiter.acquire(estimated, timeout=self.timeout)
+        response = self.provider.complete(request, **provider_specific_kwargs)
+        self._settle(estimated, response)
+        return response
+
+    def stream_complete(self, request: ChatCompletionRequest, **provider_specific_kwargs) -> Iterator[ChatCompletionResponse]:
+        """Wait for capacity, then stream from the wrapped provider."""
+        estimated = estimate_tokens(request)
+        self.limiter.acquire(estimated, timeout=self.timeout)
+        last = None
+        for last in self.provider.stream_complete(request, **provider_specific_kwargs):
+            yield last
+        self._settle(estimated, last)
+
+    async def acomplete(self, request: ChatCompletionRequest, **provider_specific_kwargs) -> ChatCompletionResponse:
+        """Async counterpart of complete."""
+        estimated = estimate_tokens(request)
+        await self.limiter.aacquire(estimated, timeout=self.timeout)
+        response = await self.provider.acomplete(request, **provider_specific_kwargs)
+        self._settle(estimated, response)
+        return response
+
+    async def astream_complete(self, request: ChatCompletionRequest, **provider_specific_kwargs) -> AsyncIterator[ChatCompletionResponse]:
+        """Async counterpart of stream_complete."""
+        estimated = estimate_tokens(request)
+        await self.limiter.aacquire(estimated, timeout=self.timeout)
+        last = None
+        async for last in self.provider.astream_complete(request, **provider_specific_kwargs):
+            yield last
+        self._settle(estimated, last)
+
+
+_limiters: Dict[str, Optional[RateLimiter]] = {}
+_overrides: Dict[str, Dict[str, Any]] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limit(provider_name: str, rpm: Optional[float] = None, tpm: Optional[float] = None) -> None:
+    """
+    Set (or clear, with no limits) the rate limit of a provider, overriding PROVIDER_CONFIGS.
+
+    Args:
+        provider_name (str): The provider name.
+        rpm (Optional[float]): Requests per minute.
+        tpm (Optional[float]): Tokens per minute.
+    """
+    name = provider_name.lower()
+    with _limiters_lock:
+        _overrides[name] = {"rpm": rpm, "tpm": tpm}
+        limiter = _limiters.pop(name, None)
+    if limiter is not None:
+        limiter.close()
+
+
+def _configured_limits(name: str) -> Dict[str, Any]:
+    if name in _overrides:
+        return _overrides[name]
+    from .examples.providers_config import PROVIDER_CONFIGS
+    return PROVIDER_CONFIGS.get(name, {}).get("rate_limit") or {}
+
+
+def get_rate_limiter(provider_name: str) -> Optional[RateLimiter]:
+    """
+    Return the shared limiter of a provider, or None if it has no limits.
+
+    The state file defaults to ``~/.uniinfer/ratelimit.sqlite`` and can be
+    moved with the ``UNIINFER_RATELIMIT_DB`` environment variable.
+    """
+    name = provider_name.lower()
+    with _limiters_lock:
+        if name not in _limiters:
+            limits = _configured_limits(name)
+            if limits.get("rpm") or limits.get("tpm"):
+                path = os.path.expanduser(
+                    os.getenv("UNIINFER_RATELIMIT_DB", DEFAULT_STATE_PATH))
+                _limiters[name] = RateLimiter(
+                    name, rpm=limits.get("rpm"), tpm=limits.get("tpm"), path=path)
+            else:
+                _limiters[name] = None
+        return _limiters[name]
+
+
+def with_rate_limit(provider: ChatProvider, provider_name: str, timeout: Optional[float] = None) -> ChatProvider:
+    """
+    Wrap a provider in its rate limiter, if the provider has limits configured.
+
+    Args:
+        provider (ChatProvider): The provider instance.
+        provider_name (str): The provider name used to look up the limits.
+        timeout (Optional[float]): Maximum seconds to wait for capacity per call.
+
+    Returns:
+        ChatProvider: The wrapped provider, or the provider itself when unlimited.
+    """
+    limiter = get_rate_limiter(provider_name)
+    if limiter is None:
+        return provider
+    return RateLimitedProvider(provider, limiter, timeout=timeout)
@@ -0,0 +1,388 @@
+"""
+Priority-aware admission control for async request handlers.
+
+``PriorityScheduler.acquire(provider, model, priority)`` returns a ``Slot``
+once the provider (and, if limited, the model) has a free in-flight slot.
+Requests that cannot start right away wait in a bounded queue per provider
+and priority class; a full queue raises ``QueueFullError`` immediately, so
+callers can answer with HTTP 429 instead of piling up work.
+
+Freed slots go to the highest-priority waiter that can use them
+(``interactive`` before ``normal`` before ``batch``, oldest first), so bulk
+traffic cannot starve interactive users. A waiter blocked only by its
+model's limit does not hold up waiters for other models of the provider.
+
+Limits are keyed by provider name or ``provider@model``; ``*`` sets a
+default for providers without a limit of their own. Providers without any
+limit are admitted immediately but still counted. With an
+``AdaptiveConcurrency`` (see ``uniinfer.adaptive``) the provider limit is
+learned from the outcomes reported by ``Slot.release()``, capped by the
+configured limit, and a provider is paused while a Retry-After lasts.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from .errors import QueueFullError
+from .metrics import QUEUE_DEPTH, QUEUE_REJECTIONS, QUEUE_WAIT, SCHEDULER_INFLIGHT
+
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, NORMAL, BATCH)
+_ALIASES = {"high": INTERACTIVE, "default": NORMAL, "low": BATCH, "bulk": BATCH}
+DEFAULT_MAX_QUEUE = 100
+DEFAULT_QUEUE_TIMEOUT = 30.0
+# acquire() default: use the scheduler's queue_timeout
+_CONFIGURED = object()
+
+
+def parse_priority(value: Optional[str]) -> str:
+    """
+    Normalise a priority class name; None or empty means ``normal``.
+
+    Raises:
+        ValueError: If the value is not a known priority class.
+    """
+    if not value:
+        return NORMAL
+    name = value.strip().lower()
+    name = _ALIASES.get(name, name)
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{value}'. Expected one of {', '.join(PRIORITIES)}.")
+    return name
+
+
+def parse_limits(spec: Optional[str]) -> Dict[str, int]:
+    """
+    Parse ``"openai=8,openai@gpt-4o=2,*=16"`` into a limits dict.
+
+    Raises:
+        ValueError: If an entry is not ``key=positive integer``.
+    """
+    limits: Dict[str, int] = {}
+    for entry in (spec or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        key, sep, value = entry.rpartition("=")
+        if not sep or not key.strip() or not value.strip().isdigit() or int(value) < 1:
+            raise ValueError(f"Invalid concurrency limit '{entry}'. Expected key=positive integer.")
+        limits[key.strip()] = int(value)
+    return limits
+
+
+class _Waiter:
+    __slots__ = ("model", "priority", "future", "loop", "enqueued_at", "admitted")
+
+    def __init__(self, model: str, priority: str, future, loop):
+        self.model = model
+        self.priority = priority
+        self.future = future
+        self.loop = loop
+        self.enqueued_at = time.perf_counter()
+        self.admitted = False
+
+
+class _Lane:
+    """In-flight counts and waiting queues of one provider."""
+
+    __slots__ = ("inflight", "model_inflight", "queues", "wake_at")
+
+    def __init__(self):
+        self.inflight = 0
+        self.model_inflight: Dict[str, int] = {}
+        self.queues: Dict[str, Deque[_Waiter]] = {priority: deque() for priority in PRIORITIES}
+        # monotonic time a dispatch is scheduled for the end of a pause
+        self.wake_at = 0.0
+
+
+class Slot:
+    """
+    An admitted request's hold on its provider and model slots.
+
+    ``release()`` is idempotent; the slot is also an async context manager
+    that reports the exception leaving its block, if any.
+    """
+
+    __slots__ = ("_scheduler", "provider", "model", "priority", "waited", "admitted_at", "_released")
+
+    def __init__(self, scheduler: "PriorityScheduler", provider: str, model: str, priority: str, waited: float):
+        self._scheduler = scheduler
+        self.provider = provider
+        self.model = model
+        self.priority = priority
+        self.waited = waited
+        self.admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self, error: Optional[BaseException] = None, latency: Optional[float] = None) -> None:
+        """
+        Free the slot for the next waiter.
+
+        Args:
+            error (Optional[BaseException]): What the request failed with, if it
+                failed; rate limits and timeouts lower an adaptive limit.
+            latency (Optional[float]): Latency to report for a success, e.g. a
+                stream's time to first token; defaults to the time since admission.
+        """
+        if self._released:
+            return
+        self._released = True
+        self._scheduler._release(self.provider, self.model, self.admitted_at, error, latency)
+
+    async def __aenter__(self) -> "Slot":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.release(error=exc)
+
+
+class PriorityScheduler:
+    """
+    Per-provider and per-model in-flight limits with prioritised, bounded queues.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, int]] = None,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        queue_timeout: Optional[float] = DEFAULT_QUEUE_TIMEOUT,
+        use_provider_configs: bool = True,
+        adaptive: Optional[Any] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            limits (Optional[Dict[str, int]]): Maximum in-flight requests keyed by
+                provider, ``provider@model`` or ``*`` (default for all providers).
+            max_queue (int): Maximum waiting requests per provider and priority class.
+            queue_timeout (Optional[float]): Seconds a request may wait before it is
+                rejected; None waits indefinitely.
+            use_provider_configs (bool): Fall back to ``max_concurrency`` in
+                PROVIDER_CONFIGS for providers without an entry in limits.
+            adaptive (Optional[AdaptiveConcurrency]): Learns provider limits from
+                request outcomes; configured limits become upper bounds.
+        """
+        self.limits = dict(limits or {})
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.use_provider_configs = use_provider_configs
+        self.adaptive = adaptive
+        self._lanes: Dict[str, _Lane] = {}
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    def configured_limit(self, provider: str) -> Optional[int]:
+        """Return the configured in-flight limit of a provider, or None if unlimited."""
+        if provider in self.limits:
+            return self.limits[provider]
+        if self.use_provider_configs:
+            from .examples.providers_config import PROVIDER_CONFIGS
+            configured = PROVIDER_CONFIGS.get(provider, {}).get("max_concurrency")
+            if configured:
+                return int(configured)
+        return self.limits.get("*")
+
+    def provider_limit(self, provider: str) -> Optional[int]:
+        """Return the effective in-flight limit of a provider, or None if unlimited."""
+        limit = self.configured_limit(provider)
+        if self.adaptive is None:
+            return limit
+        learned = self.adaptive.limit(provider)
+        return learned if limit is None else min(limit, learned)
+
+    def model_limit(self, provider: str, model: str) -> Optional[int]:
+        """Return the in-flight limit of a provider's model, or None if unlimited."""
+        return self.limits.get(f"{provider}@{model}")
+
+    def _has_capacity(self, lane: _Lane, provider: str, model: str) -> bool:
+        if self.adaptive is not None and self.adaptive.paused_for(provider) > 0:
+            return False
+        limit = self.provider_limit(provider)
+        if limit is not None and lane.inflight >= limit:
+            return False
+        limit = self.model_limit(provider, model)
+        return limit is None or lane.model_inflight.get(model, 0) < limit
+
+    def _take(self, lane: _Lane, provider: str, model: str) -> None:
+        lane.inflight += 1
+        lane.model_inflight[model] = lane.model_inflight.get(model, 0) + 1
+        self.admitted += 1
+        SCHEDULER_INFLIGHT.inc(provider)
+
+    async def acquire(self, provider: str, model: str, priority: str = NORMAL,
+                      queue_timeout: Any = _CONFIGURED) -> Slot:
+        """
+        Wait for a slot of the provider and model.
+
+        Args:
+            provider (str): The provider name.
+            model (str): The model name.
+            priority (str): ``interactive``, ``normal`` or ``batch``.
+            queue_timeout (Optional[float]): Overrides the scheduler's queue_timeout
+                for this request; None waits indefinitely (e.g. batch jobs).
+
+        Returns:
+            Slot: Release it (or leave its ``async with`` block) when the request is done.
+
+        Raises:
+            QueueFullError: If the queue is full (reason ``"full"``) or the wait
+                exceeded queue_timeout (reason ``"timeout"``).
+        """
+        priority = parse_priority(priority)
+        if queue_timeout is _CONFIGURED:
+            queue_timeout = self.queue_timeout
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            lane = self._lanes.get(provider)
+            if lane is None:
+                lane = self._lanes[provider] = _Lane()
+            # Every waiter left after a dispatch is blocked, so free capacity
+            # means nobody is ahead of this request
+            if self._has_capacity(lane, provider, model):
+                self._take(lane, provider, model)
+                QUEUE_WAIT.observe(provider, priority, value=0.0)
+                return Slot(self, provider, model, priority, 0.0)
+            queue = lane.queues[priority]
+            if len(queue) >= self.max_queue:
+                self.rejected += 1
+                QUEUE_REJECTIONS.inc(provider, priority, "full")
+                raise QueueFullError(
+                    f"{provider} queue for {priority} requests is full ({self.max_queue} waiting)")
+            waiter = _Waiter(model, priority, loop.create_future(), loop)
+            queue.append(waiter)
+            self.queued += 1
+            QUEUE_DEPTH.inc(provider, priority)
+        self._wake_after_pause(lane, provider)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), queue_timeout)
+        except BaseException as e:
+            with self._lock:
+                admitted = waiter.admitted
+                if not admitted:
+                    lane.queues[priority].remove(waiter)
+                    QUEUE_DEPTH.dec(provider, priority)
+            if admitted:
+                if not isinstance(e, asyncio.TimeoutError):
+                    # cancelled right after being admitted: hand the slot on
+                    self._release(provider, model)
+                    raise
+                # admitted as the timeout fired: keep the slot
+            elif isinstance(e, asyncio.TimeoutError):
+                with self._lock:
+                    self.rejected += 1
+                QUEUE_REJECTIONS.inc(provider, priority, "timeout")
+                QUEUE_WAIT.observe(provider, priority, value=time.perf_counter() - waiter.enqueued_at)
+                raise QueueFullError(
+                    f"{provider} {priority} request waited more than {queue_timeout} seconds",
+                    reason="timeout")
+            else:
+                raise
+        waited = time.perf_counter() - waiter.enqueued_at
+        QUEUE_WAIT.observe(provider, priority, value=waited)
+        return Slot(self, provider, model, priority, waited)
+
+    def _release(self, provider: str, model: str, admitted_at: Optional[float] = None,
+                 error: Optional[BaseException] = None, latency: Optional[float] = None) -> None:
+        lane = self._lanes[provider]
+        if self.adaptive is not None and admitted_at is not None:
+            if error is None:
+                limit = self.provider_limit(provider)
+                self.adaptive.on_success(
+                    provider, latency if latency is not None else time.monotonic() - admitted_at,
+                    saturated=limit is not None and lane.inflight >= limit)
+            else:
+                self.adaptive.on_error(provider, error, started=admitted_at)
+        with self._lock:
+            lane.inflight -= 1
+            lane.model_inflight[model] -= 1
+            if not lane.model_inflight[model]:
+                del lane.model_inflight[model]
+            SCHEDULER_INFLIGHT.dec(provider)
+            granted = self._dispatch(lane, provider)
+        self._grant_all(granted)
+        self._wake_after_pause(lane, provider)
+
+    def _kick(self, provider: str) -> None:
+        """Dispatch waiters of a provider whose pause has ended."""
+        with self._lock:
+            lane = self._lanes[provider]
+            lane.wake_at = 0.0
+            granted = self._dispatch(lane, provider)
+        self._grant_all(granted)
+        self._wake_after_pause(lane, provider)
+
+    def _wake_after_pause(self, lane: _Lane, provider: str) -> None:
+        """Schedule a dispatch for when a Retry-After pause with waiters ends."""
+        if self.adaptive is None:
+            return
+        pause = self.adaptive.paused_for(provider)
+        if pause <= 0:
+            return
+        with self._lock:
+            waiter = next((w for queue in lane.queues.values() for w in queue), None)
+            wake_at = time.monotonic() + pause
+            if waiter is None or lane.wake_at >= wake_at:
+                return
+            lane.wake_at = wake_at
+        try:
+            waiter.loop.call_soon_threadsafe(waiter.loop.call_later, pause, self._kick, provider)
+        except RuntimeError:
+            pass  # loop closed; its waiter is gone
+
+    @staticmethod
+    def _grant_all(granted: list) -> None:
+        for waiter in granted:
+            if waiter.future.done():
+                continue
+            try:
+                waiter.loop.call_soon_threadsafe(_grant, waiter.future)
+            except RuntimeError:
+                pass  # loop closed; its waiter is gone
+
+    def _dispatch(self, lane: _Lane, provider: str) -> list:
+        """Admit waiters in priority order while capacity lasts (lock held)."""
+        granted = []
+        provider_limit = self.provider_limit(provider)
+        for priority in PRIORITIES:
+            queue = lane.queues[priority]
+            for waiter in list(queue):
+                if provider_limit is not None and lane.inflight >= provider_limit:
+                    return granted
+                if not self._has_capacity(lane, provider, waiter.model):
+                    continue
+                queue.remove(waiter)
+                QUEUE_DEPTH.dec(provider, priority)
+                waiter.admitted = True
+                self._take(lane, provider, waiter.model)
+                granted.append(waiter)
+        return granted
+
+    def stats(self) -> Dict[str, Any]:
+        """Return totals and, per provider, in-flight requests, limit and queue lengths."""
+        with self._lock:
+            return {
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "rejected": self.rejected,
+                "providers": {
+                    provider: {
+                        "inflight": lane.inflight,
+                        "limit": self.provider_limit(provider),
+                        "waiting": {priority: len(queue) for priority, queue in lane.queues.items()},
+                    }
+                    for provider, lane in self._lanes.items()
+                },
+            }
+
+
+def _grant(future) -> None:
+    if not future.done():
+        future.set_result(None)
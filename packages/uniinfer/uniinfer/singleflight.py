@@ -0,0 +1,83 @@
+"""
+Coalescing of identical concurrent async calls.
+
+``SingleFlight.do(key, fn)`` runs ``fn()`` once per key at a time: callers that
+arrive with the same key while a call is in flight await that call and get
+its result (or exception) instead of starting their own. The shared call runs
+as its own task, so a caller that is cancelled (e.g. a client that hung up)
+does not cancel it for the others.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+from .metrics import SINGLEFLIGHT_CALLS, SINGLEFLIGHT_COALESCED, SINGLEFLIGHT_ERRORS
+
+
+def make_request_key(*parts: Any) -> str:
+    """
+    Build a key for a request from JSON-serialisable parts.
+
+    Returns:
+        str: Hex sha256 of the canonical (sorted-keys) JSON encoding.
+    """
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=repr)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Shares one in-flight awaitable between concurrent callers with the same key.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], endpoint: str = "") -> Any:
+        """
+        Await fn() or, if a call for key is already running, its result.
+
+        Args:
+            key (str): Identity of the request, see make_request_key().
+            fn (Callable[[], Awaitable[Any]]): Starts the upstream call.
+            endpoint (str): Label of the ``uniinfer_singleflight_*`` metrics.
+
+        Returns:
+            Any: The result of the shared call; all callers receive the same object.
+        """
+        with self._lock:
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(fn())
+                self._inflight[key] = task
+                self.calls += 1
+                SINGLEFLIGHT_CALLS.inc(endpoint)
+                task.add_done_callback(lambda done: self._finish(key, done, endpoint))
+            else:
+                self.coalesced += 1
+                SINGLEFLIGHT_COALESCED.inc(endpoint)
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task, endpoint: str) -> None:
+        with self._lock:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+            if task.cancelled() or task.exception() is not None:
+                self.errors += 1
+                SINGLEFLIGHT_ERRORS.inc(endpoint)
+
+    def stats(self) -> Dict[str, int]:
+        """Return upstream calls, coalesced callers, failed calls and calls in flight."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "inflight": len(self._inflight),
+            }
@@ -1,34 +1,136 @@
 """
 Provider strategies for UniInfer.
 """
+import asyncio
+import queue
+import threading
 import time
-from typing import List, Dict, Any, Iterator, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple, TYPE_CHECKING
 
 from .core import ChatCompletionRequest, ChatCompletionResponse
 from .factory import ProviderFactory
-from .errors import ProviderError
+from .errors import CircuitOpenError, ProviderError, TimeoutError
+from .circuit_breaker import get_circuit_breaker
+from .transport import OpenStreams, track_streams
+
+if TYPE_CHECKING:
+    from .batch import ProviderSlots
+
+# Marks the end of a stream in the priming helpers below
+_STREAM_END = object()
+
+
+def _produce_stream(
+    iterator: Iterator[Any], chunks: "queue.Queue", stop: threading.Event, streams: OpenStreams
+) -> None:
+    """
+    Pump a provider stream into a queue from a background thread.
+
+    The HTTP responses the provider opens on this thread are recorded in
+    ``streams`` so that an abandoned stream can be aborted mid-read.
+    """
+    with track_streams(streams):
+        try:
+            for chunk in iterator:
+                chunks.put((chunk, None))
+                if stop.is_set():
+                    break
+            chunks.put((_STREAM_END, None))
+        except Exception as e:
+            chunks.put((None, e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+
+def _drain_stream(chunks: "queue.Queue") -> Iterator[Any]:
+    """Yield chunks from a queue filled by _produce_stream."""
+    while True:
+        chunk, error = chunks.get()
+        if error is not None:
+            raise error
+        if chunk is _STREAM_END:
+            return
+        yield chunk
+
+
+def _prime_stream(iterator: Iterator[Any], timeout: Optional[float]) -> Tuple[Any, Iterator[Any], Callable[[], None]]:
+    """
+    Pull the first chunk of a stream, optionally within a deadline.
+
+    Without a timeout the chunk is pulled directly; with one, the stream is
+    consumed by a background thread so that a stalled provider can be abandoned.
+    An abandoned stream's HTTP response is aborted, which frees its pooled
+    connection and ends the thread instead of waiting for the read timeout.
+
+    Returns:
+        Tuple: The first chunk (or _STREAM_END), an iterator over the remaining
+        chunks and a callable that releases the stream.
+
+    Raises:
+        TimeoutError: If no chunk arrives within ``timeout`` seconds.
+    """
+    if timeout is None:
+        first = next(iterator, _STREAM_END)
+        return first, iterator, getattr(iterator, "close", lambda: None)
+
+    chunks: "queue.Queue" = queue.Queue()
+    stop = threading.Event()
+    streams = OpenStreams()
+    threading.Thread(target=_produce_stream, args=(iterator, chunks, stop, streams), daemon=True).start()
+
+    def release() -> None:
+        stop.set()
+        streams.abort()
+
+    try:
+        first, error = chunks.get(timeout=timeout)
+    except queue.Empty:
+        release()
+        raise TimeoutError(f"No first token within {timeout}s")
+    if error is not None:
+        raise error
+    return first, _drain_stream(chunks), release
 
 
 class FallbackStrategy:
     """
     Strategy that tries providers in order until one succeeds.
     """
-    def __init__(self, provider_names: List[str], max_retries: int = 1):
+    def __init__(
+        self,
+        provider_names: List[str],
+        max_retries: int = 1,
+        first_token_timeout: Optional[float] = None,
+        circuit_breaker: bool = True
+    ):
         """
         Initialize the fallback strategy.
         
         Args:
             provider_names (List[str]): Ordered list of provider names to try.
             max_retries (int): Maximum number of retries per provider.
+            first_token_timeout (Optional[float]): Seconds a stream may take to
+                deliver its first chunk before failing over. None waits indefinitely.
+            circuit_breaker (bool): Whether to skip providers whose process-wide
+                circuit breaker is open (see uniinfer.circuit_breaker).
         """
         self.provider_names = provider_names
         self.max_retries = max_retries
+        self.first_token_timeout = first_token_timeout
+        self.circuit_breaker = circuit_breaker
         self.latency_stats: Dict[str, List[float]] = {}
         self.error_counts: Dict[str, int] = {}
+        self.ttft_stats: Dict[str, List[float]] = {}
+        self.throughput_stats: Dict[str, List[float]] = {}
     
     def complete(
         self, 
         request: ChatCompletionRequest, 
+        slots: Optional["ProviderSlots"] = None,
         **kwargs
     ) -> Tuple[ChatCompletionResponse, str]:
         """
@@ -36,6 +138,8 @@ class FallbackStrategy:
         
         Args:
             request (ChatCompletionRequest): The request to make.
+            slots (Optional[ProviderSlots]): Per-provider concurrency limits
+                to hold while calling each provider.
             **kwargs: Additional parameters for the provider.
         
         Returns:
@@ -46,21 +150,29 @@ class FallbackStrategy:
         """
         last_error = None
         
-        for provider_name in self.provider_names:
+        for provider_name in self._provider_order():
             for attempt in range(self.max_retries + 1):
                 try:
+                    self._check_circuit(provider_name)
                     provider = ProviderFactory.get_provider(provider_name)
                     
-                    # Measure latency
-                    start_time = time.time()
-                    response = provider.complete(request, **kwargs)
-                    latency = time.time() - start_time
+                    slot = slots.slot(provider_name) if slots is not None else nullcontext()
+                    with slot:
+                        # Measure latency
+                        start_time = time.time()
+                        response = provider.complete(request, **kwargs)
+                        latency = time.time() - start_time
                     
                     # Record successful call
                     self._record_latency(provider_name, latency)
                     
                     return response, provider_name
                     
+                except CircuitOpenError as e:
+                    # Provider is known to be down; skip it without waiting
+                    last_error = e
+                    break
+                    
                 except Exception as e:
                     last_error = e
                     
@@ -82,6 +194,11 @@ class FallbackStrategy:
         """
         Stream a chat completion response with fallback.
         
+        The first chunk is pulled before returning, so connection errors,
+        rate limits, empty streams and a missed ``first_token_timeout`` fail
+        over to the next provider before anything reaches the caller. Errors
+        after the first chunk are raised from the iterator.
+        
         Args:
             request (ChatCompletionRequest): The request to make.
             **kwargs: Additional parameters for the provider.
@@ -94,17 +211,30 @@ class FallbackStrategy:
         """
         last_error = None
         
-        for provider_name in self.provider_names:
+        for provider_name in self._provider_order():
             for attempt in range(self.max_retries + 1):
                 try:
+                    self._check_circuit(provider_name)
                     provider = ProviderFactory.get_provider(provider_name)
                     
-                    # Start streaming
-                    stream_iter = provider.stream_complete(request, **kwargs)
+                    # Start streaming and wait for the first chunk
+                    start_time = time.time()
+                    stream_iter = iter(provider.stream_complete(request, **kwargs))
+                    first, rest, close = _prime_stream(stream_iter, self.first_token_timeout)
+                    if first is _STREAM_END:
+                        raise ProviderError(f"{provider_name} returned an empty stream")
+                    self._record_ttft(provider_name, time.time() - start_time)
+                    if self.circuit_breaker:
+                        # A primed stream counts as a success, closing a half-open probe
+                        get_circuit_breaker(provider_name).record_success()
                     
                     # Return the streaming iterator and provider name
-                    # Note: We can't easily measure latency for streaming
-                    return stream_iter, provider_name
+                    return self._relay_stream(provider_name, first, rest, close, start_time), provider_name
+                    
+                except CircuitOpenError as e:
+                    # Provider is known to be down; skip it without waiting
+                    last_error = e
+                    break
                     
                 except Exception as e:
                     last_error = e
@@ -119,8 +249,84 @@ class FallbackStrategy:
         # If we get here, all providers failed
         raise ProviderError(f"All providers failed streaming. Last error: {str(last_error)}")
     
+    async def acomplete(
+        self,
+        request: ChatCompletionRequest,
+        **kwargs
+    ) -> Tuple[ChatCompletionResponse, str]:
+        """
+        Async counterpart of complete, backed by ChatProvider.acomplete.
+
+        Args:
+            request (ChatCompletionRequest): The request to make.
+            **kwargs: Additional parameters for the provider.
+
+        Returns:
+            Tuple[ChatCompletionResponse, str]: The response and provider name.
+
+        Raises:
+            ProviderError: If all providers fail.
+        """
+        last_error = None
+
+        for provider_name in self._provider_order():
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self._check_circuit(provider_name)
+                    provider = ProviderFactory.get_provider(provider_name)
+                    start_time = time.time()
+                    response = await provider.acomplete(request, **kwargs)
+                    self._record_latency(provider_name, time.time() - start_time)
+                    return response, provider_name
+                except CircuitOpenError as e:
+                    last_error = e
+                    break
+                except Exception as e:
+                    last_error = e
+                    self._record_error(provider_name)
+
+        raise ProviderError(f"All providers failed. Last error: {str(last_error)}")
+
+    def _relay_stream(
+        self,
+        provider_name: str,
+        first: ChatCompletionResponse,
+        rest: Iterator[ChatCompletionResponse],
+        close: Callable[[], None],
+        start_time: float
+    ) -> Iterator[ChatCompletionResponse]:
+        """Yield a primed stream and record its throughput once it completes."""
+        chunks = 1
+        last = first
+        try:
+            yield first
+            for last in rest:
+                chunks += 1
+                yield last
+        except Exception:
+            self._record_error(provider_name)
+            raise
+        finally:
+            close()
+        duration = time.time() - start_time
+        # Prefer reported usage; otherwise count chunks as an approximation of tokens
+        tokens = (last.usage or {}).get("completion_tokens") or chunks
+        if duration > 0:
+            self._record_throughput(provider_name, tokens / duration)
+
+    def _check_circuit(self, provider: str) -> None:
+        """Raise CircuitOpenError if the provider's breaker rejects the call."""
+        if self.circuit_breaker:
+            get_circuit_breaker(provider).check()
+
+    def _provider_order(self) -> List[str]:
+        """Return the providers in the order they should be tried."""
+        return list(self.provider_names)
+
     def _record_latency(self, provider: str, latency: float) -> None:
         """Record latency for a provider."""
+        if self.circuit_breaker:
+            get_circuit_breaker(provider).record_success()
         if provider not in self.latency_stats:
             self.latency_stats[provider] = []
         self.latency_stats[provider].append(latency)
@@ -129,8 +335,20 @@ class FallbackStrategy:
         if len(self.latency_stats[provider]) > 10:
             self.latency_stats[provider] = self.latency_stats[provider][-10:]
     
+    def _record_ttft(self, provider: str, ttft: float) -> None:
+        """Record the time to first token of a stream."""
+        self.ttft_stats.setdefault(provider, []).append(ttft)
+        self.ttft_stats[provider] = self.ttft_stats[provider][-10:]
+
+    def _record_throughput(self, provider: str, tokens_per_second: float) -> None:
+        """Record the throughput of a completed stream."""
+        self.throughput_stats.setdefault(provider, []).append(tokens_per_second)
+        self.throughput_stats[provider] = self.throughput_stats[provider][-10:]
+
     def _record_error(self, provider: str) -> None:
         """Record an error for a provider."""
+        if self.circuit_breaker:
+            get_circuit_breaker(provider).record_failure()
         if provider not in self.error_counts:
             self.error_counts[provider] = 0
         self.error_counts[provider] += 1
@@ -144,14 +362,19 @@ class FallbackStrategy:
         """
         stats = {}
         
-        for provider in set(list(self.latency_stats.keys()) + list(self.error_counts.keys())):
+        for provider in set(list(self.latency_stats.keys()) + list(self.error_counts.keys())
+                            + list(self.ttft_stats.keys())):
             latencies = self.latency_stats.get(provider, [])
             errors = self.error_counts.get(provider, 0)
+            ttfts = self.ttft_stats.get(provider, [])
+            throughputs = self.throughput_stats.get(provider, [])
             
             stats[provider] = {
                 "avg_latency": sum(latencies) / len(latencies) if latencies else None,
                 "min_latency": min(latencies) if latencies else None,
                 "max_latency": max(latencies) if latencies else None,
+                "avg_ttft": sum(ttfts) / len(ttfts) if ttfts else None,
+                "avg_tokens_per_second": sum(throughputs) / len(throughputs) if throughputs else None,
                 "error_count": errors,
                 "call_count": len(latencies) + errors
             }
@@ -159,6 +382,285 @@ class FallbackStrategy:
         return stats
 
 
+class LatencyAwareStrategy(FallbackStrategy):
+    """
+    Strategy that tries providers fastest-first, optionally hedging slow calls.
+
+    Providers are ranked by an exponentially weighted moving average (or the
+    p95) of their recent latencies, inflated by their error rate. Providers
+    without measurements are tried first, in configured order, so that every
+    provider gets sampled.
+
+    With ``hedge=True`` a duplicate request is sent to the next-best provider
+    when the primary has not answered within its p95 latency; the first
+    success wins and the other call is cancelled (async) or abandoned (sync).
+    If both fail, providers are retried in ranked order up to ``max_retries``
+    times each, as in FallbackStrategy.
+    """
+    def __init__(
+        self,
+        provider_names: List[str],
+        max_retries: int = 1,
+        metric: str = "ewma",
+        alpha: float = 0.3,
+        error_penalty: float = 4.0,
+        hedge: bool = False,
+        hedge_delay: Optional[float] = None,
+        min_samples: int = 3,
+        first_token_timeout: Optional[float] = None,
+        circuit_breaker: bool = True
+    ):
+        """
+        Initialize the latency-aware strategy.
+
+        Args:
+            provider_names (List[str]): Providers to choose from, in default order.
+            max_retries (int): Maximum number of retries per provider.
+            metric (str): Latency estimate used for ranking, "ewma" or "p95".
+            alpha (float): Smoothing factor of the EWMA.
+            error_penalty (float): Weight of the error rate; a provider's score is
+                ``latency * (1 + error_penalty * error_rate)``.
+            hedge (bool): Whether to send hedged duplicate requests.
+            hedge_delay (Optional[float]): Fixed hedge delay in seconds. Defaults to
+                the primary provider's p95 latency.
+            min_samples (int): Latency samples needed before the p95 is used for hedging.
+            first_token_timeout (Optional[float]): Seconds a stream may take to
+                deliver its first chunk before failing over.
+            circuit_breaker (bool): Whether to skip providers whose circuit breaker is open.
+        """
+        super().__init__(provider_names, max_retries, first_token_timeout, circuit_breaker)
+        if metric not in ("ewma", "p95"):
+            raise ValueError(f"Unknown latency metric '{metric}'")
+        self.metric = metric
+        self.alpha = alpha
+        self.error_penalty = error_penalty
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.min_samples = min_samples
+        self.ewma: Dict[str, float] = {}
+        self.success_counts: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+
+    def _record_latency(self, provider: str, latency: float) -> None:
+        """Record latency for a provider and update its EWMA."""
+        with self._stats_lock:
+            super()._record_latency(provider, latency)
+            previous = self.ewma.get(provider)
+            self.ewma[provider] = latency if previous is None else (
+                self.alpha * latency + (1 - self.alpha) * previous)
+            self.success_counts[provider] = self.success_counts.get(provider, 0) + 1
+
+    def _record_error(self, provider: str) -> None:
+        """Record an error for a provider."""
+        with self._stats_lock:
+            super()._record_error(provider)
+
+    def p95(self, provider: str) -> Optional[float]:
+        """Return the p95 of the recent latencies of a provider, if known."""
+        latencies = sorted(self.latency_stats.get(provider, []))
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))]
+
+    def error_rate(self, provider: str) -> float:
+        """Return the fraction of failed calls of a provider."""
+        errors = self.error_counts.get(provider, 0)
+        calls = errors + self.success_counts.get(provider, 0)
+        return errors / calls if calls else 0.0
+
+    def score(self, provider: str) -> float:
+        """Return the ranking score of a provider (lower is better)."""
+        latency = self.ewma.get(provider) if self.metric == "ewma" else self.p95(provider)
+        if latency is None:
+            # Unmeasured providers go first; providers that only ever failed go last
+            return float("inf") if self.error_counts.get(provider) else 0.0
+        return latency * (1 + self.error_penalty * self.error_rate(provider))
+
+    def _provider_order(self) -> List[str]:
+        """Return the providers ordered by score, keeping configured order on ties."""
+        def key(provider: str) -> Tuple[bool, float]:
+            circuit_open = self.circuit_breaker and get_circuit_breaker(provider).state == "open"
+            return circuit_open, self.score(provider)
+        return sorted(self.provider_names, key=key)
+
+    def _hedge_delay(self, provider: str) -> Optional[float]:
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        if len(self.latency_stats.get(provider, [])) < self.min_samples:
+            return None
+        return self.p95(provider)
+
+    def _call(
+        self,
+        provider_name: str,
+        request: ChatCompletionRequest,
+        slots: Optional["ProviderSlots"],
+        kwargs: Dict[str, Any]
+    ) -> ChatCompletionResponse:
+        """Make one timed call, recording its latency or error."""
+        self._check_circuit(provider_name)
+        try:
+            provider = ProviderFactory.get_provider(provider_name)
+            slot = slots.slot(provider_name) if slots is not None else nullcontext()
+            with slot:
+                start_time = time.time()
+                response = provider.complete(request, **kwargs)
+                latency = time.time() - start_time
+        except Exception:
+            self._record_error(provider_name)
+            raise
+        self._record_latency(provider_name, latency)
+        return response
+
+    def complete(
+        self,
+        request: ChatCompletionRequest,
+        slots: Optional["ProviderSlots"] = None,
+        **kwargs
+    ) -> Tuple[ChatCompletionResponse, str]:
+        """
+        Make a chat completion request, hedging the fastest provider if enabled.
+
+        Args:
+            request (ChatCompletionRequest): The request to make.
+            slots (Optional[ProviderSlots]): Per-provider concurrency limits
+                to hold while calling each provider.
+            **kwargs: Additional parameters for the provider.
+
+        Returns:
+            Tuple[ChatCompletionResponse, str]: The response and provider name.
+
+        Raises:
+            ProviderError: If all providers fail.
+        """
+        order = self._provider_order()
+        delay = self._hedge_delay(order[0]) if self.hedge and len(order) > 1 else None
+        if delay is None:
+            return super().complete(request, slots=slots, **kwargs)
+
+        primary, backup = order[0], order[1]
+        last_error: Optional[Exception] = None
+        # Not a context manager: a losing call is abandoned, not waited for
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            futures = {executor.submit(self._call, primary, request, slots, kwargs): primary}
+            done, _ = wait(futures, timeout=delay)
+            if not done:
+                futures[executor.submit(self._call, backup, request, slots, kwargs)] = backup
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        for loser in pending:
+                            loser.cancel()
+                        return future.result(), futures[future]
+                    last_error = future.exception()
+        finally:
+            executor.shutdown(wait=False)
+
+        # Hedged calls used up the first attempt of their providers
+        attempts = {name: 1 for name in futures.values()}
+        for provider_name in order:
+            for _ in range(attempts.get(provider_name, 0), self.max_retries + 1):
+                try:
+                    return self._call(provider_name, request, slots, kwargs), provider_name
+                except CircuitOpenError as e:
+                    last_error = e
+                    break
+                except Exception as e:
+                    last_error = e
+        raise ProviderError(f"All providers failed. Last error: {str(last_error)}")
+
+    async def _acall(
+        self,
+        provider_name: str,
+        request: ChatCompletionRequest,
+        kwargs: Dict[str, Any]
+    ) -> ChatCompletionResponse:
+        """Async counterpart of _call; cancellation is not counted as an error."""
+        self._check_circuit(provider_name)
+        try:
+            provider = ProviderFactory.get_provider(provider_name)
+            start_time = time.time()
+            response = await provider.acomplete(request, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._record_error(provider_name)
+            raise
+        self._record_latency(provider_name, time.time() - start_time)
+        return response
+
+    async def acomplete(
+        self,
+        request: ChatCompletionRequest,
+        **kwargs
+    ) -> Tuple[ChatCompletionResponse, str]:
+        """
+        Async counterpart of complete; the losing hedged call is cancelled.
+
+        Args:
+            request (ChatCompletionRequest): The request to make.
+            **kwargs: Additional parameters for the provider.
+
+        Returns:
+            Tuple[ChatCompletionResponse, str]: The response and provider name.
+
+        Raises:
+            ProviderError: If all providers fail.
+        """
+        order = self._provider_order()
+        delay = self._hedge_delay(order[0]) if self.hedge and len(order) > 1 else None
+        if delay is None:
+            return await super().acomplete(request, **kwargs)
+
+        primary, backup = order[0], order[1]
+        last_error: Optional[Exception] = None
+        tasks = {asyncio.ensure_future(self._acall(primary, request, kwargs)): primary}
+        try:
+            done, _ = await asyncio.wait(set(tasks), timeout=delay)
+            if not done:
+                tasks[asyncio.ensure_future(self._acall(backup, request, kwargs))] = backup
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result(), tasks[task]
+                    last_error = task.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        attempts = {name: 1 for name in tasks.values()}
+        for provider_name in order:
+            for _ in range(attempts.get(provider_name, 0), self.max_retries + 1):
+                try:
+                    return await self._acall(provider_name, request, kwargs), provider_name
+                except CircuitOpenError as e:
+                    last_error = e
+                    break
+                except Exception as e:
+                    last_error = e
+        raise ProviderError(f"All providers failed. Last error: {str(last_error)}")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get statistics for each provider, including EWMA, p95 and error rate.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Stats for each provider.
+        """
+        stats = super().get_stats()
+        for provider, entry in stats.items():
+            entry["ewma_latency"] = self.ewma.get(provider)
+            entry["p95_latency"] = self.p95(provider)
+            entry["error_rate"] = self.error_rate(provider)
+        return stats
+
+
 class CostBasedStrategy:
     """
     Simple strategy that selects providers based on cost.
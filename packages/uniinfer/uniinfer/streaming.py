@@ -0,0 +1,196 @@
+"""
+Incremental decoder for streamed provider responses.
+
+Providers stream either Server-Sent Events (``data: {...}`` frames ending
+with ``data: [DONE]``) or newline-delimited JSON (Ollama). StreamDecoder
+consumes raw byte chunks as they arrive, splits complete lines without
+decoding them to ``str`` and parses each payload with orjson when it is
+installed (falling back to the standard json module). Malformed lines are
+skipped, matching how providers treated individual bad chunks.
+
+Use ``iter_sse``/``iter_ndjson`` for ``requests`` responses opened with
+``stream=True`` and ``aiter_sse``/``aiter_ndjson`` for ``httpx`` streams.
+"""
+import json
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+SSE = "sse"
+NDJSON = "ndjson"
+
+_DATA_PREFIX = b"data:"
+_DONE = b"[DONE]"
+
+
+# JSON parser for stream payloads; both accept bytes
+loads = orjson.loads if HAS_ORJSON else json.loads
+
+
+class StreamDecoder:
+    """
+    Incremental SSE / NDJSON decoder.
+
+    Feed it raw byte chunks in arrival order; it returns the JSON payloads of
+    all lines completed so far and keeps any partial line for the next chunk.
+
+    Attributes:
+        format (str): "sse" or "ndjson".
+        done (bool): True once an SSE ``[DONE]`` frame has been seen.
+    """
+
+    __slots__ = ("format", "done", "_buffer")
+
+    def __init__(self, format: str = SSE):
+        """
+        Initialize the decoder.
+
+        Args:
+            format (str): "sse" for ``data:`` frames or "ndjson" for one JSON document per line.
+        """
+        if format not in (SSE, NDJSON):
+            raise ValueError(f"Unknown stream format '{format}'")
+        self.format = format
+        self.done = False
+        self._buffer = b""
+
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Decode a chunk of the stream.
+
+        Args:
+            data (bytes): The next bytes of the stream.
+
+        Returns:
+            List[Any]: Payloads of the lines completed by this chunk.
+        """
+        if self.done or not data:
+            return []
+        if self._buffer:
+            data = self._buffer + data
+        lines = data.split(b"\n")
+        self._buffer = lines.pop()
+        events = []
+        for line in lines:
+            event = self._decode_line(line)
+            if event is not None:
+                events.append(event)
+            elif self.done:
+                break
+        return events
+
+    def flush(self) -> List[Any]:
+        """
+        Decode whatever is left once the stream has ended.
+
+        Returns:
+            List[Any]: The payload of a trailing line without a newline, if any.
+        """
+        line, self._buffer = self._buffer, b""
+        if self.done or not line:
+            return []
+        event = self._decode_line(line)
+        return [] if event is None else [event]
+
+    def _decode_line(self, line: bytes) -> Optional[Any]:
+        line = line.strip()
+        if not line:
+            return None
+        if self.format == SSE:
+            # Ignore "event:", "id:", "retry:" fields and ":" comments
+            if not line.startswith(_DATA_PREFIX):
+                return None
+            line = line[len(_DATA_PREFIX):].lstrip()
+            if line == _DONE:
+                self.done = True
+                return None
+        try:
+            return loads(line)
+        except ValueError:
+            return None
+
+
+def decode_lines(lines: Iterable[Any], format: str = SSE) -> Iterator[Any]:
+    """
+    Decode an iterable of complete lines (bytes or str), e.g. recorded streams.
+
+    Args:
+        lines (Iterable): The stream's lines.
+        format (str): "sse" or "ndjson".
+
+    Yields:
+        Any: Decoded payloads.
+    """
+    decoder = StreamDecoder(format)
+    for line in lines:
+        if isinstance(line, str):
+            line = line.encode("utf-8")
+        event = decoder._decode_line(line)
+        if event is not None:
+            yield event
+        elif decoder.done:
+            return
+
+
+def iter_events(response: Any, format: str = SSE) -> Iterator[Any]:
+    """
+    Decode a streaming ``requests`` response.
+
+    Args:
+        response: A ``requests.Response`` opened with ``stream=True``.
+        format (str): "sse" or "ndjson".
+
+    Yields:
+        Any: Decoded payloads, as soon as their line is complete.
+    """
+    decoder = StreamDecoder(format)
+    for chunk in response.iter_content(chunk_size=None):
+        yield from decoder.feed(chunk)
+        if decoder.done:
+            return
+    yield from decoder.flush()
+
+
+async def aiter_events(response: Any, format: str = SSE) -> AsyncIterator[Any]:
+    """
+    Decode a streaming ``httpx`` response.
+
+    Args:
+        response: An ``httpx.Response`` from ``AsyncClient.stream``.
+        format (str): "sse" or "ndjson".
+
+    Yields:
+        Any: Decoded payloads, as soon as their line is complete.
+    """
+    decoder = StreamDecoder(format)
+    async for chunk in response.aiter_bytes():
+        for event in decoder.feed(chunk):
+            yield event
+        if decoder.done:
+            return
+    for event in decoder.flush():
+        yield event
+
+
+def iter_sse(response: Any) -> Iterator[Any]:
+    """Decode the ``data:`` frames of a streaming ``requests`` response."""
+    return iter_events(response, SSE)
+
+
+def iter_ndjson(response: Any) -> Iterator[Any]:
+    """Decode a newline-delimited JSON ``requests`` response."""
+    return iter_events(response, NDJSON)
+
+
+def aiter_sse(response: Any) -> AsyncIterator[Any]:
+    """Decode the ``data:`` frames of a streaming ``httpx`` response."""
+    return aiter_events(response, SSE)
+
+
+def aiter_ndjson(response: Any) -> AsyncIterator[Any]:
+    """Decode a newline-delimited JSON ``httpx`` response."""
+    return aiter_events(response, NDJSON)
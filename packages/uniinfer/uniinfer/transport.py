@@ -0,0 +1,282 @@
+"""
+Shared HTTP transport for UniInfer providers.
+
+Providers talk to their APIs through a single pooled session instead of bare
+``requests.post``/``requests.get`` calls, so TCP and TLS connections are kept
+alive and reused across completions, embeddings and model listings.
+The async API uses a pooled ``httpx.AsyncClient`` with the same settings.
+
+Streaming responses opened inside ``track_streams`` are recorded in an
+``OpenStreams`` so another thread can abort them: closing a ``requests``
+response does not interrupt a read blocked on a stalled upstream, so the
+socket is shut down first.
+"""
+import asyncio
+import socket
+import threading
+import weakref
+from contextlib import contextmanager
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Tuple, Union
+
+# requests and httpx are imported when the first session/client is built,
+# which keeps ``import uniinfer`` fast for callers that never make a request.
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+# httpx is only needed for the async API (acomplete / astream_complete)
+HAS_HTTPX = find_spec("httpx") is not None
+
+# (connect timeout, read timeout) in seconds. Completions can take minutes
+# to produce the first byte on busy free tiers, so the read timeout is generous.
+DEFAULT_TIMEOUT: Tuple[float, float] = (10.0, 300.0)
+DEFAULT_POOL_CONNECTIONS = 32
+DEFAULT_POOL_MAXSIZE = 32
+
+# The OpenStreams the current thread records its streaming responses in
+_tracking = threading.local()
+
+
+def abort_response(response: Any) -> None:
+    """
+    Close a streaming ``requests`` response, interrupting a read that is
+    blocked on it in another thread.
+    """
+    # The connection is detached once the response is released to the pool,
+    # so a finished response is only closed, never its reused socket
+    connection = getattr(getattr(response, "raw", None), "connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    response.close()
+
+
+class OpenStreams:
+    """
+    Streaming responses opened by one thread, abortable from any other.
+    """
+
+    def __init__(self):
+        self._responses: List[Any] = []
+        self._lock = threading.Lock()
+        self.aborted = False
+
+    def add(self, response: Any) -> None:
+        """Record a response; it is aborted at once if abort() was already called."""
+        with self._lock:
+            if not self.aborted:
+                self._responses.append(response)
+                return
+        abort_response(response)
+
+    def abort(self) -> None:
+        """Abort all recorded responses and any opened from now on."""
+        with self._lock:
+            self.aborted = True
+            responses, self._responses = self._responses, []
+        for response in responses:
+            abort_response(response)
+
+    def forget(self) -> None:
+        """Drop the recorded responses without closing them."""
+        with self._lock:
+            self._responses = []
+
+
+@contextmanager
+def track_streams(streams: OpenStreams) -> Iterator[OpenStreams]:
+    """
+    Record the streaming responses the current thread opens in ``streams``.
+
+    Leaving the block forgets them: by then the code that opened them has
+    closed them itself.
+    """
+    previous = getattr(_tracking, "streams", None)
+    _tracking.streams = streams
+    try:
+        yield streams
+    finally:
+        _tracking.streams = previous
+        streams.forget()
+
+
+class HTTPTransport:
+    """
+    Pooled keep-alive HTTP transport.
+
+    Wraps a ``requests.Session`` whose adapters keep one connection pool per
+    host. The session is safe to share between threads for the simple
+    request/response usage of the providers.
+
+    Attributes:
+        pool_connections (int): Number of per-host pools to cache.
+        pool_maxsize (int): Maximum number of connections kept per host.
+        timeout: Default timeout applied when a call does not pass one.
+        max_retries (int): Connection-level retries (not HTTP status retries).
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        timeout: Union[float, Tuple[float, float], None] = DEFAULT_TIMEOUT,
+        max_retries: int = 0,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._session: Optional["requests.Session"] = None
+        # One httpx client per event loop; entries go away with their loop
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary())
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> "requests.Session":
+        """The underlying pooled session, created on first use."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self) -> "requests.Session":
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self.max_retries,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def request(self, method: str, url: str, **kwargs: Any) -> "requests.Response":
+        """
+        Send a request through the pooled session.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Target URL.
+            **kwargs: Passed through to ``requests.Session.request``. If no
+                ``timeout`` is given, the transport default is used.
+
+        Returns:
+            requests.Response: The response. Use it as a context manager when
+            streaming so the connection is returned to the pool.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        response = self.session.request(method, url, **kwargs)
+        streams = getattr(_tracking, "streams", None)
+        if streams is not None and kwargs.get("stream"):
+            streams.add(response)
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> "requests.Response":
+        """Send a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> "requests.Response":
+        """Send a POST request."""
+        return self.request("POST", url, **kwargs)
+
+    @property
+    def async_client(self) -> "httpx.AsyncClient":
+        """
+        The pooled async client for the running event loop.
+
+        httpx clients are bound to the loop they were first used on, so each
+        loop gets its own client. Clients of loops that have been closed are
+        dropped when the next client is created.
+
+        Raises:
+            ImportError: If httpx is not installed.
+        """
+        if not HAS_HTTPX:
+            raise ImportError(
+                "httpx package is required for the async API. "
+                "Install it with: pip install httpx"
+            )
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                for stale in [other for other in self._async_clients if other.is_closed()]:
+                    del self._async_clients[stale]
+                client = self._async_clients[loop] = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.pool_connections * self.pool_maxsize,
+                        max_keepalive_connections=self.pool_maxsize,
+                    ),
+                    timeout=self._httpx_timeout(),
+                )
+        return client
+
+    def _httpx_timeout(self) -> "httpx.Timeout":
+        import httpx
+
+        if isinstance(self.timeout, tuple):
+            connect_timeout, read_timeout = self.timeout
+            return httpx.Timeout(read_timeout, connect=connect_timeout)
+        return httpx.Timeout(self.timeout)
+
+    async def arequest(self, method: str, url: str, **kwargs: Any) -> "httpx.Response":
+        """
+        Send a request through the pooled async client.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Target URL.
+            **kwargs: Passed through to ``httpx.AsyncClient.request``.
+
+        Returns:
+            httpx.Response: The fully read response.
+        """
+        return await self.async_client.request(method, url, **kwargs)
+
+    async def aget(self, url: str, **kwargs: Any) -> "httpx.Response":
+        """Send an async GET request."""
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url: str, **kwargs: Any) -> "httpx.Response":
+        """Send an async POST request."""
+        return await self.arequest("POST", url, **kwargs)
+
+    def astream(self, method: str, url: str, **kwargs: Any):
+        """
+        Open a streaming async request.
+
+        Use as ``async with transport.astream("POST", url, ...) as response``;
+        leaving the block closes the upstream response.
+        """
+        return self.async_client.stream(method, url, **kwargs)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            # Async clients can only be closed from their own loop; drop them
+            # and let them be garbage collected otherwise.
+            self._async_clients.clear()
+
+    async def aclose(self) -> None:
+        """Close the async client of the running loop."""
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
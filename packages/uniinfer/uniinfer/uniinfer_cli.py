@@ -9,6 +9,7 @@ from uniinfer import (
     EmbeddingRequest,
     EmbeddingProviderFactory
 )
+from uniinfer.model_catalogue import get_model_catalogue
 from credgoo import get_api_key
 import argparse
 import random
@@ -78,27 +79,30 @@ def main():
 
     if args.list_providers and args.list_models:
         providers = ProviderFactory.list_providers()
-        for provider in providers:
-            try:
-                provider_class = ProviderFactory.get_provider_class(provider)
-                retrieved_api_key = get_api_key(
-                    service=provider,
-                    encryption_key=credgoo_encryption_token,
-                    bearer_token=credgoo_api_token,)
-                # models = ProviderFactory.list_models(
-                #    provider=provider,
-                #    api_key=retrieved_api_key,
-                #    **({} if provider not in ['cloudflare', 'ollama'] else PROVIDER_CONFIGS[provider].get('extra_params', {}))
-                # )
-                models = provider_class.list_models(
-                    api_key=retrieved_api_key,
-                    **({} if provider not in ['cloudflare', 'ollama'] else PROVIDER_CONFIGS[provider].get('extra_params', {}))
-                )
-                print(f"\nAvailable models for {provider}:")
-                for model in models:
-                    print(f"- {model}")
-            except Exception as e:
-                print(f"\nError listing models for {provider}: {str(e)}")
+
+        def fetch_models(provider):
+            provider_class = ProviderFactory.get_provider_class(provider)
+            retrieved_api_key = get_api_key(
+                service=provider,
+                encryption_key=credgoo_encryption_token,
+                bearer_token=credgoo_api_token,)
+            return provider_class.list_models(
+                api_key=retrieved_api_key,
+                **({} if provider not in ['cloudflare', 'ollama'] else PROVIDER_CONFIGS[provider].get('extra_params', {}))
+            )
+
+        # query all providers in parallel; slow ones time out individually, and
+        # the shared transport gives up on their requests after the same time
+        catalogue = get_model_catalogue()
+        ProviderFactory.configure_transport(timeout=catalogue.timeout)
+        results = catalogue.get_many(providers, fetch_models)
+        for provider, models in results.items():
+            if isinstance(models, Exception):
+                print(f"\nError listing models for {provider}: {str(models)}")
+                continue
+            print(f"\nAvailable models for {provider}:")
+            for model in models:
+                print(f"- {model}")
         return
 
     if args.list_providers:
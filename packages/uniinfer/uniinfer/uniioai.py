@@ -2,25 +2,23 @@
 A OpenAI compliance wrapper for LLM APIs using uniinfer, supporting streaming and non-streaming.
 """
 import os
-from typing import Optional, List, Dict, Any  # Import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple  # Import Optional, List, Dict, Any
 import random  # Import random
 
 from uniinfer import ProviderFactory, ChatMessage, ChatCompletionRequest, ChatCompletionResponse
 from uniinfer import EmbeddingProviderFactory, EmbeddingRequest, EmbeddingResponse
 from uniinfer.errors import UniInferError, AuthenticationError
-from dotenv import load_dotenv
-from credgoo import get_api_key
+from uniinfer.completion_cache import CachedProvider, get_completion_cache
+from uniinfer.ratelimit import with_rate_limit
+from uniinfer.embedding_batch import with_embedding_batching
+from uniinfer.embedding_cache import with_embedding_cache
 from uniinfer.examples.providers_config import PROVIDER_CONFIGS  # added
 # Import the helper functions
-from uniinfer.json_utils import update_models, update_model_accessed
-# Load environment variables from .env file
-dotenv_path = os.path.join(os.getcwd(), '.env')  # Explicitly check current dir
-# Add verbose=True and override=True
-found_dotenv = load_dotenv(dotenv_path=dotenv_path,
-                           verbose=True, override=True)
+from uniinfer.json_utils import update_model_accessed
+from uniinfer.model_catalogue import get_model_catalogue
+from uniinfer.env import load_environment
 
-print(f"DEBUG: Attempted to load .env from: {dotenv_path}")  # Debug print
-print(f"DEBUG: .env file found and loaded: {found_dotenv}")  # Debug print
+# dotenv and credgoo are imported on first use rather than at import time
 
 
 # --- Helper Function for API Key Retrieval ---
@@ -43,6 +41,7 @@ def get_provider_api_key(api_bearer_token: str, provider_name: str) -> Optional[
         ValueError: If the combined credgoo token format is invalid or api_bearer_token is missing.
         AuthenticationError: If credgoo fails to retrieve a key using a combined token.
     """
+    load_environment()
     # For Ollama, no authentication is required
     if provider_name == 'ollama':
         return None
@@ -59,6 +58,7 @@ def get_provider_api_key(api_bearer_token: str, provider_name: str) -> Optional[
             if not credgoo_bearer or not credgoo_encryption:
                 raise ValueError(
                     "Invalid combined credgoo token format. Both parts are required.")
+            from credgoo import get_api_key
             provider_api_key = get_api_key(
                 service=provider_name,
                 encryption_key=credgoo_encryption,
@@ -87,6 +87,27 @@ def get_provider_api_key(api_bearer_token: str, provider_name: str) -> Optional[
     return provider_api_key
 
 
+def _split_provider_model(provider_model_string: str) -> Tuple[str, str]:
+    """Split 'provider@modelname' into its parts, validating the format."""
+    if '@' not in provider_model_string:
+        raise ValueError(
+            "Invalid provider_model_string format. Expected 'provider@modelname'.")
+    provider_name, model_name = provider_model_string.split('@', 1)
+
+    if not provider_name or not model_name:
+        raise ValueError(
+            "Invalid provider_model_string format. Provider or model name is empty.")
+    return provider_name, model_name
+
+
+def _with_completion_cache(provider, provider_name: str, base_url: Optional[str] = None):
+    """Wrap the provider in the completion cache when caching is enabled."""
+    cache = get_completion_cache()
+    if cache is None:
+        return provider
+    return CachedProvider(provider, cache, provider_name=provider_name, base_url=base_url)
+
+
 # --- Main Completion Functions ---
 
 # Update signature: remove api_bearer_token, add provider_api_key
@@ -110,26 +131,21 @@ def stream_completion(messages, provider_model_string, temperature=0.7, max_toke
         ValueError: If the provider_model_string format is invalid.
         UniInferError: If there's an issue with the provider or the request.
     """
+    load_environment()
     try:
         # Parse provider and model from the combined string
-        if '@' not in provider_model_string:
-            raise ValueError(
-                "Invalid provider_model_string format. Expected 'provider@modelname'.")
-        provider_name, model_name = provider_model_string.split('@', 1)
-
-        if not provider_name or not model_name:
-            raise ValueError(
-                "Invalid provider_model_string format. Provider or model name is empty.")
+        provider_name, model_name = _split_provider_model(
+            provider_model_string)
 
         # Get the specified provider, passing base_url if provided
         provider_kwargs = {'api_key': provider_api_key}  # Use passed key
         if base_url:
             provider_kwargs['base_url'] = base_url
 
-        provider = ProviderFactory.get_provider(
+        provider = _with_completion_cache(with_rate_limit(ProviderFactory.get_provider(
             provider_name,
             **provider_kwargs
-        )
+        ), provider_name), provider_name, base_url)
 
         # Prepare uniinfer messages
         uniinfer_messages = [ChatMessage(**msg) for msg in messages]
@@ -180,26 +196,21 @@ def get_completion(messages, provider_model_string, temperature=0.7, max_tokens=
         ValueError: If the provider_model_string format is invalid.
         UniInferError: If there's an issue with the provider or the request.
     """
+    load_environment()
     try:
         # Parse provider and model from the combined string
-        if '@' not in provider_model_string:
-            raise ValueError(
-                "Invalid provider_model_string format. Expected 'provider@modelname'.")
-        provider_name, model_name = provider_model_string.split('@', 1)
-
-        if not provider_name or not model_name:
-            raise ValueError(
-                "Invalid provider_model_string format. Provider or model name is empty.")
+        provider_name, model_name = _split_provider_model(
+            provider_model_string)
 
         # Get the specified provider, passing base_url if provided
         provider_kwargs = {'api_key': provider_api_key}  # Use passed key
         if base_url:
             provider_kwargs['base_url'] = base_url
 
-        provider = ProviderFactory.get_provider(
+        provider = _with_completion_cache(with_rate_limit(ProviderFactory.get_provider(
             provider_name,
             **provider_kwargs
-        )
+        ), provider_name), provider_name, base_url)
 
         # Prepare uniinfer messages
         uniinfer_messages = [ChatMessage(**msg) for msg in messages]
@@ -237,9 +248,128 @@ def get_completion(messages, provider_model_string, temperature=0.7, max_tokens=
             f"An unexpected error occurred in get_completion: {e}")
 
 
+# --- Async Completion Functions (run on the caller's event loop) ---
+
+async def astream_completion(messages, provider_model_string, temperature=0.7, max_tokens=500, provider_api_key: Optional[str] = None, base_url: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Async counterpart of stream_completion, backed by ChatProvider.astream_complete.
+
+    Args:
+        messages (list[dict]): A list of message dictionaries.
+        provider_model_string (str): Combined provider and model name, e.g., "openai@gpt-4".
+        temperature (float): The sampling temperature.
+        max_tokens (int): The maximum number of tokens to generate.
+        provider_api_key (str, optional): The pre-retrieved API key for the provider. Defaults to None.
+        base_url (str, optional): The base URL for the provider's API (e.g., for Ollama). Defaults to None.
+    Yields:
+        str: Chunks of the generated content.
+
+    Raises:
+        ValueError: If the provider_model_string format is invalid.
+        UniInferError: If there's an issue with the provider or the request.
+    """
+    load_environment()
+    try:
+        provider_name, model_name = _split_provider_model(
+            provider_model_string)
+
+        provider_kwargs = {'api_key': provider_api_key}
+        if base_url:
+            provider_kwargs['base_url'] = base_url
+        provider = _with_completion_cache(with_rate_limit(ProviderFactory.get_provider(
+            provider_name, **provider_kwargs), provider_name), provider_name, base_url)
+
+        request = ChatCompletionRequest(
+            messages=[ChatMessage(**msg) for msg in messages],
+            model=model_name,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            streaming=True
+        )
+
+        print(
+            f"--- Streaming response from {provider_name} ({model_name}) ---")
+        stream = provider.astream_complete(request)
+        try:
+            async for chunk in stream:
+                if chunk.message and chunk.message.content:
+                    yield chunk.message.content
+        finally:
+            # close the provider stream (and its HTTP response) right away
+            # when the caller stops early
+            await stream.aclose()
+        update_model_accessed(model_name, provider_name)
+
+    except (UniInferError, ValueError) as e:
+        print(f"An error occurred: {e}")
+        raise
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        raise UniInferError(
+            f"An unexpected error occurred in astream_completion: {e}")
+
+
+async def aget_completion(messages, provider_model_string, temperature=0.7, max_tokens=500, provider_api_key: Optional[str] = None, base_url: Optional[str] = None) -> str:
+    """
+    Async counterpart of get_completion, backed by ChatProvider.acomplete.
+
+    Args:
+        messages (list[dict]): A list of message dictionaries.
+        provider_model_string (str): Combined provider and model name, e.g., "openai@gpt-4".
+        temperature (float): The sampling temperature.
+        max_tokens (int): The maximum number of tokens to generate.
+        provider_api_key (str, optional): The pre-retrieved API key for the provider. Defaults to None.
+        base_url (str, optional): The base URL for the provider's API (e.g., for Ollama). Defaults to None.
+    Returns:
+        str: The complete generated content.
+
+    Raises:
+        ValueError: If the provider_model_string format is invalid.
+        UniInferError: If there's an issue with the provider or the request.
+    """
+    load_environment()
+    try:
+        provider_name, model_name = _split_provider_model(
+            provider_model_string)
+
+        provider_kwargs = {'api_key': provider_api_key}
+        if base_url:
+            provider_kwargs['base_url'] = base_url
+        provider = _with_completion_cache(with_rate_limit(ProviderFactory.get_provider(
+            provider_name, **provider_kwargs), provider_name), provider_name, base_url)
+
+        request = ChatCompletionRequest(
+            messages=[ChatMessage(**msg) for msg in messages],
+            model=model_name,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            streaming=False
+        )
+
+        print(
+            f"--- Requesting non-streaming response from {provider_name} ({model_name}) ---")
+        response: ChatCompletionResponse = await provider.acomplete(request)
+        print("--- Response received ---")
+
+        if response.message and response.message.content:
+            update_model_accessed(model_name, provider_name)
+            return response.message.content
+        print("Warning: Received empty content in response.")
+        return ""
+
+    except (UniInferError, ValueError) as e:
+        print(f"An error occurred during non-streaming completion: {e}")
+        raise
+    except Exception as e:
+        print(
+            f"An unexpected error occurred during non-streaming completion: {e}")
+        raise UniInferError(
+            f"An unexpected error occurred in aget_completion: {e}")
+
+
 # --- Embedding Functions ---
 
-def get_embeddings(input_texts: List[str], provider_model_string: str, provider_api_key: Optional[str] = None, base_url: Optional[str] = None) -> Dict[str, Any]:
+def get_embeddings(input_texts: List[str], provider_model_string: str, provider_api_key: Optional[str] = None, base_url: Optional[str] = None, as_matrix: bool = False) -> Dict[str, Any]:
     """
     Initiates an embedding request via uniinfer.
 
@@ -248,6 +378,8 @@ def get_embeddings(input_texts: List[str], provider_model_string: str, provider_
         provider_model_string (str): Combined provider and model name, e.g., "ollama@nomic-embed-text:latest".
         provider_api_key (str, optional): The pre-retrieved API key for the provider. Defaults to None.
         base_url (str, optional): The base URL for the provider's API (e.g., for Ollama). Defaults to None.
+        as_matrix (bool, optional): Return the embeddings as the response's float32 matrix
+            (see EmbeddingResponse.embeddings) instead of lists of floats. Defaults to False.
 
     Returns:
         Dict[str, Any]: A dictionary containing 'embeddings' (list of embedding vectors) and 'usage' (token usage information).
@@ -256,16 +388,11 @@ def get_embeddings(input_texts: List[str], provider_model_string: str, provider_
         ValueError: If the provider_model_string format is invalid.
         UniInferError: If there's an issue with the provider or the request.
     """
+    load_environment()
     try:
         # Parse provider and model from the combined string
-        if '@' not in provider_model_string:
-            raise ValueError(
-                "Invalid provider_model_string format. Expected 'provider@modelname'.")
-        provider_name, model_name = provider_model_string.split('@', 1)
-
-        if not provider_name or not model_name:
-            raise ValueError(
-                "Invalid provider_model_string format. Provider or model name is empty.")
+        provider_name, model_name = _split_provider_model(
+            provider_model_string)
 
         # Get the specified embedding provider, passing base_url if provided
         provider_kwargs = {'api_key': provider_api_key}  # Use passed key
@@ -283,14 +410,17 @@ def get_embeddings(input_texts: List[str], provider_model_string: str, provider_
             model=model_name
         )
 
-        # Get the response
+        # Get the response; cached vectors are reused when the embedding cache is
+        # enabled, and the remaining inputs are deduplicated and sent in
+        # concurrent batches
         print(
             f"--- Requesting embeddings from {provider_name} ({model_name}) ---")
+        provider = with_embedding_cache(with_embedding_batching(provider), provider_name)
         response: EmbeddingResponse = provider.embed(request)
         print("--- Embeddings received ---")
 
         # Extract the embedding vectors and usage from the response
-        embeddings = [embedding_data["embedding"] for embedding_data in response.data]
+        embeddings = response.embeddings if as_matrix else [row.tolist() for row in response.embeddings]
         usage = getattr(response, 'usage', {'prompt_tokens': 0, 'total_tokens': 0})
         return {'embeddings': embeddings, 'usage': usage}
 
@@ -303,6 +433,58 @@ def get_embeddings(input_texts: List[str], provider_model_string: str, provider_
             f"An unexpected error occurred in get_embeddings: {e}")
 
 
+async def aget_embeddings(input_texts: List[str], provider_model_string: str, provider_api_key: Optional[str] = None, base_url: Optional[str] = None, as_matrix: bool = False) -> Dict[str, Any]:
+    """
+    Async counterpart of get_embeddings, backed by EmbeddingProvider.aembed.
+
+    Args:
+        input_texts (List[str]): A list of texts to embed.
+        provider_model_string (str): Combined provider and model name, e.g., "ollama@nomic-embed-text:latest".
+        provider_api_key (str, optional): The pre-retrieved API key for the provider. Defaults to None.
+        base_url (str, optional): The base URL for the provider's API (e.g., for Ollama). Defaults to None.
+        as_matrix (bool, optional): Return the embeddings as the response's float32 matrix
+            (see EmbeddingResponse.embeddings) instead of lists of floats. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing 'embeddings' (list of embedding vectors) and 'usage' (token usage information).
+
+    Raises:
+        ValueError: If the provider_model_string format is invalid.
+        UniInferError: If there's an issue with the provider or the request.
+    """
+    load_environment()
+    try:
+        provider_name, model_name = _split_provider_model(
+            provider_model_string)
+
+        provider_kwargs = {'api_key': provider_api_key}
+        if base_url:
+            provider_kwargs['base_url'] = base_url
+        provider = EmbeddingProviderFactory.get_provider(
+            provider_name, **provider_kwargs)
+
+        request = EmbeddingRequest(input=input_texts, model=model_name)
+
+        print(
+            f"--- Requesting embeddings from {provider_name} ({model_name}) ---")
+        provider = with_embedding_cache(with_embedding_batching(provider), provider_name)
+        response: EmbeddingResponse = await provider.aembed(request)
+        print("--- Embeddings received ---")
+
+        embeddings = response.embeddings if as_matrix else [row.tolist() for row in response.embeddings]
+        usage = getattr(response, 'usage', {
+                        'prompt_tokens': 0, 'total_tokens': 0})
+        return {'embeddings': embeddings, 'usage': usage}
+
+    except (UniInferError, ValueError) as e:
+        print(f"An error occurred during embedding request: {e}")
+        raise
+    except Exception as e:
+        print(f"An unexpected error occurred during embedding request: {e}")
+        raise UniInferError(
+            f"An unexpected error occurred in aget_embeddings: {e}")
+
+
 # --- New Helper to List Embedding Providers ---
 def list_embedding_providers() -> List[str]:
     """
@@ -341,10 +523,7 @@ def list_providers() -> List[str]:
 
 
 # --- New Helper to List Models for a Provider ---
-def list_models_for_provider(provider_name: str, api_bearer_token: str) -> List[str]:
-    """
-    Return available model names for the given provider, using the bearer token.
-    """
+def _fetch_models_for_provider(provider_name: str, api_bearer_token: str) -> List[str]:
     # retrieve actual api key
     api_key = get_provider_api_key(api_bearer_token, provider_name)
     # determine extra params if needed
@@ -353,13 +532,37 @@ def list_models_for_provider(provider_name: str, api_bearer_token: str) -> List[
         extra = PROVIDER_CONFIGS.get(provider_name, {}).get('extra_params', {})
     # get the provider class and list models
     provider_cls = ProviderFactory.get_provider_class(provider_name)
-    modellist = provider_cls.list_models(api_key=api_key, **extra)
-    update_models(modellist, provider_name)
-    return modellist
+    return provider_cls.list_models(api_key=api_key, **extra)
+
+
+def list_models_for_provider(provider_name: str, api_bearer_token: str, refresh: bool = False) -> List[str]:
+    """
+    Return available model names for the given provider, using the bearer token.
+
+    Lists are cached by the model catalogue and saved to models.json; pass
+    refresh=True to fetch a new one.
+    """
+    return get_model_catalogue().get(
+        provider_name,
+        lambda: _fetch_models_for_provider(provider_name, api_bearer_token),
+        api_key=api_bearer_token,
+        refresh=refresh)
+
+
+async def alist_models_for_provider(provider_name: str, api_bearer_token: str, refresh: bool = False) -> List[str]:
+    """
+    Async version of list_models_for_provider(); fetches run off the event loop.
+    """
+    return await get_model_catalogue().aget(
+        provider_name,
+        lambda: _fetch_models_for_provider(provider_name, api_bearer_token),
+        api_key=api_bearer_token,
+        refresh=refresh)
 
 
 # Example Usage
 if __name__ == "__main__":
+    load_environment()
     test_credgootoken = f"{os.getenv('CREDGOO_BEARER_TOKEN')}@{os.getenv('CREDGOO_ENCRYPTION_KEY')}"
 #    test_provider_model = os.getenv("TEST_PROVIDER_MODEL", "ollama@gemma3:4b")
     test_provider_model = os.getenv(
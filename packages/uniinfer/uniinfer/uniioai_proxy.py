@@ -1,18 +1,20 @@
 import os
 import sys
 import time
+import asyncio
 import json
 import uuid
-from typing import List, Optional, Dict, Any, AsyncGenerator
-import inspect  # Import inspect for debugging
+import base64
+import math
+import weakref
+from contextlib import asynccontextmanager
+from typing import List, Optional, Dict, Any, AsyncGenerator, Union
 
 from fastapi import FastAPI, HTTPException, Request, Depends  # Add Depends
 # Add FileResponse and CORSMiddleware imports
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import StreamingResponse, FileResponse, PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-# Import run_in_threadpool
-from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 from fastapi.security import HTTPBearer  # Import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials  # Import HTTPAuthorizationCredentials
 from uniinfer.examples.providers_config import PROVIDER_CONFIGS  # Add this import
@@ -27,19 +29,46 @@ if uniinfer_package_path not in sys.path:
 # Now import from uniioai (assuming it's inside the uniinfer package structure)
 try:
     # Import get_provider_api_key as well
-    from uniinfer.uniioai import stream_completion, get_completion, get_provider_api_key, list_providers, list_models_for_provider, get_embeddings, list_embedding_providers, list_embedding_models_for_provider
-    from uniinfer.errors import UniInferError, AuthenticationError, ProviderError, RateLimitError
+    from uniinfer.uniioai import load_environment, astream_completion, aget_completion, get_provider_api_key, list_providers, alist_models_for_provider, aget_embeddings, list_embedding_providers, list_embedding_models_for_provider
+    from uniinfer.errors import UniInferError, AuthenticationError, ProviderError, RateLimitError, QueueFullError
+    from uniinfer.core import pack_embedding
+    from uniinfer.credential_cache import CredentialCache, DEFAULT_TTL as CREDENTIAL_TTL
+    from uniinfer.providers.replay import key_provider as replay_key_provider
+    from uniinfer.singleflight import SingleFlight, make_request_key
+    from uniinfer.embedding_cache import get_embedding_cache
+    from uniinfer.metrics import REGISTRY, StreamTimer, track_request
+    from uniinfer.scheduler import (
+        PriorityScheduler, Slot, parse_limits, parse_priority,
+        DEFAULT_MAX_QUEUE, DEFAULT_QUEUE_TIMEOUT, BATCH
+    )
+    from uniinfer.adaptive import AdaptiveConcurrency, DEFAULT_LIMITS_PATH
+    from uniinfer.batch_jobs import (
+        BatchRunner, BatchStore,
+        DEFAULT_BATCH_DB, DEFAULT_CONCURRENCY as DEFAULT_BATCH_CONCURRENCY
+    )
 except ImportError as e:
     print(f"Error importing from uniinfer.uniioai: {e}")
     print("Please ensure uniioai.py is correctly placed within the uniinfer package structure")
     print(f"Attempted path: {uniinfer_package_path}")
     sys.exit(1)
 
+# Apply .env before the UNIINFER_* settings below are read
+load_environment()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # uvicorn re-raises SIGTERM after shutdown, which skips atexit handlers
+    if adaptive_limits is not None:
+        adaptive_limits.save()
+
 
 app = FastAPI(
     title="UniIOAI API",
     description="OpenAI-compatible API wrapper using UniInfer",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # --- Add CORS Middleware ---
@@ -55,6 +84,95 @@ app.add_middleware(
 # Define the security scheme
 security = HTTPBearer()
 
+# Resolved provider keys per bearer token, so credgoo is consulted once per
+# token and provider (UNIINFER_CREDENTIAL_TTL seconds, 0 disables)
+credential_cache = CredentialCache(
+    ttl=float(os.getenv("UNIINFER_CREDENTIAL_TTL", CREDENTIAL_TTL)))
+
+
+async def resolve_provider_api_key(api_bearer_token: Optional[str], provider_name: str,
+                                   model: str = "") -> Optional[str]:
+    """
+    get_provider_api_key() through the proxy's credential cache. Misses
+    (a credgoo round trip) run in a worker thread, shared by concurrent
+    requests with the same token and provider.
+
+    ``replay`` requests resolve the key of the provider they record from,
+    named in ``model``, and need none when only replaying.
+    """
+    if provider_name == "replay":
+        provider_name = replay_key_provider(model)
+        if provider_name is None:
+            return None
+    return await credential_cache.aresolve(api_bearer_token, provider_name, get_provider_api_key)
+
+
+# Identical concurrent non-streaming requests share one upstream call when
+# UNIINFER_SINGLE_FLIGHT is set
+single_flight = SingleFlight() if os.getenv("UNIINFER_SINGLE_FLIGHT", "").strip().lower() in (
+    "1", "true", "yes", "on") else None
+
+
+async def coalesced(key_parts: tuple, fn):
+    """Await fn(), sharing the call with identical in-flight requests if enabled."""
+    if single_flight is None:
+        return await fn()
+    return await single_flight.do(make_request_key(*key_parts), fn, endpoint=key_parts[0])
+
+
+# Provider limits learned from 429s, timeouts and latency (AIMD) when
+# UNIINFER_ADAPTIVE_CONCURRENCY is set, persisted across restarts
+adaptive_limits = AdaptiveConcurrency(
+    path=os.getenv("UNIINFER_ADAPTIVE_LIMITS_PATH", DEFAULT_LIMITS_PATH)
+) if os.getenv("UNIINFER_ADAPTIVE_CONCURRENCY", "").strip().lower() in ("1", "true", "yes", "on") else None
+
+# Admission control: in-flight limits per provider and model (max_concurrency
+# in PROVIDER_CONFIGS or UNIINFER_CONCURRENCY_LIMITS="openai=8,openai@gpt-4o=2")
+# with X-Priority classes and bounded queues
+scheduler = PriorityScheduler(
+    limits=parse_limits(os.getenv("UNIINFER_CONCURRENCY_LIMITS")),
+    max_queue=int(os.getenv("UNIINFER_QUEUE_SIZE", DEFAULT_MAX_QUEUE)),
+    queue_timeout=float(os.getenv("UNIINFER_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT)),
+    adaptive=adaptive_limits)
+
+
+def rate_limit_exception(error: RateLimitError) -> HTTPException:
+    """HTTP 429 for an upstream rate limit, passing on its Retry-After."""
+    headers = {"Retry-After": str(math.ceil(error.retry_after))} if error.retry_after is not None else None
+    return HTTPException(status_code=429, detail=f"Rate Limit Error: {error}", headers=headers)
+
+
+def request_priority(request: Request) -> str:
+    """Return the request's X-Priority class, raising HTTP 400 for an unknown one."""
+    try:
+        return parse_priority(request.headers.get("x-priority"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def admit(priority: str, provider_name: str, model: str) -> Slot:
+    """
+    Wait for a scheduler slot in the given priority class.
+
+    Raises HTTP 429 when the queue is full or the wait timed out.
+    """
+    try:
+        return await scheduler.acquire(provider_name, model, priority)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=f"Queue Full: {e}", headers={"Retry-After": "1"})
+
+
+async def admitted(priority: str, provider_name: str, model: str, fn):
+    """
+    Await fn() while holding a scheduler slot, reporting its outcome.
+
+    Used inside coalesced() so that only the leader of a shared call takes a
+    slot and feeds the adaptive limits; followers just wait for its result.
+    """
+    async with await admit(priority, provider_name, model):
+        return await fn()
+
+
 # Custom dependency for optional authentication
 async def optional_security(request: Request) -> Optional[str]:
     """
@@ -149,11 +267,13 @@ class EmbeddingRequest(BaseModel):
     model: str  # Expected format: "provider@modelname"
     input: List[str]  # List of texts to embed
     user: Optional[str] = None  # Optional user identifier
+    # "float" (JSON numbers) or "base64" (packed little-endian float32)
+    encoding_format: Optional[str] = "float"
 
 
 class EmbeddingData(BaseModel):
     object: str = "embedding"
-    embedding: List[float]
+    embedding: Union[List[float], str]
     index: int
 
 
@@ -185,11 +305,43 @@ PREDEFINED_MODELS = [
 ]
 
 
+# --- Models for /v1/batches ---
+
+class BatchCreateRequest(BaseModel):
+    input_file_id: str
+    endpoint: str = "/v1/chat/completions"
+    completion_window: str = "24h"
+    metadata: Optional[Dict[str, str]] = None
+
+
 # --- Helper Functions ---
 
+async def _wait_for_disconnect(request: Request) -> None:
+    """Return once the client has closed the connection."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _stop_reading(pending_read: Optional[asyncio.Future], upstream) -> None:
+    """Cancel a pending upstream read and close the upstream stream."""
+    if pending_read is not None and not pending_read.done():
+        pending_read.cancel()
+        # let the provider unwind (closing its HTTP response) inside that read
+        await asyncio.gather(pending_read, return_exceptions=True)
+    await upstream.aclose()
+
+
 # Update signature: remove api_bearer_token, add provider_api_key
-async def stream_response_generator(messages: List[Dict], provider_model: str, temp: float, max_tok: int, provider_api_key: Optional[str], base_url: Optional[str]) -> AsyncGenerator[str, None]:
-    """Generates OpenAI-compatible SSE chunks from uniioai.stream_completion using a thread pool."""
+async def stream_response_generator(messages: List[Dict], provider_model: str, temp: float, max_tok: int, provider_api_key: Optional[str], base_url: Optional[str], request: Optional[Request] = None, slot: Optional[Slot] = None) -> AsyncGenerator[str, None]:
+    """
+    Generates OpenAI-compatible SSE chunks from uniioai.astream_completion on the event loop.
+
+    When the request is given, a client disconnect stops the stream right away:
+    the pending upstream read is cancelled and the upstream response closed.
+    A scheduler slot, if given, is released when the stream ends.
+    """
     completion_id = f"chatcmpl-{uuid.uuid4()}"
     created_time = int(time.time())
     model_name = provider_model
@@ -203,38 +355,41 @@ async def stream_response_generator(messages: List[Dict], provider_model: str, t
     )
     yield f"data: {first_chunk_data.model_dump_json()}\n\n"
 
+    provider_name, model = provider_model.split('@', 1)
+    timer = StreamTimer(provider_name, model)
+    upstream = astream_completion(
+        messages, provider_model, temp, max_tok, provider_api_key=provider_api_key, base_url=base_url)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(request)) if request is not None else None
+    pending_read = None
+    failure = None  # reported to the scheduler slot
     try:
-        # Create the synchronous generator instance, passing the retrieved key
-        sync_generator = stream_completion(
-            # Pass provider_api_key
-            messages, provider_model, temp, max_tok, provider_api_key=provider_api_key, base_url=base_url)
-
-        # --- Debugging ---
-        print(f"DEBUG: Type of sync_generator: {type(sync_generator)}")
-        print(
-            f"DEBUG: Is sync_generator a generator? {inspect.isgenerator(sync_generator)}")
-        iterator_obj = iterate_in_threadpool(sync_generator)
-        print(
-            f"DEBUG: Type of iterator_obj from iterate_in_threadpool: {type(iterator_obj)}")
-        print(
-            f"DEBUG: Is iterator_obj an async generator? {inspect.isasyncgen(iterator_obj)}")
-        print(
-            f"DEBUG: iterator_obj has __aiter__: {hasattr(iterator_obj, '__aiter__')}")
-        print(
-            f"DEBUG: iterator_obj has __anext__: {hasattr(iterator_obj, '__anext__')}")
-        # --- End Debugging ---
-
-        # Iterate over the synchronous generator in a thread pool
-        async for content_chunk in iterator_obj:  # Use the debugged object
-            if content_chunk:  # Ensure we don't send empty chunks
-                chunk_data = StreamingChatCompletionChunk(
-                    id=completion_id,
-                    created=created_time,
-                    model=model_name,
-                    choices=[StreamingChoice(
-                        delta=ChoiceDelta(content=content_chunk))]
-                )
-                yield f"data: {chunk_data.model_dump_json()}\n\n"
+        # Iterate the provider stream natively on the event loop, racing each
+        # read against the client going away
+        with track_request("chat_stream", provider_name, model) as outcome:
+            while True:
+                pending_read = asyncio.ensure_future(upstream.__anext__())
+                if disconnected is not None:
+                    await asyncio.wait((pending_read, disconnected), return_when=asyncio.FIRST_COMPLETED)
+                    if not pending_read.done():
+                        outcome["status"] = "cancelled"
+                        timer.cancel(max_tok)
+                        failure = asyncio.CancelledError()
+                        return
+                try:
+                    content_chunk = await pending_read
+                except StopAsyncIteration:
+                    break
+                if content_chunk:  # Ensure we don't send empty chunks
+                    timer.chunk(content_chunk)
+                    chunk_data = StreamingChatCompletionChunk(
+                        id=completion_id,
+                        created=created_time,
+                        model=model_name,
+                        choices=[StreamingChoice(
+                            delta=ChoiceDelta(content=content_chunk))]
+                    )
+                    yield f"data: {chunk_data.model_dump_json()}\n\n"
+            timer.finish()
 
         # Last chunk signals completion
         final_chunk_data = StreamingChatCompletionChunk(
@@ -246,7 +401,13 @@ async def stream_response_generator(messages: List[Dict], provider_model: str, t
         )
         yield f"data: {final_chunk_data.model_dump_json()}\n\n"
 
+    except (asyncio.CancelledError, GeneratorExit) as e:
+        # The server stopped the response (client gone) while we were waiting
+        failure = e
+        timer.cancel(max_tok)
+        raise
     except NameError as e:
+        failure = e
         # Specific catch for missing 'payload' or similar undefined names
         print(f"NameError during streaming: {e}")
         error_chunk = {
@@ -258,18 +419,28 @@ async def stream_response_generator(messages: List[Dict], provider_model: str, t
         }
         yield f"data: {json.dumps(error_chunk)}\n\n"
     except (UniInferError, ValueError) as e:
+        failure = e
         print(f"Error during streaming: {e}")
         # Optionally yield an error chunk (though not standard OpenAI)
         error_chunk = {"error": {"message": str(
             e), "type": type(e).__name__, "code": None}}
         yield f"data: {json.dumps(error_chunk)}\n\n"
     except Exception as e:
+        failure = e
         print(f"Unexpected error during streaming: {e}")
         import traceback
         traceback.print_exc()
         error_chunk = {"error": {
             "message": f"Unexpected server error: {type(e).__name__}", "type": "internal_server_error", "code": None}}
         yield f"data: {json.dumps(error_chunk)}\n\n"
+    finally:
+        if disconnected is not None:
+            disconnected.cancel()
+        await _stop_reading(pending_read, upstream)
+        if slot is not None:
+            # a stream's latency is its time to first token
+            slot.release(error=failure, latency=(
+                timer.first_at - timer.started if timer.first_at is not None else None))
 
     yield "data: [DONE]\n\n"
 
@@ -312,7 +483,7 @@ async def get_providers(token: str = Depends(security)):
 
 @app.post("/v1/chat/completions")
 # Add the security dependency
-async def chat_completions(request_input: ChatCompletionRequestInput, token: str = Depends(security)):
+async def chat_completions(request_input: ChatCompletionRequestInput, request: Request, token: str = Depends(security)):
     """
     OpenAI-compatible chat completions endpoint.
     Uses the 'model' field in the format 'provider@modelname'.
@@ -339,38 +510,48 @@ async def chat_completions(request_input: ChatCompletionRequestInput, token: str
         print(f"DEBUG: Using base_url: {base_url}")
 
         try:
-            provider_api_key = get_provider_api_key(
-                api_bearer_token, provider_name)
+            provider_api_key = await resolve_provider_api_key(
+                api_bearer_token, provider_name, provider_model.split('@', 1)[1])
         except (ValueError, AuthenticationError) as e:
             # Handle errors during key retrieval specifically
             raise HTTPException(
                 status_code=401, detail=f"API Key Retrieval Failed: {e}")
         # --- End API Key Retrieval & Base URL Logic ---
 
+        model = provider_model.split('@', 1)[1]
+        priority = request_priority(request)
+
         if request_input.stream:
+            slot = await admit(priority, provider_name, model)
             # Use the async generator with StreamingResponse
-            return StreamingResponse(
-                stream_response_generator(
-                    messages=messages_dict,
-                    provider_model=provider_model,
-                    temp=request_input.temperature,
-                    max_tok=request_input.max_tokens,
-                    provider_api_key=provider_api_key,  # Pass retrieved key
-                    base_url=base_url  # Pass potentially modified base_url
-                ),
-                media_type="text/event-stream"
-            )
-        else:
-            # Wrap synchronous get_completion in run_in_threadpool
-            full_content = await run_in_threadpool(
-                get_completion,  # The sync function
+            stream = stream_response_generator(
                 messages=messages_dict,
-                provider_model_string=provider_model,
-                temperature=request_input.temperature,
-                max_tokens=request_input.max_tokens,
+                provider_model=provider_model,
+                temp=request_input.temperature,
+                max_tok=request_input.max_tokens,
                 provider_api_key=provider_api_key,  # Pass retrieved key
-                base_url=base_url  # Pass potentially modified base_url
+                base_url=base_url,  # Pass potentially modified base_url
+                request=request,  # Stop the upstream when the client disconnects
+                slot=slot  # Held until the stream ends
             )
+            # Also free the slot if the response is dropped before streaming starts
+            weakref.finalize(stream, slot.release)
+            return StreamingResponse(stream, media_type="text/event-stream")
+        else:
+            # The key includes the provider key, so only callers with the
+            # same upstream credentials share a call
+            with track_request("chat", provider_name, model):
+                full_content = await coalesced(
+                    ("chat", provider_model, messages_dict, request_input.temperature,
+                     request_input.max_tokens, base_url, provider_api_key),
+                    lambda: admitted(priority, provider_name, model, lambda: aget_completion(
+                        messages=messages_dict,
+                        provider_model_string=provider_model,
+                        temperature=request_input.temperature,
+                        max_tokens=request_input.max_tokens,
+                        provider_api_key=provider_api_key,  # Pass retrieved key
+                        base_url=base_url  # Pass potentially modified base_url
+                    )))
 
             # Format the response according to OpenAI spec
             response_data = NonStreamingChatCompletion(
@@ -385,6 +566,8 @@ async def chat_completions(request_input: ChatCompletionRequestInput, token: str
             )
             return response_data
 
+    except HTTPException:
+        raise
     # Catches ValueErrors from uniioai completion functions (e.g., model format)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -394,7 +577,7 @@ async def chat_completions(request_input: ChatCompletionRequestInput, token: str
         raise HTTPException(
             status_code=401, detail=f"Provider Authentication Error: {e}")
     except RateLimitError as e:
-        raise HTTPException(status_code=429, detail=f"Rate Limit Error: {e}")
+        raise rate_limit_exception(e)
     except ProviderError as e:
         raise HTTPException(
             status_code=500, detail=f"Provider Error ({provider_name}): {e}")
@@ -445,25 +628,39 @@ async def create_embeddings(request_input: EmbeddingRequest, request: Request):
                 raise HTTPException(
                     status_code=401, detail="Authentication required for this provider")
             try:
-                provider_api_key = get_provider_api_key(
+                provider_api_key = await resolve_provider_api_key(
                     api_bearer_token, provider_name)
             except (ValueError, AuthenticationError) as e:
                 raise HTTPException(
                     status_code=401, detail=f"API Key Retrieval Failed: {e}")
             base_url = None
 
-        # Get embeddings using the synchronous function in a thread pool
-        embeddings_result = await run_in_threadpool(
-            get_embeddings,
-            input_texts=input_texts,
-            provider_model_string=provider_model,
-            provider_api_key=provider_api_key,
-            base_url=base_url
-        )
-
-        # Format the response according to OpenAI spec
+        encoding_format = request_input.encoding_format or "float"
+        if encoding_format not in ("float", "base64"):
+            raise HTTPException(
+                status_code=400, detail="Invalid encoding_format. Expected 'float' or 'base64'.")
+
+        model = provider_model.split('@', 1)[1]
+        priority = request_priority(request)
+        with track_request("embeddings", provider_name, model):
+            embeddings_result = await coalesced(
+                ("embeddings", provider_model, input_texts, base_url, provider_api_key),
+                lambda: admitted(priority, provider_name, model, lambda: aget_embeddings(
+                    input_texts=input_texts,
+                    provider_model_string=provider_model,
+                    provider_api_key=provider_api_key,
+                    base_url=base_url,
+                    as_matrix=True
+                )))
+
+        # Format the response according to OpenAI spec; base64 sends each
+        # vector as its packed float32 bytes instead of JSON numbers
         embedding_data = []
-        for i, embedding in enumerate(embeddings_result['embeddings']):
+        for i, row in enumerate(embeddings_result['embeddings']):
+            if encoding_format == "base64":
+                embedding = base64.b64encode(pack_embedding(row)).decode("ascii")
+            else:
+                embedding = row.tolist()
             embedding_data.append(EmbeddingData(
                 embedding=embedding,
                 index=i
@@ -476,13 +673,15 @@ async def create_embeddings(request_input: EmbeddingRequest, request: Request):
         )
         return response_data
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except AuthenticationError as e:
         raise HTTPException(
             status_code=401, detail=f"Provider Authentication Error: {e}")
     except RateLimitError as e:
-        raise HTTPException(status_code=429, detail=f"Rate Limit Error: {e}")
+        raise rate_limit_exception(e)
     except ProviderError as e:
         raise HTTPException(
             status_code=500, detail=f"Provider Error ({provider_name}): {e}")
@@ -499,22 +698,213 @@ async def create_embeddings(request_input: EmbeddingRequest, request: Request):
 
 # --- Change dynamic list models to return ModelList ---
 @app.get("/v1/models/{provider_name}", response_model=ModelList)
-async def dynamic_list_models(provider_name: str, token: str = Depends(security)):
+async def dynamic_list_models(provider_name: str, token: str = Depends(security), refresh: bool = False):
     """
     List available models for a specific provider, formatted OpenAI‐style.
+    Lists are cached per provider and token; pass ?refresh=true to bypass the cache.
     """
     try:
-        raw_models = list_models_for_provider(provider_name, token.credentials)
+        raw_models = await alist_models_for_provider(provider_name, token.credentials, refresh=refresh)
         model_objs = [Model(id=m) for m in raw_models]
         return ModelList(data=model_objs)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except AuthenticationError as e:
         raise HTTPException(status_code=401, detail=str(e))
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Request, latency, streaming and error metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/v1/stats")
+async def get_stats():
+    """
+    Counters of the proxy's scheduler, request coalescing and caches.
+    """
+    embedding_cache = get_embedding_cache()
+    return {
+        "scheduler": scheduler.stats(),
+        "adaptive_limits": adaptive_limits.stats() if adaptive_limits is not None else None,
+        "single_flight": single_flight.stats() if single_flight is not None else None,
+        "credentials": credential_cache.stats(),
+        "embedding_cache": embedding_cache.stats() if embedding_cache is not None else None,
+    }
+
+
+@app.delete("/v1/credentials/cache")
+async def flush_credentials(token: str = Depends(security)):
+    """
+    Forget the cached provider keys of the calling token, e.g. after rotating
+    keys in credgoo.
+    """
+    return {"flushed": credential_cache.flush(token.credentials)}
+
+
+# --- Batch API ---
+
+_batch_runner: Optional[BatchRunner] = None
+
+
+def get_batch_runner() -> BatchRunner:
+    """
+    Return the batch runner, opening its job store (UNIINFER_BATCH_DB) on first use.
+    """
+    global _batch_runner
+    if _batch_runner is None:
+        store = BatchStore(os.getenv("UNIINFER_BATCH_DB", DEFAULT_BATCH_DB))
+        _batch_runner = BatchRunner(
+            store, run_batch_request,
+            concurrency=int(os.getenv("UNIINFER_BATCH_CONCURRENCY", DEFAULT_BATCH_CONCURRENCY)))
+    return _batch_runner
+
+
+async def run_batch_request(body: Dict[str, Any], api_bearer_token: str) -> Dict[str, Any]:
+    """
+    Send one batch line as a chat completion at batch priority and return the
+    chat.completion body. Provider rate limits apply as for direct requests;
+    the request waits for a slot without the queue timeout, so sustained
+    interactive load delays batches instead of failing them.
+    """
+    request_input = ChatCompletionRequestInput(**body)
+    provider_model = request_input.model
+    provider_name, model = provider_model.split('@', 1)
+    base_url = request_input.base_url
+    if provider_name == "ollama" and base_url is None:
+        base_url = PROVIDER_CONFIGS.get("ollama", {}).get("extra_params", {}).get("base_url")
+    provider_api_key = await resolve_provider_api_key(api_bearer_token, provider_name, model)
+    async with await scheduler.acquire(provider_name, model, BATCH, queue_timeout=None):
+        with track_request("batch", provider_name, model):
+            full_content = await aget_completion(
+                messages=[msg.model_dump() for msg in request_input.messages],
+                provider_model_string=provider_model,
+                temperature=request_input.temperature,
+                max_tokens=request_input.max_tokens,
+                provider_api_key=provider_api_key,
+                base_url=base_url)
+    return NonStreamingChatCompletion(
+        model=provider_model,
+        choices=[NonStreamingChoice(message=ChatMessageOutput(role="assistant", content=full_content))]
+    ).model_dump()
+
+
+@app.post("/v1/files")
+async def upload_file(request: Request, token: str = Depends(security), purpose: str = "batch",
+                      filename: Optional[str] = None):
+    """
+    Upload a batch input file: multipart form (``file``, ``purpose``) as in the
+    OpenAI API, or the raw JSONL as the request body.
+    """
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        try:
+            form = await request.form()
+        except AssertionError:
+            raise HTTPException(
+                status_code=415, detail="Multipart uploads need python-multipart; send the JSONL as the request body instead")
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing 'file' field")
+        content = await upload.read()
+        filename = upload.filename or filename
+        purpose = form.get("purpose") or purpose
+    else:
+        content = await request.body()
+    if purpose != "batch":
+        raise HTTPException(status_code=400, detail="Only purpose 'batch' is supported")
+    runner = get_batch_runner()
+    owner = runner.attach(token.credentials)
+    return await asyncio.to_thread(
+        runner.store.create_file, owner, content, filename or "batch_input.jsonl", purpose)
+
+
+@app.get("/v1/files/{file_id}")
+async def get_file(file_id: str, token: str = Depends(security)):
+    """Return the metadata of an uploaded or generated file."""
+    runner = get_batch_runner()
+    file_object = await asyncio.to_thread(runner.store.get_file, runner.attach(token.credentials), file_id)
+    if file_object is None:
+        raise HTTPException(status_code=404, detail=f"File '{file_id}' not found")
+    return file_object
+
+
+@app.get("/v1/files/{file_id}/content")
+async def get_file_content(file_id: str, token: str = Depends(security)):
+    """Return the content of a file, e.g. a batch's output or error JSONL."""
+    runner = get_batch_runner()
+    content = await asyncio.to_thread(runner.store.file_content, runner.attach(token.credentials), file_id)
+    if content is None:
+        raise HTTPException(status_code=404, detail=f"File '{file_id}' not found")
+    return Response(content, media_type="application/jsonl")
+
+
+@app.post("/v1/batches")
+async def create_batch(request_input: BatchCreateRequest, token: str = Depends(security)):
+    """
+    Create a batch from an uploaded JSONL file. Its requests run in the
+    background at batch priority; poll GET /v1/batches/{batch_id} for the
+    output_file_id.
+    """
+    runner = get_batch_runner()
+    owner = runner.attach(token.credentials)
+    try:
+        # parsing and inserting a large input file must not stall the loop
+        batch = await asyncio.to_thread(
+            runner.store.create_batch, owner, request_input.input_file_id, request_input.endpoint,
+            request_input.completion_window, request_input.metadata)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"File '{request_input.input_file_id}' not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    runner.start()
+    return batch
+
+
+@app.get("/v1/batches")
+async def list_batches(token: str = Depends(security), limit: int = 20, after: Optional[str] = None):
+    """List the caller's batches, newest first."""
+    if not 1 <= limit <= 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+    runner = get_batch_runner()
+    batches = await asyncio.to_thread(
+        runner.store.list_batches, runner.attach(token.credentials), limit + 1, after)
+    return {
+        "object": "list",
+        "data": batches[:limit],
+        "first_id": batches[0]["id"] if batches else None,
+        "last_id": batches[:limit][-1]["id"] if batches else None,
+        "has_more": len(batches) > limit,
+    }
+
+
+@app.get("/v1/batches/{batch_id}")
+async def get_batch(batch_id: str, token: str = Depends(security)):
+    """Return a batch with its status and request counts."""
+    runner = get_batch_runner()
+    batch = await asyncio.to_thread(runner.store.get_batch, runner.attach(token.credentials), batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail=f"Batch '{batch_id}' not found")
+    return batch
+
+
+@app.post("/v1/batches/{batch_id}/cancel")
+async def cancel_batch(batch_id: str, token: str = Depends(security)):
+    """Stop sending a batch's requests; finished results are kept in its output file."""
+    runner = get_batch_runner()
+    batch = await asyncio.to_thread(runner.store.cancel_batch, runner.attach(token.credentials), batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail=f"Batch '{batch_id}' not found")
+    runner.start()
+    return batch
+
+
 # --- Add Embedding Providers Endpoint ---
 @app.get("/v1/embedding/providers", response_model=ProviderList)
 async def get_embedding_providers(request: Request):